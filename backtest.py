@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+backtest.py
+scalping_signals giriş kurallarının (VWAP_BOUNCE, VOLUME_BREAKOUT, SQUEEZE_BREAKOUT)
+uzun geçmiş üzerinde vektörel geri testi.
+
+Kurallar her bar için qwen3.scalping_signal_frame ile değerlendirilir. Canlı analiz VWAP'ı
+çektiği pencere (ohlcv_buffer) üzerinde kümülatif hesapladığı için geri testte de VWAP
+aynı uzunlukta kayan pencereyle hesaplanır; diğer indikatörler canlıdakiyle aynıdır.
+
+İşlem modeli (kural ve yön başına, aynı anda tek pozisyon):
+- Sinyal barının kapanışında karar, sonraki barın açılışında taker emirle giriş
+- Take profit: giriş ± tp_atr * ATR14 (maker limit emir)
+- Stop loss:   giriş ∓ sl_atr * ATR14 (taker); aynı barda ikisi de değerse stop sayılır
+- `hold` bar içinde hiçbiri olmazsa son barın kapanışında taker çıkış
+Komisyonlar get_market_info'nun taker_fee / maker_fee (%) alanlarından alınır; getiriler
+sabit notional ile yüzde olarak toplanır (drawdown bu eşitlik eğrisinde ölçülür).
+
+Kullanım:
+    python backtest.py BTC/USDT:USDT ETH/USDT:USDT --timeframe 15m --days 365 --json report.json
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicator_block as kernels
+from qwen3 import SCALPING_COLUMNS, SCALPING_ENTRY_SIGNALS, indicator_set, ohlcv_buffer, scalping_signal_frame
+
+RULES = ("VWAP_BOUNCE", "VOLUME_BREAKOUT", "SQUEEZE_BREAKOUT")
+
+# Binance USDT-M futures varsayılan komisyonları (oran)
+DEFAULT_TAKER_FEE = 0.0005
+DEFAULT_MAKER_FEE = 0.0002
+
+# Varsayılan çıkış parametreleri
+DEFAULT_HOLD = 8
+DEFAULT_TP_ATR = 1.5
+DEFAULT_SL_ATR = 1.0
+
+# Canlı 15m analizinde VWAP'ın hesaplandığı mum sayısı
+DEFAULT_VWAP_WINDOW = ohlcv_buffer(200)
+
+EXIT_REASONS = ("take_profit", "stop_loss", "time")
+
+
+def fees_from_market_info(market_info: dict) -> tuple:
+    """get_market_info çıktısındaki % komisyonları (taker, maker) oranına çevirir."""
+    market_info = market_info or {}
+    taker = market_info.get("taker_fee")
+    maker = market_info.get("maker_fee")
+    return (DEFAULT_TAKER_FEE if taker is None else taker / 100,
+            DEFAULT_MAKER_FEE if maker is None else maker / 100)
+
+
+def signal_frame(df: pd.DataFrame, vwap_window: int = DEFAULT_VWAP_WINDOW) -> pd.DataFrame:
+    """
+    OHLCV frame'i için bar başına giriş sinyalleri ve ATR14.
+    vwap_window > 0 ise vwap, canlı analizdeki pencere uzunluğunda kayan VWAP'tır.
+    """
+    frame = indicator_set(df).frame(SCALPING_COLUMNS + ["atr14"])
+    if vwap_window:
+        frame = frame.assign(vwap=kernels.rolling_vwap(
+            *(frame[c].to_numpy(dtype="float64") for c in ("high", "low", "close", "volume")), vwap_window))
+    signals = scalping_signal_frame(frame)
+    signals["atr14"] = frame["atr14"]
+    return signals
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """Her satırda ilk True'nun konumu (yoksa satır uzunluğu)."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+
+def _non_overlapping(entry: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """Önceki pozisyon kapanmadan gelen girişleri eler (girişler sıralı)."""
+    keep = np.zeros(len(entry), dtype=bool)
+    free_at = -1
+    for i, (e, x) in enumerate(zip(entry.tolist(), exit_.tolist())):
+        if e > free_at:
+            keep[i] = True
+            free_at = x
+    return keep
+
+
+def simulate(ohlc: dict, signal: np.ndarray, side: int, atr: np.ndarray, taker: float, maker: float,
+             hold: int = DEFAULT_HOLD, tp_atr: float = DEFAULT_TP_ATR, sl_atr: float = DEFAULT_SL_ATR) -> dict:
+    """
+    Bir sinyal kolonunun işlemlerini simüle eder.
+
+    Args:
+        ohlc: {"open", "high", "low", "close"} float64 dizileri
+        signal: Bar başına giriş sinyali (bool)
+        side: 1 long, -1 short
+        atr: Sinyal barındaki ATR14
+        taker, maker: Komisyon oranları
+
+    Returns:
+        {"entry", "exit", "net", "gross", "reason"} dizileri (exit'e göre sıralı)
+    """
+    n = len(ohlc["close"])
+    bars = np.flatnonzero(signal[:n - hold] & (atr[:n - hold] > 0)) if n > hold else np.empty(0, dtype=int)
+    entry = bars + 1
+    price = ohlc["open"][entry]
+    take = price + side * tp_atr * atr[bars]
+    stop = price - side * sl_atr * atr[bars]
+
+    highs = sliding_window_view(ohlc["high"], hold)[entry]
+    lows = sliding_window_view(ohlc["low"], hold)[entry]
+    if side > 0:
+        tp_hit, sl_hit = _first_true(highs >= take[:, None]), _first_true(lows <= stop[:, None])
+    else:
+        tp_hit, sl_hit = _first_true(lows <= take[:, None]), _first_true(highs >= stop[:, None])
+
+    # 0: take profit, 1: stop loss, 2: süre doldu
+    reason = np.where(sl_hit <= tp_hit, np.where(sl_hit < hold, 1, 2), 0)
+    offset = np.choose(reason, [tp_hit, sl_hit, np.full_like(tp_hit, hold - 1)])
+    exit_ = entry + offset
+    exit_price = np.choose(reason, [take, stop, ohlc["close"][exit_]])
+
+    keep = _non_overlapping(entry, exit_)
+    entry, exit_, price, exit_price, reason = entry[keep], exit_[keep], price[keep], exit_price[keep], reason[keep]
+    gross = side * (exit_price - price) / price
+    net = gross - taker - np.where(reason == 0, maker, taker)
+    return {"entry": entry, "exit": exit_, "gross": gross, "net": net, "reason": reason}
+
+
+def _concat(trades: list) -> dict:
+    """İşlem kümelerini birleştirip çıkış zamanına göre sıralar."""
+    if not trades:
+        return {"exit_time": np.empty(0, dtype="int64"), "net": np.empty(0), "reason": np.empty(0, dtype=int),
+                "bars": np.empty(0, dtype=int)}
+    merged = {k: np.concatenate([t[k] for t in trades]) for k in ("exit_time", "net", "reason", "bars")}
+    order = np.argsort(merged["exit_time"], kind="stable")
+    return {k: v[order] for k, v in merged.items()}
+
+
+def trade_stats(trades: dict) -> dict:
+    """İsabet oranı, beklenen değer, kâr faktörü ve maksimum drawdown (% notional)."""
+    net = trades["net"] * 100
+    count = len(net)
+    if count == 0:
+        return {"trades": 0, "hit_rate_pct": None, "expectancy_pct": None, "avg_win_pct": None,
+                "avg_loss_pct": None, "profit_factor": None, "total_return_pct": 0.0, "max_drawdown_pct": 0.0,
+                "avg_bars_held": None, "exits": dict.fromkeys(EXIT_REASONS, 0)}
+    wins, losses = net[net > 0], net[net <= 0]
+    equity = np.cumsum(net)
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0)) - equity
+    loss_sum = -losses.sum()
+    return {
+        "trades": count,
+        "hit_rate_pct": round(len(wins) / count * 100, 2),
+        "expectancy_pct": round(float(net.mean()), 4),
+        "avg_win_pct": round(float(wins.mean()), 4) if len(wins) else None,
+        "avg_loss_pct": round(float(losses.mean()), 4) if len(losses) else None,
+        "profit_factor": round(float(wins.sum() / loss_sum), 3) if loss_sum > 0 else None,
+        "total_return_pct": round(float(equity[-1]), 4),
+        "max_drawdown_pct": round(float(drawdown.max()), 4),
+        "avg_bars_held": round(float(trades["bars"].mean()), 2),
+        "exits": {name: int((trades["reason"] == i).sum()) for i, name in enumerate(EXIT_REASONS)},
+    }
+
+
+def run_signals(df: pd.DataFrame, taker: float = DEFAULT_TAKER_FEE, maker: float = DEFAULT_MAKER_FEE,
+                hold: int = DEFAULT_HOLD, tp_atr: float = DEFAULT_TP_ATR, sl_atr: float = DEFAULT_SL_ATR,
+                vwap_window: int = DEFAULT_VWAP_WINDOW) -> dict:
+    """
+    Tek bir sembolün tüm giriş sinyallerinin işlemleri.
+
+    Returns:
+        {sinyal adı: {"exit_time", "net", "reason", "bars"}}
+    """
+    signals = signal_frame(df, vwap_window=vwap_window)
+    ohlc = {c: df[c].to_numpy(dtype="float64") for c in ("open", "high", "low", "close")}
+    atr = signals["atr14"].to_numpy(dtype="float64")
+    times = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else np.arange(len(df), dtype="int64")
+    out = {}
+    for name in SCALPING_ENTRY_SIGNALS:
+        side = 1 if name.endswith("_LONG") else -1
+        sim = simulate(ohlc, signals[name].to_numpy(), side, atr, taker, maker, hold=hold, tp_atr=tp_atr,
+                       sl_atr=sl_atr)
+        out[name] = {"exit_time": times[sim["exit"]], "net": sim["net"], "reason": sim["reason"],
+                     "bars": sim["exit"] - sim["entry"] + 1}
+    return out
+
+
+def summarize(trades_by_signal: dict) -> dict:
+    """Sinyal başına ve kural başına (long + short) istatistikler."""
+    signals = {name: trade_stats(_concat(trades)) for name, trades in trades_by_signal.items()}
+    rules = {rule: trade_stats(_concat([t for name, ts in trades_by_signal.items()
+                                        if name.startswith(rule) for t in ts]))
+             for rule in RULES}
+    return {"signals": signals, "rules": rules}
+
+
+def backtest(frames: dict, market_infos: dict = None, hold: int = DEFAULT_HOLD, tp_atr: float = DEFAULT_TP_ATR,
+             sl_atr: float = DEFAULT_SL_ATR, vwap_window: int = DEFAULT_VWAP_WINDOW) -> dict:
+    """
+    Birden çok sembolün geri testi.
+
+    Args:
+        frames: {symbol: OHLCV DataFrame (DatetimeIndex)}
+        market_infos: {symbol: get_market_info çıktısı} (komisyonlar; yoksa varsayılanlar)
+
+    Returns:
+        {"symbols": {symbol: {"bars", "fees", "signals", "rules"}}, "total": {"signals", "rules"}}
+    """
+    market_infos = market_infos or {}
+    per_symbol, pooled = {}, {name: [] for name in SCALPING_ENTRY_SIGNALS}
+    for symbol, df in frames.items():
+        taker, maker = fees_from_market_info(market_infos.get(symbol))
+        trades = run_signals(df, taker, maker, hold=hold, tp_atr=tp_atr, sl_atr=sl_atr, vwap_window=vwap_window)
+        per_symbol[symbol] = {"bars": len(df), "fees": {"taker": taker, "maker": maker},
+                              **summarize({name: [t] for name, t in trades.items()})}
+        for name, t in trades.items():
+            pooled[name].append(t)
+    return {"symbols": per_symbol, "total": summarize(pooled)}
+
+
+def print_report(report: dict) -> None:
+    """Kural başına tüm semboller toplamı ve sembol başına beklenen değer."""
+    print(f"\n{'kural':>22} | {'işlem':>6} | {'isabet':>7} | {'beklenen':>9} | {'toplam':>9} | {'max DD':>8}")
+    print("-" * 76)
+    for name, stats in {**report["total"]["rules"], **report["total"]["signals"]}.items():
+        hit = f"{stats['hit_rate_pct']:6.2f}%" if stats["trades"] else "     - "
+        expectancy = f"{stats['expectancy_pct']:8.4f}%" if stats["trades"] else "       - "
+        print(f"{name:>22} | {stats['trades']:>6} | {hit} | {expectancy} | "
+              f"{stats['total_return_pct']:8.2f}% | {stats['max_drawdown_pct']:7.2f}%")
+
+
+def load_frames(symbols: list, timeframe: str, days: float, exchange_id: str = "binance"):
+    """Sembollerin `days` günlük mumlarını (candle store ile) ve market bilgisini çeker."""
+    from candle_store import fetch_ohlcv_cached, get_default_store, timeframe_to_ms
+    from exchanges import get_exchange
+    from qwen3 import get_market_info
+
+    exchange = get_exchange(exchange_id)
+    limit = int(days * 86_400_000 // timeframe_to_ms(timeframe))
+    frames, infos = {}, {}
+    for symbol in symbols:
+        print(f"📥 {symbol} {timeframe}: {limit} mum çekiliyor...")
+        frames[symbol] = fetch_ohlcv_cached(exchange, symbol, timeframe, limit, store=get_default_store())
+        infos[symbol] = get_market_info(exchange, symbol)
+    return frames, infos
+
+
+def main(argv=None) -> int:
+    import time
+
+    parser = argparse.ArgumentParser(description="Scalping giriş kurallarının vektörel geri testi")
+    parser.add_argument("symbols", nargs="+", help="Semboller (örn. BTC/USDT:USDT)")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--timeframe", default="15m")
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--hold", type=int, default=DEFAULT_HOLD, help="En fazla pozisyon süresi (bar)")
+    parser.add_argument("--tp-atr", type=float, default=DEFAULT_TP_ATR, help="Take profit (ATR katı)")
+    parser.add_argument("--sl-atr", type=float, default=DEFAULT_SL_ATR, help="Stop loss (ATR katı)")
+    parser.add_argument("--vwap-window", type=int, default=DEFAULT_VWAP_WINDOW,
+                        help="Kayan VWAP penceresi (0 → tüm geçmiş kümülatif)")
+    parser.add_argument("--json", help="Raporu JSON dosyasına yaz")
+    args = parser.parse_args(argv)
+
+    frames, infos = load_frames(args.symbols, args.timeframe, args.days, exchange_id=args.exchange)
+    start = time.perf_counter()
+    report = backtest(frames, infos, hold=args.hold, tp_atr=args.tp_atr, sl_atr=args.sl_atr,
+                      vwap_window=args.vwap_window)
+    seconds = time.perf_counter() - start
+    print_report(report)
+    bars = sum(len(df) for df in frames.values())
+    print(f"\n⏱️  {len(frames)} sembol, {bars} mum: {seconds:.2f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
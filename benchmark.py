@@ -0,0 +1,721 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+benchmark.py
+Analiz motorunun sıcak noktaları için performans ölçümleri.
+
+Kullanım:
+    python benchmark.py levels --sizes 10000,100000,1000000
+    python benchmark.py indicators summaries analyze --json report.json --baseline benchmark_baseline.json
+    python benchmark.py imports --json report.json --baseline benchmark_baseline.json
+
+--json ölçümleri makine tarafından okunabilir bir rapora yazar; --baseline verilirse
+süreler (ve tepe bellek) kayıtlı rapora göre karşılaştırılır ve --tolerance'tan
+fazla yavaşlama varsa çıkış kodu 1 olur.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from test_scalping_features import create_test_data
+
+
+# =========================
+#  REFERANS (ESKİ) UYGULAMALAR
+# =========================
+def detect_all_levels_loop(df: pd.DataFrame, window: int = 10) -> dict:
+    """detect_all_levels'in bar bar döngülü orijinal hali (doğruluk referansı)."""
+    highs, lows = [], []
+    for i in range(window, len(df) - window):
+        hh = df["high"].iloc[i]
+        ll = df["low"].iloc[i]
+        if hh == df["high"].iloc[i - window:i + window + 1].max():
+            highs.append(hh)
+        if ll == df["low"].iloc[i - window:i + window + 1].min():
+            lows.append(ll)
+    return {"highs": highs, "lows": lows}
+
+
+def grade_levels_by_volume_loop(df: pd.DataFrame, levels: list, side: str, radius_mult: float = 0.5):
+    """grade_levels_by_volume'un seviye başına maske kuran orijinal hali (doğruluk referansı)."""
+    if not levels or df.empty:
+        return {"strong": [], "moderate": [], "weak": []}
+
+    atr_now = float(df["atr14"].dropna().iloc[-1]) if df["atr14"].notna().any() else (df["high"]-df["low"]).mean()
+    avg_vol = float(df["volume"].mean())
+    strong, moderate, weak = [], [], []
+    radius = max(atr_now * radius_mult, 1e-9)
+
+    for lvl in levels:
+        mask = (df["high"] >= lvl - radius) & (df["low"] <= lvl + radius)
+        local_vol = float(df.loc[mask, "volume"].mean()) if mask.any() else 0.0
+        if local_vol >= 1.5 * avg_vol:
+            strong.append(lvl)
+        elif local_vol >= 1.0 * avg_vol:
+            moderate.append(lvl)
+        else:
+            weak.append(lvl)
+    return {"strong": sorted(strong), "moderate": sorted(moderate), "weak": sorted(weak)}
+
+
+def candle_pattern_row(o, h, l, c):
+    """Satır bazlı eski tek mum sınıflandırıcı (doğruluk referansı)."""
+    body = abs(c - o)
+    rng = max(h - l, 1e-9)
+    upper = h - max(c, o)
+    lower = min(c, o) - l
+    if body / rng < 0.1:
+        return "doji"
+    if lower > 2 * body and upper < body:
+        return "hammer"
+    if upper > 2 * body and lower < body:
+        return "shooting_star"
+    return "normal"
+
+
+def classify_candles_loop(df: pd.DataFrame) -> list:
+    """enrich_indicators'taki eski list comprehension hali."""
+    return [candle_pattern_row(o, h, l, c) for o, h, l, c in zip(df["open"], df["high"], df["low"], df["close"])]
+
+
+def recent_candles_json_loop(df: pd.DataFrame, last_n: int) -> list:
+    """recent_candles_json'un iterrows ile satır satır kuran orijinal hali."""
+    from qwen3 import _float, _bool
+
+    tail = df.dropna().tail(last_n)
+    out = []
+    for ts, r in tail.iterrows():
+        out.append({
+            "timestamp": ts.isoformat().replace("+00:00", "Z"),
+            "open": _float(r["open"]), "high": _float(r["high"]), "low": _float(r["low"]),
+            "close": _float(r["close"]), "volume": _float(r["volume"]),
+            "sma50": _float(r["sma50"]), "sma100": _float(r["sma100"]), "sma200": _float(r["sma200"]),
+            "ema20": _float(r.get("ema20")),
+            "ema50": _float(r["ema50"]), "ema100": _float(r["ema100"]), "ema200": _float(r["ema200"]),
+            "rsi14": _float(r["rsi14"]),
+            "macd": _float(r["macd"]), "macd_signal": _float(r["macd_signal"]), "macd_hist": _float(r["macd_hist"]),
+            "atr14": _float(r["atr14"]),
+            "obv": _float(r["obv"]),
+            "change_pct": _float(r["change_pct"]),
+            "trend_flags": {
+                "above_sma200": _bool(r["above_sma200"]),
+                "above_ema200": _bool(r["above_ema200"])
+            },
+            "pattern": r["pattern"],
+            "vwap": _float(r.get("vwap")),
+            "bb_middle": _float(r.get("bb_middle")), "bb_upper": _float(r.get("bb_upper")),
+            "bb_lower": _float(r.get("bb_lower")), "bb_percent_b": _float(r.get("bb_percent_b")),
+            "bb_bandwidth": _float(r.get("bb_bandwidth")),
+            "stoch_rsi": _float(r.get("stoch_rsi"))
+        })
+    return out
+
+
+def stochastic_rsi_reindex(rsi_series: pd.Series, length: int = 14) -> pd.Series:
+    """stochastic_rsi'ın dropna + reindex ile çalışan orijinal hali."""
+    rsi_clean = rsi_series.dropna()
+    if len(rsi_clean) < length:
+        return pd.Series([np.nan] * len(rsi_series), index=rsi_series.index)
+    rsi_min = rsi_clean.rolling(window=length, min_periods=length).min()
+    rsi_max = rsi_clean.rolling(window=length, min_periods=length).max()
+    denominator = (rsi_max - rsi_min).replace(0, np.nan)
+    stoch_rsi = ((rsi_clean - rsi_min) / denominator) * 100
+    return stoch_rsi.reindex(rsi_series.index)
+
+
+def enrich_indicators_copying(df: pd.DataFrame) -> pd.DataFrame:
+    """enrich_indicators'ın df.copy() + kolon kolon atama yapan orijinal hali."""
+    from patterns import classify_candles
+    from qwen3 import sma, ema, rsi, macd, atr, obv, vwap, bollinger_bands
+
+    d = df.copy()
+    for L in (50, 100, 200):
+        d[f"sma{L}"] = sma(d["close"], L)
+        d[f"ema{L}"] = ema(d["close"], L)
+    d["ema20"] = ema(d["close"], 20)
+    d["rsi14"] = rsi(d["close"], 14)
+    d["macd"], d["macd_signal"], d["macd_hist"] = macd(d["close"])
+    d["atr14"] = atr(d, 14)
+    d["obv"] = obv(d)
+    d["change_pct"] = (d["close"] - d["open"]) / d["open"] * 100.0
+    d["above_sma200"] = d["close"] > d["sma200"]
+    d["above_ema200"] = d["close"] > d["ema200"]
+    d["pattern"] = classify_candles(d)
+    d["vwap"] = vwap(d)
+    d["bb_middle"], d["bb_upper"], d["bb_lower"], d["bb_percent_b"], d["bb_bandwidth"] = bollinger_bands(d["close"], 20)
+    d["stoch_rsi"] = stochastic_rsi_reindex(d["rsi14"], 14)
+    return d
+
+
+def clear_table_per_row(client, table_name: str) -> int:
+    """clear_table'ın tüm id'leri çekip her satırı ayrı DELETE ile silen orijinal hali (N+1)."""
+    response = client.table(table_name).select("id").execute()
+    for row in response.data or []:
+        client.table(table_name).delete().eq("id", row["id"]).execute()
+    return len(response.data or [])
+
+
+# =========================
+#        YARDIMCILAR
+# =========================
+def best_time(fn, *args, repeat: int = 3, **kwargs) -> float:
+    """fn'in `repeat` çalıştırmadaki en iyi süresini (saniye) döndürür."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn, *args, **kwargs) -> int:
+    """fn çalışırken tracemalloc ile ölçülen tepe bellek (byte)."""
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def make_data(n: int, seed: int = 42) -> pd.DataFrame:
+    """Tekrarlanabilir test verisi (create_test_data ile aynı dağılım)."""
+    np.random.seed(seed)
+    return create_test_data(n)
+
+
+def synthetic_recording(config: dict, symbol: str = "BTC/USDT:USDT", exchange_id: str = "binance",
+                        server_time: int = 1_760_000_000_000, seed: int = 42) -> dict:
+    """
+    create_test_data ile üretilmiş, recording.ReplayExchange'in oynatabileceği kayıt.
+    config: {timeframe: mum sayısı}; mumlar exchange saatine hizalı biter.
+    """
+    from candle_store import frame_to_rows, timeframe_to_ms
+
+    ohlcv = {}
+    for i, (tf, n) in enumerate(config.items()):
+        df = make_data(n, seed=seed + i)
+        step = timeframe_to_ms(tf)
+        end = server_time - server_time % step
+        df.index = pd.to_datetime(end - step * np.arange(n)[::-1], unit="ms", utc=True)
+        ohlcv[tf] = frame_to_rows(df)
+
+    last = float(ohlcv[next(iter(config))][-1, 4])
+    tick = round(last * 1e-5, 2) or 0.01
+    return {
+        "exchange": exchange_id,
+        "symbol": symbol,
+        "server_time": server_time,
+        "ohlcv": ohlcv,
+        "ticker": {"symbol": symbol, "last": last, "bid": last - tick, "ask": last + tick,
+                   "quoteVolume": 2.5e9, "baseVolume": 2.5e9 / last, "percentage": 1.2,
+                   "high": last * 1.02, "low": last * 0.98},
+        "order_book": {"bids": [[last - tick * (i + 1), 1.0 + i * 0.5] for i in range(20)],
+                       "asks": [[last + tick * (i + 1), 1.2 + i * 0.4] for i in range(20)]},
+        "funding_rate": {"symbol": symbol, "fundingRate": 0.0001,
+                         "fundingTimestamp": server_time + 3_600_000},
+        "market": {"symbol": symbol, "type": "swap", "taker": 0.0005, "maker": 0.0002},
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """analyze_coin'in ilerleme çıktısını ölçüm süresince bastırır."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# =========================
+#        BENCHMARKS
+# =========================
+def bench_levels(sizes, reference_max: int = 20_000) -> list:
+    """detect_all_levels: vektörel sürüm vs döngülü referans."""
+    from qwen3 import detect_all_levels
+
+    results = []
+    print(f"\n{'n':>10} | {'vektörel (ms)':>14} | {'döngü (ms)':>12} | {'hızlanma':>9}")
+    print("-" * 56)
+    for n in sizes:
+        df = make_data(n)
+        fast = best_time(detect_all_levels, df)
+        slow = best_time(detect_all_levels_loop, df, repeat=1) if n <= reference_max else None
+        results.append({"name": "detect_all_levels", "n": n, "seconds": fast, "reference_seconds": slow})
+        slow_txt = f"{slow * 1000:12.1f}" if slow is not None else f"{'-':>12}"
+        speedup = f"{slow / fast:8.0f}x" if slow is not None else f"{'-':>9}"
+        print(f"{n:>10} | {fast * 1000:14.2f} | {slow_txt} | {speedup}")
+    return results
+
+
+def bench_grading(sizes, n_levels: int = 2000, reference_max: int = 20_000) -> list:
+    """grade_levels_by_volume: toplu (prefix-sum) sürüm vs seviye başına maske."""
+    from qwen3 import atr, grade_levels_by_volume
+
+    results = []
+    print(f"\n{'n':>10} | {'seviye':>7} | {'toplu (ms)':>11} | {'maske (ms)':>11} | {'hızlanma':>9}")
+    print("-" * 62)
+    for n in sizes:
+        df = make_data(n)
+        df["atr14"] = atr(df, 14)
+        rng = np.random.default_rng(0)
+        levels = sorted(rng.uniform(df["low"].min(), df["high"].max(), n_levels).tolist())
+
+        fast = best_time(grade_levels_by_volume, df, levels, "support")
+        slow = best_time(grade_levels_by_volume_loop, df, levels, "support", repeat=1) if n <= reference_max else None
+        results.append({"name": "grade_levels_by_volume", "n": n, "levels": n_levels,
+                        "seconds": fast, "reference_seconds": slow})
+        slow_txt = f"{slow * 1000:11.1f}" if slow is not None else f"{'-':>11}"
+        speedup = f"{slow / fast:8.0f}x" if slow is not None else f"{'-':>9}"
+        print(f"{n:>10} | {n_levels:>7} | {fast * 1000:11.2f} | {slow_txt} | {speedup}")
+    return results
+
+
+def bench_patterns(sizes, reference_max: int = 1_000_000) -> list:
+    """classify_candles (tek + çok mumlu) vs satır bazlı tek mum döngüsü."""
+    from patterns import classify_candles
+
+    results = []
+    print(f"\n{'n':>10} | {'vektörel (ms)':>14} | {'döngü (ms)':>12} | {'hızlanma':>9}")
+    print("-" * 56)
+    for n in sizes:
+        df = make_data(n)
+        fast = best_time(classify_candles, df)
+        slow = best_time(classify_candles_loop, df, repeat=1) if n <= reference_max else None
+        results.append({"name": "classify_candles", "n": n, "seconds": fast, "reference_seconds": slow})
+        slow_txt = f"{slow * 1000:12.1f}" if slow is not None else f"{'-':>12}"
+        speedup = f"{slow / fast:8.0f}x" if slow is not None else f"{'-':>9}"
+        print(f"{n:>10} | {fast * 1000:14.2f} | {slow_txt} | {speedup}")
+    return results
+
+
+def bench_serialize(sizes, reference_max: int = 100_000) -> list:
+    """recent_candles_json (kolon bazlı) vs iterrows + JSON encode süresi."""
+    import json
+    from qwen3 import enrich_indicators, recent_candles_json
+    from serialization import dumps_bytes
+
+    results = []
+    print(f"\n{'n':>10} | {'kolon (ms)':>11} | {'iterrows (ms)':>13} | {'encode (ms)':>11} | {'json (ms)':>10}")
+    print("-" * 68)
+    for n in sizes:
+        df = enrich_indicators(make_data(n))
+        records = recent_candles_json(df, n)
+        fast = best_time(recent_candles_json, df, n)
+        slow = best_time(recent_candles_json_loop, df, n, repeat=1) if n <= reference_max else None
+        encode = best_time(dumps_bytes, records)
+        std = best_time(json.dumps, records, ensure_ascii=False)
+        results.append({"name": "recent_candles_json", "n": n, "seconds": fast, "reference_seconds": slow,
+                        "encode_seconds": encode, "json_seconds": std})
+        slow_txt = f"{slow * 1000:13.1f}" if slow is not None else f"{'-':>13}"
+        print(f"{n:>10} | {fast * 1000:11.2f} | {slow_txt} | {encode * 1000:11.2f} | {std * 1000:10.2f}")
+    return results
+
+
+def bench_clear(sizes, latency: float = 0.002, reference_max: int = 5_000) -> list:
+    """bulk_clear (tek DELETE) vs satır başına DELETE, yerel PostgREST taklidine karşı."""
+    from supabase import create_client
+    from postgrest_stub import PostgrestStub
+    from supabase_store import bulk_clear
+
+    results = []
+    print(f"\n  (istek başına {latency * 1000:.0f} ms yapay gecikme)")
+    print(f"{'satır':>10} | {'toplu (ms)':>11} | {'istek':>5} | {'satır satır (ms)':>16} | {'istek':>6}")
+    print("-" * 62)
+    with PostgrestStub(latency=latency) as stub:
+        client = create_client(stub.url, "benchmark-key")
+        client.table("bench").select("id").execute()  # bağlantıyı ısıt
+        for n in sizes:
+            rows = [{"symbol": f"COIN{i}/USDT"} for i in range(n)]
+
+            stub.seed("bench", rows)
+            stub.reset_counters()
+            start = time.perf_counter()
+            bulk_clear(client, "bench")
+            fast, fast_requests = time.perf_counter() - start, stub.request_count
+
+            slow = slow_requests = None
+            if n <= reference_max:
+                stub.seed("bench", rows)
+                stub.reset_counters()
+                start = time.perf_counter()
+                clear_table_per_row(client, "bench")
+                slow, slow_requests = time.perf_counter() - start, stub.request_count
+
+            results.append({"name": "clear_table", "n": n, "seconds": fast, "requests": fast_requests,
+                            "reference_seconds": slow, "reference_requests": slow_requests})
+            slow_txt = f"{slow * 1000:16.1f} | {slow_requests:>6}" if slow is not None else f"{'-':>16} | {'-':>6}"
+            print(f"{n:>10} | {fast * 1000:11.2f} | {fast_requests:>5} | {slow_txt}")
+    return results
+
+
+def bench_memory(sizes, last_n: int = 200) -> list:
+    """
+    Timeframe başına tepe bellek: enrich_indicators (blok) vs kopyalayan orijinal,
+    ve indikatörler + timeframe_summary (15m, scalping dahil) toplamı.
+    """
+    from qwen3 import enrich_indicators, timeframe_summary
+
+    def analyze(df):
+        timeframe_summary(enrich_indicators(df), last_n=last_n, timeframe="15m")
+
+    results = []
+    print(f"\n{'n':>10} | {'blok (MB)':>10} | {'kopya (MB)':>10} | {'timeframe (MB)':>14} | {'girdi (MB)':>10}")
+    print("-" * 66)
+    for n in sizes:
+        df = make_data(n)
+        enrich_indicators(df)  # importlar ve önbellekler ölçüme girmesin
+        fast = peak_memory(enrich_indicators, df)
+        slow = peak_memory(enrich_indicators_copying, df)
+        total = peak_memory(analyze, df)
+        size = df.memory_usage(deep=True).sum()
+        results.append({"name": "enrich_memory", "n": n, "peak_bytes": fast,
+                        "reference_peak_bytes": slow, "timeframe_peak_bytes": total})
+        print(f"{n:>10} | {fast / 1e6:10.2f} | {slow / 1e6:10.2f} | {total / 1e6:14.2f} | {size / 1e6:10.2f}")
+    return results
+
+
+def bench_lazy(sizes, last_n: int = 200) -> list:
+    """timeframe_summary: tüm indikatörler (enrich_indicators) vs sadece okunanlar (IndicatorSet)."""
+    from qwen3 import enrich_indicators, indicator_set, timeframe_summary
+
+    results = []
+    print(f"\n{'n':>10} | {'tf':>4} | {'kolon':>5} | {'tembel (ms)':>11} | {'hepsi (ms)':>10} | {'hızlanma':>9}")
+    print("-" * 64)
+    for n in sizes:
+        df = make_data(n)
+        for tf in ("4h", "15m"):
+            indicators = indicator_set(df)
+            timeframe_summary(indicators, last_n=last_n, timeframe=tf)
+            columns = len(indicators.computed)
+            fast = best_time(lambda: timeframe_summary(indicator_set(df), last_n=last_n, timeframe=tf))
+            slow = best_time(lambda: timeframe_summary(enrich_indicators(df), last_n=last_n, timeframe=tf))
+            results.append({"name": f"timeframe_summary_{tf}", "n": n, "seconds": fast,
+                            "reference_seconds": slow, "columns": columns})
+            print(f"{n:>10} | {tf:>4} | {columns:>5} | {fast * 1000:11.2f} | {slow * 1000:10.2f} | {slow / fast:8.2f}x")
+    return results
+
+
+def bench_indicators(sizes) -> list:
+    """Tek tek indikatör fonksiyonları (sma, ema, rsi, macd, atr, obv, vwap, bollinger, stoch rsi)."""
+    from qwen3 import atr, bollinger_bands, ema, macd, obv, rsi, sma, stochastic_rsi, vwap
+
+    cases = {
+        "sma": lambda df, r: sma(df["close"], 200),
+        "ema": lambda df, r: ema(df["close"], 200),
+        "rsi": lambda df, r: rsi(df["close"], 14),
+        "macd": lambda df, r: macd(df["close"]),
+        "atr": lambda df, r: atr(df, 14),
+        "obv": lambda df, r: obv(df),
+        "vwap": lambda df, r: vwap(df),
+        "bollinger_bands": lambda df, r: bollinger_bands(df["close"]),
+        "stochastic_rsi": lambda df, r: stochastic_rsi(r, 14),
+    }
+    results = []
+    print(f"\n{'n':>10} | " + " | ".join(f"{name[:9]:>9}" for name in cases) + "   (ms)")
+    print("-" * (13 + 12 * len(cases)))
+    for n in sizes:
+        df = make_data(n)
+        rsi_series = rsi(df["close"], 14)
+        row = []
+        for name, fn in cases.items():
+            seconds = best_time(fn, df, rsi_series)
+            results.append({"name": name, "n": n, "seconds": seconds})
+            row.append(f"{seconds * 1000:9.2f}")
+        print(f"{n:>10} | " + " | ".join(row))
+    return results
+
+
+def bench_summaries(sizes, last_n: int = 200) -> list:
+    """Özet fonksiyonları, indikatörleri hesaplanmış frame üzerinde (indikatör süresi hariç)."""
+    from qwen3 import enhanced_15m_analysis, enrich_indicators, summarize_key_levels, timeframe_summary
+
+    cases = {
+        "summarize_key_levels": lambda df: summarize_key_levels(df, last_n),
+        "timeframe_summary_4h": lambda df: timeframe_summary(df, last_n=last_n, timeframe="4h"),
+        "timeframe_summary_15m": lambda df: timeframe_summary(df, last_n=last_n, timeframe="15m"),
+        "enhanced_15m_analysis": lambda df: enhanced_15m_analysis(df),
+    }
+    results = []
+    print(f"\n{'n':>10} | {'seviyeler':>10} | {'tf 4h':>9} | {'tf 15m':>9} | {'15m ek':>9}   (ms)")
+    print("-" * 62)
+    for n in sizes:
+        df = enrich_indicators(make_data(n))
+        row = []
+        for name, fn in cases.items():
+            seconds = best_time(fn, df)
+            results.append({"name": name, "n": n, "last_n": last_n, "seconds": seconds})
+            row.append(seconds * 1000)
+        print(f"{n:>10} | {row[0]:10.2f} | {row[1]:9.2f} | {row[2]:9.2f} | {row[3]:9.2f}")
+    return results
+
+
+def bench_analyze(sizes, recording: str = None, repeat_max: int = 100_000) -> list:
+    """
+    Uçtan uca analyze_coin, kayıttan oynatılan exchange'e karşı (ağsız).
+    n, her timeframe için istenen mum sayısıdır (config {4h: n, 1h: n, 15m: n});
+    recording verilmezse create_test_data ile sentetik kayıt kullanılır.
+    repeat_max üstündeki boyutlar tek sefer ölçülür.
+    """
+    import qwen3
+    from recording import load_recording, replaying
+
+    recorded = load_recording(recording) if recording else None
+    results = []
+    print(f"\n  ({'kayıt: ' + recording if recording else 'sentetik kayıt'})")
+    print(f"\n{'n':>10} | {'analyze_coin (ms)':>17} | {'mum/sn':>12}")
+    print("-" * 46)
+    for n in sizes:
+        config = {"4h": n, "1h": n, "15m": n}
+        if recorded is None:
+            data = synthetic_recording({tf: qwen3.ohlcv_buffer(need) for tf, need in config.items()})
+        else:
+            data = recorded
+            config = {tf: min(n, len(rows) - 200) for tf, rows in recorded["ohlcv"].items()}
+        with replaying(data), quiet():
+            seconds = best_time(qwen3.analyze_coin, data["symbol"], config, repeat=1 if n > repeat_max else 3)
+        candles = sum(config.values())
+        results.append({"name": "analyze_coin", "n": n, "seconds": seconds, "candles": candles})
+        print(f"{n:>10} | {seconds * 1000:17.2f} | {candles / seconds:12.0f}")
+    return results
+
+
+def bench_backtest(sizes, symbols: int = 1) -> list:
+    """
+    backtest.backtest: scalping giriş kurallarının vektörel geri testi (indikatörler dahil).
+    n, sembol başına mum sayısıdır (1 yıl 15m ≈ 35 bin mum).
+    """
+    from backtest import backtest
+
+    results = []
+    print(f"\n{'n':>10} | {'geri test (ms)':>14} | {'mum/sn':>12}")
+    print("-" * 43)
+    for n in sizes:
+        frames = {}
+        for i in range(symbols):
+            df = make_data(n, seed=42 + i)
+            df.index = pd.date_range("2025-01-01", periods=n, freq="15min", tz="UTC")
+            frames[f"S{i}/USDT:USDT"] = df
+        seconds = best_time(backtest, frames)
+        results.append({"name": "backtest", "n": n, "symbols": symbols, "seconds": seconds})
+        print(f"{n:>10} | {seconds * 1000:14.2f} | {n * symbols / seconds:12.0f}")
+    return results
+
+
+# Soğuk başlangıçta ölçülen importlar: ana betik ve onun ertelediği ağır istemciler
+IMPORT_TARGETS = {
+    "qwen3": "import qwen3",
+    "indicator_core": "import indicator_block, incremental, patterns",
+    "ccxt": "import ccxt",
+    "supabase": "import supabase",
+}
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    `python -X importtime` çıktısını [(modül, self_us, cumulative_us, derinlik), ...] listesine çevirir.
+    Derinlik 0 olanlar doğrudan import edilen (en üst seviye) modüllerdir.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_breakdown(rows: list, top: int = 8) -> list:
+    """Import süresinin (self) kök pakete göre dağılımı (ms), büyükten küçüğe."""
+    totals = {}
+    for name, self_us, _, _ in rows:
+        root = name.split(".")[0]
+        totals[root] = totals.get(root, 0) + self_us
+    ranked = sorted(totals.items(), key=lambda kv: -kv[1])[:top]
+    return [{"package": name, "ms": round(us / 1000, 3)} for name, us in ranked]
+
+
+def _importtime(code: str, cwd: str):
+    """code'u yeni bir yorumlayıcıda -X importtime ile çalıştırır: (satırlar, duvar saati sn)."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                          capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code!r} başarısız: {proc.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(proc.stderr), wall
+
+
+def bench_imports(sizes=None, targets: dict = None, repeat: int = 5) -> list:
+    """
+    Soğuk başlangıç: her hedef yeni bir yorumlayıcıda `-X importtime` ile import edilir.
+    seconds, hedefin import ettiği modüllerin toplam süresidir (yorumlayıcı açılışındaki
+    site/encodings hariç; en iyi `repeat` çalıştırma); process_seconds sürecin toplam
+    duvar saati süresidir. sizes kullanılmaz (n = 1: tek soğuk import).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    startup = {name for name, *_ in _importtime("pass", here)[0]}
+    results = []
+    print(f"\n{'hedef':>15} | {'import (ms)':>11} | {'süreç (ms)':>10} | en pahalı paketler (ms)")
+    print("-" * 96)
+    for name, code in (targets or IMPORT_TARGETS).items():
+        best = None
+        for _ in range(repeat):
+            rows, wall = _importtime(code, here)
+            rows = [row for row in rows if row[0] not in startup]
+            seconds = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1e6
+            if best is None or seconds < best["seconds"]:
+                best = {"name": f"import_{name}", "n": 1, "seconds": seconds, "process_seconds": wall,
+                        "packages": import_breakdown(rows)}
+        results.append(best)
+        top = ", ".join(f"{p['package']} {p['ms']:.0f}" for p in best["packages"][:5])
+        print(f"{name:>15} | {best['seconds'] * 1000:11.1f} | {best['process_seconds'] * 1000:10.1f} | {top}")
+    return results
+
+
+BENCHMARKS = {
+    "levels": bench_levels,
+    "grading": bench_grading,
+    "patterns": bench_patterns,
+    "serialize": bench_serialize,
+    "clear": bench_clear,
+    "memory": bench_memory,
+    "lazy": bench_lazy,
+    "indicators": bench_indicators,
+    "summaries": bench_summaries,
+    "analyze": bench_analyze,
+    "backtest": bench_backtest,
+    "imports": bench_imports,
+}
+
+
+# =========================
+#    RAPOR & BASELINE
+# =========================
+# Baseline ile karşılaştırılan ölçümler (büyük olan kötü)
+COMPARED_METRICS = ("seconds", "peak_bytes")
+
+
+def run_metadata() -> dict:
+    """Raporun hangi ortamda üretildiği (karşılaştırmalar aynı makinede anlamlıdır)."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "created_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _result_key(benchmark: str, result: dict) -> tuple:
+    """Bir ölçümü raporlar arasında eşleyen anahtar (süre/bellek dışındaki parametreler)."""
+    params = tuple(sorted((k, v) for k, v in result.items()
+                          if k not in COMPARED_METRICS and not k.startswith("reference_")
+                          and not k.endswith(("_seconds", "_bytes")) and isinstance(v, (int, str))))
+    return (benchmark,) + params
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float = 0.25,
+                    min_seconds: float = 0.001) -> list:
+    """
+    Raporu baseline ile karşılaştırır.
+
+    Args:
+        tolerance: İzin verilen göreli artış (0.25 → %25)
+        min_seconds: Bu süreden kısa baseline ölçümleri gürültü sayılır, karşılaştırılmaz
+
+    Returns:
+        [{"benchmark", "name", "n", "metric", "baseline", "current", "ratio", "regression"}, ...]
+    """
+    previous = {}
+    for benchmark, results in baseline.get("results", {}).items():
+        for result in results:
+            previous[_result_key(benchmark, result)] = result
+
+    rows = []
+    for benchmark, results in report.get("results", {}).items():
+        for result in results:
+            old = previous.get(_result_key(benchmark, result))
+            if old is None:
+                continue
+            for metric in COMPARED_METRICS:
+                before, now = old.get(metric), result.get(metric)
+                if before is None or now is None or before <= 0:
+                    continue
+                if metric == "seconds" and before < min_seconds:
+                    continue
+                ratio = now / before
+                rows.append({"benchmark": benchmark, "name": result["name"], "n": result["n"],
+                             "metric": metric, "baseline": before, "current": now, "ratio": ratio,
+                             "regression": ratio > 1 + tolerance})
+    return rows
+
+
+def print_comparison(rows: list, tolerance: float) -> None:
+    print(f"\n📊 Baseline karşılaştırması (tolerans %{tolerance * 100:.0f})")
+    print(f"\n{'benchmark':>12} | {'ölçüm':>24} | {'n':>8} | {'baseline':>10} | {'şimdi':>10} | {'oran':>6}")
+    print("-" * 86)
+    for row in rows:
+        scale, unit = (1000, "ms") if row["metric"] == "seconds" else (1e-6, "MB")
+        flag = " ❌" if row["regression"] else ""
+        print(f"{row['benchmark']:>12} | {row['name'][:24]:>24} | {row['n']:>8} | "
+              f"{row['baseline'] * scale:8.2f}{unit} | {row['current'] * scale:8.2f}{unit} | "
+              f"{row['ratio']:5.2f}x{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{len(rows)} ölçüm karşılaştırıldı, {regressions} gerileme")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analiz motoru benchmark'ları")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS), help="Çalıştırılacak benchmark'lar")
+    parser.add_argument("--sizes", default="200,1000,10000,100000,1000000", help="Virgülle ayrılmış mum sayıları")
+    parser.add_argument("--json", dest="json_path", help="Sonuçları bu JSON dosyasına yaz")
+    parser.add_argument("--baseline", help="Karşılaştırılacak kayıtlı rapor (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="İzin verilen göreli yavaşlama")
+    parser.add_argument("--recording", help="analyze için recording.py kaydı (yoksa sentetik)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",") if x]
+    report = {"meta": run_metadata(), "sizes": sizes, "results": {}}
+    for name in args.names:
+        print(f"\n📏 {name}")
+        kwargs = {"recording": args.recording} if name == "analyze" and args.recording else {}
+        report["results"][name] = BENCHMARKS[name](sizes, **kwargs)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Rapor yazıldı: {args.json_path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_reports(report, baseline, tolerance=args.tolerance)
+        print_comparison(rows, args.tolerance)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+candle_store.py
+(exchange, symbol, timeframe) anahtarlı yerel OHLCV mum deposu.
+
+İlk çalıştırmada tam buffer çekilir ve diske yazılır. Sonraki çalıştırmalarda
+sadece son kayıtlı mumdan itibaren (`since`) yeni mumlar çekilir ve birleştirilir.
+Son kayıtlı mum genelde henüz kapanmamış (forming) mumdur; delta isteği onu da
+tekrar getirdiği için birleştirmede üzerine yazılır.
+
+Exchange'in tek istekte döndürebileceğinden fazla mum istenirse (örn. resample
+modunda binlerce 15m mum) istek `since` ile ileriye doğru sayfalanır.
+
+Depo formatı: her anahtar için bir .npy dosyası, satırlar [timestamp_ms, o, h, l, c, v].
+"""
+
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+DEFAULT_STORE_DIR = ".candle_store"
+DEFAULT_MAX_ROWS = 5000
+
+# fetch_ohlcv tek istekte döndürülen maksimum mum (bilinmeyen exchange'ler için varsayılan)
+OHLCV_PAGE_LIMITS = {"binance": 1500, "okx": 300, "bybit": 1000, "kraken": 720, "kucoin": 1500}
+DEFAULT_PAGE_LIMIT = 500
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """ccxt timeframe string'ini milisaniyeye çevirir (örn: "15m" -> 900000)."""
+    match = re.fullmatch(r"(\d+)([mhdw])", timeframe)
+    if not match:
+        raise ValueError(f"Geçersiz timeframe: {timeframe}")
+    amount, unit = int(match.group(1)), match.group(2)
+    unit_ms = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}[unit]
+    return amount * unit_ms
+
+
+def ohlcv_to_frame(rows) -> pd.DataFrame:
+    """ccxt fetch_ohlcv satırlarını UTC timestamp index'li DataFrame'e çevirir."""
+    df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+    df["timestamp"] = pd.to_datetime(df["timestamp"].astype("int64"), unit="ms", utc=True)
+    df.set_index("timestamp", inplace=True)
+    return df
+
+
+def frame_to_rows(df: pd.DataFrame) -> np.ndarray:
+    """DataFrame'i depo formatındaki (n, 6) float64 diziye çevirir."""
+    ts = df.index.as_unit("ms").asi8.astype("float64")
+    values = df[OHLCV_COLUMNS[1:]].to_numpy(dtype="float64")
+    return np.column_stack([ts, values])
+
+
+def merge_candles(cached: pd.DataFrame, fresh: pd.DataFrame, max_rows: int = None) -> pd.DataFrame:
+    """
+    Depodaki mumlarla yeni çekilenleri birleştirir.
+    Aynı timestamp'te yeni gelen kazanır (forming mum güncellenir).
+    """
+    if cached is None or cached.empty:
+        merged = fresh
+    elif fresh is None or fresh.empty:
+        merged = cached
+    else:
+        merged = pd.concat([cached, fresh])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+    if max_rows:
+        merged = merged.tail(max_rows)
+    return merged
+
+
+def plan_delta(cached: pd.DataFrame, limit: int, timeframe: str, now_ms: int = None):
+    """
+    Delta çekim planı çıkarır.
+
+    Returns:
+        (since_ms, fetch_limit) delta çekilebiliyorsa, tam çekim gerekiyorsa None
+    """
+    if cached is None or len(cached) < limit:
+        return None
+
+    tf_ms = timeframe_to_ms(timeframe)
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    last_ms = int(cached.index[-1].value // 1_000_000)
+
+    # Forming mum + o zamandan beri kapanan mumlar (+1 saat kayması payı)
+    missing = max(0, (now_ms - last_ms) // tf_ms) + 2
+    if missing >= limit:
+        return None
+    return last_ms, int(missing)
+
+
+def page_limit_for(exchange) -> int:
+    """Exchange'in tek fetch_ohlcv isteğinde döndürdüğü maksimum mum sayısı."""
+    return OHLCV_PAGE_LIMITS.get(getattr(exchange, "id", None), DEFAULT_PAGE_LIMIT)
+
+
+def plan_pages(limit: int, timeframe: str, page_limit: int, since_ms: int = None, now_ms: int = None):
+    """
+    Sayfalı çekim için başlangıç zamanını ve maksimum sayfa sayısını hesaplar.
+    since_ms yoksa son `limit` mumu kapsayacak şekilde geriye gidilir.
+
+    Returns:
+        (since_ms, max_pages)
+    """
+    tf_ms = timeframe_to_ms(timeframe)
+    if since_ms is None:
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        since_ms = (now_ms // tf_ms - (limit - 1)) * tf_ms
+    return since_ms, -(-limit // page_limit) + 2
+
+
+def _next_page(rows: list, page: list, page_limit: int):
+    """Sayfayı biriktirir; devam edilecekse bir sonraki `since` değerini, bittiyse None döner."""
+    last_ms = rows[-1][0] if rows else None
+    new = [r for r in page if last_ms is None or r[0] > last_ms]
+    rows.extend(new)
+    if len(page) < page_limit or not new:
+        return None  # güncel muma ulaşıldı (veya exchange ilerlemiyor)
+    return int(rows[-1][0]) + 1
+
+
+def local_now_ms(exchange) -> int:
+    """
+    Sayfa planı için şimdiki zaman (ms): ccxt'nin `milliseconds()` saati.
+    Kayıt tekrarında (recording.ReplayExchange) kaydın saatini döndürür.
+    """
+    clock = getattr(exchange, "milliseconds", None)
+    return int(clock()) if callable(clock) else int(time.time() * 1000)
+
+
+def fetch_rows(exchange, symbol: str, timeframe: str, limit: int, since: int = None) -> list:
+    """
+    fetch_ohlcv çağrısı; `limit` exchange'in sayfa sınırını aşıyorsa `since` ile sayfalar.
+    since verilmezse son `limit` mum döner.
+    """
+    page_limit = page_limit_for(exchange)
+    if limit <= page_limit:
+        if since is None:
+            return exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+        return exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    cursor, max_pages = plan_pages(limit, timeframe, page_limit, since_ms=since, now_ms=local_now_ms(exchange))
+    rows = []
+    for _ in range(max_pages):
+        page = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=cursor, limit=page_limit)
+        cursor = _next_page(rows, page, page_limit)
+        if cursor is None:
+            break
+    return rows if since is not None else rows[-limit:]
+
+
+async def fetch_rows_async(exchange, symbol: str, timeframe: str, limit: int, since: int = None) -> list:
+    """fetch_rows'un ccxt.async_support karşılığı."""
+    page_limit = page_limit_for(exchange)
+    if limit <= page_limit:
+        if since is None:
+            return await exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+        return await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    cursor, max_pages = plan_pages(limit, timeframe, page_limit, since_ms=since, now_ms=local_now_ms(exchange))
+    rows = []
+    for _ in range(max_pages):
+        page = await exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=cursor, limit=page_limit)
+        cursor = _next_page(rows, page, page_limit)
+        if cursor is None:
+            break
+    return rows if since is not None else rows[-limit:]
+
+
+class CandleStore:
+    """(exchange, symbol, timeframe) başına bir .npy dosyası tutan disk deposu."""
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, max_rows: int = DEFAULT_MAX_ROWS):
+        self.root = root
+        self.max_rows = max_rows
+
+    def path_for(self, exchange_id: str, symbol: str, timeframe: str) -> str:
+        safe_symbol = re.sub(r"[^A-Za-z0-9]+", "_", symbol).strip("_")
+        return os.path.join(self.root, exchange_id, f"{safe_symbol}_{timeframe}.npy")
+
+    def state_path_for(self, exchange_id: str, symbol: str, timeframe: str) -> str:
+        """Aynı anahtar için artımlı indikatör durumu dosyası (incremental.IndicatorEngine)."""
+        return self.path_for(exchange_id, symbol, timeframe)[:-len(".npy")] + ".state.json"
+
+    def load(self, exchange_id: str, symbol: str, timeframe: str):
+        """Kayıtlı mumları döndürür; yoksa veya okunamazsa None."""
+        path = self.path_for(exchange_id, symbol, timeframe)
+        try:
+            rows = np.load(path)
+        except (OSError, ValueError):
+            return None
+        if rows.ndim != 2 or rows.shape[1] != len(OHLCV_COLUMNS) or len(rows) == 0:
+            return None
+        return ohlcv_to_frame(rows)
+
+    def save(self, exchange_id: str, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        """Mumları atomik olarak diske yazar (yarım kalan yazım depoyu bozmaz)."""
+        path = self.path_for(exchange_id, symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, frame_to_rows(df.tail(self.max_rows)))
+        os.replace(tmp_path, path)
+
+    def update(self, exchange_id: str, symbol: str, timeframe: str, fresh: pd.DataFrame,
+               cached: pd.DataFrame = None) -> pd.DataFrame:
+        """Yeni mumları depoya birleştirir, kaydeder ve birleşik frame'i döndürür."""
+        merged = merge_candles(cached, fresh, self.max_rows)
+        self.save(exchange_id, symbol, timeframe, merged)
+        return merged
+
+
+class MemoryCandleStore(CandleStore):
+    """
+    Mumları süreç belleğinde tutan depo (daemon modu).
+    backing verilirse ilk okumada diskten ısınır ve yazımlar diske de yansıtılır,
+    böylece yeniden başlatma tam çekim gerektirmez.
+    Artımlı indikatör motorları da `engines` içinde bellekte tutulur.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS, backing: CandleStore = None):
+        super().__init__(root=backing.root if backing else DEFAULT_STORE_DIR, max_rows=max_rows)
+        self.backing = backing
+        self.frames = {}
+        self.engines = {}  # (exchange_id, symbol, timeframe) -> incremental.IndicatorEngine
+
+    def load(self, exchange_id: str, symbol: str, timeframe: str):
+        key = (exchange_id, symbol, timeframe)
+        if key not in self.frames and self.backing is not None:
+            cached = self.backing.load(*key)
+            if cached is not None:
+                self.frames[key] = cached
+        return self.frames.get(key)
+
+    def save(self, exchange_id: str, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        self.frames[(exchange_id, symbol, timeframe)] = df.tail(self.max_rows)
+        if self.backing is not None:
+            self.backing.save(exchange_id, symbol, timeframe, df)
+
+
+_default_store = None
+
+
+def set_default_store(store) -> None:
+    """get_default_store'un döndüreceği depoyu sabitler (None → çevre değişkenleri)."""
+    global _default_store
+    _default_store = store
+
+
+def get_default_store():
+    """
+    Çevre değişkenlerine göre varsayılan depoyu döndürür.
+    CANDLE_STORE=0 ile kapatılır; CANDLE_STORE_DIR ve CANDLE_STORE_MAX_ROWS ile ayarlanır.
+    set_default_store ile bir depo sabitlendiyse (daemon modu) o döner.
+    """
+    if _default_store is not None:
+        return _default_store
+    if os.getenv("CANDLE_STORE", "1") == "0":
+        return None
+    return CandleStore(
+        root=os.getenv("CANDLE_STORE_DIR", DEFAULT_STORE_DIR),
+        max_rows=int(os.getenv("CANDLE_STORE_MAX_ROWS", str(DEFAULT_MAX_ROWS))),
+    )
+
+
+def _merge_delta(store, exchange, symbol, timeframe, limit, cached, rows, since_ms, now_ms):
+    """Delta satırlarını birleştirir; süreklilik bozuksa None döner (tam çekim gerekir)."""
+    if not rows and now_ms - since_ms > 2 * timeframe_to_ms(timeframe):
+        # Depodaki son mum iki periyottan eski ve delta boş: önbelleği bayat döndürmek yerine tam çekim
+        print(f"⚠️ Candle store: {symbol} {timeframe} delta boş döndü, tam çekim yapılıyor", flush=True)
+        return None
+    fresh = ohlcv_to_frame(rows) if rows else None
+    if fresh is not None and int(fresh.index[0].value // 1_000_000) > since_ms:
+        # Beklenen forming mum gelmedi: arada boşluk olabilir
+        return None
+    merged = store.update(exchange.id, symbol, timeframe, fresh, cached=cached)
+    new_count = 0 if fresh is None else int((fresh.index > cached.index[-1]).sum())
+    print(f"📦 Candle store: {symbol} {timeframe} -> {len(rows)} mum çekildi, {new_count} yeni", flush=True)
+    return merged.tail(limit)
+
+
+def fetch_ohlcv_cached(exchange, symbol: str, timeframe: str, limit: int, store=None) -> pd.DataFrame:
+    """
+    OHLCV'yi depo üzerinden çeker: depoda yeterli geçmiş varsa sadece delta istenir.
+
+    Args:
+        exchange: ccxt exchange instance (senkron)
+        symbol: Trading pair
+        timeframe: Zaman dilimi
+        limit: Döndürülecek mum sayısı (buffer dahil)
+        store: CandleStore; None ise depo kullanılmaz
+
+    Returns:
+        Son `limit` mumu içeren DataFrame
+    """
+    if store is None:
+        return ohlcv_to_frame(fetch_rows(exchange, symbol, timeframe, limit))
+
+    cached = store.load(exchange.id, symbol, timeframe)
+    now_ms = local_now_ms(exchange)
+    plan = plan_delta(cached, limit, timeframe, now_ms=now_ms)
+    if plan is not None:
+        since_ms, fetch_limit = plan
+        rows = fetch_rows(exchange, symbol, timeframe, fetch_limit, since=since_ms)
+        merged = _merge_delta(store, exchange, symbol, timeframe, limit, cached, rows, since_ms, now_ms)
+        if merged is not None:
+            return merged
+
+    fresh = ohlcv_to_frame(fetch_rows(exchange, symbol, timeframe, limit))
+    return store.update(exchange.id, symbol, timeframe, fresh).tail(limit)
+
+
+async def fetch_ohlcv_cached_async(exchange, symbol: str, timeframe: str, limit: int, store=None) -> pd.DataFrame:
+    """fetch_ohlcv_cached'in ccxt.async_support karşılığı."""
+    if store is None:
+        return ohlcv_to_frame(await fetch_rows_async(exchange, symbol, timeframe, limit))
+
+    cached = store.load(exchange.id, symbol, timeframe)
+    now_ms = local_now_ms(exchange)
+    plan = plan_delta(cached, limit, timeframe, now_ms=now_ms)
+    if plan is not None:
+        since_ms, fetch_limit = plan
+        rows = await fetch_rows_async(exchange, symbol, timeframe, fetch_limit, since=since_ms)
+        merged = _merge_delta(store, exchange, symbol, timeframe, limit, cached, rows, since_ms, now_ms)
+        if merged is not None:
+            return merged
+
+    fresh = ohlcv_to_frame(await fetch_rows_async(exchange, symbol, timeframe, limit))
+    return store.update(exchange.id, symbol, timeframe, fresh).tail(limit)
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+exchanges.py
+Süreç genelinde paylaşılan ccxt exchange havuzu.
+
+Her exchange id için tek bir ccxt instance oluşturulur ve tüm fetch yolları
+(qwen3.py, qwen3_AllData.py) bu instance'ı paylaşır. Böylece:
+- load_markets() her exchange için çalıştırma başına bir kez çağrılır
+- HTTP session (keep-alive bağlantılar) tekrar kullanılır
+- ccxt'nin rate-limit durumu çağrılar arasında korunur
+
+Ayrıca exchange saat farkı (clock offset) exchange başına bir kez ölçülüp
+CLOCK_SYNC_TTL saniye boyunca önbellekte tutulur (ClockSync).
+
+fetch_with_failover: exchange listesini sırayla dener; erişilemeyen exchange
+(örn. GitHub Actions'ta coğrafi engelli Binance) CircuitBreaker ile bir süre
+devre dışı bırakılır ve sonraki çağrılar doğrudan çalışan exchange'e gider.
+
+ccxt ilk exchange instance'ı oluşturulurken import edilir; modülü import etmek
+(örn. sadece indikatörleri kullanan testler) ccxt yüklemez.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+import perf
+
+
+# Exchange id -> ccxt konfigürasyonu
+EXCHANGE_CONFIGS = {
+    "binance": {"options": {"defaultType": "future"}, "enableRateLimit": True},
+    "okx": {"options": {"defaultType": "swap"}, "enableRateLimit": True},
+    "bybit": {"enableRateLimit": True},
+    "kraken": {"enableRateLimit": True},
+    "kucoin": {"enableRateLimit": True},
+}
+
+# Keep-alive bağlantı havuzu boyutu (requests.Session adapter'ı için)
+HTTP_POOL_SIZE = 10
+
+_pool = {}
+_pool_lock = threading.Lock()
+
+# ccxt.async_support instance'ları event loop'a bağlıdır; çalıştırma sonunda kapatılır
+_async_pool = {}
+
+
+def _create_exchange(exchange_id: str):
+    """Havuz için yeni bir ccxt instance oluşturur ve HTTP session'ını ayarlar."""
+    import ccxt
+
+    config = dict(EXCHANGE_CONFIGS.get(exchange_id, {"enableRateLimit": True}))
+    exchange = getattr(ccxt, exchange_id)(config)
+
+    # Aynı host'a giden istekler için keep-alive bağlantıları paylaş
+    session = getattr(exchange, "session", None)
+    if session is not None and hasattr(session, "mount"):
+        from requests.adapters import HTTPAdapter
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    return perf.instrument_exchange(exchange)
+
+
+def get_exchange(exchange_id: str, warm: bool = True):
+    """
+    Havuzdan exchange instance'ı döndürür, yoksa oluşturur.
+
+    Args:
+        exchange_id: ccxt exchange id (örn: "binance", "okx")
+        warm: True ise markets metadata'sı yüklenir (sadece ilk seferde istek atar)
+
+    Returns:
+        Paylaşılan ccxt exchange instance
+    """
+    with _pool_lock:
+        exchange = _pool.get(exchange_id)
+        if exchange is None:
+            exchange = _create_exchange(exchange_id)
+            _pool[exchange_id] = exchange
+
+    if warm and not exchange.markets:
+        # Hata yukarı fırlatılır; instance havuzda kalır, sonraki çağrı tekrar dener
+        with perf.span("load_markets", exchange=exchange_id):
+            exchange.load_markets()
+
+    return exchange
+
+
+async def get_async_exchange(exchange_id: str, warm: bool = True):
+    """
+    get_exchange'in ccxt.async_support karşılığı.
+    Eşzamanlı çağrılar aynı instance'ı ve tek bir load_markets isteğini paylaşır.
+    """
+    import ccxt.async_support as ccxt_async
+
+    exchange = _async_pool.get(exchange_id)
+    if exchange is None:
+        config = dict(EXCHANGE_CONFIGS.get(exchange_id, {"enableRateLimit": True}))
+        exchange = perf.instrument_exchange(getattr(ccxt_async, exchange_id)(config))
+        _async_pool[exchange_id] = exchange
+
+    if warm and not exchange.markets:
+        with perf.span("load_markets", exchange=exchange_id):
+            await exchange.load_markets()
+
+    return exchange
+
+
+async def close_async_exchanges() -> None:
+    """Async havuzdaki tüm instance'ların HTTP session'larını kapatır."""
+    exchanges = list(_async_pool.values())
+    _async_pool.clear()
+    for exchange in exchanges:
+        try:
+            await exchange.close()
+        except Exception:
+            pass
+
+
+def reset_pool() -> None:
+    """Havuzdaki tüm instance'ları bırakır (testler ve uzun süreli modlar için)."""
+    with _pool_lock:
+        _pool.clear()
+
+
+def install_exchange(exchange_id: str, exchange) -> None:
+    """Havuza hazır bir instance yerleştirir (kayıt tekrarı ve çevrimdışı çalışma için)."""
+    with _pool_lock:
+        _pool[exchange_id] = exchange
+
+
+# =========================
+#   SAAT SENKRONİZASYONU
+# =========================
+DEFAULT_CLOCK_SYNC_TTL = 600.0
+
+
+class ClockSync:
+    """
+    Exchange saatinin yerel saate göre farkını (ms) exchange başına önbellekler.
+
+    Fark fetch_time() ile ölçülür; istek süresinin yarısı düşülerek (NTP
+    tarzı orta nokta) ağ gecikmesi telafi edilir. Ölçüm `ttl` saniye geçerlidir,
+    böylece kısa çalıştırmada exchange başına tek istek yapılır, uzun süreli
+    modda fark periyodik olarak yenilenir. Ölçüm başarısız olursa fark 0
+    (yerel saat) kabul edilir ve yine ttl boyunca tekrar denenmez.
+    """
+
+    def __init__(self, ttl: float = None):
+        if ttl is None:
+            ttl = float(os.getenv("CLOCK_SYNC_TTL", DEFAULT_CLOCK_SYNC_TTL))
+        self.ttl = ttl
+        self._offsets = {}  # exchange id -> (offset_ms, ölçüm anı (monotonic))
+        self._inflight = {}  # exchange id -> devam eden async ölçüm
+        self._lock = threading.Lock()
+
+    def _cached(self, exchange_id: str):
+        with self._lock:
+            entry = self._offsets.get(exchange_id)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def _store(self, exchange_id: str, offset_ms: float) -> float:
+        with self._lock:
+            self._offsets[exchange_id] = (offset_ms, time.monotonic())
+        return offset_ms
+
+    @staticmethod
+    def _failed(exchange_id: str, error: Exception) -> float:
+        print(f"⚠️ {exchange_id} saat senkronizasyonu başarısız, yerel saat kullanılıyor: {str(error)[:100]}")
+        return 0.0
+
+    def offset_ms(self, exchange) -> float:
+        """Exchange saat farkı (ms); önbellekte yoksa veya eskiyse ölçer."""
+        cached = self._cached(exchange.id)
+        if cached is not None:
+            return cached
+        try:
+            start = time.time() * 1000
+            server = exchange.fetch_time()
+            end = time.time() * 1000
+            offset = float(server) - (start + end) / 2
+        except Exception as e:
+            offset = self._failed(exchange.id, e)
+        return self._store(exchange.id, offset)
+
+    async def offset_ms_async(self, exchange) -> float:
+        """
+        offset_ms'in ccxt.async_support instance'ları için karşılığı. Aynı exchange
+        için eşzamanlı çağrılar tek bir fetch_time isteğini bekler.
+        """
+        import asyncio
+
+        cached = self._cached(exchange.id)
+        if cached is not None:
+            return cached
+        task = self._inflight.get(exchange.id)
+        if task is None:
+            task = asyncio.ensure_future(self._measure_async(exchange))
+            self._inflight[exchange.id] = task
+            task.add_done_callback(lambda _, key=exchange.id: self._inflight.pop(key, None))
+        return await task
+
+    async def _measure_async(self, exchange) -> float:
+        try:
+            start = time.time() * 1000
+            server = await exchange.fetch_time()
+            end = time.time() * 1000
+            offset = float(server) - (start + end) / 2
+        except Exception as e:
+            offset = self._failed(exchange.id, e)
+        return self._store(exchange.id, offset)
+
+    def now_ms(self, exchange) -> int:
+        """Exchange saatine göre şimdiki zaman (ms)."""
+        return int(time.time() * 1000 + self.offset_ms(exchange))
+
+    async def now_ms_async(self, exchange) -> int:
+        return int(time.time() * 1000 + await self.offset_ms_async(exchange))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._offsets.clear()
+
+
+_clock = ClockSync()
+
+
+def server_time_ms(exchange) -> int:
+    """Paylaşılan ClockSync üzerinden exchange saatini (ms) döndürür."""
+    return _clock.now_ms(exchange)
+
+
+async def server_time_ms_async(exchange) -> int:
+    """server_time_ms'in async karşılığı."""
+    return await _clock.now_ms_async(exchange)
+
+
+def reset_clock() -> None:
+    """Önbellekteki tüm saat farklarını unutur (testler için)."""
+    _clock.reset()
+
+
+# =========================
+#   CIRCUIT BREAKER & FAILOVER
+# =========================
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN = 1800.0
+DEFAULT_RATE_LIMIT_RETRIES = 2
+DEFAULT_RATE_LIMIT_DELAY = 1.0
+MAX_RATE_LIMIT_DELAY = 10.0
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Hata 429 / DDoS korumasından mı geliyor? (exchange erişilebilir, sadece yavaşlamak gerekir)"""
+    import ccxt
+
+    return isinstance(error, (ccxt.RateLimitExceeded, ccxt.DDoSProtection))
+
+
+def is_exchange_failure(error: Exception) -> bool:
+    """
+    Hata exchange'in kendisine mi ait (ağ, zaman aşımı, coğrafi engel, bakım, yetki)?
+    Sembole/isteğe özgü ccxt hataları (BadSymbol, BadRequest, ExchangeError) exchange'i devre dışı bırakmaz.
+    ccxt'de NetworkError alt sınıfı olan RateLimitExceeded/DDoSProtection da sayılmaz; onlar geri çekilip tekrar denenir.
+    """
+    import ccxt
+
+    return isinstance(error, (ccxt.NetworkError, ccxt.AuthenticationError)) and not is_rate_limited(error)
+
+
+def rate_limit_backoff(attempt: int):
+    """
+    attempt'inci rate limit hatasından sonra beklenecek süre; tekrar hakkı bittiyse None.
+    RATE_LIMIT_RETRIES (varsayılan 2) ve RATE_LIMIT_DELAY (varsayılan 1 sn, üstel artar) ile ayarlanır.
+    """
+    retries = int(os.getenv("RATE_LIMIT_RETRIES", DEFAULT_RATE_LIMIT_RETRIES))
+    if attempt >= retries:
+        return None
+    base_delay = float(os.getenv("RATE_LIMIT_DELAY", DEFAULT_RATE_LIMIT_DELAY))
+    return min(base_delay * (2 ** attempt), MAX_RATE_LIMIT_DELAY)
+
+
+def is_ccxt_error(error: Exception) -> bool:
+    """
+    Hata exchange'den mi geldi? ccxt dışı hatalar (depo, pandas vb. yerel hatalar)
+    failover'da sonraki exchange'e geçilmeden ve breaker'a yazılmadan yükseltilir.
+    """
+    import ccxt
+
+    return isinstance(error, ccxt.BaseError)
+
+
+class CircuitBreaker:
+    """
+    Exchange başına devre kesici.
+
+    `threshold` ardışık hatadan sonra exchange `cooldown` saniye boyunca açık
+    (devre dışı) kalır; süre dolunca bir sonraki çağrı tekrar dener, başarılı
+    olursa devre kapanır. Durum `state_path` verilirse JSON dosyasına yazılır,
+    böylece çalıştırmalar arasında da hatırlanır.
+
+    Çevre değişkenleri (get_breaker için):
+        CIRCUIT_BREAKER_THRESHOLD → açılma için ardışık hata sayısı (varsayılan 3)
+        CIRCUIT_BREAKER_COOLDOWN  → açık kalma süresi, saniye (varsayılan 1800)
+        CIRCUIT_BREAKER_STATE     → durum dosyası (varsayılan <CANDLE_STORE_DIR>/circuit_breaker.json, 0 → kapalı)
+    """
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                 cooldown: float = DEFAULT_BREAKER_COOLDOWN, state_path: str = None):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.state_path = state_path
+        self._state = {}  # exchange id -> {"failures", "open_until", "last_error"}
+        self._lock = threading.Lock()
+        self._load()
+
+    def is_open(self, exchange_id: str) -> bool:
+        with self._lock:
+            entry = self._state.get(exchange_id)
+            return bool(entry and entry.get("open_until", 0) > time.time())
+
+    def order(self, candidates: list) -> list:
+        """
+        (exchange_id, symbol) adaylarından denenecekleri döndürür: açık devreler
+        atlanır; hepsi açıksa (son çare) hepsi orijinal sırayla denenir.
+        """
+        available = [c for c in candidates if not self.is_open(c[0])]
+        return available or list(candidates)
+
+    def record_success(self, exchange_id: str) -> None:
+        with self._lock:
+            if exchange_id not in self._state:
+                return
+            del self._state[exchange_id]
+        print(f"🔌 {exchange_id} tekrar erişilebilir, devre kapandı", flush=True)
+        self._save()
+
+    def record_failure(self, exchange_id: str, error: Exception) -> None:
+        with self._lock:
+            entry = self._state.setdefault(exchange_id, {"failures": 0, "open_until": 0})
+            entry["failures"] += 1
+            entry["last_error"] = str(error)[:200]
+            opened = entry["failures"] >= self.threshold
+            if opened:
+                entry["open_until"] = time.time() + self.cooldown
+        if opened:
+            print(f"⛔ {exchange_id} {self.cooldown:.0f}s devre dışı (circuit open): {str(error)[:100]}", flush=True)
+        self._save()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self._state))
+
+    def _load(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        # Süresi çoktan dolmuş kayıtları taşımaya gerek yok
+        self._state = {k: v for k, v in data.items()
+                       if isinstance(v, dict) and v.get("open_until", 0) + self.cooldown > now}
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"⚠️ Circuit breaker durumu kaydedilemedi: {e}")
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    """Süreç genelinde paylaşılan CircuitBreaker (çevre değişkenlerinden)."""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            state_path = os.getenv("CIRCUIT_BREAKER_STATE")
+            if state_path is None:
+                state_path = os.path.join(os.getenv("CANDLE_STORE_DIR", ".candle_store"), "circuit_breaker.json")
+            _breaker = CircuitBreaker(
+                threshold=int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD)),
+                cooldown=float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN)),
+                state_path=None if state_path in ("", "0") else state_path,
+            )
+        return _breaker
+
+
+def reset_breaker(breaker: CircuitBreaker = None) -> None:
+    """Paylaşılan breaker'ı değiştirir (None → sonraki get_breaker yeniden oluşturur)."""
+    global _breaker
+    with _breaker_lock:
+        _breaker = breaker
+
+
+def _skipped(candidates: list, ordered: list) -> None:
+    skipped = [c[0] for c in candidates if c not in ordered]
+    if skipped:
+        print(f"⏭️  Devre dışı exchange'ler atlanıyor: {', '.join(skipped)}", flush=True)
+
+
+def fetch_with_failover(candidates: list, fetch, label: str = "", breaker: CircuitBreaker = None):
+    """
+    Adayları sırayla dener, ilk başarılı sonucu döndürür.
+
+    Args:
+        candidates: [(exchange_id, symbol), ...] tercih sırasıyla
+        fetch: fetch(exchange, symbol) → sonuç
+        label: Hata mesajı için etiket (örn. sembol)
+
+    Returns:
+        (sonuç, exchange_instance, used_symbol)
+    """
+    breaker = breaker or get_breaker()
+    ordered = breaker.order(candidates)
+    _skipped(candidates, ordered)
+
+    last_error = None
+    for exchange_id, symbol in ordered:
+        attempt = 0
+        while True:
+            try:
+                print(f"🔄 {exchange_id} ({symbol}) deneniyor...", flush=True)
+                exchange = get_exchange(exchange_id)
+                result = fetch(exchange, symbol)
+                breaker.record_success(exchange_id)
+                print(f"✅ {exchange_id} başarılı!", flush=True)
+                return result, exchange, symbol
+            except Exception as e:
+                if not is_ccxt_error(e):
+                    raise
+                last_error = e
+                delay = rate_limit_backoff(attempt) if is_rate_limited(e) else None
+                if delay is not None:
+                    attempt += 1
+                    print(f"⏳ {exchange_id} rate limit, {delay:.1f}s sonra tekrar ({attempt}): {str(e)[:100]}", flush=True)
+                    time.sleep(delay)
+                    continue
+                if is_exchange_failure(e):
+                    breaker.record_failure(exchange_id, e)
+                print(f"⚠️ {exchange_id} failed: {str(e)[:150]}", flush=True)
+                break
+
+    raise Exception(f"{label} için tüm exchange'ler başarısız oldu. Son hata: {last_error}")
+
+
+async def fetch_with_failover_async(candidates: list, fetch, label: str = "",
+                                    breaker: CircuitBreaker = None, limiter=None):
+    """
+    fetch_with_failover'ın ccxt.async_support karşılığı.
+    fetch bir coroutine fonksiyonudur; limiter (asyncio.Semaphore) her denemeyi sınırlar.
+    """
+    import asyncio
+
+    breaker = breaker or get_breaker()
+    ordered = breaker.order(candidates)
+    _skipped(candidates, ordered)
+
+    last_error = None
+    for exchange_id, symbol in ordered:
+        attempt = 0
+        while True:
+            try:
+                async with limiter or contextlib.nullcontext():
+                    exchange = await get_async_exchange(exchange_id)
+                    result = await fetch(exchange, symbol)
+                breaker.record_success(exchange_id)
+                print(f"✅ {exchange_id} {label} başarılı!", flush=True)
+                return result, exchange, symbol
+            except Exception as e:
+                if not is_ccxt_error(e):
+                    raise
+                last_error = e
+                delay = rate_limit_backoff(attempt) if is_rate_limited(e) else None
+                if delay is not None:
+                    # Bekleme limiter dışında: diğer istekler bu sürede slotu kullanabilir
+                    attempt += 1
+                    print(f"⏳ {exchange_id} {label} rate limit, {delay:.1f}s sonra tekrar ({attempt}): {str(e)[:100]}",
+                          flush=True)
+                    await asyncio.sleep(delay)
+                    continue
+                if is_exchange_failure(e):
+                    breaker.record_failure(exchange_id, e)
+                print(f"⚠️ {exchange_id} {label} failed: {str(e)[:150]}", flush=True)
+                break
+
+    raise Exception(f"{label} için tüm exchange'ler başarısız oldu. Son hata: {last_error}")
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+incremental.py
+Durumlu (stateful) indikatör motoru: EMA, SMA, RSI, MACD, ATR.
+
+qwen3.enrich_indicators her çalıştırmada tüm buffer'ı baştan hesaplar. Bu motor
+her (symbol, timeframe) için indikatör durumunu saklar; N yeni mum eklemek O(N)
+maliyetlidir, geçmişin uzunluğundan bağımsızdır. Durum JSON olarak kaydedilip
+sonraki çalıştırmada kaldığı yerden devam eder; frame_for için tutulan geçmiş
+satırlar (max_history, analiz edilen buffer kadar) ayrı bir ikili .npy dosyasındadır.
+
+Çıktılar qwen3'teki sma/ema/rsi/macd/atr fonksiyonlarının aynı seri
+üzerindeki sonuçlarıyla (motorun başladığı mumdan itibaren) örtüşür. EMA
+güncellemesi pandas'ın ewm(adjust=False) adımıyla birebir aynı yapılır.
+Kümülatif OBV ve VWAP motorda tutulmaz; qwen3 bunları analiz edilen pencereden hesaplar.
+"""
+
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+NAN = float("nan")
+
+DEFAULT_MAX_HISTORY = 1000
+
+
+def _nan_to_none(x):
+    return None if x is None or (isinstance(x, float) and math.isnan(x)) else x
+
+
+def _none_to_nan(x):
+    return NAN if x is None else x
+
+
+class _Ewm:
+    """pandas ewm(alpha, adjust=False) tek adım karşılığı (min_periods ile maskeleme)."""
+
+    def __init__(self, alpha: float, min_periods: int = 0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        if x == x:
+            self.nobs += 1
+            if self.value == self.value:
+                if self.value != x:
+                    old_wt = 1.0 - self.alpha
+                    self.value = (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+            else:
+                self.value = x
+        return self.value if self.nobs >= self.min_periods else NAN
+
+    def to_dict(self) -> dict:
+        return {"value": _nan_to_none(self.value), "nobs": self.nobs}
+
+    def load(self, data: dict) -> None:
+        self.value = _none_to_nan(data["value"])
+        self.nobs = data["nobs"]
+
+
+class _RollingMean:
+    """rolling(length, min_periods=length).mean() karşılığı; son `length` değeri tutar."""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.total = 0.0
+        self.steps = 0
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.length:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        self.steps += 1
+        # Kayan toplamın float birikim hatasını periyodik olarak sıfırla
+        if self.steps % self.length == 0:
+            self.total = math.fsum(self.window)
+        if len(self.window) < self.length:
+            return NAN
+        return self.total / self.length
+
+    def to_dict(self) -> dict:
+        return {"window": list(self.window)}
+
+    def load(self, data: dict) -> None:
+        self.window = deque(data["window"], maxlen=self.length)
+        self.total = math.fsum(self.window)
+        self.steps = 0
+
+
+class IndicatorEngine:
+    """
+    Tek bir (symbol, timeframe) için artımlı indikatör motoru.
+
+    Kolon adları enrich_indicators ile aynıdır: sma50/100/200, ema20/50/100/200,
+    rsi14, macd, macd_signal, macd_hist, atr14 (qwen3.ENGINE_COLUMNS).
+    """
+
+    SMA_LENGTHS = (50, 100, 200)
+    EMA_LENGTHS = (20, 50, 100, 200)
+    RSI_LENGTH = 14
+    MACD_PARAMS = (12, 26, 9)
+    ATR_LENGTH = 14
+
+    def __init__(self, max_history: int = DEFAULT_MAX_HISTORY):
+        fast, slow, signal = self.MACD_PARAMS
+        self.sma = {L: _RollingMean(L) for L in self.SMA_LENGTHS}
+        self.ema = {L: _Ewm(2.0 / (L + 1), min_periods=L) for L in self.EMA_LENGTHS}
+        self.rsi_gain = _Ewm(1.0 / self.RSI_LENGTH)
+        self.rsi_loss = _Ewm(1.0 / self.RSI_LENGTH)
+        self.macd_fast = _Ewm(2.0 / (fast + 1), min_periods=fast)
+        self.macd_slow = _Ewm(2.0 / (slow + 1), min_periods=slow)
+        self.macd_signal = _Ewm(2.0 / (signal + 1), min_periods=signal)
+        self.atr = _RollingMean(self.ATR_LENGTH)
+        self.prev_close = NAN
+        self.last_timestamp = None
+        self.interval = None  # ardışık iki kapanmış mum arası (pd.Timedelta)
+        self.max_history = max_history
+        # Son max_history kapanmış mumun çıktıları: (timestamp ns, kolon değerleri)
+        self.history = np.empty(0, dtype=self.history_dtype)
+
+    @property
+    def columns(self) -> list:
+        return (
+            [f"sma{L}" for L in self.SMA_LENGTHS]
+            + [f"ema{L}" for L in self.EMA_LENGTHS]
+            + ["rsi14", "macd", "macd_signal", "macd_hist", "atr14"]
+        )
+
+    @property
+    def history_dtype(self) -> np.dtype:
+        return np.dtype([("timestamp", "int64"), ("values", "float64", len(self.columns))])
+
+    # -------------------------
+    #   Tek mum adımı
+    # -------------------------
+    def _step(self, o: float, h: float, l: float, c: float) -> tuple:
+        row = [self.sma[L].update(c) for L in self.SMA_LENGTHS]
+        row += [self.ema[L].update(c) for L in self.EMA_LENGTHS]
+
+        # RSI (Wilder: alpha = 1/length)
+        prev = self.prev_close
+        delta = c - prev if prev == prev else NAN
+        gain = self.rsi_gain.update(max(delta, 0.0) if delta == delta else NAN)
+        loss = self.rsi_loss.update(-min(delta, 0.0) if delta == delta else NAN)
+        if loss != loss or loss == 0:
+            rsi_val = NAN
+        else:
+            rsi_val = 100 - (100 / (1 + gain / loss))
+        row.append(rsi_val)
+
+        # MACD: sinyal EMA'sı ilk geçerli MACD değerinden başlar
+        macd_line = self.macd_fast.update(c) - self.macd_slow.update(c)
+        signal = self.macd_signal.update(macd_line)
+        row += [macd_line, signal, macd_line - signal]
+
+        # ATR: true range'in basit hareketli ortalaması
+        hl = h - l
+        if prev == prev:
+            tr = max(hl, abs(h - prev), abs(l - prev))
+        else:
+            tr = hl
+        row.append(self.atr.update(tr))
+
+        self.prev_close = c
+        return tuple(row)
+
+    # -------------------------
+    #   Dış arayüz
+    # -------------------------
+    def reset(self) -> None:
+        """Tüm durumu ve geçmişi siler."""
+        self.__init__(max_history=self.max_history)
+
+    def _continues(self, df: pd.DataFrame, first_new: pd.Timestamp) -> bool:
+        """İlk yeni mum last_timestamp'in hemen ardından mı geliyor?"""
+        if self.interval is not None:
+            return first_new - self.last_timestamp == self.interval
+        return self.last_timestamp in df.index
+
+    def update(self, df: pd.DataFrame, forming: bool = False) -> pd.DataFrame:
+        """
+        last_timestamp'ten yeni mumları işler.
+        Yeni mumlar last_timestamp'in devamı değilse (örn. fetch penceresinden uzun
+        kesinti) motor sıfırlanır ve df baştan işlenir; boşluğun üstünden adım atılmaz.
+
+        Args:
+            df: OHLCV DataFrame (timestamp index)
+            forming: True ise son mum henüz kapanmamıştır; durum ilerletilmeden
+                     önizleme olarak hesaplanır
+
+        Returns:
+            Yeni mumların indikatör değerleri (DataFrame)
+        """
+        index, rows = self._advance(df, forming)
+        if not len(index):
+            return pd.DataFrame(columns=self.columns, dtype="float64")
+        return pd.DataFrame(rows, index=index.rename(df.index.name), columns=self.columns)
+
+    def _advance(self, df: pd.DataFrame, forming: bool) -> tuple:
+        """update'in DataFrame kurmayan çekirdeği: (yeni mumların index'i, satırlar)."""
+        if self.last_timestamp is not None:
+            new = df.iloc[df.index.searchsorted(self.last_timestamp, side="right"):]
+            if len(new) and not self._continues(df, new.index[0]):
+                self.reset()
+            else:
+                df = new
+        if df.empty:
+            return df.index, []
+
+        closed = df.iloc[:-1] if forming else df
+        values = np.column_stack([closed[col].to_numpy(dtype="float64") for col in ("open", "high", "low", "close")])
+        rows = [self._step(*candle) for candle in values]
+        if len(closed):
+            added = np.empty(len(closed), dtype=self.history_dtype)
+            added["timestamp"] = closed.index.as_unit("ns").asi8
+            added["values"] = rows
+            self.history = np.concatenate([self.history, added])[-self.max_history:]
+            previous = closed.index[-2] if len(closed) > 1 else self.last_timestamp
+            if previous is not None:
+                self.interval = closed.index[-1] - previous
+            self.last_timestamp = closed.index[-1]
+
+        if forming:
+            rows.append(self.preview(df.iloc[-1]))
+        return (df.index if forming else closed.index), rows
+
+    def preview(self, candle: pd.Series) -> tuple:
+        """Kapanmamış mumun değerlerini durumu değiştirmeden hesaplar."""
+        snapshot = IndicatorEngine.from_dict(self.to_dict())
+        return snapshot._step(float(candle["open"]), float(candle["high"]), float(candle["low"]),
+                              float(candle["close"]))
+
+    def frame_for(self, df: pd.DataFrame):
+        """
+        df'in tüm satırları için indikatör kolonlarını döndürür. Kapanmış mumlar
+        geçmişten, son (forming) mum önizlemeden gelir. Geçmiş df'i kapsamıyorsa None.
+        """
+        index, rows = self._advance(df, forming=True)
+        stamps, values = self.history["timestamp"], self.history["values"]
+        if len(index):
+            stamps = np.append(stamps, index[-1:].as_unit("ns").asi8)
+            values = np.vstack([values, rows[-1]])
+        wanted = df.index.as_unit("ns").asi8
+        positions = np.searchsorted(stamps, wanted).clip(max=max(len(stamps) - 1, 0))
+        if not len(stamps) or (stamps[positions] != wanted).any():
+            return None
+        return pd.DataFrame(values[positions], index=df.index, columns=self.columns)
+
+    # -------------------------
+    #   Kalıcılık
+    # -------------------------
+    def to_dict(self) -> dict:
+        """Özyineleme durumu (geçmiş satırlar hariç; onlar save() ile ayrı .npy dosyasına yazılır)."""
+        return {
+            "sma": {str(L): s.to_dict() for L, s in self.sma.items()},
+            "ema": {str(L): e.to_dict() for L, e in self.ema.items()},
+            "rsi_gain": self.rsi_gain.to_dict(),
+            "rsi_loss": self.rsi_loss.to_dict(),
+            "macd_fast": self.macd_fast.to_dict(),
+            "macd_slow": self.macd_slow.to_dict(),
+            "macd_signal": self.macd_signal.to_dict(),
+            "atr": self.atr.to_dict(),
+            "prev_close": _nan_to_none(self.prev_close),
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+            "interval": self.interval.total_seconds() if self.interval is not None else None,
+            "max_history": self.max_history,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorEngine":
+        engine = cls(max_history=data.get("max_history", DEFAULT_MAX_HISTORY))
+        for L, state in data["sma"].items():
+            engine.sma[int(L)].load(state)
+        for L, state in data["ema"].items():
+            engine.ema[int(L)].load(state)
+        for name in ("rsi_gain", "rsi_loss", "macd_fast", "macd_slow", "macd_signal"):
+            getattr(engine, name).load(data[name])
+        engine.atr.load(data["atr"])
+        engine.prev_close = _none_to_nan(data["prev_close"])
+        if data["last_timestamp"]:
+            engine.last_timestamp = pd.Timestamp(data["last_timestamp"])
+        if data.get("interval"):
+            engine.interval = pd.Timedelta(seconds=data["interval"])
+        return engine
+
+    def save(self, path: str) -> None:
+        """
+        Durumu atomik olarak yazar: özyineleme durumu JSON (path), geçmiş satırlar
+        ikili .npy (history_path). Geçmiş önce yazılır; durum dosyası son commit'tir.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        rows_path = history_path(path)
+        with open(rows_path + ".tmp", "wb") as f:
+            np.save(f, self.history)
+        os.replace(rows_path + ".tmp", rows_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict()))  # json.dump saf Python kodlayıcısını kullanır
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Kayıtlı durumu yükler; dosyalar yoksa, bozuksa veya birbirini tutmuyorsa None."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                engine = cls.from_dict(json.load(f))
+            rows = np.load(history_path(path))
+        except (OSError, ValueError, KeyError):
+            return None
+        if rows.dtype != engine.history_dtype:
+            return None
+        saved_last = int(rows["timestamp"][-1]) if len(rows) else None
+        if saved_last != (engine.last_timestamp.value if engine.last_timestamp is not None else None):
+            return None
+        engine.history = rows[-engine.max_history:]
+        return engine
+
+
+def history_path(path: str) -> str:
+    """Durum dosyasının (*.state.json) geçmiş satırları dosyası (*.state.npy)."""
+    return os.path.splitext(path)[0] + ".npy"
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+indicator_block.py
+Önceden ayrılmış, kolon bazlı NumPy bloğu ve ona yazan indikatör çekirdekleri.
+
+enrich_indicators eskiden DataFrame'i kopyalayıp ~25 kolonu tek tek ekliyordu;
+her atama ayrı bir dizi ve pandas blok birleştirmesi demekti. IndicatorBlock tüm
+float kolonlar için tek bir (kolon, mum) dizisi ayırır: her kolon bitişik bir
+satırdır, çekirdekler sonucu doğrudan bu satırlara (out=) yazar. to_frame() bu
+satırları kopyalamadan (zero-copy view) DataFrame kolonları olarak sunar.
+
+Çekirdekler qwen3'teki Series tabanlı fonksiyonlarla aynı işlem sırasını izler,
+bu yüzden sonuçlar birebir aynıdır.
+
+IndicatorRegistry / IndicatorSet: her indikatör girdilerini, lookback'ini ve
+bağımlılıklarını bildirir; kolonlar tüketiciler (özetler, scalping) istedikçe
+hesaplanır ve çalıştırma içinde saklanır. Kullanılmayan indikatör hesaplanmaz.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class IndicatorBlock:
+    """
+    (kolon, mum) şeklinde C-sıralı tek float64 dizi.
+
+    Kullanım:
+        block = IndicatorBlock(df.index, ["close", "rsi14"])
+        block["close"] = df["close"]
+        rsi_values = block["rsi14"]          # bitişik, yazılabilir view
+        frame = block.to_frame()             # kopyasız DataFrame
+    """
+
+    def __init__(self, index: pd.Index, columns: list):
+        self.index = index
+        self.columns = list(columns)
+        self._pos = {name: i for i, name in enumerate(self.columns)}
+        self.values = np.empty((len(self.columns), len(index)), dtype="float64")
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[self._pos[name]]
+
+    def __setitem__(self, name: str, values) -> None:
+        if isinstance(values, (pd.Series, pd.Index)):
+            values = values.to_numpy(dtype="float64", na_value=np.nan)
+        np.copyto(self[name], values)
+
+    def series(self, name: str) -> pd.Series:
+        """Kolonun kopyasız Series görünümü (pandas rolling/ewm girdisi için)."""
+        return pd.Series(self[name], index=self.index, name=name, copy=False)
+
+    def to_frame(self, extra: dict = None, order: list = None) -> pd.DataFrame:
+        """
+        Blok kolonlarını ve `extra` kolonlarını (bool, kategorik) tek DataFrame'de sunar.
+        Blok kolonları kopyalanmaz; `order` verilirse kolon sırası odur.
+        """
+        extra = extra or {}
+        order = order or self.columns + list(extra)
+        data = {name: extra[name] if name in extra else self[name] for name in order}
+        return pd.DataFrame(data, index=self.index, copy=False)
+
+
+# =========================
+#   KAYIT DEFTERİ (REGISTRY)
+# =========================
+BASE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class Indicator:
+    """
+    Kayıtlı indikatör.
+
+    outputs: Ürettiği kolonlar (MACD gibi çok çıktılı olabilir)
+    deps: Girdi kolonları (OHLCV veya başka indikatör çıktıları)
+    lookback: Girdileri geçerli olduktan sonra ilk geçerli değere kadar geçen mum sayısı
+    compute: float ise compute(ind, *out_dizileri) çıktılara yazar;
+             değilse compute(ind) kolonu döndürür (bool, kategorik)
+    """
+
+    def __init__(self, outputs: tuple, deps: tuple, lookback: int, compute, dtype: str = "float64"):
+        self.outputs = outputs
+        self.deps = deps
+        self.lookback = lookback
+        self.compute = compute
+        self.dtype = dtype
+
+
+class IndicatorRegistry:
+    """
+    Kolon adı → Indicator eşlemesi. Bağımlılıklar kayıt anında var olmalıdır,
+    bu yüzden kayıt sırası aynı zamanda geçerli bir hesaplama sırasıdır.
+    """
+
+    def __init__(self):
+        self.by_column = {}
+        self.specs = []    # kayıt sırasıyla indikatörler
+        self.columns = []  # kayıt sırasıyla tüm çıktı kolonları
+
+    def register(self, outputs, deps=(), lookback: int = 0, dtype: str = "float64"):
+        """Dekoratör: @registry.register("rsi14", deps=["close"], lookback=1)"""
+        outputs = (outputs,) if isinstance(outputs, str) else tuple(outputs)
+        deps = tuple(deps)
+
+        def decorator(fn):
+            for dep in deps:
+                if dep not in BASE_COLUMNS and dep not in self.by_column:
+                    raise ValueError(f"{outputs}: bilinmeyen bağımlılık {dep}")
+            for name in outputs:
+                if name in self.by_column or name in BASE_COLUMNS:
+                    raise ValueError(f"{name} zaten kayıtlı")
+            spec = Indicator(outputs, deps, lookback, fn, dtype)
+            self.specs.append(spec)
+            for name in outputs:
+                self.by_column[name] = spec
+                self.columns.append(name)
+            return fn
+        return decorator
+
+    def plan(self, columns, available=()) -> list:
+        """`columns` için hesaplanması gereken indikatörler (bağımlılıklar dahil, kayıt sırasıyla)."""
+        needed, stack = set(), [c for c in columns if c not in available]
+        while stack:
+            name = stack.pop()
+            if name in BASE_COLUMNS or name in available:
+                continue
+            if name not in self.by_column:
+                raise KeyError(f"Kayıtlı olmayan indikatör: {name}")
+            spec = self.by_column[name]
+            if spec not in needed:
+                needed.add(spec)
+                stack.extend(spec.deps)
+        return [spec for spec in self.specs if spec in needed]
+
+    def warmup(self, columns) -> int:
+        """Kolonların hepsinin geçerli olması için gereken ısınma mumu sayısı (zincir boyunca)."""
+        memo = {}
+
+        def chain(name):
+            if name in BASE_COLUMNS:
+                return 0
+            if name not in memo:
+                spec = self.by_column[name]
+                memo[name] = spec.lookback + max((chain(d) for d in spec.deps), default=0)
+            return memo[name]
+
+        return max((chain(c) for c in columns), default=0)
+
+
+class IndicatorSet:
+    """
+    Bir OHLCV frame'i için tembel (lazy) indikatör kümesi.
+
+    Kolonlar ilk istendiklerinde bağımlılıklarıyla birlikte hesaplanır ve
+    saklanır (memoization); istenmeyen indikatör hiç hesaplanmaz. Aynı
+    istekte hesaplanan float kolonlar tek bir IndicatorBlock'a yazılır.
+
+    external/external_columns: Bu kolonlar önce external() frame'inden alınır
+    (örn. artımlı indikatör motoru); external() None dönerse hesaplanır.
+    """
+
+    def __init__(self, df: pd.DataFrame, registry: IndicatorRegistry,
+                 external=None, external_columns=()):
+        self.source = df
+        self.registry = registry
+        self.index = df.index
+        self.external = external
+        self.external_columns = set(external_columns)
+        self._external_frame = None
+        self._external_loaded = external is None
+        self._values = {}
+        self.computed = []  # hesaplanan kolonlar, hesaplanma sırasıyla
+
+    @property
+    def available(self) -> set:
+        return set(self.source.columns) | set(self._values)
+
+    def __getitem__(self, name: str):
+        if name not in self._values:
+            if name in self.source.columns:
+                col = self.source[name]
+                self._values[name] = col.to_numpy(dtype="float64", na_value=np.nan) \
+                    if col.dtype.kind in "fiu" else col
+            else:
+                self.compute([name])
+        return self._values[name]
+
+    def series(self, name: str) -> pd.Series:
+        """Kolonun kopyasız Series görünümü."""
+        values = self[name]
+        if isinstance(values, pd.Series):
+            return values
+        return pd.Series(values, index=self.index, name=name, copy=False)
+
+    def _external(self):
+        if not self._external_loaded:
+            self._external_frame = self.external()
+            self._external_loaded = True
+        return self._external_frame
+
+    def compute(self, columns) -> None:
+        """Eksik kolonları (ve bağımlılıklarını) hesaplar."""
+        available = self.available
+        specs = self.registry.plan(columns, available=available)
+        if not specs:
+            return
+        # Girdisi hazır float olmayan kolonlar (örn. desenler) önce: geçici dizileri blok ayrılmadan serbest kalır
+        early = [spec for spec in specs if spec.dtype != "float64"
+                 and all(d in BASE_COLUMNS or d in available for d in spec.deps)]
+        specs = early + [spec for spec in specs if spec not in early]
+        float_outputs = [name for spec in specs if spec.dtype == "float64" for name in spec.outputs]
+        block = IndicatorBlock(self.index, float_outputs) if float_outputs else None
+        for spec in specs:
+            if spec.dtype != "float64":
+                self._values[spec.outputs[0]] = spec.compute(self)
+            else:
+                outs = [block[name] for name in spec.outputs]
+                external = self._external() if set(spec.outputs) <= self.external_columns else None
+                if external is not None:
+                    for name, out in zip(spec.outputs, outs):
+                        np.copyto(out, external[name].to_numpy(dtype="float64", na_value=np.nan))
+                else:
+                    spec.compute(self, *outs)
+                self._values.update(zip(spec.outputs, outs))
+            self.computed.extend(spec.outputs)
+
+    def frame(self, columns=None) -> pd.DataFrame:
+        """
+        Kaynak kolonlar + istenen indikatörler (kayıt sırasıyla) içeren DataFrame.
+        columns None ise tüm kayıtlı indikatörler. Kolonlar kopyalanmaz.
+        """
+        columns = self.registry.columns if columns is None else columns
+        self.compute(columns)
+        wanted = set(columns)
+        names = list(self.source.columns) + [c for c in self.registry.columns
+                                             if c in wanted and c not in self.source.columns]
+        data = {name: self.source[name] if name in self.source.columns else self._values[name]
+                for name in names}
+        return pd.DataFrame(data, index=self.index, copy=False)
+
+
+# =========================
+#       ÇEKİRDEKLER
+# =========================
+def _out(out, like: np.ndarray) -> np.ndarray:
+    return np.empty_like(like, dtype="float64") if out is None else out
+
+
+def change_pct(open_: np.ndarray, close: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """(close - open) / open * 100"""
+    out = _out(out, close)
+    np.subtract(close, open_, out=out)
+    np.divide(out, open_, out=out)
+    np.multiply(out, 100.0, out=out)
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """max(high - low, |high - prev_close|, |low - prev_close|); ilk mumda sadece high - low."""
+    out = _out(out, close)
+    np.subtract(high, low, out=out)
+    if len(close) > 1:
+        prev = close[:-1]
+        np.fmax(out[1:], np.abs(high[1:] - prev), out=out[1:])
+        np.fmax(out[1:], np.abs(low[1:] - prev), out=out[1:])
+    return out
+
+
+def obv(close: np.ndarray, volume: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """On-Balance Volume: sign(close farkı) * hacim kümülatif toplamı."""
+    out = _out(out, close)
+    if len(close) == 0:
+        return out
+    out[0] = 0.0
+    np.subtract(close[1:], close[:-1], out=out[1:])
+    np.sign(out, out=out)
+    np.multiply(out, volume, out=out)
+    np.cumsum(out, out=out)
+    return out
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+         out: np.ndarray = None) -> np.ndarray:
+    """Kümülatif (tipik fiyat * hacim) / kümülatif hacim."""
+    out = _out(out, close)
+    np.add(high, low, out=out)
+    np.add(out, close, out=out)
+    np.divide(out, 3, out=out)
+    np.multiply(out, volume, out=out)
+    np.cumsum(out, out=out)
+    np.divide(out, np.cumsum(volume), out=out)
+    return out
+
+
+def rolling_vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, window: int,
+                 out: np.ndarray = None) -> np.ndarray:
+    """
+    Her barda son `window` barın VWAP'ı (ilk window-1 bar kümülatif).
+    Canlı analizin çektiği pencereyle hesaplanan vwap'ı uzun geçmişte bar bar verir.
+    """
+    out = _out(out, close)
+    pv = np.cumsum((high + low + close) / 3 * volume)
+    vol = np.cumsum(volume, dtype="float64")
+    pv[window:] = pv[window:] - pv[:-window]
+    vol[window:] = vol[window:] - vol[:-window]
+    np.divide(pv, vol, out=out)
+    return out
+
+
+def bollinger(close: np.ndarray, middle: np.ndarray, std: np.ndarray, std_dev: float,
+              upper: np.ndarray, lower: np.ndarray, percent_b: np.ndarray, bandwidth: np.ndarray) -> None:
+    """
+    Orta bant ve standart sapmadan üst/alt bant, %B ve bant genişliğini hesaplar.
+    Sıfır genişlikte %B NaN, sonsuz bant genişliği NaN olur.
+    """
+    np.multiply(std, std_dev, out=upper)
+    np.subtract(middle, upper, out=lower)
+    np.add(middle, upper, out=upper)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.subtract(upper, lower, out=bandwidth)
+        np.subtract(close, lower, out=percent_b)
+        np.divide(percent_b, np.where(bandwidth == 0, np.nan, bandwidth), out=percent_b)
+        np.divide(bandwidth, middle, out=bandwidth)
+    bandwidth[np.isinf(bandwidth)] = np.nan
+
+
+def stochastic_rsi(rsi: np.ndarray, length: int = 14, out: np.ndarray = None) -> np.ndarray:
+    """
+    RSI'ın `length` pencerelik min/max aralığındaki konumu (0-100).
+
+    Pencere NaN olmayan RSI değerleri üzerinde kayar (NaN'lar atlanır),
+    sonuç yine RSI ile aynı konumlara yazılır; Series dropna/reindex yok.
+    """
+    out = _out(out, rsi)
+    out.fill(np.nan)
+    valid = ~np.isnan(rsi)
+    values = rsi[valid]
+    if len(values) < length:
+        return out
+
+    windows = sliding_window_view(values, length)
+    low = windows.min(axis=1)
+    span = windows.max(axis=1) - low
+    span[span == 0] = np.nan
+    stoch = np.full(len(values), np.nan)
+    stoch[length - 1:] = (values[length - 1:] - low) / span * 100
+    out[valid] = stoch
+    return out
+
+
+def valid_rows(df: pd.DataFrame) -> np.ndarray:
+    """Hiçbir kolonu NaN olmayan satırların maskesi (df.dropna() ile aynı satırlar)."""
+    mask = np.ones(len(df), dtype=bool)
+    for name in df.columns:
+        mask &= df[name].notna().to_numpy()
+    return mask
+
+
+def dropna_tail(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    """
+    df.dropna().tail(n) ile aynı sonucu, tüm frame'i kopyalamadan verir.
+    Geçerli son n satır bitişikse kopyasız dilim döner.
+    """
+    positions = np.flatnonzero(valid_rows(df))[-n:] if n > 0 else np.array([], dtype=int)
+    if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+        return df.iloc[positions[0]:positions[-1] + 1]
+    return df.iloc[positions]
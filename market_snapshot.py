@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+market_snapshot.py
+Çalıştırma başına toplu ticker, funding rate ve mark price.
+
+Binance / OKX / Bybit tüm sembollerin ticker'ını (fetch_tickers) ve funding
+rate + mark price'ını (fetch_funding_rates) tek istekte döndürür. MarketSnapshots
+exchange başına bu iki isteği çalıştırmada bir kez yapar; her coin'in market_info'su
+snapshot'tan üretilir. Böylece market bilgisi istek sayısı coin sayısından bağımsızdır.
+
+Toplu endpoint'i olmayan ya da isteği başarısız olan exchange için snapshot None
+döner ve qwen3.get_market_info sembol başına isteklere düşer.
+"""
+
+import threading
+import time
+
+import perf
+
+
+class MarketSnapshot:
+    """Bir exchange'in toplu çekilmiş ticker ve funding verisi."""
+
+    def __init__(self, exchange_id: str, tickers: dict, funding: dict = None, fetched_ms: int = None):
+        self.exchange_id = exchange_id
+        self.tickers = tickers or {}
+        # None → funding toplu çekilemedi (sembol başına çekilmeli)
+        self.funding_rates = funding
+        self.fetched_ms = fetched_ms or int(time.time() * 1000)
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self.tickers
+
+    def ticker(self, symbol: str) -> dict:
+        return self.tickers[symbol]
+
+    @property
+    def has_funding(self) -> bool:
+        return self.funding_rates is not None
+
+    def funding(self, symbol: str):
+        return (self.funding_rates or {}).get(symbol)
+
+
+def _supports(exchange, feature: str) -> bool:
+    return bool(getattr(exchange, "has", {}).get(feature))
+
+
+def fetch_market_snapshot(exchange, symbols: list):
+    """
+    Semboller için ticker'ları ve funding rate'leri toplu çeker.
+
+    Returns:
+        MarketSnapshot veya toplu ticker desteklenmiyor / başarısızsa None
+    """
+    if not _supports(exchange, "fetchTickers"):
+        return None
+    with perf.span("market_snapshot", exchange=exchange.id):
+        try:
+            tickers = exchange.fetch_tickers(symbols)
+        except Exception as e:
+            print(f"⚠️ Toplu ticker alınamadı ({exchange.id}): {e}")
+            return None
+        funding = None
+        if _supports(exchange, "fetchFundingRates"):
+            try:
+                funding = exchange.fetch_funding_rates(symbols)
+            except Exception as e:
+                print(f"⚠️ Toplu funding rate alınamadı ({exchange.id}): {e}")
+    return MarketSnapshot(exchange.id, tickers, funding)
+
+
+async def fetch_market_snapshot_async(exchange, symbols: list, limiter):
+    """fetch_market_snapshot'ın async karşılığı (ticker ve funding eşzamanlı çekilir)."""
+    import asyncio
+
+    if not _supports(exchange, "fetchTickers"):
+        return None
+
+    async def call(method):
+        async with limiter:
+            return await method(symbols)
+
+    with perf.span("market_snapshot", exchange=exchange.id):
+        requests = [call(exchange.fetch_tickers)]
+        if _supports(exchange, "fetchFundingRates"):
+            requests.append(call(exchange.fetch_funding_rates))
+        tickers, *funding = await asyncio.gather(*requests, return_exceptions=True)
+    if isinstance(tickers, Exception):
+        print(f"⚠️ Toplu ticker alınamadı ({exchange.id}): {tickers}")
+        return None
+    funding = funding[0] if funding else None
+    if isinstance(funding, Exception):
+        print(f"⚠️ Toplu funding rate alınamadı ({exchange.id}): {funding}")
+        funding = None
+    return MarketSnapshot(exchange.id, tickers, funding)
+
+
+class MarketSnapshots:
+    """
+    Çalıştırma boyunca exchange başına tek snapshot: ilk ihtiyaç duyan coin tüm
+    semboller için çeker, diğerleri aynı snapshot'ı kullanır. Başarısız çekim de
+    önbelleğe alınır (her coin için tekrar denenmez).
+    """
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self._snapshots = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def get(self, exchange):
+        with self._lock:
+            if exchange.id not in self._snapshots:
+                self._snapshots[exchange.id] = fetch_market_snapshot(exchange, self.symbols)
+            return self._snapshots[exchange.id]
+
+    async def get_async(self, exchange, limiter):
+        """Eşzamanlı coinler aynı isteği bekler (exchange başına tek task)."""
+        import asyncio
+
+        task = self._tasks.get(exchange.id)
+        if task is None:
+            task = asyncio.ensure_future(fetch_market_snapshot_async(exchange, self.symbols, limiter))
+            self._tasks[exchange.id] = task
+        return await task
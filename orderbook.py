@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+orderbook.py
+Tek bir derin order book snapshot'ından NumPy ile vektörel likidite metrikleri.
+
+Sembol başına tek istekle ORDER_BOOK_LIMIT seviye çekilir; market_info'nun bid/ask
+değerleri ve advanced_analysis'in order book analizi aynı snapshot'tan üretilir.
+
+Metrikler:
+- İlk `depth` seviyede toplam hacim, dengesizlik ve duvarlar (önceki çıktı ile aynı alanlar)
+- depth_bands: mid fiyattan %0.1 / %0.5 / %1 uzaklığa kadar kümülatif hacim ve notional,
+  dengesizlik ve o bant içindeki duvarlar (bant ortalama seviye hacminin WALL_MULTIPLIER katından
+  büyük seviyeler). Snapshot bandın sonuna ulaşmıyorsa `complete` False olur.
+"""
+
+import os
+
+import numpy as np
+
+
+# Mid fiyattan uzaklık bantları (oran)
+DEPTH_BANDS = (0.001, 0.005, 0.01)
+
+# Ortalama seviye hacminin kaç katı "duvar" sayılır
+WALL_MULTIPLIER = 3.0
+
+# Binance Futures geçerli limitleri: 5, 10, 20, 50, 100, 500, 1000 (500 → ağırlık 10)
+DEFAULT_LIMIT = 500
+
+
+def order_book_limit() -> int:
+    """Snapshot derinliği (ORDER_BOOK_LIMIT, varsayılan 500 seviye)."""
+    return int(os.getenv("ORDER_BOOK_LIMIT", str(DEFAULT_LIMIT)))
+
+
+def _levels(rows) -> np.ndarray:
+    """ccxt [[price, amount, (count)], ...] listesini (n, 2) float64 diziye çevirir."""
+    arr = np.asarray(rows, dtype="float64")
+    if arr.size == 0:
+        return np.empty((0, 2), dtype="float64")
+    return arr[:, :2]
+
+
+def band_label(pct: float) -> str:
+    """0.005 → "0.5%" """
+    return f"{pct * 100:g}%"
+
+
+class OrderBookSnapshot:
+    """
+    Bir order book anlık görüntüsü: bids fiyata göre azalan, asks artan (n, 2) dizileri
+    ve kümülatif hacim / notional toplamları.
+    """
+
+    def __init__(self, bids, asks, timestamp: int = None):
+        self.bids = _levels(bids)
+        self.asks = _levels(asks)
+        self.timestamp = timestamp
+        self.bid_cum = np.cumsum(self.bids[:, 1])
+        self.ask_cum = np.cumsum(self.asks[:, 1])
+        self.bid_notional_cum = np.cumsum(self.bids[:, 0] * self.bids[:, 1])
+        self.ask_notional_cum = np.cumsum(self.asks[:, 0] * self.asks[:, 1])
+
+    @classmethod
+    def from_ccxt(cls, orderbook: dict) -> "OrderBookSnapshot":
+        return cls(orderbook.get("bids") or [], orderbook.get("asks") or [], orderbook.get("timestamp"))
+
+    @property
+    def best_bid(self):
+        return float(self.bids[0, 0]) if len(self.bids) else None
+
+    @property
+    def best_ask(self):
+        return float(self.asks[0, 0]) if len(self.asks) else None
+
+    @property
+    def mid(self):
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    def band_counts(self, bands=DEPTH_BANDS):
+        """Her bant için mid'den o uzaklığa kadar olan (bid, ask) seviye sayıları."""
+        pct = np.asarray(bands, dtype="float64")
+        mid = self.mid
+        # bids azalan: fiyatın negatifi artan olur
+        bid_n = np.searchsorted(-self.bids[:, 0], -(mid * (1 - pct)), side="right")
+        ask_n = np.searchsorted(self.asks[:, 0], mid * (1 + pct), side="right")
+        return bid_n, ask_n
+
+
+def _cum_at(cum: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """İlk counts[i] seviyenin toplamı (counts 0 ise 0)."""
+    padded = np.concatenate([[0.0], cum])
+    return padded[counts]
+
+
+def _walls(levels: np.ndarray, counts: np.ndarray, thresholds: np.ndarray):
+    """
+    Her bant için duvar sayısı ve en büyük seviyenin fiyatı.
+    levels: (n, 2) tek taraf; counts: bant başına seviye sayısı; thresholds: bant başına eşik.
+    """
+    n = len(levels)
+    if n == 0:
+        return np.zeros(len(counts), dtype=int), [None] * len(counts)
+    sizes = levels[:, 1]
+    in_band = np.arange(n)[:, None] < counts[None, :]
+    walls = ((sizes[:, None] > thresholds[None, :]) & in_band).sum(axis=0)
+
+    # İlk k seviyenin en büyüğünün konumu (kayan argmax)
+    running = np.maximum.accumulate(sizes)
+    argmax = np.maximum.accumulate(np.where(sizes == running, np.arange(n), 0))
+    largest = [float(levels[argmax[c - 1], 0]) if c > 0 else None for c in counts]
+    return walls, largest
+
+
+def band_metrics(book: OrderBookSnapshot, bands=DEPTH_BANDS, wall_multiplier: float = WALL_MULTIPLIER) -> dict:
+    """Mid'den her uzaklık bandı için kümülatif derinlik, dengesizlik ve duvarlar."""
+    if book.mid is None:
+        return {}
+    bid_n, ask_n = book.band_counts(bands)
+    bid_vol, ask_vol = _cum_at(book.bid_cum, bid_n), _cum_at(book.ask_cum, ask_n)
+    bid_notional = _cum_at(book.bid_notional_cum, bid_n)
+    ask_notional = _cum_at(book.ask_notional_cum, ask_n)
+
+    total = bid_vol + ask_vol
+    levels = np.maximum(bid_n + ask_n, 1)
+    thresholds = total / levels * wall_multiplier
+    imbalance = np.divide(bid_vol - ask_vol, total, out=np.zeros_like(total), where=total > 0) * 100
+    bid_walls, largest_bid = _walls(book.bids, bid_n, thresholds)
+    ask_walls, largest_ask = _walls(book.asks, ask_n, thresholds)
+
+    out = {}
+    for i, pct in enumerate(bands):
+        out[band_label(pct)] = {
+            "bid_volume": round(float(bid_vol[i]), 4),
+            "ask_volume": round(float(ask_vol[i]), 4),
+            "bid_notional": round(float(bid_notional[i]), 2),
+            "ask_notional": round(float(ask_notional[i]), 2),
+            "imbalance_pct": round(float(imbalance[i]), 2),
+            "bid_levels": int(bid_n[i]),
+            "ask_levels": int(ask_n[i]),
+            "bid_walls": int(bid_walls[i]),
+            "ask_walls": int(ask_walls[i]),
+            "largest_bid_wall": largest_bid[i],
+            "largest_ask_wall": largest_ask[i],
+            # Snapshot bandın sonuna kadar uzanıyor mu (değilse hacimler alt sınırdır)
+            "complete": bool(bid_n[i] < len(book.bids) and ask_n[i] < len(book.asks)),
+        }
+    return out
+
+
+def depth_metrics(book: OrderBookSnapshot, depth: int = 20, bands=DEPTH_BANDS,
+                  wall_multiplier: float = WALL_MULTIPLIER) -> dict:
+    """
+    İlk `depth` seviyenin özet metrikleri (önceki order_book_analysis alanları) ve
+    mid'den uzaklık bantlarına göre derinlik (depth_bands).
+    """
+    bids, asks = book.bids[:depth], book.asks[:depth]
+    total_bid_volume = float(bids[:, 1].sum())
+    total_ask_volume = float(asks[:, 1].sum())
+    liquidity_imbalance = (total_bid_volume - total_ask_volume) / (total_bid_volume + total_ask_volume) * 100
+
+    # Büyük emir duvarları (manipülasyon sinyali)
+    avg_volume = (total_bid_volume + total_ask_volume) / (2 * depth)
+    large_bid_walls = int((bids[:, 1] > avg_volume * wall_multiplier).sum())
+    large_ask_walls = int((asks[:, 1] > avg_volume * wall_multiplier).sum())
+
+    best_bid, best_ask = book.best_bid, book.best_ask
+    spread = best_ask - best_bid if best_bid and best_ask else None
+    spread_pct = (spread / best_bid * 100) if spread else None
+
+    return {
+        "liquidity_imbalance_pct": round(liquidity_imbalance, 2),
+        "large_bid_walls": large_bid_walls,
+        "large_ask_walls": large_ask_walls,
+        "total_bid_volume": round(total_bid_volume, 2),
+        "total_ask_volume": round(total_ask_volume, 2),
+        "spread": round(spread, 4) if spread else None,
+        "spread_percentage": round(spread_pct, 4) if spread_pct else None,
+        "market_depth": round(total_bid_volume + total_ask_volume, 2),
+        "mid_price": book.mid,
+        "snapshot_levels": {"bids": len(book.bids), "asks": len(book.asks)},
+        "depth_bands": band_metrics(book, bands, wall_multiplier),
+    }
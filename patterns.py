@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+patterns.py
+NumPy ile vektörel mum deseni sınıflandırıcı (qwen3.py ve qwen3_AllData.py ortak kullanır).
+
+Tüm seri tek geçişte sınıflandırılır; sonuç kategorik bir kolondur. Bir mumda
+birden fazla desen eşleşirse çok mumlu desen tek mumluya göre önceliklidir:
+  three_white_soldiers / three_black_crows > morning_star / evening_star
+  > bullish_engulfing / bearish_engulfing > doji / hammer / shooting_star > normal
+
+Kripto piyasaları 7/24 açık olduğu için klasik "gap" şartları aranmaz.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+SINGLE_PATTERNS = ["normal", "doji", "hammer", "shooting_star"]
+MULTI_PATTERNS = [
+    "bullish_engulfing", "bearish_engulfing",
+    "morning_star", "evening_star",
+    "three_white_soldiers", "three_black_crows",
+]
+PATTERN_CATEGORIES = SINGLE_PATTERNS + MULTI_PATTERNS
+
+
+def _shift(a: np.ndarray, n: int) -> np.ndarray:
+    """a'yı n bar kaydırır; baştaki değerler NaN (bool dizilerde False) olur."""
+    out = np.full_like(a, False if a.dtype == bool else np.nan)
+    out[n:] = a[:-n]
+    return out
+
+
+def classify_candles(df: pd.DataFrame) -> pd.Series:
+    """
+    OHLC DataFrame'indeki her mumu sınıflandırır.
+
+    Returns:
+        df.index ile hizalı kategorik pattern serisi
+    """
+    o = df["open"].to_numpy(dtype="float64")
+    h = df["high"].to_numpy(dtype="float64")
+    l = df["low"].to_numpy(dtype="float64")
+    c = df["close"].to_numpy(dtype="float64")
+
+    body = np.abs(c - o)
+    rng = np.maximum(h - l, 1e-9)
+    upper = h - np.maximum(c, o)
+    lower = np.minimum(c, o) - l
+    bull = c > o
+    bear = c < o
+    strong = body >= 0.5 * rng  # gövdesi mum aralığının yarısından büyük
+
+    codes = np.zeros(len(df), dtype=np.int8)  # 0 = normal
+
+    # --- Tek mumlu desenler (sıra önemli: doji > hammer > shooting_star) ---
+    with np.errstate(invalid="ignore"):
+        doji = body / rng < 0.1
+        hammer = ~doji & (lower > 2 * body) & (upper < body)
+        shooting = ~doji & ~hammer & (upper > 2 * body) & (lower < body)
+    codes[shooting] = PATTERN_CATEGORIES.index("shooting_star")
+    codes[hammer] = PATTERN_CATEGORIES.index("hammer")
+    codes[doji] = PATTERN_CATEGORIES.index("doji")
+
+    if len(df) >= 2:
+        o1, c1, body1 = _shift(o, 1), _shift(c, 1), _shift(body, 1)
+        bull1, bear1 = _shift(bull, 1), _shift(bear, 1)
+
+        # --- İki mumlu: engulfing (gövde önceki gövdeyi tamamen yutar) ---
+        with np.errstate(invalid="ignore"):
+            bull_engulf = bear1 & bull & (o <= c1) & (c >= o1) & (body > body1)
+            bear_engulf = bull1 & bear & (o >= c1) & (c <= o1) & (body > body1)
+        codes[bull_engulf] = PATTERN_CATEGORIES.index("bullish_engulfing")
+        codes[bear_engulf] = PATTERN_CATEGORIES.index("bearish_engulfing")
+
+    if len(df) >= 3:
+        o2, c2, body2 = _shift(o, 2), _shift(c, 2), _shift(body, 2)
+        bull2, bear2 = _shift(bull, 2), _shift(bear, 2)
+        strong1, strong2 = _shift(strong, 1), _shift(strong, 2)
+        mid2 = (o2 + c2) / 2
+
+        with np.errstate(invalid="ignore"):
+            # --- Üç mumlu: morning/evening star (güçlü mum, küçük gövdeli yıldız, ters yönlü güçlü mum) ---
+            small_star = body1 <= 0.3 * body2
+            morning = bear2 & strong2 & small_star & bull & strong & (c > mid2)
+            evening = bull2 & strong2 & small_star & bear & strong & (c < mid2)
+
+            # --- Üç mumlu: three white soldiers / black crows ---
+            soldiers = (bull2 & bull1 & bull & strong2 & strong1 & strong
+                        & (c1 > c2) & (c > c1)
+                        & (o1 >= o2) & (o1 <= c2) & (o >= o1) & (o <= c1))
+            crows = (bear2 & bear1 & bear & strong2 & strong1 & strong
+                     & (c1 < c2) & (c < c1)
+                     & (o1 <= o2) & (o1 >= c2) & (o <= o1) & (o >= c1))
+        codes[morning] = PATTERN_CATEGORIES.index("morning_star")
+        codes[evening] = PATTERN_CATEGORIES.index("evening_star")
+        codes[soldiers] = PATTERN_CATEGORIES.index("three_white_soldiers")
+        codes[crows] = PATTERN_CATEGORIES.index("three_black_crows")
+
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=PATTERN_CATEGORIES),
+        index=df.index, name="pattern"
+    )
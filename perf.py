@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+perf.py
+Analiz aşamaları için hafif süre ölçümü (span).
+
+Her span duvar saati süresini, thread CPU süresini ve span açıkken yapılan
+exchange HTTP isteklerinin sayısını / yanıt byte'ını kaydeder. Spanlar bir
+Trace altında toplanır (coin başına bir trace, çalıştırma başına bir trace);
+iç içe spanlar dış spanın etiketlerini (örn. timeframe) devralır ve istekler
+açık olan tüm spanlara sayılır.
+
+Durum contextvars ile tutulur: asyncio task'ları ve asyncio.to_thread kendi
+kopyalarını alır, böylece eşzamanlı coinlerin spanları karışmaz. Async modda
+aynı thread'de iç içe geçen coroutine'ler nedeniyle CPU süreleri yaklaşıktır.
+
+Trace yoksa span() hiçbir şey kaydetmez (neredeyse sıfır maliyet).
+
+Çevre değişkenleri:
+    PERF_LOG=perf.jsonl  → her trace JSON satırı olarak eklenir ("-" → stdout)
+    PERF_EMBED=1         → coin trace'i analiz satırına `perf` alanı olarak eklenir
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# Açık span kayıtları (en dıştaki trace kökü dahil), iç içe sırayla
+_open = contextvars.ContextVar("perf_open_spans", default=())
+_log_lock = threading.Lock()
+
+
+class Trace:
+    """Bir coin ya da çalıştırma için kapanmış spanların listesi ve toplamları."""
+
+    def __init__(self, **tags):
+        self.tags = tags
+        self.started_utc = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        self.spans = []
+        self.requests = 0
+        self.bytes_received = 0
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        self.wall_ms = None
+        self.cpu_ms = None
+
+    def close(self) -> None:
+        self.wall_ms = round((time.perf_counter() - self._wall) * 1000, 3)
+        self.cpu_ms = round((time.thread_time() - self._cpu) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            **self.tags,
+            "started_utc": self.started_utc,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "requests": self.requests,
+            "bytes_received": self.bytes_received,
+            "spans": list(self.spans),
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "tags", "requests", "bytes_received")
+
+    def __init__(self, trace: Trace, name: str, tags: dict):
+        self.trace = trace
+        self.name = name
+        self.tags = tags
+        self.requests = 0
+        self.bytes_received = 0
+
+
+def current_trace():
+    """En içteki açık trace (yoksa None)."""
+    for item in reversed(_open.get()):
+        if isinstance(item, Trace):
+            return item
+    return None
+
+
+@contextlib.contextmanager
+def tracing(**tags):
+    """
+    Yeni bir trace açar; blok içindeki spanlar ona kaydedilir.
+    Dış trace varsa istekler ona da sayılır. Blok bitince (hata olsa da)
+    trace PERF_LOG'a yazılır.
+
+    Yields:
+        Trace (blok bitince wall_ms/cpu_ms dolar)
+    """
+    trace = Trace(**tags)
+    token = _open.set(_open.get() + (trace,))
+    try:
+        yield trace
+    except BaseException as e:
+        trace.tags["error"] = str(e)[:200]
+        raise
+    finally:
+        _open.reset(token)
+        trace.close()
+        emit(trace)
+
+
+@contextlib.contextmanager
+def span(name: str, **tags):
+    """
+    Aşama süresini ölçer ve en içteki trace'e ekler (trace yoksa ölçmez).
+    Etiketler dış spandan devralınır.
+    """
+    stack = _open.get()
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+
+    parent = stack[-1]
+    merged = {**parent.tags, **tags} if isinstance(parent, _Span) else tags
+    record = _Span(trace, name, merged)
+    token = _open.set(stack + (record,))
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall_ms = (time.perf_counter() - wall) * 1000
+        cpu_ms = (time.thread_time() - cpu) * 1000
+        _open.reset(token)
+        trace.spans.append({
+            "name": name,
+            **merged,
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "requests": record.requests,
+            "bytes_received": record.bytes_received,
+        })
+
+
+async def timed(name: str, awaitable, **tags):
+    """awaitable'ı bir span içinde bekler (asyncio.gather ile eşzamanlı aşamalar için)."""
+    with span(name, **tags):
+        return await awaitable
+
+
+def record_response(nbytes: int) -> None:
+    """Bir HTTP yanıtını açık tüm span ve trace'lere sayar."""
+    for item in _open.get():
+        item.requests += 1
+        item.bytes_received += nbytes
+
+
+def instrument_exchange(exchange):
+    """
+    ccxt exchange'in REST yanıtlarını (sync ve async) perf sayaçlarına bağlar.
+    ccxt her yanıtı on_rest_response'tan geçirir; gövde byte'ı sayılır.
+    """
+    original = exchange.on_rest_response
+
+    def on_rest_response(code, reason, url, method, response_headers, response_body, *args):
+        if _open.get():
+            body = response_body or ""
+            record_response(len(body.encode("utf-8")) if isinstance(body, str) else len(body))
+        return original(code, reason, url, method, response_headers, response_body, *args)
+
+    exchange.on_rest_response = on_rest_response
+    return exchange
+
+
+# =========================
+#        ÇIKTI
+# =========================
+def embed_enabled() -> bool:
+    """PERF_EMBED=1 ise coin trace'i analiz satırına eklenir."""
+    return os.getenv("PERF_EMBED", "0") == "1"
+
+
+def emit(trace: Trace, path: str = None) -> None:
+    """Trace'i PERF_LOG'a (ya da path'e) tek satır JSON olarak ekler; ayarlı değilse yazmaz."""
+    path = path or os.getenv("PERF_LOG")
+    if not path:
+        return
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+    with _log_lock:
+        if path == "-":
+            print(line, flush=True)
+            return
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ Perf kaydı yazılamadı: {e}")
+
+
+def stage_totals(trace: Trace) -> dict:
+    """Span adına göre toplam duvar süresi (ms), büyükten küçüğe."""
+    totals = {}
+    for item in trace.spans:
+        totals[item["name"]] = totals.get(item["name"], 0.0) + item["wall_ms"]
+    return {name: round(ms, 3) for name, ms in sorted(totals.items(), key=lambda kv: -kv[1])}
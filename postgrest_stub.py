@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+postgrest_stub.py
+Test ve benchmark için yerel, PostgREST uyumlu (Supabase REST) basit sunucu.
+
+supabase-py istemcisinin kullandığı alt kümeyi destekler:
+  GET    /rest/v1/<tablo>?select=...&<kolon>=<op>.<değer>
+  POST   /rest/v1/<tablo>[?on_conflict=kolon]   (insert / upsert)
+  DELETE /rest/v1/<tablo>?<kolon>=<op>.<değer>
+Filtreler: eq, neq, gt, gte, lt, lte, in.(a,b) ve not.<op> ile tersleri
+Prefer başlıkları: return=minimal|representation, count=exact,
+resolution=merge-duplicates|ignore-duplicates
+
+`latency` her isteğe yapay gecikme ekler (ağ gidiş-dönüşünü taklit eder);
+`fail_next(n)` sonraki n yazma isteğini 503 ile düşürür.
+
+Kullanım:
+    with PostgrestStub(latency=0.002) as stub:
+        client = create_client(stub.url, "test-key")
+"""
+
+import csv
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+def _parse_value(raw: str):
+    """PostgREST filtre değerini sayıya çevirmeyi dener."""
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def _matches(row: dict, filters: list) -> bool:
+    for column, op, value in filters:
+        if op.startswith("not."):
+            if _matches(row, [(column, op[4:], value)]):
+                return False
+            continue
+        current = row.get(column)
+        if op == "in":
+            if current not in value:
+                return False
+            continue
+        if current is None:
+            return False
+        if op == "eq" and not current == value:
+            return False
+        if op == "neq" and not current != value:
+            return False
+        if op == "gt" and not current > value:
+            return False
+        if op == "gte" and not current >= value:
+            return False
+        if op == "lt" and not current < value:
+            return False
+        if op == "lte" and not current <= value:
+            return False
+    return True
+
+
+class PostgrestStub:
+    """Bellekte tablo tutan, thread'li yerel PostgREST taklidi."""
+
+    FILTER_OPS = ("eq", "neq", "gt", "gte", "lt", "lte", "in")
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables = {}
+        self.request_count = 0
+        self.requests = []  # (method, path) listesi
+        self._failures = 0
+        self._next_id = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # -------------------------
+    #   Sunucu yaşam döngüsü
+    # -------------------------
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "PostgrestStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub._handle(self, "GET")
+
+            def do_POST(self):
+                stub._handle(self, "POST")
+
+            def do_PATCH(self):
+                stub._handle(self, "PATCH")
+
+            def do_DELETE(self):
+                stub._handle(self, "DELETE")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -------------------------
+    #   Yardımcılar
+    # -------------------------
+    def seed(self, table: str, rows: list) -> None:
+        """Tabloya doğrudan satır ekler (id atanır)."""
+        with self._lock:
+            for row in rows:
+                self._insert_row(table, dict(row))
+
+    def fail_next(self, n: int = 1) -> None:
+        """Sonraki n yazma isteği (POST/PATCH/DELETE) 503 döner."""
+        self._failures = n
+
+    def reset_counters(self) -> None:
+        self.request_count = 0
+        self.requests = []
+
+    def _insert_row(self, table: str, row: dict) -> dict:
+        rows = self.tables.setdefault(table, [])
+        if "id" not in row:
+            next_id = self._next_id.get(table, max((r["id"] for r in rows), default=0) + 1)
+            row["id"] = next_id
+            self._next_id[table] = next_id + 1
+        rows.append(row)
+        return row
+
+    # -------------------------
+    #   İstek işleme
+    # -------------------------
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = urlsplit(handler.path)
+        table = parts.path.rsplit("/", 1)[-1]
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        prefer = {}
+        for item in handler.headers.get("Prefer", "").split(","):
+            if "=" in item:
+                k, v = item.strip().split("=", 1)
+                prefer[k] = v
+
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length) or b"null") if length else None
+
+        with self._lock:
+            self.request_count += 1
+            self.requests.append((method, parts.path))
+            if method != "GET" and self._failures > 0:
+                self._failures -= 1
+                self._send(handler, 503, {"message": "Service Unavailable (stub)"})
+                return
+
+            filters, select, on_conflict = [], "*", None
+            for key, value in params:
+                if key == "select":
+                    select = value
+                elif key == "on_conflict":
+                    on_conflict = value
+                else:
+                    negate = value.startswith("not.")
+                    if negate:
+                        value = value[4:]
+                    op, _, raw = value.partition(".")
+                    if op not in self.FILTER_OPS:
+                        continue
+                    if op == "in":
+                        items = next(csv.reader([raw[1:-1]])) if raw.strip("()") else []
+                        parsed = tuple(_parse_value(x) for x in items)
+                    else:
+                        parsed = _parse_value(raw)
+                    filters.append((key, "not." + op if negate else op, parsed))
+
+            rows = self.tables.setdefault(table, [])
+            if method == "GET":
+                result = [r for r in rows if _matches(r, filters)]
+            elif method == "DELETE":
+                result = [r for r in rows if _matches(r, filters)]
+                self.tables[table] = [r for r in rows if not _matches(r, filters)]
+            elif method == "PATCH":
+                result = [r for r in rows if _matches(r, filters)]
+                for r in result:
+                    r.update(body)
+            else:  # POST
+                payload = body if isinstance(body, list) else [body]
+                result = []
+                for item in payload:
+                    existing = None
+                    if on_conflict and prefer.get("resolution"):
+                        existing = next((r for r in rows if r.get(on_conflict) == item.get(on_conflict)), None)
+                    if existing is not None:
+                        if prefer["resolution"] == "merge-duplicates":
+                            existing.update(item)
+                            result.append(existing)
+                    else:
+                        result.append(self._insert_row(table, dict(item)))
+
+        if select != "*":
+            columns = select.split(",")
+            result = [{c: r.get(c) for c in columns} for r in result]
+
+        headers = {}
+        if prefer.get("count") == "exact":
+            headers["Content-Range"] = f"0-{max(len(result) - 1, 0)}/{len(result)}"
+        status = 201 if method == "POST" else 200
+        if prefer.get("return") == "minimal" and method != "GET":
+            self._send(handler, 204, None, headers)
+        else:
+            self._send(handler, status, result, headers)
+
+    @staticmethod
+    def _send(handler, status: int, payload, headers: dict = None) -> None:
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            handler.send_header(k, v)
+        handler.end_headers()
+        if data:
+            handler.wfile.write(data)
@@ -16,23 +16,41 @@ Timeframes ve mum sayıları:
 
 Not: Bu betik "analiz/öneri" üretmez; yalnızca modeli besleyecek veriyi JSON olarak hazırlar.
 
-GÜNCELLEME: Artık tüm coinler tek bir tabloya (crypto_analysis) 5 satır olarak kaydedilir.
-Her çalıştırmada tablo temizlenir ve yeni veriler eklenir.
+GÜNCELLEME: Artık tüm coinler tek bir tabloya (crypto_analysis) coin başına bir satır olarak
+kaydedilir. Her çalıştırmada listede olmayan eski semboller silinir.
 
-Analiz edilen coinler sabit listeden seçilir (BTC, ETH, SOL, BNB, XRP).
+Analiz edilen coinler sabit listeden (BTC, ETH, SOL, BNB, XRP) ya da evren modunda
+(--universe) 24s hacme göre seçilen değişken sayıda USDT perpetual'dan oluşur.
 """
 
 import json
 import os
+import time
 from math import atan
 from datetime import datetime, timezone
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
-import ccxt
-from supabase import create_client, Client
+from numpy.lib.stride_tricks import sliding_window_view
 from dotenv import load_dotenv
 
+from exchanges import (get_exchange, close_async_exchanges, server_time_ms, server_time_ms_async,
+                       fetch_with_failover, fetch_with_failover_async, get_breaker)
+from candle_store import (get_default_store, set_default_store, fetch_ohlcv_cached, fetch_ohlcv_cached_async,
+                          MemoryCandleStore, DEFAULT_MAX_ROWS, timeframe_to_ms)
+from resample import resample_ohlcv, plan_resample, compare_ohlcv
+from scheduler import plan_wakeup
+from incremental import IndicatorEngine
+import indicator_block as kernels
+import perf
+from indicator_block import IndicatorRegistry, IndicatorSet, dropna_tail
+from patterns import classify_candles, MULTI_PATTERNS
+from orderbook import OrderBookSnapshot, depth_metrics, order_book_limit
+from market_snapshot import MarketSnapshot, MarketSnapshots
+from serialization import columnar_records, iso_timestamps, dumps_bytes
+from supabase_store import get_client, bulk_clear, execute_with_retries, prune_rows, SupabaseWriter
+
 # .env dosyasını yükle
 load_dotenv()
 
@@ -40,21 +58,12 @@ load_dotenv()
 # =========================
 #  SUPABASE CONFIGURATION
 # =========================
-def get_supabase_client() -> Client:
+def get_supabase_client():
     """
-    Supabase bağlantısı kurar.
+    Paylaşılan (tek, uzun ömürlü) Supabase client'ını döndürür.
     Çevre değişkenlerinden SUPABASE_URL ve SUPABASE_KEY okur.
     """
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    
-    if not url or not key:
-        raise ValueError(
-            "Supabase bağlantı bilgileri eksik!\n"
-            "Lütfen SUPABASE_URL ve SUPABASE_KEY çevre değişkenlerini ayarlayın."
-        )
-    
-    return create_client(url, key)
+    return get_client()
 
 
 def clear_table(table_name: str = "btc_analysis") -> None:
@@ -66,16 +75,12 @@ def clear_table(table_name: str = "btc_analysis") -> None:
     """
     supabase = get_supabase_client()
     
-    # Tüm kayıtları al ve sil
+    # Tüm kayıtları tek bir filtreli DELETE isteğiyle sil
     try:
-        # Önce tüm ID'leri al
-        response = supabase.table(table_name).select("id").execute()
+        deleted = bulk_clear(supabase, table_name)
         
-        if response.data and len(response.data) > 0:
-            # Her kaydı sil
-            for row in response.data:
-                supabase.table(table_name).delete().eq('id', row['id']).execute()
-            print(f"🗑️  '{table_name}' tablosundan {len(response.data)} kayıt silindi.")
+        if deleted > 0:
+            print(f"🗑️  '{table_name}' tablosundan {deleted} kayıt silindi.")
         else:
             print(f"ℹ️  '{table_name}' tablosu zaten boş.")
     except Exception as e:
@@ -85,7 +90,8 @@ def clear_table(table_name: str = "btc_analysis") -> None:
 def save_to_supabase(data: dict, table_name: str = "btc_analysis") -> dict:
     """
     Analiz verisini Supabase'e kaydeder.
-    Önce tabloyu temizler, sonra yeni veriyi ekler.
+    Sembole göre upsert edilir (aynı sembolün eski kaydı güncellenir);
+    geçici hatalarda üstel geri çekilmeyle tekrar denenir.
     
     Args:
         data: Kaydedilecek JSON verisi
@@ -102,15 +108,13 @@ def save_to_supabase(data: dict, table_name: str = "btc_analysis") -> dict:
     print(f"✅ Supabase bağlantısı başarılı!", flush=True)
     sys.stdout.flush()
     
-    # Önce tabloyu temizle
-    print(f"🗑️  '{table_name}' tablosu temizleniyor...", flush=True)
-    sys.stdout.flush()
-    clear_table(table_name)
-    
-    # Yeni veriyi kaydet
+    # Yeni veriyi kaydet (symbol anahtarlı upsert)
     print(f"💾 Yeni veri '{table_name}' tablosuna kaydediliyor...", flush=True)
     sys.stdout.flush()
-    response = supabase.table(table_name).insert(data).execute()
+    response = execute_with_retries(
+        lambda: supabase.table(table_name).upsert(data, on_conflict="symbol").execute(),
+        label=f"'{table_name}' upsert"
+    )
     print(f"✅ Veri başarıyla kaydedildi! Kayıt sayısı: {len(response.data) if response.data else 0}", flush=True)
     sys.stdout.flush()
     
@@ -139,24 +143,23 @@ def macd(series: pd.Series, fast=12, slow=26, signal=9):
     hist = macd_line - signal_line
     return macd_line, signal_line, hist
 
+def _values(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype="float64", na_value=np.nan)
+
 def atr(df: pd.DataFrame, length: int = 14) -> pd.Series:
-    hl = df["high"] - df["low"]
-    hc = (df["high"] - df["close"].shift()).abs()
-    lc = (df["low"] - df["close"].shift()).abs()
-    tr = pd.concat([hl, hc, lc], axis=1).max(axis=1)
-    return tr.rolling(length, min_periods=length).mean()
+    tr = kernels.true_range(_values(df["high"]), _values(df["low"]), _values(df["close"]))
+    return pd.Series(tr, index=df.index, copy=False).rolling(length, min_periods=length).mean()
 
 def obv(df: pd.DataFrame) -> pd.Series:
-    delta = np.sign(df["close"].diff().fillna(0.0))
-    return (delta * df["volume"]).cumsum()
+    return pd.Series(kernels.obv(_values(df["close"]), _values(df["volume"])), index=df.index, copy=False)
 
 def vwap(df: pd.DataFrame) -> pd.Series:
     """
     Volume Weighted Average Price - Scalping'in kralı
     Her günün başında sıfırlanır, tipik fiyat * hacim / toplam hacim
     """
-    typical_price = (df['high'] + df['low'] + df['close']) / 3
-    return (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
+    values = kernels.vwap(_values(df['high']), _values(df['low']), _values(df['close']), _values(df['volume']))
+    return pd.Series(values, index=df.index, copy=False)
 
 def bollinger_bands(series: pd.Series, length: int = 20, std_dev: float = 2.0):
     """
@@ -165,215 +168,201 @@ def bollinger_bands(series: pd.Series, length: int = 20, std_dev: float = 2.0):
     middle = series.rolling(window=length, min_periods=length).mean()
     std = series.rolling(window=length, min_periods=length).std()
     
-    upper = middle + (std * std_dev)
-    lower = middle - (std * std_dev)
+    # %B'de sıfıra bölme ve sonsuz bant genişliği NaN olur (kernels.bollinger)
+    upper, lower, percent_b, bandwidth = (np.empty(len(series)) for _ in range(4))
+    kernels.bollinger(_values(series), _values(middle), _values(std), std_dev,
+                      upper, lower, percent_b, bandwidth)
     
-    # %B hesaplamasında division by zero koruması
-    denominator = (upper - lower)
-    denominator = denominator.replace(0, np.nan)
-    
-    percent_b = (series - lower) / denominator
-    
-    # Bandwidth hesaplaması
-    bandwidth = (upper - lower) / middle
-    bandwidth = bandwidth.replace([np.inf, -np.inf], np.nan)
-    
-    return middle, upper, lower, percent_b, bandwidth
+    wrap = lambda a: pd.Series(a, index=series.index, copy=False)
+    return middle, wrap(upper), wrap(lower), wrap(percent_b), wrap(bandwidth)
 
 def stochastic_rsi(rsi_series: pd.Series, length: int = 14) -> pd.Series:
     """
     Stochastic RSI - DÜZELTİLMİŞ VERSİYON
+    Pencere NaN olmayan RSI değerleri üzerinde kayar; sıfır aralıkta NaN döner.
     """
-    # NaN değerleri temizle
-    rsi_clean = rsi_series.dropna()
-    
-    if len(rsi_clean) < length:
-        return pd.Series([np.nan] * len(rsi_series), index=rsi_series.index)
-    
-    rsi_min = rsi_clean.rolling(window=length, min_periods=length).min()
-    rsi_max = rsi_clean.rolling(window=length, min_periods=length).max()
-    
-    # Sıfıra bölme hatasını önle
-    denominator = (rsi_max - rsi_min)
-    denominator = denominator.replace(0, np.nan)  # Sıfır yerine NaN
-    
-    stoch_rsi = ((rsi_clean - rsi_min) / denominator) * 100
-    
-    # NaN değerleri orijinal seriyle aynı index'te döndür
-    return stoch_rsi.reindex(rsi_series.index)
-
-def candle_pattern_row(o, h, l, c):
-    body = abs(c - o)
-    rng = max(h - l, 1e-9)
-    upper = h - max(c, o)
-    lower = min(c, o) - l
-    if body / rng < 0.1:
-        return "doji"
-    if lower > 2 * body and upper < body:
-        return "hammer"
-    if upper > 2 * body and lower < body:
-        return "shooting_star"
-    return "normal"
+    values = kernels.stochastic_rsi(_values(rsi_series), length)
+    return pd.Series(values, index=rsi_series.index, copy=False)
 
 
 # =========================
 #  ADVANCED MARKET ANALYSIS
 # =========================
-def get_order_book_depth(exchange, symbol: str, depth: int = 20):
+def fetch_order_book_snapshot(exchange, symbol: str, limit: int = None):
     """
-    Binance order book derinliğini çeker - Scalping için kritik
+    Derin order book'u tek istekle çeker (ORDER_BOOK_LIMIT seviye).
+    Hem market_info'nun bid/ask'ı hem de derinlik analizi bu snapshot'tan üretilir.
+    
+    Returns:
+        OrderBookSnapshot veya hata durumunda None
     """
     try:
-        orderbook = exchange.fetch_order_book(symbol, limit=depth)
-        
-        bids = orderbook['bids']  # [[price, volume], ...]
-        asks = orderbook['asks']  # [[price, volume], ...]
-        
-        # Toplam likidite
-        total_bid_volume = sum([bid[1] for bid in bids])
-        total_ask_volume = sum([ask[1] for ask in asks])
-        
-        # Likidite dengesi
-        liquidity_imbalance = ((total_bid_volume - total_ask_volume) / 
-                             (total_bid_volume + total_ask_volume)) * 100
-        
-        # Büyük emir duvarları (manipülasyon sinyali)
-        avg_volume = (total_bid_volume + total_ask_volume) / (2 * depth)
-        large_bid_walls = len([bid for bid in bids if bid[1] > avg_volume * 3])
-        large_ask_walls = len([ask for ask in asks if ask[1] > avg_volume * 3])
-        
-        # Spread analizi
-        best_bid = bids[0][0] if bids else None
-        best_ask = asks[0][0] if asks else None
-        spread = best_ask - best_bid if best_bid and best_ask else None
-        spread_pct = (spread / best_bid * 100) if spread else None
-        
-        return {
-            "liquidity_imbalance_pct": round(liquidity_imbalance, 2),
-            "large_bid_walls": large_bid_walls,
-            "large_ask_walls": large_ask_walls,
-            "total_bid_volume": round(total_bid_volume, 2),
-            "total_ask_volume": round(total_ask_volume, 2),
-            "spread": round(spread, 4) if spread else None,
-            "spread_percentage": round(spread_pct, 4) if spread_pct else None,
-            "market_depth": round(total_bid_volume + total_ask_volume, 2)
-        }
+        with perf.span("order_book"):
+            orderbook = exchange.fetch_order_book(symbol, limit=limit or order_book_limit())
+        return OrderBookSnapshot.from_ccxt(orderbook)
     except Exception as e:
         print(f"⚠️ Order book alınamadı: {e}")
         return None
 
 
-def market_regime_analysis(df: pd.DataFrame):
+def get_order_book_depth(exchange, symbol: str, depth: int = 20, book: OrderBookSnapshot = None):
     """
-    Mevcut OHLCV verisiyle piyasa rejimini analiz eder
+    Binance order book derinliğini çeker - Scalping için kritik
+    book verilirse yeni istek yapılmaz.
     """
-    if len(df) < 50:
+    if book is None:
+        book = fetch_order_book_snapshot(exchange, symbol)
+    return order_book_depth_from(book, depth) if book is not None else None
+
+
+def order_book_depth_from(orderbook, depth: int = 20):
+    """
+    Önceden çekilmiş order book'tan (ccxt dict ya da OrderBookSnapshot) derinlik
+    metriklerini hesaplar (ağ isteği yapmaz): ilk `depth` seviyenin özeti ve
+    mid'den %0.1 / %0.5 / %1 bantlarında kümülatif derinlik ve duvarlar
+    """
+    try:
+        book = orderbook if isinstance(orderbook, OrderBookSnapshot) else OrderBookSnapshot.from_ccxt(orderbook)
+        return depth_metrics(book, depth)
+    except Exception as e:
+        print(f"⚠️ Order book alınamadı: {e}")
         return None
-    
+
+
+@lru_cache(maxsize=None)
+def _label_dtype(labels: tuple) -> pd.CategoricalDtype:
+    return pd.CategoricalDtype(list(labels))
+
+
+def _labels(conditions: list, choices: list, default: str) -> pd.Categorical:
+    """np.select'in kategorik karşılığı: ilk sağlanan koşulun etiketi, hiçbiri yoksa default.
+
+    Metin dizisi yerine kod dizisi üretir; DataFrame'e koymak ucuzdur ve == karşılaştırması aynı çalışır.
+    """
+    codes = np.select(conditions, list(range(len(choices))), len(choices)).astype(np.int8)
+    return pd.Categorical.from_codes(codes, dtype=_label_dtype((*choices, default)), validate=False)
+
+
+def _last_row(columns: dict) -> dict:
+    """Kolon dizilerinin son elemanları (tek bar sonucu DataFrame kurmadan okunur)."""
+    return {name: values[-1] for name, values in columns.items()}
+
+
+def market_regime_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    market_regime_analysis'in bar başına karşılığı: her barda volatilite, trend ve range
+    rejimi ile oranlar (o bara kadarki veriyle; ATR ortalaması genişleyen ortalamadır).
+    """
+    return pd.DataFrame(_market_regime_columns(df), index=df.index)
+
+
+def _market_regime_columns(df: pd.DataFrame) -> dict:
     close = df['close']
-    high = df['high']
-    low = df['low']
-    
-    # Volatilite rejimi (ATR bazlı)
     atr_14 = atr(df, 14)
-    current_atr = atr_14.iloc[-1]
-    atr_avg = atr_14.mean()
-    
-    if current_atr > atr_avg * 1.5:
-        vol_regime = "high_volatility"
-    elif current_atr < atr_avg * 0.7:
-        vol_regime = "low_volatility" 
-    else:
-        vol_regime = "normal_volatility"
-    
-    # Trend rejimi
+    atr_avg = atr_14.expanding().mean()
     sma_20 = sma(close, 20)
     sma_50 = sma(close, 50)
+    daily_ranges = (df['high'] - df['low']) / close * 100
+    avg_range = daily_ranges.rolling(20, min_periods=1).mean()
+
+    volatility_ratio = _values(atr_14 / atr_avg)
+    price_vs_sma20 = _values((close - sma_20) / sma_20 * 100)
+    sma20_vs_sma50 = _values((sma_20 - sma_50) / sma_50 * 100)
+    current_range, avg_range = _values(daily_ranges), _values(avg_range)
+
+    return {
+        'volatility_regime': _labels(
+            [_values(atr_14) > _values(atr_avg) * 1.5, _values(atr_14) < _values(atr_avg) * 0.7],
+            ['high_volatility', 'low_volatility'], 'normal_volatility'),
+        'trend_regime': _labels(
+            [(price_vs_sma20 > 2) & (sma20_vs_sma50 > 1), (price_vs_sma20 < -2) & (sma20_vs_sma50 < -1),
+             np.abs(price_vs_sma20) < 1],
+            ['strong_uptrend', 'strong_downtrend', 'ranging'], 'weak_trend'),
+        'range_regime': _labels(
+            [current_range > avg_range * 1.3, current_range < avg_range * 0.7],
+            ['expanding', 'contracting'], 'normal'),
+        'volatility_ratio': volatility_ratio,
+        'price_vs_sma20_pct': price_vs_sma20,
+        'sma20_vs_sma50_pct': sma20_vs_sma50,
+    }
+
+
+def market_regime_analysis(df: pd.DataFrame):
+    """
+    Mevcut OHLCV verisiyle piyasa rejimini analiz eder (market_regime_frame'in son barı)
+    """
+    if len(df) < 50:
+        return None
     
-    price_vs_sma20 = (close.iloc[-1] - sma_20.iloc[-1]) / sma_20.iloc[-1] * 100
-    sma20_vs_sma50 = (sma_20.iloc[-1] - sma_50.iloc[-1]) / sma_50.iloc[-1] * 100
-    
-    if price_vs_sma20 > 2 and sma20_vs_sma50 > 1:
-        trend_regime = "strong_uptrend"
-    elif price_vs_sma20 < -2 and sma20_vs_sma50 < -1:
-        trend_regime = "strong_downtrend"
-    elif abs(price_vs_sma20) < 1:
-        trend_regime = "ranging"
-    else:
-        trend_regime = "weak_trend"
-    
-    # Range analizi (ADR - Average Daily Range)
-    daily_ranges = (high - low) / close * 100
-    current_range = daily_ranges.iloc[-1]
-    avg_range = daily_ranges.tail(20).mean()
-    
-    if current_range > avg_range * 1.3:
-        range_regime = "expanding"
-    elif current_range < avg_range * 0.7:
-        range_regime = "contracting"
-    else:
-        range_regime = "normal"
-    
+    current = _last_row(_market_regime_columns(df))
     return {
-        "volatility_regime": vol_regime,
-        "trend_regime": trend_regime,
-        "range_regime": range_regime,
-        "current_vs_avg_volatility_ratio": round(current_atr / atr_avg, 2),
-        "price_vs_sma20_pct": round(price_vs_sma20, 2),
-        "sma20_vs_sma50_pct": round(sma20_vs_sma50, 2)
+        "volatility_regime": str(current['volatility_regime']),
+        "trend_regime": str(current['trend_regime']),
+        "range_regime": str(current['range_regime']),
+        "current_vs_avg_volatility_ratio": round(current['volatility_ratio'], 2),
+        "price_vs_sma20_pct": round(current['price_vs_sma20_pct'], 2),
+        "sma20_vs_sma50_pct": round(current['sma20_vs_sma50_pct'], 2)
+    }
+
+
+def volume_anomaly_frame(df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+    """
+    detect_volume_anomalies'in bar başına karşılığı: hacim z-skoru, anomali seviyesi,
+    ortalamaya oran ve hacim momentumu (standart sapma 0 ya da tanımsızsa z-skoru 0).
+    """
+    return pd.DataFrame(_volume_anomaly_columns(df, window), index=df.index)
+
+
+def _volume_anomaly_columns(df: pd.DataFrame, window: int) -> dict:
+    volumes = df['volume']
+    volume_ma = _values(volumes.rolling(window=window).mean())
+    volume_std = _values(volumes.rolling(window=window).std())
+    volume = _values(volumes)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        zscore = np.where(volume_std > 0, (volume - volume_ma) / volume_std, 0.0)
+        ratio = volume / volume_ma
+    increasing = _values(volumes.rolling(5).mean()) > _values(volumes.rolling(20).mean())
+
+    return {
+        'volume_zscore': zscore,
+        'anomaly_level': _labels([zscore > 3, zscore > 2, zscore > 1], ['extreme', 'high', 'moderate'], 'normal'),
+        'volume_ratio': ratio,
+        'volume_momentum': _labels([increasing], ['increasing'], 'decreasing'),
+        'is_volume_spike': zscore > 2,
     }
 
 
 def detect_volume_anomalies(df: pd.DataFrame, window: int = 20):
     """
-    Anormal hacim artışlarını tespit eder - sadece özet
+    Anormal hacim artışlarını tespit eder - sadece özet (volume_anomaly_frame'in son barı)
     """
     if len(df) < window:
         return None
     
-    volumes = df['volume']
-    
-    # Rolling statistics
-    volume_ma = volumes.rolling(window=window).mean()
-    volume_std = volumes.rolling(window=window).std()
-    
-    current_volume = volumes.iloc[-1]
-    current_ma = volume_ma.iloc[-1]
-    current_std = volume_std.iloc[-1]
-    
-    # Z-score hesaplama
-    volume_zscore = (current_volume - current_ma) / current_std if current_std > 0 else 0
-    
-    # Anomali tespiti
-    if volume_zscore > 3:
-        anomaly_level = "extreme"
-    elif volume_zscore > 2:
-        anomaly_level = "high" 
-    elif volume_zscore > 1:
-        anomaly_level = "moderate"
-    else:
-        anomaly_level = "normal"
-    
-    # Volume momentum
-    volume_ma_5 = volumes.rolling(5).mean()
-    volume_ma_20 = volumes.rolling(20).mean()
-    volume_momentum = "increasing" if volume_ma_5.iloc[-1] > volume_ma_20.iloc[-1] else "decreasing"
-    
+    current = _last_row(_volume_anomaly_columns(df, window))
     return {
-        "volume_zscore": round(volume_zscore, 2),
-        "anomaly_level": anomaly_level,
-        "current_vs_avg_volume_ratio": round(current_volume / current_ma, 2),
-        "volume_momentum": volume_momentum,
-        "is_volume_spike": _bool(volume_zscore > 2)
+        "volume_zscore": round(current['volume_zscore'], 2),
+        "anomaly_level": str(current['anomaly_level']),
+        "current_vs_avg_volume_ratio": round(current['volume_ratio'], 2),
+        "volume_momentum": str(current['volume_momentum']),
+        "is_volume_spike": _bool(current['is_volume_spike'])
     }
 
 
-def get_advanced_market_analysis(exchange, symbol: str, df: pd.DataFrame):
+def get_advanced_market_analysis(exchange, symbol: str, df: pd.DataFrame, book: OrderBookSnapshot = None):
     """
-    Tüm advanced analizleri birleştirir
+    Tüm advanced analizleri birleştirir (book verilirse order book tekrar çekilmez)
+    """
+    return build_advanced_market_analysis(get_order_book_depth(exchange, symbol, book=book), df)
+
+
+def build_advanced_market_analysis(order_book_analysis, df: pd.DataFrame):
+    """
+    Order book analizi hazır verildiğinde advanced analizleri birleştirir
     """
     return {
-        "order_book_analysis": get_order_book_depth(exchange, symbol),
+        "order_book_analysis": order_book_analysis,
         "market_regime": market_regime_analysis(df),
         "volume_anomalies": detect_volume_anomalies(df),
         "timestamp": datetime.now(timezone.utc).isoformat()
@@ -412,47 +401,68 @@ def validate_indicators(df_tail: pd.DataFrame) -> bool:
     return True
 
 
+def micro_level_frame(df: pd.DataFrame, window: int = 10) -> pd.DataFrame:
+    """
+    micro_levels'in bar başına karşılığı: her barda son `window` mumun destek/direnç,
+    range, breakout seviyeleri, range içi konum ve konsolidasyon durumu.
+    """
+    return pd.DataFrame(_micro_level_columns(df, window), index=df.index)
+
+
+def _trailing(values: np.ndarray, window: int) -> np.ndarray:
+    """Her bar için son `window` değerin penceresi (ilk barlarda eksik kısım NaN)."""
+    return sliding_window_view(np.concatenate([np.full(window - 1, np.nan), values]), window)
+
+
+def _micro_level_columns(df: pd.DataFrame, window: int) -> dict:
+    high, low = _values(df['high']), _values(df['low'])
+    resistance = np.nanmax(_trailing(high, window), axis=1)
+    support = np.nanmin(_trailing(low, window), axis=1)
+    avg_range = np.nanmean(_trailing(high - low, window), axis=1)
+    price = _values(df['close'])
+    current_range = resistance - support
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        position = np.where(current_range > 0, (price - support) / current_range * 100, 50.0)
+
+    return {
+        'immediate_resistance': resistance,
+        'immediate_support': support,
+        'current_range': current_range,
+        'range_position_pct': position,
+        'is_consolidating': current_range < avg_range * 0.8,
+        'breakout_up': resistance + current_range * 0.1,
+        'breakout_down': support - current_range * 0.1,
+        'recent_high_breaks': price > resistance,
+        'recent_low_breaks': price < support,
+    }
+
+
 def micro_levels(df: pd.DataFrame, window: int = 10):
     """
     15m scalping için mikro seviyeler
-    Immediate support/resistance ve consolidation breakout seviyeleri
+    Immediate support/resistance ve consolidation breakout seviyeleri (micro_level_frame'in son barı)
     """
-    recent = df.tail(window)
-    
-    immediate_resistance = float(recent['high'].max())
-    immediate_support = float(recent['low'].min())
-    current_range = immediate_resistance - immediate_support
-    current_price = float(recent['close'].iloc[-1])
-    
-    # Range breakout seviyeleri (mevcut range'in %10'u kadar dışarı)
-    breakout_up = immediate_resistance + (current_range * 0.1)
-    breakout_down = immediate_support - (current_range * 0.1)
-    
-    # Konsolidasyon tespiti (range dar mı?)
-    avg_range = float((recent['high'] - recent['low']).mean())
-    is_consolidating = current_range < avg_range * 0.8
-    
-    # Price position in range
-    range_position_pct = ((current_price - immediate_support) / current_range * 100) if current_range > 0 else 50
+    current = _last_row(_micro_level_columns(df.tail(window), window))
     
     return {
-        'immediate_resistance': immediate_resistance,
-        'immediate_support': immediate_support,
-        'current_range': current_range,
-        'range_position_pct': round(range_position_pct, 2),
-        'is_consolidating': _bool(is_consolidating),
+        'immediate_resistance': float(current['immediate_resistance']),
+        'immediate_support': float(current['immediate_support']),
+        'current_range': float(current['current_range']),
+        'range_position_pct': round(float(current['range_position_pct']), 2),
+        'is_consolidating': _bool(current['is_consolidating']),
         'range_breakout_levels': {
-            'upside': round(breakout_up, 2),
-            'downside': round(breakout_down, 2)
+            'upside': round(float(current['breakout_up']), 2),
+            'downside': round(float(current['breakout_down']), 2)
         },
-        'recent_high_breaks': _bool(current_price > immediate_resistance),
-        'recent_low_breaks': _bool(current_price < immediate_support)
+        'recent_high_breaks': _bool(current['recent_high_breaks']),
+        'recent_low_breaks': _bool(current['recent_low_breaks'])
     }
 
 
 def scalping_signals(df_tail: pd.DataFrame):
     """
-    Scalping sinyalleri - DAHA GERÇEKÇİ THRESHOLD'lar
+    Scalping sinyalleri - DAHA GERÇEKÇİ THRESHOLD'lar (scalping_signal_frame'in son barı)
     """
     if len(df_tail) < 20:
         return {"signals": {}, "entry_opportunities": [], "confidence": "low", "risk_level": "unknown"}
@@ -461,186 +471,217 @@ def scalping_signals(df_tail: pd.DataFrame):
     if not validate_indicators(df_tail):
         return {"signals": {}, "entry_opportunities": [], "confidence": "low", "risk_level": "unknown"}
 
-    current = df_tail.iloc[-1]
+    current = _last_row(_scalping_signal_columns(indicator_frame(df_tail, SCALPING_COLUMNS)))
+
+    signals = {
+        'vwap_position': str(current['vwap_position']),
+        'vwap_distance_pct': round(current['vwap_distance_pct'], 3),
+        'bollinger_squeeze': 'yes' if current['bollinger_squeeze'] else 'no',
+        'bb_percent_b': round(current['bb_percent_b'], 3),
+        'stoch_rsi_signal': str(current['stoch_rsi_signal']),
+        'stoch_rsi_value': round(current['stoch_rsi_value'], 2),
+        'volume_spike': 'yes' if current['volume_spike'] else 'no',
+        'ema_alignment': str(current['ema_alignment'])
+    }
 
-    # VWAP pozisyonu (daha geniş bant)
-    vwap_distance_pct = ((current['close'] - current['vwap']) / current['vwap']) * 100
-    vwap_position = 'above' if vwap_distance_pct > 0.1 else 'below' if vwap_distance_pct < -0.1 else 'neutral'
+    return {
+        'signals': signals,
+        'entry_opportunities': [name for name in SCALPING_ENTRY_SIGNALS if current[name]],
+        'confidence': str(current['confidence']),
+        'confidence_score': int(current['confidence_score']),
+        'risk_level': str(current['risk_level'])
+    }
 
-    # Bollinger Bands squeeze (daha gevşek threshold)
-    bb_squeeze = (current['bb_upper'] - current['bb_lower']) / current['bb_middle'] < 0.15  # 0.1 → 0.15
-    
-    # Stochastic RSI (NaN kontrolü ile)
-    stoch_rsi_value = current['stoch_rsi']
-    if pd.isna(stoch_rsi_value):
-        stoch_rsi_signal = 'unknown'
-    elif stoch_rsi_value < 25:  # 20 → 25 (daha hassas)
-        stoch_rsi_signal = 'oversold'
-    elif stoch_rsi_value > 75:  # 80 → 75 (daha hassas)
-        stoch_rsi_signal = 'overbought'
-    else:
-        stoch_rsi_signal = 'neutral'
 
-    # Volume spike (daha düşük threshold)
-    recent_avg_volume = df_tail['volume'].tail(20).mean()
-    volume_spike = current['volume'] > recent_avg_volume * 1.3  # 1.5 → 1.3
+# scalping_signals giriş sinyalleri ve confidence puanları (sıra entry_opportunities ile aynı)
+SCALPING_ENTRY_SIGNALS = {
+    'VWAP_BOUNCE_LONG': 1, 'VWAP_BOUNCE_SHORT': 1,
+    'VOLUME_BREAKOUT_LONG': 2, 'VOLUME_BREAKOUT_SHORT': 2,
+    'SQUEEZE_BREAKOUT_LONG': 1, 'SQUEEZE_BREAKOUT_SHORT': 1,
+}
 
-    # EMA alignment
-    ema_20 = current.get('ema20', current['close'])
-    ema_50 = current['ema50']
-    ema_bullish = ema_20 > ema_50
 
-    signals = {
+def scalping_signal_frame(df) -> pd.DataFrame:
+    """
+    scalping_signals'ın bar başına vektörel karşılığı. Her barın değeri, scalping_signals'a
+    o bar son satır olacak şekilde kesilmiş frame verildiğindeki sonuçla aynıdır.
+
+    Returns:
+        Bar başına sinyal kolonları (vwap_position, vwap_distance_pct, bollinger_squeeze,
+        bb_percent_b, stoch_rsi_signal, stoch_rsi_value, volume_spike, ema_alignment),
+        SCALPING_ENTRY_SIGNALS boolean kolonları, confidence_score, confidence, risk_level
+        ve 'valid' (validate_indicators ve en az 20 mum şartı; geçersiz barlarda giriş yok,
+        risk_level 'unknown')
+    """
+    df = indicator_frame(df, SCALPING_COLUMNS)
+    return pd.DataFrame(_scalping_signal_columns(df), index=df.index)
+
+
+def _scalping_signal_columns(df: pd.DataFrame) -> dict:
+    """scalping_signal_frame kolonları (df SCALPING_COLUMNS'u içermeli)."""
+    close, volume, vwap_, stoch, rsi_, percent_b, ema_20, ema_50, upper, lower, middle = (
+        _values(df[col]) for col in ('close', 'volume', 'vwap', 'stoch_rsi', 'rsi14', 'bb_percent_b', 'ema20',
+                                     'ema50', 'bb_upper', 'bb_lower', 'bb_middle'))
+
+    # VWAP pozisyonu (daha geniş bant), Bollinger squeeze (daha gevşek threshold)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap_distance_pct = (close - vwap_) / vwap_ * 100
+        bb_squeeze = (upper - lower) / middle < 0.15
+    vwap_position = _labels([vwap_distance_pct > 0.1, vwap_distance_pct < -0.1], ['above', 'below'], 'neutral')
+
+    # Stochastic RSI (NaN → unknown), volume spike (son 20 mum ortalamasının 1.3 katı)
+    oversold, overbought = stoch < 25, stoch > 75
+    stoch_signal = _labels([np.isnan(stoch), oversold, overbought], ['unknown', 'oversold', 'overbought'],
+                            'neutral')
+    volume_spike = volume > _trailing(volume, 20).mean(axis=1) * 1.3
+
+    valid = (stoch >= 0) & (stoch <= 100) & (rsi_ >= 0) & (rsi_ <= 100) & (np.arange(len(df)) >= 19)
+    valid &= ~(np.isnan(vwap_) | np.isnan(upper) | np.isnan(lower) | np.isnan(middle))
+
+    out = {
         'vwap_position': vwap_position,
-        'vwap_distance_pct': round(vwap_distance_pct, 3),
-        'bollinger_squeeze': 'yes' if bb_squeeze else 'no',
-        'bb_percent_b': round(current['bb_percent_b'], 3),
-        'stoch_rsi_signal': stoch_rsi_signal,
-        'stoch_rsi_value': round(stoch_rsi_value, 2),
-        'volume_spike': 'yes' if volume_spike else 'no',
-        'ema_alignment': 'bullish' if ema_bullish else 'bearish'
+        'vwap_distance_pct': vwap_distance_pct,
+        'bollinger_squeeze': bb_squeeze,
+        'bb_percent_b': percent_b,
+        'stoch_rsi_signal': stoch_signal,
+        'stoch_rsi_value': stoch,
+        'volume_spike': volume_spike,
+        'ema_alignment': _labels([ema_20 > ema_50], ['bullish'], 'bearish'),
     }
 
     # ENTRY SİNYALLERİ - DAHA GEVŞEK KRİTERLER
-    entry_signals = []
-    confidence_score = 0
-
-    # 1. VWAP Bounce (daha geniş bant)
-    if vwap_position == 'above' and stoch_rsi_signal == 'oversold':
-        entry_signals.append('VWAP_BOUNCE_LONG')
-        confidence_score += 1  # 2 → 1
-
-    if vwap_position == 'below' and stoch_rsi_signal == 'overbought':
-        entry_signals.append('VWAP_BOUNCE_SHORT') 
-        confidence_score += 1
-
-    # 2. Volume Breakout (daha düşük volume threshold)
-    if volume_spike:
-        if current['close'] > ema_20:
-            entry_signals.append('VOLUME_BREAKOUT_LONG')
-            confidence_score += 2  # 3 → 2
-        elif current['close'] < ema_20:
-            entry_signals.append('VOLUME_BREAKOUT_SHORT')
-            confidence_score += 2
-
-    # 3. Bollinger Squeeze (daha gevşek)
-    if bb_squeeze:
-        if current['bb_percent_b'] > 0.7:  # 0.8 → 0.7
-            entry_signals.append('SQUEEZE_BREAKOUT_LONG')
-            confidence_score += 1  # 2 → 1
-        elif current['bb_percent_b'] < 0.3:  # 0.2 → 0.3
-            entry_signals.append('SQUEEZE_BREAKOUT_SHORT')
-            confidence_score += 1
-
-    # Confidence level (daha düşük threshold)
-    if confidence_score >= 2:  # 5 → 2
-        confidence = 'high'
-    elif confidence_score >= 1:  # 3 → 1
-        confidence = 'medium'
-    else:
-        confidence = 'low'
+    entries = {
+        'VWAP_BOUNCE_LONG': (vwap_position == 'above') & oversold,
+        'VWAP_BOUNCE_SHORT': (vwap_position == 'below') & overbought,
+        'VOLUME_BREAKOUT_LONG': volume_spike & (close > ema_20),
+        'VOLUME_BREAKOUT_SHORT': volume_spike & (close < ema_20),
+        'SQUEEZE_BREAKOUT_LONG': bb_squeeze & (percent_b > 0.7),
+        'SQUEEZE_BREAKOUT_SHORT': bb_squeeze & (percent_b < 0.3),
+    }
+    score = np.zeros(len(df), dtype='int64')
+    for name, mask in entries.items():
+        out[name] = mask & valid
+        score += out[name] * SCALPING_ENTRY_SIGNALS[name]
+    out['confidence_score'] = score
+    out['confidence'] = _labels([score >= 2, score >= 1], ['high', 'medium'], 'low')
 
     # Risk level (daha akıllı)
-    if bb_squeeze and stoch_rsi_signal == 'neutral':
-        risk_level = 'low'
-    elif volume_spike and stoch_rsi_signal in ['overbought', 'oversold']:
-        risk_level = 'medium'
-    else:
-        risk_level = 'high'
+    out['risk_level'] = _labels(
+        [~valid, bb_squeeze & (stoch_signal == 'neutral'), volume_spike & (oversold | overbought)],
+        ['unknown', 'low', 'medium'], 'high')
+    out['valid'] = valid
+    return out
 
-    return {
-        'signals': signals,
-        'entry_opportunities': entry_signals,
-        'confidence': confidence,
-        'confidence_score': confidence_score,
-        'risk_level': risk_level
-    }
 
 # =========================
 #     MARKET DATA UTILS
 # =========================
-def get_market_info(exchange, symbol: str) -> dict:
+def get_market_info(exchange, symbol: str, book: OrderBookSnapshot = None,
+                    snapshot: MarketSnapshot = None) -> dict:
     """
     Piyasa bilgilerini çeker: spread, likidite, komisyon vb.
     
     Args:
         exchange: ccxt exchange instance
         symbol: Trading pair sembolü
+        book: Önceden çekilmiş order book snapshot'ı (ticker'da bid/ask yoksa kullanılır)
+        snapshot: Çalıştırma başına toplu çekilmiş ticker/funding (varsa sembol için istek yapılmaz)
     
     Returns:
         Market bilgileri dict
     """
     try:
-        ticker = exchange.fetch_ticker(symbol)
+        cached = snapshot is not None and snapshot.has(symbol)
+        ticker = snapshot.ticker(symbol) if cached else exchange.fetch_ticker(symbol)
         market = exchange.market(symbol)
         
         # Bid/Ask için orderbook'tan al
         bid = ticker.get('bid')
         ask = ticker.get('ask')
         
-        # Eğer ticker'da yoksa orderbook'tan çek
+        # Eğer ticker'da yoksa order book snapshot'ından al (yoksa sığ bir tane çek)
         if not bid or not ask:
-            try:
-                orderbook = exchange.fetch_order_book(symbol, limit=5)
-                bid = orderbook['bids'][0][0] if orderbook['bids'] else None
-                ask = orderbook['asks'][0][0] if orderbook['asks'] else None
-            except:
-                pass
-        
-        # Spread hesaplama
-        spread = None
-        spread_pct = None
-        if bid and ask:
-            spread = ask - bid
-            spread_pct = (spread / bid) * 100 if bid > 0 else None
+            if book is None:
+                book = fetch_order_book_snapshot(exchange, symbol, limit=5)
+            if book is not None:
+                bid, ask = book.best_bid, book.best_ask
         
         # Funding rate (futures için)
-        funding_rate = None
-        next_funding_time = None
+        funding_info = None
         try:
             if market.get('type') in ['swap', 'future']:
-                if hasattr(exchange, 'fetch_funding_rate'):
+                if cached and snapshot.has_funding:
+                    funding_info = snapshot.funding(symbol)
+                elif hasattr(exchange, 'fetch_funding_rate'):
                     funding_info = exchange.fetch_funding_rate(symbol)
-                    funding_rate = funding_info.get('fundingRate')
-                    next_funding_time = funding_info.get('fundingTimestamp')
-                    if next_funding_time:
-                        next_funding_time = pd.Timestamp(next_funding_time, unit='ms', tz='UTC').isoformat()
         except:
             pass
         
-        return {
-            "exchange": exchange.id,
-            "symbol_type": market.get('type', 'unknown'),  # spot, swap, future
-            "current_price": ticker.get('last'),
-            "bid": bid,
-            "ask": ask,
-            "spread": round(spread, 2) if spread else None,
-            "spread_percentage": round(spread_pct, 4) if spread_pct else None,
-            "volume_24h": ticker.get('quoteVolume') or ticker.get('baseVolume') or 0,
-            "taker_fee": round(market.get('taker', 0.001) * 100, 3),  # %
-            "maker_fee": round(market.get('maker', 0.001) * 100, 3),  # %
-            "funding_rate": round(funding_rate * 100, 4) if funding_rate else None,  # %
-            "next_funding_time": next_funding_time
-        }
+        return build_market_info(exchange, market, ticker, bid, ask, funding_info)
     except Exception as e:
         print(f"⚠️ Market bilgisi alınamadı: {e}", flush=True)
-        return {
-            "exchange": exchange.id if exchange else "unknown",
-            "symbol_type": "unknown",
-            "current_price": None,
-            "bid": None,
-            "ask": None,
-            "spread": None,
-            "spread_percentage": None,
-            "volume_24h": None,
-            "taker_fee": None,
-            "maker_fee": None,
-            "funding_rate": None,
-            "next_funding_time": None
-        }
+        return _empty_market_info(exchange)
 
 
-def get_last_candle_info(df: pd.DataFrame, timeframe: str) -> dict:
+def build_market_info(exchange, market: dict, ticker: dict, bid, ask, funding_info) -> dict:
+    """
+    Çekilmiş ticker/market/funding verisinden market_info dict'ini oluşturur.
+    Senkron ve async çalıştırma modları aynı çıktıyı bu fonksiyonla üretir.
+    """
+    # Spread hesaplama
+    spread = None
+    spread_pct = None
+    if bid and ask:
+        spread = ask - bid
+        spread_pct = (spread / bid) * 100 if bid > 0 else None
+    
+    funding_rate = None
+    next_funding_time = None
+    mark_price = None
+    if funding_info:
+        funding_rate = funding_info.get('fundingRate')
+        mark_price = funding_info.get('markPrice')
+        next_funding_time = funding_info.get('fundingTimestamp')
+        if next_funding_time:
+            next_funding_time = pd.Timestamp(next_funding_time, unit='ms', tz='UTC').isoformat()
+    
+    return {
+        "exchange": exchange.id,
+        "symbol_type": market.get('type', 'unknown'),  # spot, swap, future
+        "current_price": ticker.get('last'),
+        "bid": bid,
+        "ask": ask,
+        "spread": round(spread, 2) if spread else None,
+        "spread_percentage": round(spread_pct, 4) if spread_pct else None,
+        "volume_24h": ticker.get('quoteVolume') or ticker.get('baseVolume') or 0,
+        "taker_fee": round(market.get('taker', 0.001) * 100, 3),  # %
+        "maker_fee": round(market.get('maker', 0.001) * 100, 3),  # %
+        "funding_rate": round(funding_rate * 100, 4) if funding_rate else None,  # %
+        "next_funding_time": next_funding_time,
+        "mark_price": mark_price
+    }
+
+
+def _empty_market_info(exchange) -> dict:
+    """Market bilgisi alınamadığında dönen boş şablon"""
+    return {
+        "exchange": exchange.id if exchange else "unknown",
+        "symbol_type": "unknown",
+        "current_price": None,
+        "bid": None,
+        "ask": None,
+        "spread": None,
+        "spread_percentage": None,
+        "volume_24h": None,
+        "taker_fee": None,
+        "maker_fee": None,
+        "funding_rate": None,
+        "next_funding_time": None,
+        "mark_price": None
+    }
+
+
+def get_last_candle_info(df: pd.DataFrame, timeframe: str, server_time: int = None, exchange=None) -> dict:
     """
     Daha doğru zaman senkronizasyonu
     Son mumun detaylı bilgilerini döndürür.
@@ -648,6 +689,9 @@ def get_last_candle_info(df: pd.DataFrame, timeframe: str) -> dict:
     Args:
         df: OHLCV DataFrame
         timeframe: Zaman dilimi (örn: "1h", "4h")
+        server_time: Exchange saati (ms). Verilmezse mumları sağlayan exchange'in
+                     önbellekteki saat farkından yerel olarak hesaplanır.
+        exchange: Mumları sağlayan exchange (verilmezse Binance)
     
     Returns:
         Son mum bilgileri
@@ -668,10 +712,12 @@ def get_last_candle_info(df: pd.DataFrame, timeframe: str) -> dict:
     minutes = tf_minutes.get(timeframe, 60)
     next_candle = last_timestamp + pd.Timedelta(minutes=minutes)
     
-    # Binance server time ile senkronize et
+    # Exchange saati: saat farkı çalıştırma başına bir kez ölçülür (exchanges.ClockSync)
     try:
-        exchange = ccxt.binance()
-        server_time = exchange.fetch_time()
+        if server_time is None:
+            if exchange is None:
+                exchange = get_exchange("binance", warm=False)
+            server_time = server_time_ms(exchange)
         server_dt = pd.Timestamp(server_time, unit='ms', tz='UTC')
     except:
         server_dt = pd.Timestamp.now(tz='UTC')
@@ -695,59 +741,37 @@ def get_last_candle_info(df: pd.DataFrame, timeframe: str) -> dict:
     }
 
 
-def fetch_ohlcv_with_exchange(symbol: str, timeframe: str, need: int):
+# OHLCV için tercih sırasıyla exchange'ler (aynı sembol formatı: "BTC/USDT:USDT")
+OHLCV_EXCHANGES = ["binance", "okx", "bybit"]
+
+
+def ohlcv_buffer(need: int) -> int:
+    """İndikatörler için çekilecek mum sayısı (SMA200/EMA200 için güvenli buffer)."""
+    return max(210, need + 200)
+
+
+def fetch_ohlcv_with_exchange(symbol: str, timeframe: str, need: int, limit: int = None, exchange_ids: list = None):
     """
     OHLCV verisini çeker ve kullanılan exchange'i döndürür.
+    Erişilemeyen exchange'ler circuit breaker ile atlanır (exchanges.fetch_with_failover).
     
     Args:
         symbol: Trading pair (örn: "BTC/USDT:USDT")
         timeframe: Zaman dilimi
         need: İstenen mum sayısı
+        limit: Verilirse buffer yerine tam olarak bu kadar mum çekilir
+        exchange_ids: Denenecek exchange'ler (None → OHLCV_EXCHANGES)
         
     Returns:
         (DataFrame, exchange_instance, used_symbol)
     """
-    buffer = max(210, need + 200)
-    
-    # Önce Binance Futures'ı dene
-    try:
-        print(f"🔄 Binance Futures ({symbol}) deneniyor...", flush=True)
-        ex = ccxt.binance({
-            "options": {"defaultType": "future"},
-            "enableRateLimit": True
-        })
-        rows = ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=buffer)
-        df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-        df.set_index("timestamp", inplace=True)
-        print(f"✅ Binance Futures başarılı!", flush=True)
-        return df, ex, symbol
-    except Exception as e:
-        print(f"⚠️ Binance Futures başarısız: {str(e)[:150]}", flush=True)
-    
-    # Fallback: Diğer exchange'leri dene
-    exchanges_to_try = [
-        ("okx", {"options": {"defaultType": "swap"}, "enableRateLimit": True}),
-        ("bybit", {"enableRateLimit": True}),
-    ]
-    
-    last_error = None
-    for exchange_id, config in exchanges_to_try:
-        try:
-            print(f"🔄 {exchange_id} ({symbol}) deneniyor...", flush=True)
-            ex = getattr(ccxt, exchange_id)(config)
-            rows = ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=buffer)
-            df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-            df.set_index("timestamp", inplace=True)
-            print(f"✅ {exchange_id} başarılı!", flush=True)
-            return df, ex, symbol
-        except Exception as e:
-            last_error = e
-            print(f"⚠️ {exchange_id} failed: {str(e)[:150]}", flush=True)
-            continue
-    
-    raise Exception(f"{symbol} için tüm exchange'ler başarısız oldu. Son hata: {last_error}")
+    buffer = limit or ohlcv_buffer(need)
+    with perf.span("fetch_ohlcv", timeframe=timeframe):
+        return fetch_with_failover(
+            [(exchange_id, symbol) for exchange_id in exchange_ids or OHLCV_EXCHANGES],
+            lambda ex, sym: fetch_ohlcv_cached(ex, sym, timeframe, buffer, store=get_default_store()),
+            label=symbol
+        )
 
 
 # =========================
@@ -778,8 +802,43 @@ def get_trading_pairs() -> list:
     return pairs
 
 
-# =========================
-#       DATA UTILS
+def get_universe_pairs(min_volume: float = None, top: int = None) -> list:
+    """
+    Evren modu: OHLCV exchange'lerinden ilk erişilebilen olanın aktif USDT perpetual'larını
+    24s quote hacmine göre seçer (universe.select_universe). Exchange'ler OHLCV failover'ı ile
+    aynı sırada (devresi açık olanlar atlanarak) denenir, böylece evren mumları sağlayacak
+    exchange'in listesidir; tek bir sembolün çekimi başarısız olursa mumları yine failover ile
+    başka exchange'ten gelebilir. Hiçbirine erişilemezse sabit listeye düşer.
+    
+    Args:
+        min_volume: Alt hacim sınırı (None → UNIVERSE_MIN_VOLUME)
+        top: En fazla sembol sayısı (None → UNIVERSE_SIZE, 0 → sınırsız)
+    
+    Returns:
+        Hacme göre sıralı coin listesi
+    """
+    from universe import select_universe
+    
+    for exchange_id, _ in get_breaker().order([(exchange_id, None) for exchange_id in OHLCV_EXCHANGES]):
+        try:
+            with perf.span("universe", exchange=exchange_id):
+                pairs = select_universe(get_exchange(exchange_id), min_volume=min_volume, top=top)
+        except Exception as e:
+            print(f"⚠️ {exchange_id} evren listesi alınamadı: {e}")
+            continue
+        if pairs:
+            print(f"\n🌐 Evren: {exchange_id} üzerinde {len(pairs)} USDT perpetual (24s hacme göre)")
+            print("=" * 70)
+            for i, pair in enumerate(pairs[:10], 1):
+                print(f"{i}. {pair}")
+            if len(pairs) > 10:
+                print(f"... ve {len(pairs) - 10} coin daha")
+            print("=" * 70)
+            return pairs
+    print("⚠️ Evren seçilemedi, sabit listeye dönülüyor")
+    return get_trading_pairs()
+
+
 # =========================
 #       DATA UTILS
 # =========================
@@ -798,116 +857,177 @@ def _int(x):
 
 def fetch_ohlcv(symbol: str, timeframe: str, need: int) -> pd.DataFrame:
     """İndikatörler için yeterli geçmişi almak adına ekstra buffer çeker."""
-    buffer = max(210, need + 200)  # SMA200/EMA200 için güvenli buffer
-    
-    # Önce Binance Futures'ı dene
-    try:
-        print(f"🔄 Binance Futures ({symbol}) deneniyor...", flush=True)
-        ex = ccxt.binance({
-            "options": {"defaultType": "future"},
-            "enableRateLimit": True
-        })
-        rows = ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=buffer)
-        df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-        df.set_index("timestamp", inplace=True)
-        print(f"✅ Binance Futures başarılı!", flush=True)
-        return df
-    except Exception as e:
-        print(f"⚠️ Binance Futures başarısız: {str(e)[:150]}", flush=True)
-    
-    # Fallback: Diğer exchange'leri dene
-    exchanges_to_try = [
-        ("okx", {"options": {"defaultType": "swap"}, "enableRateLimit": True}),
-        ("bybit", {"enableRateLimit": True}),
-    ]
-    
-    last_error = None
-    for exchange_id, config in exchanges_to_try:
-        try:
-            print(f"🔄 {exchange_id} ({symbol}) deneniyor...", flush=True)
-            ex = getattr(ccxt, exchange_id)(config)
-            rows = ex.fetch_ohlcv(symbol, timeframe=timeframe, limit=buffer)
-            df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-            df.set_index("timestamp", inplace=True)
-            print(f"✅ {exchange_id} başarılı!", flush=True)
-            return df
-        except Exception as e:
-            last_error = e
-            print(f"⚠️ {exchange_id} failed: {str(e)[:150]}", flush=True)
-            continue
-    
-    # Hiçbiri çalışmazsa hata fırlat
-    raise Exception(f"{symbol} için tüm exchange'ler başarısız oldu. Son hata: {last_error}")
+    df, _, _ = fetch_ohlcv_with_exchange(symbol, timeframe, need)
+    return df
 
-def enrich_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    d = df.copy()
-    
-    # Existing indicators
-    for L in (50, 100, 200):
-        d[f"sma{L}"] = sma(d["close"], L)
-        d[f"ema{L}"] = ema(d["close"], L)
-    
-    # Additional EMAs for scalping
-    d["ema20"] = ema(d["close"], 20)
-    
-    d["rsi14"] = rsi(d["close"], 14)
-    d["macd"], d["macd_signal"], d["macd_hist"] = macd(d["close"])
-    d["atr14"] = atr(d, 14)
-    d["obv"] = obv(d)
-    d["change_pct"] = (d["close"] - d["open"]) / d["open"] * 100.0
-    d["above_sma200"] = d["close"] > d["sma200"]
-    d["above_ema200"] = d["close"] > d["ema200"]
-    d["pattern"] = [candle_pattern_row(o, h, l, c) for o,h,l,c in zip(d["open"], d["high"], d["low"], d["close"])]
+# =========================
+#   INDICATOR REGISTRY
+# =========================
+# Her indikatör girdilerini, lookback'ini ve bağımlılıklarını bildirir; kayıt sırası
+# enrich_indicators'ın kolon sırasıdır. Kolonlar IndicatorSet üzerinden istendikçe hesaplanır.
+INDICATORS = IndicatorRegistry()
+
+def _fill(out: np.ndarray, series: pd.Series) -> None:
+    np.copyto(out, _values(series))
+
+for _L in (50, 100, 200):
+    INDICATORS.register(f"sma{_L}", deps=["close"], lookback=_L - 1)(
+        lambda ind, out, L=_L: _fill(out, sma(ind.series("close"), L)))
+    INDICATORS.register(f"ema{_L}", deps=["close"], lookback=_L - 1)(
+        lambda ind, out, L=_L: _fill(out, ema(ind.series("close"), L)))
+
+# Additional EMAs for scalping
+@INDICATORS.register("ema20", deps=["close"], lookback=19)
+def _ema20(ind, out):
+    _fill(out, ema(ind.series("close"), 20))
+
+@INDICATORS.register("rsi14", deps=["close"], lookback=1)
+def _rsi14(ind, out):
+    _fill(out, rsi(ind.series("close"), 14))
+
+@INDICATORS.register(["macd", "macd_signal", "macd_hist"], deps=["close"], lookback=33)
+def _macd(ind, line, signal, hist):
+    for out, series in zip((line, signal, hist), macd(ind.series("close"))):
+        _fill(out, series)
+
+@INDICATORS.register("atr14", deps=["high", "low", "close"], lookback=13)
+def _atr14(ind, out):
+    kernels.true_range(ind["high"], ind["low"], ind["close"], out=out)
+    _fill(out, pd.Series(out, copy=False).rolling(14, min_periods=14).mean())
+
+@INDICATORS.register("obv", deps=["close", "volume"])
+def _obv(ind, out):
+    kernels.obv(ind["close"], ind["volume"], out=out)
+
+@INDICATORS.register("change_pct", deps=["open", "close"])
+def _change_pct(ind, out):
+    kernels.change_pct(ind["open"], ind["close"], out=out)
+
+@INDICATORS.register("above_sma200", deps=["close", "sma200"], dtype="bool")
+def _above_sma200(ind):
+    return ind["close"] > ind["sma200"]
+
+@INDICATORS.register("above_ema200", deps=["close", "ema200"], dtype="bool")
+def _above_ema200(ind):
+    return ind["close"] > ind["ema200"]
+
+@INDICATORS.register("pattern", deps=["open", "high", "low", "close"], dtype="category")
+def _pattern(ind):
+    return classify_candles(ind.source)
+
+# VWAP - Volume Weighted Average Price
+@INDICATORS.register("vwap", deps=["high", "low", "close", "volume"])
+def _vwap(ind, out):
+    kernels.vwap(ind["high"], ind["low"], ind["close"], ind["volume"], out=out)
+
+# Bollinger Bands
+@INDICATORS.register(["bb_middle", "bb_upper", "bb_lower", "bb_percent_b", "bb_bandwidth"],
+                     deps=["close"], lookback=19)
+def _bollinger(ind, middle, upper, lower, percent_b, bandwidth):
+    close = ind.series("close")
+    _fill(middle, close.rolling(window=20, min_periods=20).mean())
+    std = _values(close.rolling(window=20, min_periods=20).std())
+    kernels.bollinger(ind["close"], middle, std, 2.0, upper, lower, percent_b, bandwidth)
+
+# Stochastic RSI
+@INDICATORS.register("stoch_rsi", deps=["rsi14"], lookback=13)
+def _stoch_rsi(ind, out):
+    kernels.stochastic_rsi(ind["rsi14"], 14, out=out)
+
+
+# incremental.IndicatorEngine'den okunan kolonlar. OBV ve VWAP kümülatif olduğu için motorun
+# yaşına bağlıdır; her modda (cron, daemon, stream) çekilen pencere üzerinden hesaplanır
+ENGINE_COLUMNS = ["sma50", "ema50", "sma100", "ema100", "sma200", "ema200", "ema20",
+                  "rsi14", "macd", "macd_signal", "macd_hist", "atr14"]
+
+# Tüketicilerin okuduğu indikatör kolonları (OHLCV hariç)
+SUMMARY_COLUMNS = ["sma50", "sma200", "rsi14", "macd", "macd_signal", "macd_hist", "atr14", "pattern"]
+SCALPING_COLUMNS = ["ema20", "ema50", "rsi14", "vwap",
+                    "bb_middle", "bb_upper", "bb_lower", "bb_percent_b", "bb_bandwidth", "stoch_rsi"]
+
+
+def indicator_set(df: pd.DataFrame, engine=None) -> IndicatorSet:
+    """
+    df için tembel indikatör kümesi.
+    engine (incremental.IndicatorEngine) verilirse EMA/SMA/RSI/MACD/ATR
+    kolonları motorun durumundan gelir; sadece yeni mumlar hesaplanır.
+    """
+    external = (lambda: engine.frame_for(df)) if engine is not None else None
+    return IndicatorSet(df, INDICATORS, external=external, external_columns=ENGINE_COLUMNS)
+
+
+def indicator_frame(source, columns: list) -> pd.DataFrame:
+    """
+    Tüketicinin ihtiyaç duyduğu kolonları içeren DataFrame.
+    source bir IndicatorSet ise eksik kolonlar hesaplanıp saklanır; zaten
+    zenginleştirilmiş bir DataFrame ise olduğu gibi (eksik kolonlar eklenerek) döner.
+    """
+    if isinstance(source, IndicatorSet):
+        return source.frame(columns)
+    if all(col in source.columns for col in columns):
+        return source
+    return IndicatorSet(source, INDICATORS).frame(columns)
+
+
+def enrich_indicators(df: pd.DataFrame, engine=None) -> pd.DataFrame:
+    """
+    Tüm kayıtlı indikatör kolonlarını ekler (girdi kopyalanmaz; float kolonlar
+    tek bir IndicatorBlock'un kopyasız view'larıdır).
+    Sadece bazı kolonlar gerekiyorsa indicator_set(df).frame([...]) tercih edilmeli.
+    """
+    return indicator_set(df, engine=engine).frame()
+
+
+def load_indicator_engine(exchange_id: str, symbol: str, timeframe: str, max_history: int):
+    """
+    INCREMENTAL_INDICATORS=1 ise (exchange, symbol, timeframe) için kayıtlı motoru yükler.
+    Bellek deposunda (daemon modu) motorlar her zaman bellekte tutulur, dosyaya yazılmaz.
+    max_history analiz edilen buffer'dır (ohlcv_buffer); motor sadece bu kadar geçmiş satır tutar.
     
+    Returns:
+        (engine, state_path) veya kapalıysa (None, None); bellekteki motor için state_path None
+    """
+    store = get_default_store()
+    if isinstance(store, MemoryCandleStore):
+        key = (exchange_id, symbol, timeframe)
+        if key not in store.engines or store.engines[key].max_history != max_history:
+            store.engines[key] = IndicatorEngine(max_history=max_history)
+        return store.engines[key], None
+    if store is None or os.getenv("INCREMENTAL_INDICATORS", "0") != "1":
+        return None, None
+    path = store.state_path_for(exchange_id, symbol, timeframe)
+    engine = IndicatorEngine.load(path)
+    if engine is None or engine.max_history != max_history:
+        engine = IndicatorEngine(max_history=max_history)
+    return engine, path
+
+# recent_candles_json alan sırası (JSON çıktısındaki anahtar sırası)
+CANDLE_FIELDS = [
+    ("open", "float"), ("high", "float"), ("low", "float"), ("close", "float"), ("volume", "float"),
+    ("sma50", "float"), ("sma100", "float"), ("sma200", "float"),
+    ("ema20", "float"), ("ema50", "float"), ("ema100", "float"), ("ema200", "float"),
+    ("rsi14", "float"),
+    ("macd", "float"), ("macd_signal", "float"), ("macd_hist", "float"),
+    ("atr14", "float"),
+    ("obv", "float"),
+    ("change_pct", "float"),
+    ("trend_flags", [("above_sma200", "bool"), ("above_ema200", "bool")]),
+    ("pattern", "raw"),
     # NEW SCALPING INDICATORS
-    # VWAP - Volume Weighted Average Price
-    d['vwap'] = vwap(d)
-    
-    # Bollinger Bands
-    d['bb_middle'], d['bb_upper'], d['bb_lower'], d['bb_percent_b'], d['bb_bandwidth'] = bollinger_bands(d['close'], 20)
-    
-    # Stochastic RSI
-    d['stoch_rsi'] = stochastic_rsi(d['rsi14'], 14)
-    
-    return d
-
-def recent_candles_json(df: pd.DataFrame, last_n: int):
-    tail = df.dropna().tail(last_n)
-    out = []
-    for ts, r in tail.iterrows():
-        candle_data = {
-            "timestamp": ts.isoformat().replace("+00:00", "Z"),
-            "open": _float(r["open"]),
-            "high": _float(r["high"]),
-            "low": _float(r["low"]),
-            "close": _float(r["close"]),
-            "volume": _float(r["volume"]),
-            "sma50": _float(r["sma50"]), "sma100": _float(r["sma100"]), "sma200": _float(r["sma200"]),
-            "ema20": _float(r.get("ema20")),
-            "ema50": _float(r["ema50"]), "ema100": _float(r["ema100"]), "ema200": _float(r["ema200"]),
-            "rsi14": _float(r["rsi14"]),
-            "macd": _float(r["macd"]), "macd_signal": _float(r["macd_signal"]), "macd_hist": _float(r["macd_hist"]),
-            "atr14": _float(r["atr14"]),
-            "obv": _float(r["obv"]),
-            "change_pct": _float(r["change_pct"]),
-            "trend_flags": {
-                "above_sma200": _bool(r["above_sma200"]),
-                "above_ema200": _bool(r["above_ema200"])
-            },
-            "pattern": r["pattern"],
-            # NEW SCALPING INDICATORS
-            "vwap": _float(r.get("vwap")),
-            "bb_middle": _float(r.get("bb_middle")),
-            "bb_upper": _float(r.get("bb_upper")),
-            "bb_lower": _float(r.get("bb_lower")),
-            "bb_percent_b": _float(r.get("bb_percent_b")),
-            "bb_bandwidth": _float(r.get("bb_bandwidth")),
-            "stoch_rsi": _float(r.get("stoch_rsi"))
-        }
-        out.append(candle_data)
-    return out
+    ("vwap", "float"),
+    ("bb_middle", "float"), ("bb_upper", "float"), ("bb_lower", "float"),
+    ("bb_percent_b", "float"), ("bb_bandwidth", "float"),
+    ("stoch_rsi", "float"),
+]
+
+# CANDLE_FIELDS'ın okuduğu indikatör kolonları (iç içe alanlar dahil)
+CANDLE_COLUMNS = [name for key, kind in CANDLE_FIELDS
+                  for name in ([n for n, _ in kind] if isinstance(kind, list) else [key])
+                  if name in INDICATORS.by_column]
+
+def recent_candles_json(df, last_n: int):
+    tail = dropna_tail(indicator_frame(df, CANDLE_COLUMNS), last_n)
+    return columnar_records(tail, CANDLE_FIELDS, timestamps=iso_timestamps(tail.index))
 
 
 # =========================
@@ -932,43 +1052,95 @@ def cluster_levels(levels: list, zone_width: float):
     return centers, clusters
 
 def detect_all_levels(df: pd.DataFrame, window: int = 10) -> dict:
-    """Swing high/low ile tüm aday seviyeleri çıkarır (ham listeler)."""
-    highs, lows = [], []
-    for i in range(window, len(df) - window):
-        hh = df["high"].iloc[i]
-        ll = df["low"].iloc[i]
-        if hh == df["high"].iloc[i - window:i + window + 1].max():
-            highs.append(hh)
-        if ll == df["low"].iloc[i - window:i + window + 1].min():
-            lows.append(ll)
-    return {"highs": highs, "lows": lows}
+    """
+    Swing high/low ile tüm aday seviyeleri çıkarır (ham listeler).
+    Bir bar, [i - window, i + window] penceresinin tepesi/dibi ise swing noktasıdır;
+    pencere max/min'i merkezli rolling ile tek geçişte (O(n)) hesaplanır.
+    """
+    n = len(df)
+    if n <= 2 * window:
+        return {"highs": [], "lows": []}
+
+    span = 2 * window + 1
+    inner = slice(window, n - window)  # tam pencereye sahip barlar
+    high = df["high"].to_numpy(dtype="float64")[inner]
+    low = df["low"].to_numpy(dtype="float64")[inner]
+    window_max = df["high"].rolling(span, center=True, min_periods=1).max().to_numpy()[inner]
+    window_min = df["low"].rolling(span, center=True, min_periods=1).min().to_numpy()[inner]
+
+    return {
+        "highs": high[high == window_max].tolist(),
+        "lows": low[low == window_min].tolist()
+    }
 
 def grade_levels_by_volume(df: pd.DataFrame, levels: list, side: str, radius_mult: float = 0.5):
-    """Seviye etrafında hacim ortalamasıyla ağırlık verip (strong/moderate/weak) sınıflandır."""
+    """
+    Seviye etrafında hacim ortalamasıyla ağırlık verip (strong/moderate/weak) sınıflandır.
+    
+    Seviyeye değen mumlar: high >= lvl - r ve low <= lvl + r. Değmeyenler iki ayrık
+    kümedir (high < lvl - r veya low > lvl + r); high ve low'a göre sıralı dizilerde
+    searchsorted + kümülatif hacim ile tüm seviyeler tek geçişte hesaplanır:
+    O((mum + seviye) · log mum).
+    """
     if not levels or df.empty:
         return {"strong": [], "moderate": [], "weak": []}
 
     atr_now = float(df["atr14"].dropna().iloc[-1]) if df["atr14"].notna().any() else (df["high"]-df["low"]).mean()
     avg_vol = float(df["volume"].mean())
-    strong, moderate, weak = [], [], []
     radius = max(atr_now * radius_mult, 1e-9)
 
-    for lvl in levels:
-        # Level çevresindeki mumların hacim ortalaması
-        mask = (df["high"] >= lvl - radius) & (df["low"] <= lvl + radius)
-        local_vol = float(df.loc[mask, "volume"].mean()) if mask.any() else 0.0
+    local_vol = _local_volume_means(df, np.asarray(levels, dtype="float64"), radius)
+
+    strong, moderate, weak = [], [], []
+    for lvl, vol in zip(levels, local_vol):
         # sınıflandırma
-        if local_vol >= 1.5 * avg_vol:
+        if vol >= 1.5 * avg_vol:
             strong.append(lvl)
-        elif local_vol >= 1.0 * avg_vol:
+        elif vol >= 1.0 * avg_vol:
             moderate.append(lvl)
         else:
             weak.append(lvl)
     return {"strong": sorted(strong), "moderate": sorted(moderate), "weak": sorted(weak)}
 
+
+def _local_volume_means(df: pd.DataFrame, levels: np.ndarray, radius: float) -> np.ndarray:
+    """Her seviyenin [lvl - radius, lvl + radius] bandına değen mumların ortalama hacmi (yoksa 0)."""
+    high = df["high"].to_numpy(dtype="float64")
+    low = df["low"].to_numpy(dtype="float64")
+    volume = df["volume"].to_numpy(dtype="float64")
+
+    # NaN high/low hiçbir banda değmez; NaN hacim ortalamaya girmez (pandas mean gibi)
+    rows = ~(np.isnan(high) | np.isnan(low))
+    high, low, volume = high[rows], low[rows], volume[rows]
+    if (low > high).any():
+        # Bozuk mum varsa iki küme ayrık olmaz: seviye başına maske ile hesapla
+        means = []
+        for lvl in levels:
+            mask = (high >= lvl - radius) & (low <= lvl + radius)
+            means.append(float(np.nanmean(volume[mask])) if mask.any() else 0.0)
+        return np.array(means)
+
+    has_vol = ~np.isnan(volume)
+    vol = np.where(has_vol, volume, 0.0)
+    cnt = has_vol.astype("float64")
+
+    by_high = np.argsort(high, kind="stable")
+    by_low = np.argsort(low, kind="stable")
+    vol_h = np.concatenate(([0.0], np.cumsum(vol[by_high])))
+    cnt_h = np.concatenate(([0.0], np.cumsum(cnt[by_high])))
+    vol_l = np.concatenate(([0.0], np.cumsum(vol[by_low])))
+    cnt_l = np.concatenate(([0.0], np.cumsum(cnt[by_low])))
+
+    below = np.searchsorted(high[by_high], levels - radius, side="left")   # high < lvl - r
+    above = np.searchsorted(low[by_low], levels + radius, side="right")   # low > lvl + r → [above:]
+
+    touch_cnt = cnt_h[-1] - cnt_h[below] - (cnt_l[-1] - cnt_l[above])
+    touch_vol = vol_h[-1] - vol_h[below] - (vol_l[-1] - vol_l[above])
+    return np.where(touch_cnt > 0, touch_vol / np.maximum(touch_cnt, 1.0), 0.0)
+
 def summarize_key_levels(df: pd.DataFrame, last_n: int):
     """ATR tabanlı zone - sadece güçlü seviyeler."""
-    sub = df.dropna().tail(last_n + 200)  # last_n çevresinde bağlam olsun
+    sub = dropna_tail(df, last_n + 200)  # last_n çevresinde bağlam olsun
     if sub.empty:
         return {
             "strong_support": [],
@@ -1050,7 +1222,8 @@ def patterns_summary(df_tail: pd.DataFrame):
     recent_high = float(df_tail["high"].max()) if len(df_tail) else None
     recent_low  = float(df_tail["low"].min()) if len(df_tail) else None
 
-    confidence = "high" if current in ["hammer","shooting_star"] else "medium"
+    # Çok mumlu desenler tek mum desenlerinden daha güvenilir kabul edilir
+    confidence = "high" if current in ["hammer","shooting_star"] + MULTI_PATTERNS else "medium"
 
     return {
         "current_pattern": current,
@@ -1212,24 +1385,9 @@ def enhanced_15m_analysis(df: pd.DataFrame):
     if len(df) < 50:
         return None
     
-    df = df.copy()
-    
-    # VWAP ekle (zaten enrich_indicators'da ekleniyor ama burada kontrol)
-    if 'vwap' not in df.columns:
-        df['vwap'] = vwap(df)
-    
-    # Bollinger Bands (zaten enrich_indicators'da ekleniyor)
-    if 'bb_middle' not in df.columns:
-        df['bb_middle'], df['bb_upper'], df['bb_lower'], df['bb_percent_b'], df['bb_bandwidth'] = bollinger_bands(df['close'], 20)
-    
-    # Stochastic RSI (zaten enrich_indicators'da ekleniyor)
-    if 'stoch_rsi' not in df.columns:
-        df['stoch_rsi'] = stochastic_rsi(df['rsi14'], 14)
-    
-    # EMA 20 ekle (scalping için kısa vadeli)
-    if 'ema20' not in df.columns:
-        df['ema20'] = ema(df['close'], 20)
-    
+    # VWAP, Bollinger Bands, Stochastic RSI ve EMA20 eksikse registry'den hesaplanır
+    # (çağıranın frame'i değiştirilmez)
+    df = indicator_frame(df, SCALPING_COLUMNS)
     tail = df.tail(50)
     
     # Validasyon kontrolü - tüm gerekli göstergeler mevcut ve geçerli mi?
@@ -1258,13 +1416,25 @@ def enhanced_15m_analysis(df: pd.DataFrame):
     }
 
 
-def timeframe_summary(df: pd.DataFrame, last_n: int, timeframe: str = None):
-    """Genişletilmiş summary - daha fazla mum ile daha güçlü analiz."""
+def summary_columns(timeframe: str = None) -> list:
+    """timeframe_summary'nin okuduğu indikatör kolonları (scalping kolonları sadece 15m'de)."""
+    return SUMMARY_COLUMNS + (SCALPING_COLUMNS if timeframe == "15m" else [])
+
+
+def timeframe_summary(df, last_n: int, timeframe: str = None):
+    """
+    Genişletilmiş summary - daha fazla mum ile daha güçlü analiz.
+    df bir IndicatorSet ise sadece bu timeframe'in özetlerinin okuduğu
+    indikatörler hesaplanır (scalping kolonları sadece 15m'de).
+    """
+    df = indicator_frame(df, summary_columns(timeframe))
     # Daha fazla veri ile analiz yapmak için geniş tail al
-    tail = df.dropna().tail(max(last_n, 100))  # En az 100 mum
+    tail = dropna_tail(df, max(last_n, 100))  # En az 100 mum
+    with perf.span("levels"):
+        key_levels = summarize_key_levels(df, last_n=last_n)
     
     base_summary = {
-        "key_levels": summarize_key_levels(df, last_n=last_n),
+        "key_levels": key_levels,
         "indicators": {
             "rsi": rsi_summary(tail),
             "macd": macd_summary(tail),
@@ -1283,23 +1453,141 @@ def timeframe_summary(df: pd.DataFrame, last_n: int, timeframe: str = None):
     
     # 15m timeframe için scalping analizini ekle
     if timeframe == "15m":
-        scalping_data = enhanced_15m_analysis(df)
+        with perf.span("scalping"):
+            scalping_data = enhanced_15m_analysis(df)
         if scalping_data:
             base_summary["scalping_analysis"] = scalping_data
     
     return base_summary
 
 
+# =========================
+#      RESAMPLE MODE
+# =========================
+def resample_enabled(resample: bool = None) -> bool:
+    """resample verilmezse RESAMPLE_MODE çevre değişkenine bakar."""
+    if resample is None:
+        return os.getenv("RESAMPLE_MODE", "0") == "1"
+    return resample
+
+
+def resample_plan_for(config: dict):
+    """config için resample planı (resample.plan_resample); üretilebilecek timeframe yoksa None."""
+    return plan_resample({tf: ohlcv_buffer(need) for tf, need in config.items()})
+
+
+def derive_timeframes(base: tuple, config: dict, plan: dict) -> dict:
+    """
+    Temel timeframe verisinden plan["derived"] timeframe'lerini üretir.
+
+    Returns:
+        {timeframe: (DataFrame, exchange, used_symbol)} - base ve türetilenler
+    """
+    base_df, exchange, used_symbol = base
+    out = {plan["base"]: (base_df.tail(ohlcv_buffer(config[plan["base"]])), exchange, used_symbol)}
+    for tf in plan["derived"]:
+        df = resample_ohlcv(base_df, tf, plan["base"]).tail(ohlcv_buffer(config[tf]))
+        out[tf] = (df, exchange, used_symbol)
+        print(f"🧮 {tf} mumları {plan['base']} verisinden üretildi ({len(df)} mum)")
+    return out
+
+
+def check_resampled(timeframe: str, derived: pd.DataFrame, native: pd.DataFrame) -> pd.DataFrame:
+    """
+    Üretilen mumları exchange'in kendi mumlarıyla karşılaştırır.
+    Uyuşmazlık varsa exchange mumlarını döndürür (güvenli taraf).
+    """
+    report = compare_ohlcv(derived, native)
+    if report["ok"]:
+        print(f"✅ {timeframe} resample tutarlı ({report['compared']} kapanmış mum)")
+        return derived
+    print(f"⚠️ {timeframe} resample uyuşmazlığı: {report['mismatched']} farklı, "
+          f"{report['missing']} eksik mum (max fark: {report['max_rel_diff']}); exchange mumları kullanılıyor")
+    return native
+
+
+def fetch_timeframes(symbol: str, config: dict, resample: bool = None, exchange_ids: list = None) -> dict:
+    """
+    config'teki tüm timeframe'lerin OHLCV verisini çeker.
+
+    Resample modunda sadece en ince timeframe çekilir, üst timeframe'ler ondan
+    üretilir (coin başına 3 yerine 1 OHLCV isteği). RESAMPLE_VERIFY=1 ise üst
+    timeframe'ler aynı exchange'ten ayrıca çekilip karşılaştırılır.
+    exchange_ids verilirse failover sadece bu exchange'ler arasında yapılır.
+
+    Returns:
+        {timeframe: (DataFrame, exchange, used_symbol)} - config sırasıyla
+    """
+    plan = resample_plan_for(config) if resample_enabled(resample) else None
+    if plan is None:
+        return {tf: fetch_ohlcv_with_exchange(symbol, tf, need, exchange_ids=exchange_ids)
+                for tf, need in config.items()}
+
+    base = fetch_ohlcv_with_exchange(symbol, plan["base"], config[plan["base"]], limit=plan["base_limit"],
+                                     exchange_ids=exchange_ids)
+    fetched = derive_timeframes(base, config, plan)
+    for tf in plan["native"]:
+        fetched[tf] = fetch_ohlcv_with_exchange(symbol, tf, config[tf], exchange_ids=exchange_ids)
+
+    if os.getenv("RESAMPLE_VERIFY", "0") == "1":
+        _, exchange, used_symbol = base
+        for tf in plan["derived"]:
+            df, _, _ = fetched[tf]
+            native = fetch_ohlcv_cached(exchange, used_symbol, tf, len(df), store=get_default_store())
+            fetched[tf] = (check_resampled(tf, df, native), exchange, used_symbol)
+    return {tf: fetched[tf] for tf in config}
+
+
+async def fetch_timeframes_async(symbol: str, config: dict, limiter, resample: bool = None) -> dict:
+    """fetch_timeframes'in async karşılığı; native timeframe'ler eşzamanlı çekilir."""
+    import asyncio
+
+    plan = resample_plan_for(config) if resample_enabled(resample) else None
+    if plan is None:
+        fetched = await asyncio.gather(
+            *(fetch_ohlcv_async(symbol, tf, need, limiter) for tf, need in config.items())
+        )
+        return dict(zip(config, fetched))
+
+    base, *natives = await asyncio.gather(
+        fetch_ohlcv_async(symbol, plan["base"], config[plan["base"]], limiter, limit=plan["base_limit"]),
+        *(fetch_ohlcv_async(symbol, tf, config[tf], limiter) for tf in plan["native"])
+    )
+    fetched = await asyncio.to_thread(derive_timeframes, base, config, plan)
+    fetched.update(zip(plan["native"], natives))
+
+    if os.getenv("RESAMPLE_VERIFY", "0") == "1":
+        _, exchange, used_symbol = base
+
+        async def verify(tf):
+            df = fetched[tf][0]
+            async with limiter:
+                native = await fetch_ohlcv_cached_async(exchange, used_symbol, tf, len(df),
+                                                        store=get_default_store())
+            return tf, check_resampled(tf, df, native)
+
+        for tf, df in await asyncio.gather(*(verify(tf) for tf in plan["derived"])):
+            fetched[tf] = (df, exchange, used_symbol)
+    return {tf: fetched[tf] for tf in config}
+
+
 # =========================
 #          MAIN
 # =========================
-def analyze_coin(symbol: str, config: dict) -> dict:
+def analyze_coin(symbol: str, config: dict, resample: bool = None, timeframes=None, state: dict = None,
+                 snapshots: MarketSnapshots = None) -> dict:
     """
     Tek bir coin için tüm timeframe'lerde analiz yapar.
     
     Args:
         symbol: Trading pair (örn: "BTC/USDT:USDT")
         config: Timeframe konfigürasyonu (örn: {"4h": 100, "1h": 150, "15m": 200})
+        resample: Üst timeframe'leri en ince timeframe'den üret (None → RESAMPLE_MODE)
+        timeframes: Sadece bu timeframe'leri çek ve yeniden hesapla (daemon modu);
+            diğerlerinin verisi ve özeti state'ten alınır, son mum zamanlaması yeniden hesaplanır
+        state: Çağrılar arasında korunan dict ({"frames": ..., "timeframes": ...})
+        snapshots: Çalıştırma başına toplu ticker/funding (verilirse market bilgisi için
+            sembol başına istek yapılmaz)
     
     Returns:
         Analiz sonuçları dict
@@ -1308,154 +1596,757 @@ def analyze_coin(symbol: str, config: dict) -> dict:
     print(f"📊 {symbol} ANALİZİ BAŞLIYOR")
     print(f"{'='*70}")
     
-    # İlk timeframe'de market bilgilerini al
-    first_tf = list(config.keys())[0]
-    df_first, exchange_first, symbol_first = fetch_ohlcv_with_exchange(symbol, first_tf, config[first_tf])
-    market_info = get_market_info(exchange_first, symbol_first)
-    
-    # Advanced analizleri ekle ve market_info içine yerleştir
-    print(f"🔬 Advanced market analysis yapılıyor...")
-    advanced_analysis = get_advanced_market_analysis(exchange_first, symbol_first, df_first)
+    state = {} if state is None else state
+    frames = state.setdefault("frames", {})
+    results = state.setdefault("timeframes", {})
+    # İstenmeyen ama henüz hiç hesaplanmamış timeframe'ler de hesaplanır
+    todo = [tf for tf in config if timeframes is None or tf in timeframes or tf not in results]
     
-    # Market info'ya advanced analysis ekle
-    if advanced_analysis:
-        market_info["advanced_analysis"] = advanced_analysis
+    with perf.tracing(symbol=symbol, mode="sync", timeframes=todo) as trace:
+        frames.update(fetch_timeframes(symbol, {tf: config[tf] for tf in todo}, resample=resample))
+        
+        # İlk timeframe'in exchange'inden market bilgilerini al
+        first_tf = list(config.keys())[0]
+        df_first, exchange_first, symbol_first = frames[first_tf]
+        # Tek derin order book snapshot'ı hem market_info'yu hem derinlik analizini besler
+        book = fetch_order_book_snapshot(exchange_first, symbol_first)
+        snapshot = snapshots.get(exchange_first) if snapshots is not None else None
+        with perf.span("market_info"):
+            market_info = get_market_info(exchange_first, symbol_first, book=book, snapshot=snapshot)
+        
+        # Advanced analizleri ekle ve market_info içine yerleştir
+        print(f"🔬 Advanced market analysis yapılıyor...")
+        with perf.span("advanced_analysis"):
+            advanced_analysis = get_advanced_market_analysis(exchange_first, symbol_first, df_first, book=book)
+        
+        # Market info'ya advanced analysis ekle
+        if advanced_analysis:
+            market_info["advanced_analysis"] = advanced_analysis
+        
+        out = {
+            "symbol": symbol,
+            "as_of_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "market_info": market_info,
+            "timeframes": {}
+        }
+
+        for tf in todo:
+            need = config[tf]
+            print(f"\n🔄 {tf} timeframe analiz ediliyor... ({need} mum)")
+            
+            df, exchange, used_symbol = frames[tf]
+            
+            with perf.span("timeframe", timeframe=tf):
+                results[tf] = analyze_timeframe(df, tf, need, engine_key=(exchange.id, used_symbol),
+                                                exchange=exchange)
+        
+        # Kapanmamış timeframe'lerin özeti önceki turdan gelir; kapanışa kalan süre her uyanmada yenilenir
+        for tf in config:
+            if tf not in todo:
+                df, exchange, _ = frames[tf]
+                results[tf] = {**results[tf], "last_candle": get_last_candle_info(df, tf, exchange=exchange)}
+        out["timeframes"] = {tf: results[tf] for tf in config}
     
-    out = {
-        "symbol": symbol,
-        "as_of_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-        "market_info": market_info,
-        "timeframes": {}
+    return attach_perf(out, trace)
+
+
+def attach_perf(out: dict, trace) -> dict:
+    """PERF_EMBED=1 ise coin'in aşama sürelerini satıra `perf` alanı olarak ekler."""
+    if perf.embed_enabled():
+        out["perf"] = trace.to_dict()
+    return out
+
+
+def summarize_timeframe(df: pd.DataFrame, timeframe: str, need: int, engine=None) -> dict:
+    """
+    İndikatörleri hesaplar ve timeframe özetini üretir. Ağ isteği ve global durum
+    kullanmaz; evren modunda süreç havuzunda çalışır.
+    """
+    warmup = INDICATORS.warmup(summary_columns(timeframe))
+    if len(df) <= warmup + need:
+        print(f"⚠️ {timeframe}: {len(df)} mum var, indikatör ısınması için {warmup + need + 1} gerekli")
+    indicators = indicator_set(df, engine=engine)
+    with perf.span("enrich"):
+        indicators.compute(summary_columns(timeframe))
+    with perf.span("summary"):
+        return timeframe_summary(indicators, last_n=need, timeframe=timeframe)  # timeframe parametresi eklendi
+
+
+def analyze_timeframe(df: pd.DataFrame, timeframe: str, need: int, server_time: int = None,
+                      engine_key: tuple = None, exchange=None, summary: dict = None) -> dict:
+    """
+    Çekilmiş OHLCV verisi için indikatörleri, özeti ve son mum bilgisini üretir.
+    Ağ isteği yapmaz (exchange'in saat farkı henüz ölçülmediyse tek fetch_time hariç).
+    engine_key=(exchange_id, symbol) verilirse artımlı indikatör durumu yüklenip kaydedilir.
+    summary verilirse (süreç havuzunda hesaplanmış) sadece son mum bilgisi eklenir.
+    """
+    if summary is None:
+        engine, state_path = (load_indicator_engine(*engine_key, timeframe, ohlcv_buffer(need)) if engine_key
+                              else (None, None))
+        summary = summarize_timeframe(df, timeframe, need, engine=engine)
+        if state_path is not None:
+            engine.save(state_path)
+    with perf.span("last_candle"):
+        last_candle = get_last_candle_info(df, timeframe, server_time=server_time, exchange=exchange)
+
+    return {
+        "source_exchange": exchange.id if exchange is not None else None,
+        "last_candle": last_candle,
+        "summary": summary
     }
 
-    for tf, need in config.items():
-        print(f"\n🔄 {tf} timeframe analiz ediliyor... ({need} mum)")
-        
-        # Exchange bilgisi ile veri çek
-        if tf == first_tf:
-            df, exchange, used_symbol = df_first, exchange_first, symbol_first
+
+# =========================
+#      ASYNC RUN MODE
+# =========================
+async def fetch_ohlcv_async(symbol: str, timeframe: str, need: int, limiter, limit: int = None):
+    """
+    fetch_ohlcv_with_exchange'in async karşılığı (ccxt.async_support).
+    Rate limit ccxt'nin kendi throttler'ı ile, eşzamanlılık limiter ile sınırlanır.
+    
+    Returns:
+        (DataFrame, async_exchange_instance, used_symbol)
+    """
+    buffer = limit or ohlcv_buffer(need)
+    
+    async def fetch(ex, sym):
+        return await fetch_ohlcv_cached_async(ex, sym, timeframe, buffer, store=get_default_store())
+    
+    with perf.span("fetch_ohlcv", timeframe=timeframe):
+        return await fetch_with_failover_async(
+            [(exchange_id, symbol) for exchange_id in OHLCV_EXCHANGES],
+            fetch, label=f"{symbol} {timeframe}", limiter=limiter
+        )
+
+
+async def get_market_info_async(exchange, symbol: str, limiter, book=None,
+                                snapshot: MarketSnapshot = None) -> dict:
+    """
+    get_market_info'nun async karşılığı; çıktıyı build_market_info üretir.
+    book: OrderBookSnapshot döndüren awaitable (eşzamanlı çekilen snapshot task'ı);
+    sadece ticker'da bid/ask yoksa beklenir.
+    """
+    try:
+        cached = snapshot is not None and snapshot.has(symbol)
+        if cached:
+            ticker = snapshot.ticker(symbol)
         else:
-            df, exchange, used_symbol = fetch_ohlcv_with_exchange(symbol, tf, need=need)
+            async with limiter:
+                ticker = await exchange.fetch_ticker(symbol)
+        market = exchange.market(symbol)
         
-        df = enrich_indicators(df)
-        summary = timeframe_summary(df, last_n=need, timeframe=tf)  # timeframe parametresi eklendi
-        last_candle = get_last_candle_info(df, tf)
+        bid = ticker.get('bid')
+        ask = ticker.get('ask')
+        if not bid or not ask:
+            levels = await (book if book is not None else
+                            fetch_order_book_snapshot_async(exchange, symbol, limiter, limit=5))
+            if levels is not None:
+                bid, ask = levels.best_bid, levels.best_ask
+        
+        funding_info = None
+        try:
+            if market.get('type') in ['swap', 'future']:
+                if cached and snapshot.has_funding:
+                    funding_info = snapshot.funding(symbol)
+                elif hasattr(exchange, 'fetch_funding_rate'):
+                    async with limiter:
+                        funding_info = await exchange.fetch_funding_rate(symbol)
+        except Exception:
+            pass
+        
+        return build_market_info(exchange, market, ticker, bid, ask, funding_info)
+    except Exception as e:
+        print(f"⚠️ Market bilgisi alınamadı: {e}", flush=True)
+        return _empty_market_info(exchange)
+
+
+async def fetch_order_book_snapshot_async(exchange, symbol: str, limiter, limit: int = None):
+    """fetch_order_book_snapshot'ın async karşılığı."""
+    try:
+        with perf.span("order_book"):
+            async with limiter:
+                orderbook = await exchange.fetch_order_book(symbol, limit=limit or order_book_limit())
+        return OrderBookSnapshot.from_ccxt(orderbook)
+    except Exception as e:
+        print(f"⚠️ Order book alınamadı: {e}")
+        return None
+
+
+async def run_compute(pool, fn, *args):
+    """CPU ağırlıklı işi süreç havuzunda (pool verilirse) ya da bir thread'de çalıştırır."""
+    import asyncio
+    
+    if pool is None:
+        return await asyncio.to_thread(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
 
-        out["timeframes"][tf] = {
-            "last_candle": last_candle,
-            "summary": summary
+
+async def analyze_coin_async(symbol: str, config: dict, limiter, resample: bool = None,
+                             snapshots: MarketSnapshots = None, pool=None) -> dict:
+    """
+    analyze_coin'in async karşılığı: tüm timeframe'ler ve market verisi eşzamanlı çekilir,
+    hesaplama kısmı analyze_coin ile aynı fonksiyonları kullanır.
+    pool (ProcessPoolExecutor) verilirse indikatör/özet hesaplaması süreç havuzunda yapılır;
+    bu durumda artımlı indikatör durumu kullanılmaz.
+    """
+    import asyncio
+    
+    with perf.tracing(symbol=symbol, mode="async") as trace:
+        fetched = await fetch_timeframes_async(symbol, config, limiter, resample=resample)
+        df_first, exchange_first, symbol_first = fetched[next(iter(config))]
+        
+        # Order book snapshot'ı ticker/funding ile eşzamanlı çekilir ve iki tarafı da besler
+        book = asyncio.ensure_future(fetch_order_book_snapshot_async(exchange_first, symbol_first, limiter))
+        snapshot = await snapshots.get_async(exchange_first, limiter) if snapshots is not None else None
+        market_info = await perf.timed("market_info", get_market_info_async(exchange_first, symbol_first, limiter,
+                                                                            book=book, snapshot=snapshot))
+        book = await book
+        
+        # CPU ağırlıklı kısım thread'de (ya da süreç havuzunda) çalışır,
+        # event loop diğer coinlerin isteklerine devam eder
+        with perf.span("advanced_analysis"):
+            order_book_analysis = order_book_depth_from(book) if book is not None else None
+            advanced_analysis = await run_compute(pool, build_advanced_market_analysis, order_book_analysis,
+                                                  df_first)
+        if advanced_analysis:
+            market_info["advanced_analysis"] = advanced_analysis
+        
+        out = {
+            "symbol": symbol,
+            "as_of_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "market_info": market_info,
+            "timeframes": {}
         }
+        for tf, (df, exchange, used_symbol) in fetched.items():
+            with perf.span("timeframe", timeframe=tf):
+                # Mumları sağlayan exchange'in saati (saat farkı önbellekte, ağ isteği yok)
+                async with limiter:
+                    server_time = await server_time_ms_async(exchange)
+                if pool is None:
+                    out["timeframes"][tf] = await asyncio.to_thread(
+                        analyze_timeframe, df, tf, config[tf], server_time, (exchange.id, used_symbol), exchange
+                    )
+                else:
+                    summary = await run_compute(pool, summarize_timeframe, df, tf, config[tf])
+                    out["timeframes"][tf] = analyze_timeframe(df, tf, config[tf], server_time, exchange=exchange,
+                                                              summary=summary)
+    
+    return attach_perf(out, trace)
+
+
+async def run_analysis_async(trading_pairs: list, config: dict, concurrency: int = 8, on_result=None,
+                             resample: bool = None, pool=None):
+    """
+    Tüm coinleri eşzamanlı analiz eder.
     
-    return out
+    Args:
+        trading_pairs: Analiz edilecek pariteler
+        config: Timeframe konfigürasyonu
+        concurrency: Aynı anda açık olabilecek maksimum istek sayısı
+        on_result: Her coin analizi biter bitmez sonuçla çağrılır (örn. SupabaseWriter.submit)
+        resample: Üst timeframe'leri en ince timeframe'den üret (None → RESAMPLE_MODE)
+        pool: Hesaplama için süreç havuzu (universe.compute_pool); None → thread
+    
+    Returns:
+        (all_analysis_data, results) - senkron moddaki ile aynı yapı ve sıra;
+        başarılı sonuçlarda coin'in analiz süresi "seconds" alanındadır
+    """
+    import asyncio
+    
+    limiter = asyncio.Semaphore(max(1, concurrency))
+    # Ticker/funding tüm coinler için exchange başına bir kez toplu çekilir
+    snapshots = MarketSnapshots(trading_pairs)
+    
+    async def run_one(symbol):
+        started = time.perf_counter()
+        data = await analyze_coin_async(symbol, config, limiter, resample=resample, snapshots=snapshots, pool=pool)
+        if on_result is not None:
+            on_result(data)
+        return data, time.perf_counter() - started
+    
+    try:
+        outcomes = await asyncio.gather(
+            *(run_one(symbol) for symbol in trading_pairs),
+            return_exceptions=True
+        )
+    finally:
+        await close_async_exchanges()
+    
+    all_analysis_data = []
+    results = []
+    for symbol, outcome in zip(trading_pairs, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"\n❌ {symbol} analiz hatası: {outcome}")
+            results.append({
+                "symbol": symbol,
+                "status": "failed",
+                "error": str(outcome)
+            })
+            continue
+        
+        data, seconds = outcome
+        _print_coin_result(symbol, data)
+        all_analysis_data.append(data)
+        results.append({
+            "symbol": symbol,
+            "status": "success",
+            "seconds": round(seconds, 3)
+        })
+    
+    return all_analysis_data, results
 
 
-def main():
+# =========================
+#       DAEMON MODE
+# =========================
+def run_daemon(trading_pairs: list, config: dict, on_result=None, resample: bool = None,
+               close_delay: float = 5.0, max_cycles: int = None, clock=time.time, sleep=time.sleep) -> dict:
     """
-    Ana fonksiyon: Sabit 5 USDT paritesi (BTC, ETH, SOL, BNB, XRP) için analiz yapar ve 
-    tek bir tabloya (crypto_analysis) 5 satır olarak kaydeder.
-    Her çalıştırmada tablo temizlenir ve yeni veriler eklenir.
+    Süreç içinde sürekli çalışan mod: exchange client'ları, mum geçmişi (MemoryCandleStore)
+    ve indikatör motorları bellekte kalır. İlk turda tüm timeframe'ler hesaplanır; sonra her
+    mum kapanışından `close_delay` saniye sonra uyanılır ve sadece kapanan timeframe'ler
+    (delta çekimle) yeniden hesaplanır.
+    
+    Args:
+        trading_pairs: Analiz edilecek pariteler
+        config: Timeframe konfigürasyonu
+        on_result: Her coin sonucu ile çağrılır (örn. SupabaseWriter.submit)
+        resample: Üst timeframe'leri en ince timeframe'den üret (None → RESAMPLE_MODE)
+        close_delay: Mum kapanışından sonra beklenecek saniye
+        max_cycles: Verilirse bu kadar uyanmadan sonra durur (testler için; ilk tur dahil)
+        clock, sleep: Zaman kaynağı (saniye) ve bekleme fonksiyonu
+    
+    Returns:
+        {symbol: son analiz sonucu}
+    """
+    disk = get_default_store()
+    store = MemoryCandleStore(max_rows=disk.max_rows if disk else DEFAULT_MAX_ROWS, backing=disk)
+    set_default_store(store)
+    states = {symbol: {} for symbol in trading_pairs}
+    latest = {}
+    
+    def run_cycle(timeframes):
+        snapshots = MarketSnapshots(trading_pairs)  # uyanma başına bir toplu market bilgisi
+        for symbol in trading_pairs:
+            try:
+                latest[symbol] = analyze_coin(symbol, config, resample=resample, timeframes=timeframes,
+                                              state=states[symbol], snapshots=snapshots)
+            except Exception as e:
+                print(f"\n❌ {symbol} analiz hatası: {e}")
+                continue
+            if on_result is not None:
+                on_result(latest[symbol])
+    
+    try:
+        print(f"🛰️  Daemon modu: {len(trading_pairs)} coin, timeframe'ler {', '.join(config)}")
+        run_cycle(None)
+        cycles = 1
+        while max_cycles is None or cycles < max_cycles:
+            wake_ms, boundary_ms, closed = plan_wakeup(list(config), int(clock() * 1000), close_delay)
+            wait = max(0.0, wake_ms / 1000 - clock())
+            boundary = datetime.fromtimestamp(boundary_ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M")
+            print(f"\n⏳ Sonraki kapanış {boundary} UTC ({', '.join(closed)}), {wait:.0f} sn bekleniyor...",
+                  flush=True)
+            sleep(wait)
+            run_cycle(closed)
+            cycles += 1
+    except KeyboardInterrupt:
+        print("\n🛑 Daemon durduruldu")
+    finally:
+        set_default_store(None)
+    return latest
+
+
+def run_daemon_main(trading_pairs: list, config: dict, table_name: str, runner=None, **kwargs) -> None:
+    """
+    Sürekli modu (run_daemon ya da run_stream) uzun ömürlü bir SupabaseWriter ile
+    çalıştırır; durunca eski sembolleri temizler.
+    """
+    runner = runner or run_daemon
+    writer = None
+    try:
+        writer = SupabaseWriter(get_supabase_client(), table_name).start()
+    except Exception as e:
+        print(f"⚠️ Supabase bağlantı hatası: {e}")
+    
+    try:
+        runner(trading_pairs, config, on_result=writer.submit if writer is not None else None, **kwargs)
+    finally:
+        if writer is not None:
+            written, failed = writer.close()
+            print(f"✅ {len(written)} kayıt yazıldı, {len(failed)} başarısız")
+            try:
+                prune_rows(writer.client, table_name, trading_pairs)
+            except Exception as e:
+                print(f"⚠️  Eski kayıt temizleme hatası: {e}")
+
+
+# =========================
+#       STREAM MODE
+# =========================
+def live_market_info(base: dict, quote: dict, price) -> dict:
+    """
+    REST'ten bir kez alınmış market_info'yu (hacim, komisyon, tip) akıştaki
+    son fiyat, bid/ask ve mark price / funding ile günceller.
+    """
+    info = dict(base, current_price=price, mark_price=quote.get("mark_price"))
+    bid, ask = quote.get("bid"), quote.get("ask")
+    if bid and ask:
+        spread = ask - bid
+        info.update(bid=bid, ask=ask, spread=round(spread, 2),
+                    spread_percentage=round(spread / bid * 100, 4) if bid > 0 else None)
+    if quote.get("funding_rate") is not None:
+        info["funding_rate"] = round(quote["funding_rate"] * 100, 4)  # %
+        if quote.get("next_funding_time"):
+            info["next_funding_time"] = pd.Timestamp(quote["next_funding_time"], unit='ms', tz='UTC').isoformat()
+    return info
+
+
+def analyze_live(market, symbol: str, config: dict, base_info: dict) -> dict:
+    """
+    streaming.LiveMarket'in anlık görüntüsünden analiz üretir (ağ isteği yapmaz). Son mum kapanmamış
+    mumdur; indikatörleri bellekteki artımlı motorun önizlemesinden gelir.
+    """
+    server_time = market.now_ms()
+    with perf.tracing(symbol=symbol, mode="stream", timeframes=list(config)) as trace:
+        timeframes = {}
+        for tf, need in config.items():
+            # Cron/daemon ile aynı pencere: kümülatif vwap/obv canlı geçmişin uzunluğuna bağlı kalmaz
+            snapshot = market.snapshot(symbol, tf, limit=ohlcv_buffer(need))
+            with perf.span("timeframe", timeframe=tf):
+                result = analyze_timeframe(snapshot.frame, tf, need, server_time=server_time,
+                                           engine_key=(market.exchange_id, symbol))
+            result["source_exchange"] = market.exchange_id
+            timeframes[tf] = result
+        
+        # Son işlem fiyatı: en sık güncellenen (en ince) timeframe'in son kapanışı
+        finest = min(config, key=timeframe_to_ms)
+        price = float(market.frame(symbol, finest, limit=1)["close"].iloc[-1])
+        out = {
+            "symbol": symbol,
+            "as_of_utc": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "market_info": live_market_info(base_info, market.quote(symbol), price),
+            "timeframes": timeframes
+        }
+    return attach_perf(out, trace)
+
+
+def run_stream(trading_pairs: list, config: dict, on_result=None, resample: bool = None,
+               interval: float = 15.0, url: str = None, max_cycles: int = None, sleep=time.sleep,
+               stale_after: float = None) -> dict:
+    """
+    Akış modu: geçmiş REST ile bir kez çekilir (seed), sonra Binance Futures kline,
+    mark price ve book ticker akışları bellekteki mumları ve quote'ları gerçek zamanlı
+    günceller. Her `interval` saniyede bir tüm coinler akıştaki anlık görüntüden
+    (kapanmamış mum dahil) analiz edilir. Mesaj kaçırılan (yeniden bağlanma) coinler
+    analizden önce REST ile tekrar seed edilir.
+    
+    Seed sadece akışın exchange'inden (Binance) yapılır: failover ile başka exchange'in
+    mumları akıştaki mumlarla karışmaz. Hiçbir coin seed edilemezse akış modu başlamaz.
+    En ince timeframe'in mumu `stale_after` saniyedir güncellenmemiş coinlerin satırı
+    yazılmaz (akış bağlanamadıysa ya da koptuysa donmuş veri "canlı" diye gönderilmez).
+    
+    Args:
+        trading_pairs: Analiz edilecek pariteler
+        config: Timeframe konfigürasyonu
+        on_result: Her coin sonucu ile çağrılır (örn. SupabaseWriter.submit)
+        resample: Seed için üst timeframe'leri en ince timeframe'den üret (None → RESAMPLE_MODE)
+        interval: Analizler arası saniye
+        url: WebSocket adresi (None → STREAM_URL ya da Binance Futures)
+        max_cycles: Verilirse bu kadar analiz turundan sonra durur (testler için)
+        sleep: Bekleme fonksiyonu
+        stale_after: Akış verisinin bayat sayıldığı saniye (None → STREAM_STALE_AFTER ya da max(60, 2 * interval))
+    
+    Returns:
+        {symbol: son analiz sonucu}
+    """
+    from streaming import LiveMarket, StreamThread, stream_names, BINANCE_FUTURES_WS
+    
+    if stale_after is None:
+        stale_after = float(os.getenv("STREAM_STALE_AFTER", max(60.0, 2 * interval)))
+    finest = min(config, key=timeframe_to_ms)
+    
+    disk = get_default_store()
+    store = MemoryCandleStore(max_rows=disk.max_rows if disk else DEFAULT_MAX_ROWS, backing=disk)
+    set_default_store(store)
+    market = LiveMarket(store=store, max_rows=store.max_rows)
+    url = url or os.getenv("STREAM_URL", BINANCE_FUTURES_WS)
+    stream = StreamThread(market, stream_names(trading_pairs, config), url=url)
+    base_info = {}
+    latest = {}
+    
+    def seed(symbols):
+        snapshots = MarketSnapshots(symbols)
+        for symbol in symbols:
+            try:
+                frames = fetch_timeframes(symbol, config, resample=resample, exchange_ids=[market.exchange_id])
+            except Exception as e:
+                print(f"\n❌ {symbol} seed hatası: {e}")
+                continue
+            for tf, (df, _, _) in frames.items():
+                market.seed(symbol, tf, df)
+            _, exchange, used_symbol = frames[next(iter(config))]
+            base_info[symbol] = get_market_info(exchange, used_symbol, snapshot=snapshots.get(exchange))
+    
+    try:
+        print(f"📡 Akış modu: {len(trading_pairs)} coin, timeframe'ler {', '.join(config)}, {interval:.0f} sn aralık")
+        seed(trading_pairs)
+        if not base_info:
+            raise RuntimeError(f"{market.exchange_id} verisiyle hiçbir coin seed edilemedi; "
+                               f"akış modu başka exchange'in mumlarıyla çalışmaz")
+        stream.start()
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            sleep(interval)
+            gaps = sorted({symbol for symbol, _ in market.gaps})
+            if gaps:
+                print(f"🔁 Kaçırılan mumlar REST ile dolduruluyor: {', '.join(gaps)}")
+                seed(gaps)
+            for symbol in trading_pairs:
+                if symbol not in base_info:
+                    continue
+                age_ms = market.age_ms(symbol, finest)
+                if age_ms is None or age_ms > stale_after * 1000:
+                    age = "hiç güncellenmedi" if age_ms is None else f"{age_ms / 1000:.0f} sn önce güncellendi"
+                    print(f"⚠️ {symbol} akış verisi bayat ({finest} mumu {age}), satır yazılmadı")
+                    continue
+                try:
+                    latest[symbol] = analyze_live(market, symbol, config, base_info[symbol])
+                except Exception as e:
+                    print(f"\n❌ {symbol} analiz hatası: {e}")
+                    continue
+                if on_result is not None:
+                    on_result(latest[symbol])
+            cycles += 1
+    except KeyboardInterrupt:
+        print("\n🛑 Akış durduruldu")
+    finally:
+        stream.stop()
+        set_default_store(None)
+    return latest
+
+
+def _print_coin_result(symbol: str, analysis_data: dict) -> None:
+    """Analiz sonucunun kısa özetini konsola yazar"""
+    print(f"\n📊 {symbol} ANALİZ SONUÇLARI (ÖZET):")
+    print(f"  └─ Fiyat: ${analysis_data['market_info'].get('current_price', 'N/A')}")
+    volume_24h = analysis_data['market_info'].get('volume_24h') or 0
+    print(f"  └─ 24s Hacim: ${volume_24h:,.0f}")
+    print(f"  └─ Timeframe'ler: {', '.join(analysis_data['timeframes'].keys())}")
+
+
+def parse_args(argv=None):
+    """Komut satırı argümanları (çevre değişkenleri varsayılan olarak kullanılır)"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Çoklu coin teknik analiz motoru")
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        default=os.getenv("ASYNC_MODE", "0") == "1",
+        help="Tüm coin ve timeframe'leri ccxt.async_support ile eşzamanlı çek (ASYNC_MODE=1)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int,
+        default=int(os.getenv("ANALYSIS_CONCURRENCY", "8")),
+        help="Async modda aynı anda açık maksimum istek sayısı (ANALYSIS_CONCURRENCY)"
+    )
+    parser.add_argument(
+        "--resample", action="store_true",
+        default=os.getenv("RESAMPLE_MODE", "0") == "1",
+        help="Sadece en ince timeframe'i çek, üst timeframe'leri ondan üret (RESAMPLE_MODE=1)"
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        default=os.getenv("DAEMON_MODE", "0") == "1",
+        help="Sürekli çalış, her mum kapanışında sadece kapanan timeframe'leri hesapla (DAEMON_MODE=1)"
+    )
+    parser.add_argument(
+        "--close-delay", type=float,
+        default=float(os.getenv("DAEMON_CLOSE_DELAY", "5")),
+        help="Daemon modunda mum kapanışından sonra beklenecek saniye (DAEMON_CLOSE_DELAY)"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        default=os.getenv("STREAM_MODE", "0") == "1",
+        help="WebSocket kline/mark price/book ticker akışından sürekli analiz (STREAM_MODE=1)"
+    )
+    parser.add_argument(
+        "--stream-interval", type=float,
+        default=float(os.getenv("STREAM_INTERVAL", "15")),
+        help="Akış modunda analizler arası saniye (STREAM_INTERVAL)"
+    )
+    parser.add_argument(
+        "--universe", action="store_true",
+        default=os.getenv("UNIVERSE_MODE", "0") == "1",
+        help="Sabit 5 coin yerine 24s hacme göre tüm likit USDT perpetual'ları analiz et; satır sayısı "
+             "hacim eşiğine ve --universe-size'a bağlıdır (UNIVERSE_MODE=1)"
+    )
+    parser.add_argument(
+        "--universe-size", type=int,
+        default=int(os.getenv("UNIVERSE_SIZE", "0")),
+        help="Evren modunda en fazla sembol sayısı, 0 → sınırsız (UNIVERSE_SIZE)"
+    )
+    parser.add_argument(
+        "--min-volume", type=float,
+        default=float(os.getenv("UNIVERSE_MIN_VOLUME", "10000000")),
+        help="Evren modunda gereken 24s quote hacmi, USDT (UNIVERSE_MIN_VOLUME)"
+    )
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("COMPUTE_WORKERS", "0")),
+        help="Evren modunda hesaplama süreci sayısı, 0 → çekirdek sayısı (COMPUTE_WORKERS)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Ana fonksiyon: Sabit 5 USDT paritesi (BTC, ETH, SOL, BNB, XRP) ya da evren modunda 24s
+    hacme göre seçilen USDT perpetual'lar (sayısı hacim eşiğine ve UNIVERSE_SIZE'a bağlı) için
+    analiz yapar ve tek bir tabloya (crypto_analysis) coin başına bir satır olarak kaydeder.
+    Her coin analizi biter bitmez arka planda sembol anahtarlı upsert ile yazılır;
+    listede olmayan eski semboller en sonda silinir.
+    
+    Evren, OHLCV exchange'lerinden circuit breaker sırasına göre ilk erişilebilen olanın
+    listesinden seçilir; normalde mumlar da aynı exchange'ten gelir. Bir sembolün çekimi o
+    exchange'te başarısız olursa mumlar failover ile başka exchange'ten gelebilir
+    (timeframe çıktısındaki `source_exchange` alanı).
     """
     import sys
     sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args(argv)
     
     print("""
 ╔═══════════════════════════════════════════════════════════════════╗
 ║          ÇOKLU COİN TEKNİK ANALİZ MOTORU - V2.0                  ║
-║        Binance Futures - BTC, ETH, SOL, BNB, XRP Analizi         ║
-║             TEK TABLO - 5 SATIR (crypto_analysis)                ║
+║   USDT Perpetual - BTC, ETH, SOL, BNB, XRP ya da hacim evreni    ║
+║        TEK TABLO - COİN BAŞINA 1 SATIR (crypto_analysis)         ║
 ╚═══════════════════════════════════════════════════════════════════╝
     """)
     
     # Timeframe konfigürasyonu
     config = {"4h": 100, "1h": 150, "15m": 200}
     
-    # Analiz edilecek pariteler (sabit liste)
-    trading_pairs = get_trading_pairs()
+    # Analiz edilecek pariteler (sabit liste ya da hacme göre evren)
+    if args.universe:
+        trading_pairs = get_universe_pairs(min_volume=args.min_volume, top=args.universe_size)
+    else:
+        trading_pairs = get_trading_pairs()
     
     print(f"\n🎯 Toplam {len(trading_pairs)} coin analiz edilecek\n")
     
     # Tek tablo adı
     table_name = "crypto_analysis"
     
-    # İlk çalıştırmada tabloyu temizle
-    print(f"\n🗑️  '{table_name}' tablosu temizleniyor...")
-    clear_table(table_name)
-    print(f"✅ Tablo temizlendi, yeni veriler eklenecek.\n")
-    
-    # Her coin için analiz yap ve listeye ekle
-    all_analysis_data = []
-    results = []
-    
-    for i, symbol in enumerate(trading_pairs, 1):
+    if args.stream:
+        run_daemon_main(trading_pairs, config, table_name, runner=run_stream, resample=args.resample,
+                        interval=args.stream_interval)
+        return
+    
+    if args.daemon:
+        run_daemon_main(trading_pairs, config, table_name, resample=args.resample, close_delay=args.close_delay)
+        return
+    
+    # Evren modunda veri async çekilir, hesaplama süreç havuzuna dağıtılır
+    pool = None
+    if args.universe:
+        from universe import compute_pool, compute_workers
+        args.use_async = True
+        workers = args.workers or compute_workers()
+        pool = compute_pool(workers)
+    
+    mode = "async" if args.use_async else "sync"
+    with perf.tracing(run=table_name, mode=mode, coins=len(trading_pairs)) as run_trace:
+        # Arka plan yazıcı: her coin analizi biter bitmez upsert edilir
+        writer = None
+        supabase_error = None
         try:
-            print(f"\n{'#'*70}")
-            print(f"# {i}/{len(trading_pairs)} - {symbol} İŞLENİYOR")
-            print(f"{'#'*70}")
-            
-            # Analiz yap
-            analysis_data = analyze_coin(symbol, config)
-            
-            # JSON çıktısını göster (kısaltılmış)
-            print(f"\n📊 {symbol} ANALİZ SONUÇLARI (ÖZET):")
-            print(f"  └─ Fiyat: ${analysis_data['market_info'].get('current_price', 'N/A')}")
-            volume_24h = analysis_data['market_info'].get('volume_24h') or 0
-            print(f"  └─ 24s Hacim: ${volume_24h:,.0f}")
-            print(f"  └─ Timeframe'ler: {', '.join(analysis_data['timeframes'].keys())}")
-            
-            # Veriyi listeye ekle
-            all_analysis_data.append(analysis_data)
-            results.append({
-                "symbol": symbol,
-                "status": "success"
-            })
-        
+            writer = SupabaseWriter(get_supabase_client(), table_name).start()
         except Exception as e:
-            print(f"\n❌ {symbol} analiz hatası: {e}")
-            results.append({
-                "symbol": symbol,
-                "status": "failed",
-                "error": str(e)
-            })
+            supabase_error = e
+            print(f"⚠️ Supabase bağlantı hatası: {e}")
+    
+        def persist(analysis_data):
+            if writer is not None:
+                writer.submit(analysis_data)
+    
+        # Her coin için analiz yap ve listeye ekle
+        with perf.span("analysis"):
+            if args.use_async:
+                import asyncio
+                print(f"⚡ Async mod: tüm coinler eşzamanlı çekiliyor (concurrency={args.concurrency})")
+                if pool is not None:
+                    print(f"🧮 Hesaplama {workers} süreçte paralel yapılıyor")
+                try:
+                    all_analysis_data, results = asyncio.run(
+                        run_analysis_async(trading_pairs, config, concurrency=args.concurrency, on_result=persist,
+                                           resample=args.resample, pool=pool)
+                    )
+                finally:
+                    if pool is not None:
+                        pool.shutdown()
+            else:
+                all_analysis_data = []
+                results = []
+                # Ticker/funding tüm coinler için exchange başına bir kez toplu çekilir
+                snapshots = MarketSnapshots(trading_pairs)
         
-        # Son coin değilse kısa bir bekleme
-        if i < len(trading_pairs):
-            import time
-            print(f"\n⏳ Sonraki coin için 2 saniye bekleniyor...")
-            time.sleep(2)
-    
-    # Tüm verileri tek seferde Supabase'e kaydet
-    if all_analysis_data:
-        try:
+                # Rate limit pooled exchange client'ları (enableRateLimit) tarafından uygulanır
+                for i, symbol in enumerate(trading_pairs, 1):
+                    try:
+                        print(f"\n{'#'*70}")
+                        print(f"# {i}/{len(trading_pairs)} - {symbol} İŞLENİYOR")
+                        print(f"{'#'*70}")
+                
+                        # Analiz yap ve arka planda yazmaya gönder
+                        analysis_data = analyze_coin(symbol, config, resample=args.resample, snapshots=snapshots)
+                        persist(analysis_data)
+                
+                        # JSON çıktısını göster (kısaltılmış)
+                        _print_coin_result(symbol, analysis_data)
+                
+                        # Veriyi listeye ekle
+                        all_analysis_data.append(analysis_data)
+                        results.append({
+                            "symbol": symbol,
+                            "status": "success"
+                        })
+            
+                    except Exception as e:
+                        print(f"\n❌ {symbol} analiz hatası: {e}")
+                        results.append({
+                            "symbol": symbol,
+                            "status": "failed",
+                            "error": str(e)
+                        })
+    
+        # Arka plan yazıcının bitmesini bekle ve sonuçları işle
+        if writer is not None:
             print(f"\n{'='*70}")
-            print(f"💾 {len(all_analysis_data)} coin verisi '{table_name}' tablosuna kaydediliyor...")
+            print(f"💾 '{table_name}' tablosuna yazma tamamlanıyor...")
             print(f"{'='*70}\n")
-            
-            supabase = get_supabase_client()
-            
-            # Debug: İlk coin'in verilerini kontrol et
-            print(f"🔍 Debug - İlk coin verisi boyutu: {len(str(all_analysis_data[0]))} karakter")
-            
-            response = supabase.table(table_name).insert(all_analysis_data).execute()
-            
-            # Debug: Response'u kontrol et
-            print(f"🔍 Debug - Response data: {response.data is not None}")
-            print(f"🔍 Debug - Response data uzunluğu: {len(response.data) if response.data else 0}")
-            
-            if response.data and len(response.data) > 0:
-                print(f"✅ Tüm veriler başarıyla kaydedildi!")
-                print(f"📝 Toplam kayıt sayısı: {len(response.data)}")
-            else:
-                print(f"⚠️ Uyarı: Response döndü ama veri yok!")
-                print(f"Response: {response}")
-            
-        except Exception as e:
-            print(f"❌ Supabase toplu kayıt hatası: {e}")
-            import traceback
-            traceback.print_exc()
+            with perf.span("supabase_flush"):
+                written, failed = writer.close()
+            print(f"✅ {len(written)} coin verisi kaydedildi (upsert)")
+        
+            for r in results:
+                if r.get("status") == "success" and r["symbol"] in failed:
+                    r["status"] = "failed"
+                    r["error"] = f"Supabase kayıt hatası: {failed[r['symbol']]}"
+        
+            # Artık analiz edilmeyen coinlerin eski kayıtlarını sil
+            try:
+                with perf.span("prune"):
+                    removed = prune_rows(writer.client, table_name, trading_pairs)
+                if removed:
+                    print(f"🗑️  Listede olmayan {removed} eski kayıt silindi.")
+            except Exception as e:
+                print(f"⚠️  Eski kayıt temizleme hatası: {e}")
+        else:
             for r in results:
                 if r.get("status") == "success":
                     r["status"] = "failed"
-                    r["error"] = f"Supabase kayıt hatası: {e}"
+                    r["error"] = f"Supabase kayıt hatası: {supabase_error}"
     
     # Final özet
     print(f"\n\n{'='*70}")
@@ -1468,6 +2359,13 @@ def main():
     print(f"\n✅ Başarılı: {success_count}/{len(results)}")
     print(f"❌ Başarısız: {failed_count}/{len(results)}")
     print(f"📊 Tablo: {table_name}")
+    stages = ", ".join(f"{name} {ms / 1000:.1f}s" for name, ms in perf.stage_totals(run_trace).items())
+    print(f"⏱️  Süre: {run_trace.wall_ms / 1000:.1f}s ({stages})")
+    if pool is not None:
+        from universe import throughput
+        rate = throughput(results, run_trace.wall_ms / 1000)
+        print(f"🚀 Verim: {rate['symbols_per_sec']} coin/s, coin başı ortalama {rate['mean_symbol_seconds']}s "
+              f"(p95 {rate['p95_symbol_seconds']}s)")
     
     print("\n📋 Detaylı Sonuçlar:")
     for r in results:
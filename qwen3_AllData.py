@@ -11,15 +11,18 @@ Her mumda OHLCV + SMA/EMA(50/100/200) + RSI(14) + MACD(12/26/9) + ATR(14) + OBV
 Veriler JSON olarak döndürülür, analiz yapılmaz.
 """
 
-import ccxt
 import pandas as pd
 import numpy as np
 from datetime import datetime, timezone
-import json
-import os
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
 
+from exchanges import fetch_with_failover
+from candle_store import get_default_store, fetch_ohlcv_cached
+from patterns import classify_candles
+from serialization import columnar_records, shifted_timestamps, dumps, dump_file
+from supabase_store import get_client, bulk_clear, execute_with_retries
+
 # .env dosyasını yükle
 load_dotenv()
 
@@ -28,17 +31,8 @@ load_dotenv()
 #  SUPABASE CONFIGURATION
 # =========================
 def get_supabase_client() -> Client:
-    """Supabase bağlantısı kurar."""
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    
-    if not url or not key:
-        raise ValueError(
-            "Supabase bağlantı bilgileri eksik!\n"
-            "Lütfen SUPABASE_URL ve SUPABASE_KEY çevre değişkenlerini ayarlayın."
-        )
-    
-    return create_client(url, key)
+    """Paylaşılan Supabase client'ını döndürür."""
+    return get_client()
 
 
 def clear_table(table_name: str = "btc_raw_data") -> None:
@@ -50,16 +44,12 @@ def clear_table(table_name: str = "btc_raw_data") -> None:
     """
     supabase = get_supabase_client()
     
-    # Tüm kayıtları al ve sil
+    # Tüm kayıtları tek bir filtreli DELETE isteğiyle sil
     try:
-        # Önce tüm ID'leri al
-        response = supabase.table(table_name).select("id").execute()
+        deleted = bulk_clear(supabase, table_name)
         
-        if response.data and len(response.data) > 0:
-            # Her kaydı sil
-            for row in response.data:
-                supabase.table(table_name).delete().eq('id', row['id']).execute()
-            print(f"🗑️  '{table_name}' tablosundan {len(response.data)} kayıt silindi.")
+        if deleted > 0:
+            print(f"🗑️  '{table_name}' tablosundan {deleted} kayıt silindi.")
         else:
             print(f"ℹ️  '{table_name}' tablosu zaten boş.")
     except Exception as e:
@@ -69,7 +59,7 @@ def clear_table(table_name: str = "btc_raw_data") -> None:
 def save_to_supabase(data: dict, table_name: str = "btc_raw_data") -> dict:
     """
     Ham veriyi Supabase'e kaydeder.
-    Önce tabloyu temizler, sonra yeni veriyi ekler.
+    Sembole göre upsert edilir; geçici hatalarda tekrar denenir.
     
     Args:
         data: Kaydedilecek JSON verisi (tüm mumlar)
@@ -86,15 +76,13 @@ def save_to_supabase(data: dict, table_name: str = "btc_raw_data") -> dict:
     print(f"✅ Supabase bağlantısı başarılı!", flush=True)
     sys.stdout.flush()
     
-    # Önce tabloyu temizle
-    print(f"🗑️  '{table_name}' tablosu temizleniyor...", flush=True)
-    sys.stdout.flush()
-    clear_table(table_name)
-    
-    # Yeni veriyi kaydet
+    # Yeni veriyi kaydet (symbol anahtarlı upsert)
     print(f"💾 Yeni veri '{table_name}' tablosuna kaydediliyor...", flush=True)
     sys.stdout.flush()
-    response = supabase.table(table_name).insert(data).execute()
+    response = execute_with_retries(
+        lambda: supabase.table(table_name).upsert(data, on_conflict="symbol").execute(),
+        label=f"'{table_name}' upsert"
+    )
     print(f"✅ Veri başarıyla kaydedildi! Kayıt sayısı: {len(response.data) if response.data else 0}", flush=True)
     sys.stdout.flush()
     
@@ -132,54 +120,30 @@ def obv(df):
     obv = np.sign(df["close"].diff().fillna(0)) * df["volume"]
     return obv.cumsum()
 
-def detect_pattern(row):
-    body = abs(row["close"] - row["open"])
-    range_ = row["high"] - row["low"]
-    upper_shadow = row["high"] - max(row["close"], row["open"])
-    lower_shadow = min(row["close"], row["open"]) - row["low"]
-
-    if range_ == 0:
-        return "undefined"
-
-    if body / range_ < 0.1:
-        return "doji"
-    elif lower_shadow > 2 * body and upper_shadow < body:
-        return "hammer"
-    elif upper_shadow > 2 * body and lower_shadow < body:
-        return "shooting_star"
-    else:
-        return "normal"
-
-
 # === VERİ ÇEKME === #
 def get_ohlcv_df(symbol, timeframe, limit):
-    # Birden fazla exchange dene (Binance bazı lokasyonları engelliyor)
+    """
+    Birden fazla exchange dener (Binance bazı lokasyonları engelliyor).
+    Erişilemeyen exchange'ler circuit breaker ile atlanır.
+
+    Returns:
+        (DataFrame, veriyi sağlayan exchange id)
+    """
+    # Exchange konfigürasyonları exchanges.EXCHANGE_CONFIGS'te tutulur
     exchanges_to_try = [
-        ("binance", {"options": {"defaultType": "future"}, "enableRateLimit": True}, "BTC/USDT:USDT"),
-        ("okx", {"options": {"defaultType": "swap"}, "enableRateLimit": True}, "BTC/USDT:USDT"),
-        ("bybit", {"enableRateLimit": True}, "BTC/USDT"),  # Bybit için spot market
-        ("kraken", {"enableRateLimit": True}, "BTC/USDT"),
-        ("kucoin", {"enableRateLimit": True}, "BTC/USDT")
+        ("binance", "BTC/USDT:USDT"),
+        ("okx", "BTC/USDT:USDT"),
+        ("bybit", "BTC/USDT"),  # Bybit için spot market
+        ("kraken", "BTC/USDT"),
+        ("kucoin", "BTC/USDT")
     ]
-    
-    last_error = None
-    for exchange_id, config, sym in exchanges_to_try:
-        try:
-            print(f"🔄 {exchange_id} deneniyor...", flush=True)
-            exchange = getattr(ccxt, exchange_id)(config)
-            data = exchange.fetch_ohlcv(sym, timeframe=timeframe, limit=limit + 200)
-            df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-            df.set_index("timestamp", inplace=True)
-            print(f"✅ {exchange_id} başarılı!", flush=True)
-            return df
-        except Exception as e:
-            last_error = e
-            print(f"⚠️ {exchange_id} failed: {str(e)[:150]}", flush=True)
-            continue
-    
-    # Hiçbiri çalışmazsa hata fırlat
-    raise Exception(f"Tüm exchange'ler başarısız oldu. Son hata: {last_error}")
+
+    df, exchange, _ = fetch_with_failover(
+        exchanges_to_try,
+        lambda ex, sym: fetch_ohlcv_cached(ex, sym, timeframe, limit + 200, store=get_default_store()),
+        label=symbol
+    )
+    return df, exchange.id
 
 
 def add_indicators(df):
@@ -199,49 +163,30 @@ def add_indicators(df):
     df["change_pct"] = ((df["close"] - df["open"]) / df["open"]) * 100
     df["above_sma200"] = df["close"] > df["sma200"]
     df["above_ema200"] = df["close"] > df["ema200"]
-    df["pattern"] = df.apply(detect_pattern, axis=1)
+    df["pattern"] = classify_candles(df)
     return df
 
 
-def _f(x):
-    return None if pd.isna(x) else float(x)
+# format_data alan sırası (JSON çıktısındaki anahtar sırası)
+CANDLE_FIELDS = [
+    ("open", "float"), ("high", "float"), ("low", "float"), ("close", "float"), ("volume", "float"),
+    ("sma50", "float"), ("sma100", "float"), ("sma200", "float"),
+    ("ema50", "float"), ("ema100", "float"), ("ema200", "float"),
+    ("rsi14", "float"),
+    ("macd", "float"), ("macd_signal", "float"), ("macd_hist", "float"),
+    ("atr14", "float"),
+    ("obv", "float"),
+    ("change_pct", "float"),
+    ("trend_flags", [("above_sma200", "bool"), ("above_ema200", "bool")]),
+    ("pattern", "raw"),
+]
 
 
 def format_data(df, last_n):
     # En son mumdan başlayarak son N tanesini al
     tail = df.dropna().tail(last_n)
-    candles = []
-    for ts, row in tail.iterrows():
-        # UTC'den Türkiye saatine (UTC+3) çevir
-        tr_time = ts + pd.Timedelta(hours=3)
-        
-        candles.append({
-            "timestamp": tr_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "open": _f(row["open"]),
-            "high": _f(row["high"]),
-            "low": _f(row["low"]),
-            "close": _f(row["close"]),
-            "volume": _f(row["volume"]),
-            "sma50": _f(row["sma50"]),
-            "sma100": _f(row["sma100"]),
-            "sma200": _f(row["sma200"]),
-            "ema50": _f(row["ema50"]),
-            "ema100": _f(row["ema100"]),
-            "ema200": _f(row["ema200"]),
-            "rsi14": _f(row["rsi14"]),
-            "macd": _f(row["macd"]),
-            "macd_signal": _f(row["macd_signal"]),
-            "macd_hist": _f(row["macd_hist"]),
-            "atr14": _f(row["atr14"]),
-            "obv": _f(row["obv"]),
-            "change_pct": _f(row["change_pct"]),
-            "trend_flags": {
-                "above_sma200": bool(row["above_sma200"]),
-                "above_ema200": bool(row["above_ema200"])
-            },
-            "pattern": row["pattern"]
-        })
-    return candles
+    # UTC'den Türkiye saatine (UTC+3) çevir
+    return columnar_records(tail, CANDLE_FIELDS, timestamps=shifted_timestamps(tail.index, hours=3))
 
 
 # === ANA === #
@@ -269,12 +214,13 @@ def main():
         
         print(f"\n🔄 {tf} timeframe ({n} mum - {duration}) işleniyor...")
         
-        df = get_ohlcv_df(symbol, tf, limit=n)
+        df, source_exchange = get_ohlcv_df(symbol, tf, limit=n)
         df = add_indicators(df)
         candles = format_data(df, last_n=n)
         
         result["timeframes"][tf] = {
             "timeframe": tf,
+            "source_exchange": source_exchange,
             "candle_count": n,
             "duration": duration,
             "data": candles
@@ -284,11 +230,10 @@ def main():
     print("\n" + "="*60)
     print("📊 HAM VERİ SONUÇLARI")
     print("="*60)
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(dumps(result, indent=True))
 
     # Dosyaya kaydet
-    with open("btc_data_multi_tf.json", "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    dump_file(result, "btc_data_multi_tf.json")
     print("\n✅ Veriler 'btc_data_multi_tf.json' dosyasına kaydedildi.")
     
     # Supabase'e kaydet
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+recording.py
+Exchange verisinin kaydı ve ağ bağlantısı olmadan tekrar oynatılması.
+
+Bir kayıt, analyze_coin'in bir sembol için okuduğu her şeyi içerir: timeframe
+başına OHLCV satırları, ticker, order book, funding rate, market metadata'sı ve
+kayıt anındaki exchange saati. Kayıtlar tek bir .npz dosyasında saklanır
+(OHLCV dizileri + JSON meta).
+
+ReplayExchange kaydı ccxt senkron API'sinin analyze_coin tarafından kullanılan
+alt kümesiyle sunar (`since`/`limit` ve sayfalama dahil); `replaying` onu
+exchange havuzuna yerleştirir. Böylece analiz ağa çıkmadan, her seferinde
+aynı veriyle çalışır (benchmark ve hata ayıklama için).
+
+Kullanım:
+    python recording.py BTC/USDT:USDT --exchange binance --config 4h=1200,1h=1200,15m=1200 --out btc.npz
+"""
+
+import argparse
+import contextlib
+import json
+import os
+
+import numpy as np
+
+import ccxt
+
+import exchanges
+from candle_store import fetch_rows
+from orderbook import order_book_limit
+
+
+def save_recording(recording: dict, path: str) -> None:
+    """Kaydı .npz dosyasına yazar (OHLCV dizileri + JSON meta)."""
+    meta = {k: v for k, v in recording.items() if k != "ohlcv"}
+    meta["timeframes"] = list(recording["ohlcv"])
+    arrays = {f"ohlcv_{tf}": np.asarray(rows, dtype="float64") for tf, rows in recording["ohlcv"].items()}
+    with open(path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta, default=str)), **arrays)
+
+
+def load_recording(path: str) -> dict:
+    """save_recording ile yazılmış kaydı okur."""
+    with np.load(path, allow_pickle=False) as data:
+        recording = json.loads(str(data["meta"]))
+        recording["ohlcv"] = {tf: data[f"ohlcv_{tf}"] for tf in recording.pop("timeframes")}
+    return recording
+
+
+def record_market(exchange_id: str, symbol: str, config: dict, depth: int = None) -> dict:
+    """
+    Bir sembolün analiz için gereken verisini canlı exchange'ten kaydeder.
+
+    Args:
+        exchange_id: ccxt exchange id
+        symbol: Trading pair
+        config: {timeframe: kaydedilecek mum sayısı}
+        depth: Order book derinliği (None → ORDER_BOOK_LIMIT)
+
+    Returns:
+        Kayıt dict'i (save_recording ile yazılabilir)
+    """
+    exchange = exchanges.get_exchange(exchange_id)
+    ohlcv = {tf: np.asarray(fetch_rows(exchange, symbol, tf, limit), dtype="float64")
+             for tf, limit in config.items()}
+    order_book = exchange.fetch_order_book(symbol, limit=depth or order_book_limit())
+    funding_rate = None
+    if exchange.has.get("fetchFundingRate"):
+        try:
+            funding_rate = exchange.fetch_funding_rate(symbol)
+        except Exception as e:
+            print(f"⚠️ Funding rate kaydedilemedi: {e}")
+    return {
+        "exchange": exchange_id,
+        "symbol": symbol,
+        "server_time": exchange.fetch_time(),
+        "ohlcv": ohlcv,
+        "ticker": exchange.fetch_ticker(symbol),
+        "order_book": {"bids": order_book["bids"], "asks": order_book["asks"]},
+        "funding_rate": funding_rate,
+        "market": exchange.market(symbol),
+    }
+
+
+class ReplayExchange:
+    """Bir kaydı ccxt senkron API'si gibi sunan, ağ isteği yapmayan exchange."""
+
+    def __init__(self, recording: dict):
+        self.recording = recording
+        self.id = recording["exchange"]
+        self.symbol = recording["symbol"]
+        self.markets = {self.symbol: recording["market"]}
+        has_funding = recording.get("funding_rate") is not None
+        self.has = {"fetchFundingRate": has_funding, "fetchTickers": True, "fetchFundingRates": has_funding}
+        self._ohlcv = {tf: np.asarray(rows, dtype="float64") for tf, rows in recording["ohlcv"].items()}
+
+    def _check_symbol(self, symbol: str) -> None:
+        if symbol != self.symbol:
+            raise ccxt.BadSymbol(f"{self.id} kaydında {symbol} yok")
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self._check_symbol(symbol)
+        rows = self._ohlcv.get(timeframe)
+        if rows is None:
+            raise ccxt.BadRequest(f"{self.id} kaydında {timeframe} mumları yok")
+        if since is not None:
+            start = int(np.searchsorted(rows[:, 0], since))
+            rows = rows[start:start + limit] if limit else rows[start:]
+        elif limit:
+            rows = rows[-limit:]
+        return rows.tolist()
+
+    def fetch_ticker(self, symbol):
+        self._check_symbol(symbol)
+        return dict(self.recording["ticker"])
+
+    def fetch_tickers(self, symbols=None):
+        """Kayıtta olmayan semboller (gerçek exchange gibi) sonuçta yer almaz."""
+        if symbols is not None and self.symbol not in symbols:
+            return {}
+        return {self.symbol: self.fetch_ticker(self.symbol)}
+
+    def fetch_order_book(self, symbol, limit=None):
+        self._check_symbol(symbol)
+        book = self.recording["order_book"]
+        return {"bids": book["bids"][:limit], "asks": book["asks"][:limit]}
+
+    def fetch_funding_rate(self, symbol):
+        self._check_symbol(symbol)
+        if self.recording.get("funding_rate") is None:
+            raise ccxt.NotSupported(f"{self.id} kaydında funding rate yok")
+        return dict(self.recording["funding_rate"])
+
+    def fetch_funding_rates(self, symbols=None):
+        if symbols is not None and self.symbol not in symbols:
+            return {}
+        return {self.symbol: self.fetch_funding_rate(self.symbol)}
+
+    def market(self, symbol):
+        self._check_symbol(symbol)
+        return self.markets[symbol]
+
+    def fetch_time(self):
+        return int(self.recording["server_time"])
+
+    def milliseconds(self):
+        """Kayıt anındaki saat (sayfalı çekim planı bu saate göre yapılır)."""
+        return int(self.recording["server_time"])
+
+
+@contextlib.contextmanager
+def replaying(recording: dict, exchange_ids=None):
+    """
+    Blok süresince tüm exchange id'lerini kaydı oynatan ReplayExchange'e yönlendirir.
+
+    Candle store kapatılır, boş bir circuit breaker kullanılır ve saat farkı
+    kayıttaki exchange saatinden ölçülür; çıkışta havuz, breaker ve saat sıfırlanır.
+
+    Yields:
+        ReplayExchange
+    """
+    replay = ReplayExchange(recording)
+    saved_store = os.environ.get("CANDLE_STORE")
+    os.environ["CANDLE_STORE"] = "0"
+    exchanges.reset_pool()
+    for exchange_id in exchange_ids or exchanges.EXCHANGE_CONFIGS:
+        exchanges.install_exchange(exchange_id, replay)
+    exchanges.reset_breaker(exchanges.CircuitBreaker())
+    exchanges.reset_clock()
+    try:
+        yield replay
+    finally:
+        exchanges.reset_pool()
+        exchanges.reset_breaker()
+        exchanges.reset_clock()
+        if saved_store is None:
+            os.environ.pop("CANDLE_STORE", None)
+        else:
+            os.environ["CANDLE_STORE"] = saved_store
+
+
+def parse_config(text: str) -> dict:
+    """"4h=1200,15m=1200" → {"4h": 1200, "15m": 1200}"""
+    config = {}
+    for item in text.split(","):
+        tf, _, count = item.partition("=")
+        config[tf.strip()] = int(count)
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exchange verisini çevrimdışı analiz için kaydeder")
+    parser.add_argument("symbol", help="Trading pair (örn. BTC/USDT:USDT)")
+    parser.add_argument("--exchange", default="binance", help="ccxt exchange id")
+    parser.add_argument("--config", default="4h=1200,1h=1200,15m=1200", help="timeframe=mum sayısı listesi")
+    parser.add_argument("--out", required=True, help="Kayıt dosyası (.npz)")
+    args = parser.parse_args(argv)
+
+    recording = record_market(args.exchange, args.symbol, parse_config(args.config))
+    save_recording(recording, args.out)
+    counts = ", ".join(f"{tf}: {len(rows)}" for tf, rows in recording["ohlcv"].items())
+    print(f"💾 {args.symbol} kaydedildi → {args.out} ({counts})")
+
+
+if __name__ == "__main__":
+    main()
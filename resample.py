@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+resample.py
+Üst timeframe mumlarını (1h, 4h, ...) alt timeframe mumlarından (15m) yerel olarak üretir.
+
+Exchange'ler m/h/d mumlarını UTC epoch'a hizalı açar (4h mumları 00:00, 04:00, ...
+UTC'de başlar), haftalık mumlar pazartesi 00:00 UTC'de. Bir üst mum, aynı aralığa
+düşen alt mumların ilk açılışı, en yüksek/en düşük değeri, son kapanışı ve hacim
+toplamıdır; bu yüzden sonuç exchange'in kendi mumlarıyla aynıdır. Toplama NumPy
+reduceat ile tek geçişte yapılır.
+
+Başta eksik kalan (alt mumları depoda olmayan) üst mum atılır; son mum, alt
+timeframe'in forming mumunu içerdiği için exchange'deki gibi henüz kapanmamıştır.
+"""
+
+import numpy as np
+import pandas as pd
+
+from candle_store import OHLCV_COLUMNS, timeframe_to_ms
+
+
+# Haftalık mumlar pazartesi başlar; 1970-01-01 perşembe olduğu için 4 günlük kaydırma
+WEEK_ORIGIN_MS = 4 * 86_400_000
+
+
+def bar_origin_ms(timeframe: str) -> int:
+    """Timeframe'in mum sınırlarının epoch'a göre kaydırması (ms)."""
+    return WEEK_ORIGIN_MS if timeframe.endswith("w") else 0
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str, base_timeframe: str) -> pd.DataFrame:
+    """
+    Sıralı alt timeframe OHLCV'sini `timeframe` mumlarına toplar.
+
+    Args:
+        df: UTC index'li, open/high/low/close/volume kolonlu DataFrame (base_timeframe)
+        timeframe: Hedef timeframe (örn. "4h")
+        base_timeframe: df'in timeframe'i (örn. "15m")
+
+    Returns:
+        Hedef timeframe'de, aynı kolonlara sahip DataFrame
+    """
+    tf_ms = timeframe_to_ms(timeframe)
+    base_ms = timeframe_to_ms(base_timeframe)
+    if tf_ms % base_ms != 0:
+        raise ValueError(f"{timeframe}, {base_timeframe} mumlarından üretilemez")
+    if df.empty:
+        return df[OHLCV_COLUMNS[1:]].copy()
+
+    origin = bar_origin_ms(timeframe)
+    ts = df.index.as_unit("ms").asi8
+    buckets = (ts - origin) // tf_ms * tf_ms + origin
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+
+    high = df["high"].to_numpy(dtype="float64")
+    low = df["low"].to_numpy(dtype="float64")
+    volume = df["volume"].to_numpy(dtype="float64")
+    out = pd.DataFrame({
+        "open": df["open"].to_numpy(dtype="float64")[starts],
+        "high": np.maximum.reduceat(high, starts),
+        "low": np.minimum.reduceat(low, starts),
+        "close": df["close"].to_numpy(dtype="float64")[ends],
+        "volume": np.add.reduceat(volume, starts),
+    }, index=pd.to_datetime(buckets[starts], unit="ms", utc=True).rename(df.index.name))
+
+    # İlk alt mum üst mumun başında değilse üst mumun başı depoda yok → eksik
+    if ts[0] != buckets[0]:
+        out = out.iloc[1:]
+    return out
+
+
+def plan_resample(limits: dict):
+    """
+    Hangi timeframe'lerin en ince timeframe'den üretileceğini planlar.
+
+    Args:
+        limits: {timeframe: gereken mum sayısı}
+
+    Returns:
+        {"base": en ince timeframe, "base_limit": çekilecek alt mum sayısı,
+         "derived": üretilecek timeframe'ler, "native": ayrıca çekilecekler}
+        ya da üretilebilecek timeframe yoksa None
+    """
+    base = min(limits, key=timeframe_to_ms)
+    base_ms = timeframe_to_ms(base)
+    derived, native = [], []
+    base_limit = limits[base]
+    for tf, count in limits.items():
+        if tf == base:
+            continue
+        ratio, rem = divmod(timeframe_to_ms(tf), base_ms)
+        if rem:
+            native.append(tf)
+            continue
+        derived.append(tf)
+        # +1 üst mum: baştaki eksik mum atılabilir
+        base_limit = max(base_limit, (count + 1) * ratio)
+    if not derived:
+        return None
+    return {"base": base, "base_limit": base_limit, "derived": derived, "native": native}
+
+
+def compare_ohlcv(derived: pd.DataFrame, native: pd.DataFrame, rtol: float = 1e-9,
+                  volume_rtol: float = 1e-6) -> dict:
+    """
+    Yerel üretilen mumları exchange'in kendi mumlarıyla karşılaştırır.
+    Sadece iki tarafta da bulunan kapanmış mumlar (son mum hariç) karşılaştırılır.
+
+    Returns:
+        {"compared", "mismatched", "missing", "max_rel_diff": {kolon: fark}, "ok"}
+    """
+    closed_derived = derived.iloc[:-1]
+    closed_native = native.iloc[:-1]
+    common = closed_derived.index.intersection(closed_native.index)
+    # Üretilen aralık içinde olup yerelde oluşmayan exchange mumları
+    in_span = closed_native.index[(closed_native.index >= closed_derived.index.min())
+                                  & (closed_native.index <= closed_derived.index.max())] \
+        if len(closed_derived) else closed_native.index[:0]
+    missing = int(len(in_span.difference(common)))
+
+    a = closed_derived.loc[common, OHLCV_COLUMNS[1:]].to_numpy(dtype="float64")
+    b = closed_native.loc[common, OHLCV_COLUMNS[1:]].to_numpy(dtype="float64")
+    rel = np.abs(a - b) / np.maximum(np.abs(b), 1e-12)
+    tolerance = np.array([rtol] * 4 + [volume_rtol])
+    bad = (rel > tolerance).any(axis=1)
+
+    max_rel = rel.max(axis=0) if len(common) else np.zeros(len(tolerance))
+    return {
+        "compared": int(len(common)),
+        "mismatched": int(bad.sum()),
+        "missing": missing,
+        "max_rel_diff": {col: float(x) for col, x in zip(OHLCV_COLUMNS[1:], max_rel)},
+        "ok": bool(len(common) > 0 and not bad.any() and missing == 0),
+    }
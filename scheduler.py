@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+scheduler.py
+Daemon modu için mum kapanışlarına hizalı uyanma planı.
+
+Mumlar UTC epoch'a hizalı kapanır (15m → :00/:15/:30/:45, 4h → 00:00, 04:00, ...;
+haftalık mumlar pazartesi 00:00 UTC). Bir sonraki uyanma, izlenen timeframe'lerin
+en yakın kapanışından `delay` saniye sonradır ve sadece o anda kapanan
+timeframe'ler yeniden hesaplanır (örn. 04:00'te 15m + 1h + 4h, 04:15'te sadece 15m).
+"""
+
+from candle_store import timeframe_to_ms
+from resample import bar_origin_ms
+
+
+def next_close_ms(timeframe: str, now_ms: int) -> int:
+    """now_ms'den sonraki (kesin büyük) ilk mum kapanışı (ms)."""
+    tf_ms = timeframe_to_ms(timeframe)
+    origin = bar_origin_ms(timeframe)
+    return ((now_ms - origin) // tf_ms + 1) * tf_ms + origin
+
+
+def closes_at(timeframe: str, boundary_ms: int) -> bool:
+    """boundary_ms anında timeframe'in bir mumu kapanıyor mu?"""
+    return (boundary_ms - bar_origin_ms(timeframe)) % timeframe_to_ms(timeframe) == 0
+
+
+def plan_wakeup(timeframes, now_ms: int, delay: float = 5.0):
+    """
+    Bir sonraki uyanmayı planlar.
+
+    Args:
+        timeframes: İzlenen timeframe'ler
+        now_ms: Şimdiki zaman (ms)
+        delay: Kapanıştan sonra beklenecek süre (saniye; exchange'in mumu kapatması için pay)
+
+    Returns:
+        (wake_ms, boundary_ms, kapanan timeframe listesi - verilen sırayla)
+    """
+    delay_ms = int(delay * 1000)
+    # Kapanıştan sonraki bekleme süresi içindeysek o kapanış henüz işlenmedi
+    boundary = min(next_close_ms(tf, now_ms - delay_ms) for tf in timeframes)
+    closed = [tf for tf in timeframes if closes_at(tf, boundary)]
+    return boundary + delay_ms, boundary, closed
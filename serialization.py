@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+serialization.py
+Kolon bazlı (iterrows'suz) mum serileştirme ve hızlı JSON encoder.
+
+Mum listeleri satır satır değil kolon kolon kurulur: her kolon tek seferde
+Python nesnelerine çevrilir (NaN → None dahil), satırlar en son zip ile
+birleştirilir. Böylece on binlerce mum milisaniyeler içinde serileştirilir.
+
+JSON encoder: orjson kuruluysa onu kullanır, değilse standart json'a düşer.
+JSON_ENCODER=json ile standart kütüphane zorlanabilir.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # opsiyonel bağımlılık
+    orjson = None
+
+
+# =========================
+#   KOLON DÖNÜŞÜMLERİ
+# =========================
+def _float_column(df: pd.DataFrame, name: str) -> list:
+    """float kolon → [float | None]; kolon yoksa hepsi None"""
+    if name not in df.columns:
+        return [None] * len(df)
+    arr = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype="float64")
+    out = arr.astype(object)
+    out[np.isnan(arr)] = None
+    return out.tolist()
+
+
+def _bool_column(df: pd.DataFrame, name: str) -> list:
+    """bool kolon → [bool | None]; kolon yoksa hepsi None"""
+    if name not in df.columns:
+        return [None] * len(df)
+    col = df[name]
+    if col.dtype == bool:
+        return col.tolist()
+    missing = col.isna().to_numpy()
+    out = col.to_numpy(dtype=object, copy=True)
+    out[~missing] = col[~missing].astype(bool).to_numpy()
+    out[missing] = None
+    return out.tolist()
+
+
+def _raw_column(df: pd.DataFrame, name: str) -> list:
+    """Kolonu olduğu gibi (kategorik → str) listeye çevirir; NaN → None"""
+    if name not in df.columns:
+        return [None] * len(df)
+    out = df[name].to_numpy(dtype=object, copy=True)
+    out[pd.isna(out)] = None
+    return out.tolist()
+
+
+_CONVERTERS = {
+    "float": _float_column,
+    "bool": _bool_column,
+    "raw": _raw_column,
+}
+
+
+def iso_timestamps(index: pd.DatetimeIndex) -> list:
+    """
+    Timestamp.isoformat() ile aynı çıktıyı (UTC için "Z" soneki) vektörel üretir.
+    Nanosaniye bileşeni veya UTC dışı saat dilimi varsa satır bazlı yola düşer.
+    """
+    if len(index) == 0:
+        return []
+    is_utc = index.tz is not None and str(index.tz) == "UTC"
+    if (index.tz is not None and not is_utc) or (index.nanosecond != 0).any():
+        return [ts.isoformat().replace("+00:00", "Z") for ts in index]
+
+    # DatetimeIndex.strftime eleman eleman çalışır; datetime_as_string C'de vektöreldir
+    values = index.tz_localize(None).values if is_utc else index.values
+    out = np.datetime_as_string(values, unit="s").astype(object)
+    micro = index.microsecond != 0
+    if micro.any():
+        # isoformat mikrosaniyeyi yalnızca sıfır değilse yazar
+        out[micro] = np.datetime_as_string(values[micro], unit="us")
+    if is_utc:
+        out = out + "Z"
+    return out.tolist()
+
+
+def shifted_timestamps(index: pd.DatetimeIndex, hours: float) -> list:
+    """Index'i `hours` saat kaydırıp (örn. UTC → UTC+3) "YYYY-MM-DD HH:MM:SS" olarak biçimlendirir."""
+    if len(index) == 0:
+        return []
+    shifted = index + pd.Timedelta(hours=hours)
+    values = shifted.tz_localize(None).values if shifted.tz is not None else shifted.values
+    return np.char.replace(np.datetime_as_string(values, unit="s"), "T", " ").tolist()
+
+
+def columnar_records(df: pd.DataFrame, fields: list, timestamps: list = None) -> list:
+    """
+    DataFrame'i kolon bazlı olarak dict listesine çevirir.
+
+    Args:
+        df: Kaynak DataFrame
+        fields: (anahtar, tür) listesi; tür "float" | "bool" | "raw" ya da
+                iç içe dict için yine (anahtar, tür) listesi
+        timestamps: Verilirse her kaydın başına "timestamp" olarak eklenir
+
+    Returns:
+        Alan sırası `fields` ile aynı olan dict listesi
+    """
+    keys, columns = [], []
+    if timestamps is not None:
+        keys.append("timestamp")
+        columns.append(timestamps)
+    for key, kind in fields:
+        keys.append(key)
+        if isinstance(kind, list):
+            columns.append(columnar_records(df, kind))
+        else:
+            columns.append(_CONVERTERS[kind](df, key))
+    return [dict(zip(keys, values)) for values in zip(*columns)] if columns else []
+
+
+# =========================
+#      JSON ENCODER
+# =========================
+def _use_orjson() -> bool:
+    return orjson is not None and os.getenv("JSON_ENCODER", "orjson").lower() != "json"
+
+
+def _default(obj):
+    """numpy skalerleri ve Timestamp'ler için standart json yedeği"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_bytes(obj, indent: bool = False) -> bytes:
+    """obj'yi UTF-8 JSON byte'larına çevirir (orjson varsa onunla)."""
+    if _use_orjson():
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def dumps(obj, indent: bool = False) -> str:
+    """dumps_bytes'ın str döndüren hali."""
+    return dumps_bytes(obj, indent=indent).decode("utf-8")
+
+
+def dump_file(obj, path: str, indent: bool = True) -> None:
+    """obj'yi JSON olarak dosyaya yazar."""
+    with open(path, "wb") as f:
+        f.write(dumps_bytes(obj, indent=indent))
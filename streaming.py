@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+streaming.py
+Binance Futures WebSocket akışlarından canlı mum, mark price ve book ticker alımı.
+
+REST ile çekilen geçmiş (seed) üzerine kline akışı forming mumu gerçek zamanlı
+günceller; kapanan mumlar bellek deposuna (MemoryCandleStore) yazılır. Mark price
+(funding dahil) ve en iyi bid/ask ayrı akışlardan tutulur.
+
+LiveMarket.snapshot(symbol, timeframe) o anki mumları (kapanmamış son mum dahil)
+DataFrame olarak döndürür; qwen3.timeframe_summary / analyze_timeframe bunu REST
+verisi gibi tüketir. Artımlı indikatör motoru depoda (exchange, symbol, timeframe)
+anahtarıyla tutulduğu için her snapshot'ta sadece yeni kapanan mumlar işlenir,
+forming mumun indikatörleri önizleme olarak hesaplanır.
+
+Akış protokolü (combined stream):
+    → {"method": "SUBSCRIBE", "params": ["btcusdt@kline_15m", ...], "id": 1}
+    ← {"stream": "btcusdt@kline_15m", "data": {"e": "kline", "k": {...}}}
+
+Testler ağ olmadan ws_stub.BinanceStreamStub'a bağlanır.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from candle_store import OHLCV_COLUMNS, frame_to_rows, ohlcv_to_frame, timeframe_to_ms
+
+
+BINANCE_FUTURES_WS = "wss://fstream.binance.com/stream"
+
+# Bağlantı başına abonelik sınırı (Binance: 200 akış)
+MAX_STREAMS_PER_CONNECTION = 200
+
+Snapshot = namedtuple("Snapshot", ["frame", "quote", "updated_ms", "forming"])
+
+
+def stream_symbol(symbol: str) -> str:
+    """"BTC/USDT:USDT" → "btcusdt" (akış adlarındaki sembol)."""
+    return symbol.split(":")[0].replace("/", "").lower()
+
+
+def stream_names(symbols, timeframes) -> list:
+    """Pariteler için kline (timeframe başına), mark price ve book ticker akış adları."""
+    names = []
+    for symbol in symbols:
+        base = stream_symbol(symbol)
+        names += [f"{base}@kline_{tf}" for tf in timeframes]
+        names += [f"{base}@markPrice@1s", f"{base}@bookTicker"]
+    return names
+
+
+class _Bars:
+    """Bir (symbol, timeframe) için sabit kapasiteli OHLCV dizisi; forming mum yerinde güncellenir."""
+
+    def __init__(self, rows: np.ndarray, capacity: int):
+        self.capacity = max(capacity, len(rows))
+        self.rows = np.empty((self.capacity, len(OHLCV_COLUMNS)), dtype="float64")
+        self.n = len(rows)
+        self.rows[:self.n] = rows
+
+    @property
+    def last_ms(self):
+        return int(self.rows[self.n - 1, 0]) if self.n else None
+
+    def upsert(self, row) -> str:
+        """Mumu yazar: "update" (forming), "append" (yeni mum) ya da "stale" (eski mesaj)."""
+        last = self.last_ms
+        if last is not None and row[0] < last:
+            return "stale"
+        if last is not None and row[0] == last:
+            self.rows[self.n - 1] = row
+            return "update"
+        if self.n == self.capacity:
+            # Yarısını at: her mumda kaydırma yerine kapasite başına bir kopya
+            keep = self.capacity // 2
+            self.rows[:keep] = self.rows[self.n - keep:self.n]
+            self.n = keep
+        self.rows[self.n] = row
+        self.n += 1
+        return "append"
+
+    def frame(self, limit: int = None) -> pd.DataFrame:
+        start = 0 if limit is None else max(0, self.n - limit)
+        return ohlcv_to_frame(self.rows[start:self.n].copy())
+
+
+class LiveMarket:
+    """Akış mesajlarıyla güncellenen canlı piyasa durumu (mumlar + mark price + bid/ask)."""
+
+    def __init__(self, exchange_id: str = "binance", store=None, max_rows: int = 5000):
+        self.exchange_id = exchange_id
+        self.store = store
+        self.max_rows = max_rows
+        self.bars = {}      # (symbol, timeframe) -> _Bars
+        self.closed = {}    # (symbol, timeframe) -> son kapanmış mumun timestamp'i (ms)
+        self.quotes = {}    # symbol -> mark price / funding / bid / ask
+        self.updated = {}   # (symbol, timeframe) veya symbol -> son güncelleme (exchange ms)
+        self.gaps = set()   # mesaj kaçırılmış (symbol, timeframe): REST ile tekrar seed edilmeli
+        self.messages = 0
+        self.last_event_ms = None
+        self._symbols = {}  # "btcusdt" -> "BTC/USDT:USDT"
+        self._received_at = None
+        self._lock = threading.Lock()  # akış thread'i yazar, analiz thread'i okur
+
+    # -------------------------
+    #   Seed ve mesajlar
+    # -------------------------
+    def seed(self, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        """REST ile çekilmiş geçmişi yükler; akışta daha yeni mum varsa korunur."""
+        key = (symbol, timeframe)
+        rows = frame_to_rows(df)
+        with self._lock:
+            self._symbols[stream_symbol(symbol)] = symbol
+            self._seed(key, rows)
+
+    def _seed(self, key: tuple, rows: np.ndarray) -> None:
+        current = self.bars.get(key)
+        if current is not None and current.n:
+            newer = current.rows[:current.n][current.rows[:current.n, 0] > rows[-1, 0]]
+            rows = np.vstack([rows, newer])
+        self.bars[key] = _Bars(rows[-self.max_rows:], capacity=self.max_rows * 2)
+        self.gaps.discard(key)
+
+    def apply(self, message: dict):
+        """
+        Tek akış mesajını uygular (combined envelope ya da ham event).
+
+        Returns:
+            ("kline"|"markPrice"|"bookTicker", symbol) veya tanınmıyorsa None
+        """
+        data = message.get("data", message)
+        with self._lock:
+            return self._apply(data)
+
+    def _apply(self, data: dict):
+        event = data.get("e")
+        symbol = self._symbols.get(str(data.get("s", "")).lower())
+        if symbol is None:
+            return None
+        self.messages += 1
+        event_ms = data.get("E") or data.get("T")
+        if event_ms:
+            self.last_event_ms = int(event_ms)
+            self._received_at = time.time()
+
+        if event == "kline":
+            self._apply_kline(symbol, data["k"])
+            return "kline", symbol
+        if event == "markPriceUpdate":
+            quote = self.quotes.setdefault(symbol, {})
+            quote.update({
+                "mark_price": float(data["p"]),
+                "index_price": float(data["i"]) if data.get("i") else None,
+                "funding_rate": float(data["r"]) if data.get("r") not in (None, "") else None,
+                "next_funding_time": int(data["T"]) if data.get("T") else None,
+            })
+            self.updated[symbol] = self.last_event_ms
+            return "markPrice", symbol
+        if event == "bookTicker" or {"b", "a", "B", "A"} <= data.keys():
+            quote = self.quotes.setdefault(symbol, {})
+            quote.update({"bid": float(data["b"]), "bid_qty": float(data["B"]),
+                          "ask": float(data["a"]), "ask_qty": float(data["A"])})
+            self.updated[symbol] = self.last_event_ms
+            return "bookTicker", symbol
+        return None
+
+    def _apply_kline(self, symbol: str, k: dict) -> None:
+        timeframe = k["i"]
+        key = (symbol, timeframe)
+        bars = self.bars.get(key)
+        if bars is None:
+            return  # seed edilmemiş timeframe (geçmiş olmadan indikatör üretilemez)
+        row = (float(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+        last = bars.last_ms
+        if last is not None and row[0] > last + timeframe_to_ms(timeframe):
+            # Arada mum kaçırıldı (örn. yeniden bağlanma): REST ile doldurulana kadar işaretle
+            self.gaps.add(key)
+        if bars.upsert(row) == "stale":
+            return
+        self.updated[key] = self.last_event_ms
+        if k.get("x"):
+            self.closed[key] = int(row[0])
+            if self.store is not None:
+                self.store.save(self.exchange_id, symbol, timeframe, bars.frame())
+
+    # -------------------------
+    #   Snapshot API
+    # -------------------------
+    def now_ms(self) -> int:
+        """Exchange saati: son event zamanı + o zamandan beri geçen yerel süre."""
+        if self.last_event_ms is None:
+            return int(time.time() * 1000)
+        return self.last_event_ms + int((time.time() - self._received_at) * 1000)
+
+    def age_ms(self, symbol: str, timeframe: str):
+        """(symbol, timeframe) mumunun son akış güncellemesinden beri geçen süre (ms); seed'den beri hiç güncellenmediyse None."""
+        with self._lock:
+            updated = self.updated.get((symbol, timeframe))
+        return None if updated is None else self.now_ms() - updated
+
+    def frame(self, symbol: str, timeframe: str, limit: int = None) -> pd.DataFrame:
+        """Kapanmamış son mum dahil OHLCV (timeframe_summary'nin beklediği format)."""
+        with self._lock:
+            return self.bars[(symbol, timeframe)].frame(limit)
+
+    def quote(self, symbol: str) -> dict:
+        with self._lock:
+            return dict(self.quotes.get(symbol, {}))
+
+    def snapshot(self, symbol: str, timeframe: str, limit: int = None) -> Snapshot:
+        """
+        Anlık görüntü: mumlar, mark/bid/ask, son güncelleme zamanı ve son mumun
+        henüz kapanmamış olup olmadığı.
+        """
+        key = (symbol, timeframe)
+        frame = self.frame(symbol, timeframe, limit)
+        last_ms = int(frame.index[-1].value // 1_000_000) if len(frame) else None
+        forming = last_ms is not None and self.closed.get(key) != last_ms \
+            and last_ms + timeframe_to_ms(timeframe) > self.now_ms()
+        return Snapshot(frame, self.quote(symbol), self.updated.get(key), forming)
+
+
+# =========================
+#      AKIŞ İSTEMCİSİ
+# =========================
+async def stream_market(market: LiveMarket, streams: list, url: str = BINANCE_FUTURES_WS,
+                        stop: asyncio.Event = None, reconnect_delay: float = 1.0,
+                        max_reconnect_delay: float = 30.0, on_connect=None) -> None:
+    """
+    Akışlara abone olur ve mesajları market'e uygular; bağlantı koparsa üstel
+    bekleme ile yeniden bağlanır. stop set edilene kadar çalışır.
+
+    Args:
+        on_connect: Her (yeniden) bağlantıda çağrılır (örn. kaçırılan mumları REST ile doldurmak için)
+    """
+    import aiohttp
+
+    stop = stop or asyncio.Event()
+    delay = reconnect_delay
+    async with aiohttp.ClientSession() as session:
+        while not stop.is_set():
+            try:
+                async with session.ws_connect(url, heartbeat=30) as ws:
+                    for i in range(0, len(streams), MAX_STREAMS_PER_CONNECTION):
+                        await ws.send_json({"method": "SUBSCRIBE", "id": i + 1,
+                                            "params": streams[i:i + MAX_STREAMS_PER_CONNECTION]})
+                    print(f"📡 Akış bağlandı: {len(streams)} abonelik", flush=True)
+                    delay = reconnect_delay
+                    if on_connect is not None:
+                        on_connect()
+                    await _receive(ws, market, stop)
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                print(f"⚠️ Akış bağlantı hatası: {str(e)[:150]}", flush=True)
+            if stop.is_set():
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, max_reconnect_delay)
+
+
+async def _receive(ws, market: LiveMarket, stop: asyncio.Event) -> None:
+    import aiohttp
+
+    stop_task = asyncio.ensure_future(stop.wait())
+    try:
+        while not stop.is_set():
+            receive = asyncio.ensure_future(ws.receive())
+            done, _ = await asyncio.wait({receive, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+            if receive not in done:
+                receive.cancel()
+                return
+            msg = receive.result()
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                return  # kapandı / hata: dış döngü yeniden bağlanır
+            payload = json.loads(msg.data)
+            if "result" in payload and "id" in payload:
+                continue  # abonelik onayı
+            market.apply(payload)
+    finally:
+        stop_task.cancel()
+
+
+class StreamThread:
+    """
+    stream_market'i kendi event loop'unda arka plan thread'inde çalıştırır;
+    senkron analiz döngüsü bu sırada market.snapshot ile okur.
+    """
+
+    def __init__(self, market: LiveMarket, streams: list, url: str = BINANCE_FUTURES_WS, **kwargs):
+        self.market = market
+        self.streams = streams
+        self.url = url
+        self.kwargs = kwargs
+        self._loop = None
+        self._stop = None
+        self._thread = None
+
+    def start(self) -> "StreamThread":
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._stop = asyncio.Event()
+            started.set()
+            try:
+                self._loop.run_until_complete(
+                    stream_market(self.market, self.streams, url=self.url, stop=self._stop, **self.kwargs))
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="stream", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout=timeout)
+        self._thread = None
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+supabase_store.py
+qwen3.py ve qwen3_AllData.py için ortak Supabase yazma katmanı.
+
+- Tek, uzun ömürlü Supabase client'ı (get_client)
+- Sembol anahtarlı upsert: tabloyu önce boşaltmaya gerek kalmaz, yarıda kalan
+  bir yazma tabloyu boş bırakmaz
+- Parçalı (chunk) yazma ve geçici hatalarda üstel geri çekilmeli tekrar
+- SupabaseWriter: analiz biten coin'i arka planda hemen yazar, böylece
+  kalıcılaştırma hesaplamayla örtüşür
+
+Çevre değişkenleri:
+    SUPABASE_CHUNK_SIZE   → tek istekte yazılacak maksimum satır (varsayılan 20)
+    SUPABASE_RETRIES      → geçici hatada tekrar sayısı (varsayılan 3)
+    SUPABASE_RETRY_DELAY  → ilk bekleme süresi, saniye (varsayılan 0.5; her denemede 2 katı)
+
+supabase / httpx / postgrest ilk kullanımda import edilir (client oluşturma, hata sınıflandırma).
+"""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+
+import perf
+
+
+DEFAULT_CHUNK_SIZE = 20
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 8.0
+
+# PostgREST'in veritabanına ulaşamadığı / zaman aşımı durumları (tekrar denenebilir)
+TRANSIENT_API_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "57014", "40001", "40P01"}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+# =========================
+#   CLIENT
+# =========================
+def get_client():
+    """
+    Paylaşılan Supabase client'ını döndürür (ilk çağrıda oluşturulur).
+    Çevre değişkenlerinden SUPABASE_URL ve SUPABASE_KEY okur.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_KEY")
+
+            if not url or not key:
+                raise ValueError(
+                    "Supabase bağlantı bilgileri eksik!\n"
+                    "Lütfen SUPABASE_URL ve SUPABASE_KEY çevre değişkenlerini ayarlayın."
+                )
+
+            from supabase import create_client
+
+            _client = create_client(url, key)
+        return _client
+
+
+def reset_client() -> None:
+    """Paylaşılan client'ı unutur (testler ve yeniden yapılandırma için)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+# =========================
+#   TEKRAR DENEME
+# =========================
+def is_transient(exc: Exception) -> bool:
+    """Ağ hatası, 5xx/429 veya PostgREST bağlantı hatası ise True."""
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, APIError):
+        code = exc.code
+        # JSON olmayan cevaplarda postgrest-py HTTP durum kodunu koyar
+        if isinstance(code, int) or (isinstance(code, str) and len(code) == 3 and code.isdigit()):
+            status = int(code)
+            return status >= 500 or status == 429
+        return code in TRANSIENT_API_CODES
+    return False
+
+
+def execute_with_retries(operation, retries: int = None, base_delay: float = None, label: str = "Supabase"):
+    """
+    operation()'ı çalıştırır; geçici hatalarda üstel geri çekilmeyle tekrar dener.
+
+    Args:
+        operation: Parametresiz çağrılabilir (örn. lambda: builder.execute())
+        retries: Maksimum tekrar sayısı (None → SUPABASE_RETRIES)
+        base_delay: İlk bekleme süresi (None → SUPABASE_RETRY_DELAY)
+    """
+    if retries is None:
+        retries = int(os.getenv("SUPABASE_RETRIES", DEFAULT_RETRIES))
+    if base_delay is None:
+        base_delay = float(os.getenv("SUPABASE_RETRY_DELAY", DEFAULT_RETRY_DELAY))
+
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except Exception as e:
+            if attempt >= retries or not is_transient(e):
+                raise
+            delay = min(base_delay * (2 ** attempt), MAX_RETRY_DELAY)
+            attempt += 1
+            print(f"🔁 {label} geçici hata, {delay:.1f}s sonra tekrar ({attempt}/{retries}): {str(e)[:100]}")
+            time.sleep(delay)
+
+
+# =========================
+#   YAZMA İŞLEMLERİ
+# =========================
+def bulk_clear(client, table_name: str, key_column: str = "id") -> int:
+    """
+    Tablodaki tüm satırları tek bir filtreli DELETE isteğiyle siler.
+
+    PostgREST filtresiz DELETE'i reddeder; BIGSERIAL id kolonunda `id >= 0`
+    filtresi tüm satırları kapsar. Silinen satırlar geri döndürülmez
+    (return=minimal), sayı Content-Range başlığından okunur.
+
+    Returns:
+        Silinen satır sayısı
+    """
+    response = (
+        client.table(table_name)
+        .delete(count="exact", returning="minimal")
+        .gte(key_column, 0)
+        .execute()
+    )
+    return response.count or 0
+
+
+def upsert_rows(client, table_name: str, rows: list, on_conflict: str = "symbol",
+                chunk_size: int = None, retries: int = None, base_delay: float = None) -> int:
+    """
+    Satırları `on_conflict` kolonuna göre upsert eder (varsa günceller, yoksa ekler).
+
+    Args:
+        chunk_size: Tek istekteki maksimum satır (None → SUPABASE_CHUNK_SIZE, 0 → tek istek)
+
+    Returns:
+        Yazılan satır sayısı
+    """
+    if chunk_size is None:
+        chunk_size = int(os.getenv("SUPABASE_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+    step = chunk_size if chunk_size and chunk_size > 0 else max(len(rows), 1)
+
+    written = 0
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        execute_with_retries(
+            lambda: client.table(table_name)
+            .upsert(chunk, on_conflict=on_conflict, returning="minimal")
+            .execute(),
+            retries=retries, base_delay=base_delay, label=f"'{table_name}' upsert"
+        )
+        written += len(chunk)
+    return written
+
+
+def prune_rows(client, table_name: str, keep: list, key_column: str = "symbol") -> int:
+    """
+    `key_column` değeri `keep` listesinde olmayan satırları tek istekle siler
+    (artık analiz edilmeyen coinlerin eski kayıtları).
+
+    Returns:
+        Silinen satır sayısı
+    """
+    if not keep:
+        return 0
+    response = execute_with_retries(
+        lambda: client.table(table_name)
+        .delete(count="exact", returning="minimal")
+        .not_.in_(key_column, list(keep))
+        .execute(),
+        label=f"'{table_name}' temizlik"
+    )
+    return response.count or 0
+
+
+# =========================
+#   ARKA PLAN YAZICI
+# =========================
+class SupabaseWriter:
+    """
+    Kuyruğa eklenen satırları ayrı bir thread'de upsert eder.
+
+    submit() hemen döner; thread kuyrukta biriken satırları (en fazla
+    chunk_size) tek istekte yazar. close() kuyruğu boşaltıp bekler.
+
+    Kullanım:
+        writer = SupabaseWriter(client, "crypto_analysis").start()
+        writer.submit(analysis_data)
+        written, failed = writer.close()
+    """
+
+    _STOP = object()
+
+    def __init__(self, client, table_name: str, on_conflict: str = "symbol",
+                 chunk_size: int = None, retries: int = None, base_delay: float = None):
+        if chunk_size is None:
+            chunk_size = int(os.getenv("SUPABASE_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+        self.client = client
+        self.table_name = table_name
+        self.on_conflict = on_conflict
+        self.chunk_size = chunk_size if chunk_size > 0 else 1_000_000
+        self.retries = retries
+        self.base_delay = base_delay
+        self.written = []   # başarıyla yazılan anahtarlar
+        self.failed = {}    # anahtar -> hata mesajı
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self) -> "SupabaseWriter":
+        # Yazıcı thread'i başlatanın perf trace'ine span ekler
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run,), name="supabase-writer",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, row: dict) -> None:
+        """Satırı yazma kuyruğuna ekler (thread-safe, bloklamaz)."""
+        self._queue.put(row)
+
+    def close(self) -> tuple:
+        """
+        Kuyruktaki tüm satırlar yazılana kadar bekler.
+
+        Returns:
+            (written, failed) - yazılan anahtar listesi ve {anahtar: hata} sözlüğü
+        """
+        self._queue.put(self._STOP)
+        self._thread.join()
+        return self.written, self.failed
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            # O an kuyrukta bekleyenleri aynı isteğe ekle
+            while len(batch) < self.chunk_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        keys = [row.get(self.on_conflict) for row in batch]
+        try:
+            with perf.span("supabase_write", rows=len(batch)):
+                upsert_rows(self.client, self.table_name, batch, on_conflict=self.on_conflict,
+                            chunk_size=0, retries=self.retries, base_delay=self.base_delay)
+            self.written.extend(keys)
+            print(f"💾 {len(batch)} kayıt '{self.table_name}' tablosuna yazıldı: {', '.join(map(str, keys))}")
+        except Exception as e:
+            for key in keys:
+                self.failed[key] = str(e)
+            print(f"❌ '{self.table_name}' yazma hatası ({', '.join(map(str, keys))}): {str(e)[:150]}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_backtest.py
+Bar başına giriş sinyallerinin scalping_signals ile aynı olduğunu ve geri test
+simülasyonunun çıkışları, komisyonları ve istatistikleri doğru hesapladığını test eder
+"""
+
+import numpy as np
+import pandas as pd
+
+import indicator_block as kernels
+import qwen3
+from backtest import backtest, fees_from_market_info, simulate, trade_stats
+from benchmark import make_data
+
+
+def test_entry_frame_matches_scalping_signals_on_every_bar():
+    """Her bar, o bara kadar kesilmiş frame'de scalping_signals'ın bulduğu girişleri vermeli"""
+    df = qwen3.indicator_set(make_data(1500)).frame(qwen3.SCALPING_COLUMNS)
+    entries = qwen3.scalping_signal_frame(df)
+    fired = 0
+    for t in range(10, len(df), 3):
+        expected = qwen3.scalping_signals(df.iloc[max(0, t - 49):t + 1])
+        row = entries.iloc[t]
+        assert [name for name in qwen3.SCALPING_ENTRY_SIGNALS if row[name]] == expected["entry_opportunities"]
+        assert row["confidence_score"] == expected.get("confidence_score", 0)
+        fired += bool(expected["entry_opportunities"])
+    assert fired > 50
+
+    # Kayan VWAP, her bardaki son `window` mumun kümülatif VWAP'ı olmalı
+    cols = [df[c].to_numpy(dtype="float64") for c in ("high", "low", "close", "volume")]
+    rolling = kernels.rolling_vwap(*cols, 400)
+    for t in (5, 399, 400, 1234):
+        window = [c[max(0, t - 399):t + 1] for c in cols]
+        assert np.isclose(rolling[t], kernels.vwap(*window)[-1])
+
+    # Çoklu sembol: toplam işlem sayısı sembollerin toplamı olmalı, komisyonlar market_info'dan
+    frames = {}
+    for i, symbol in enumerate(["BTC/USDT:USDT", "ETH/USDT:USDT"]):
+        frame = make_data(3000, seed=i)
+        frame.index = pd.date_range("2025-01-01", periods=len(frame), freq="15min", tz="UTC")
+        frames[symbol] = frame
+    report = backtest(frames, {"BTC/USDT:USDT": {"taker_fee": 0.04, "maker_fee": 0.0}})
+    assert report["symbols"]["BTC/USDT:USDT"]["fees"] == {"taker": 0.0004, "maker": 0.0}
+    assert report["symbols"]["ETH/USDT:USDT"]["fees"] == {"taker": 0.0005, "maker": 0.0002}
+    for rule, stats in report["total"]["rules"].items():
+        assert stats["trades"] == sum(s["rules"][rule]["trades"] for s in report["symbols"].values()) > 0
+
+
+def test_simulate_exits_fees_and_statistics():
+    """TP/SL/süre çıkışları, aynı barda stop önceliği, çakışan girişler ve metrikler elle hesaplananla aynı olmalı"""
+    n = 30
+    ohlc = {"open": np.full(n, 100.0), "high": np.full(n, 100.5), "low": np.full(n, 99.5), "close": np.full(n, 100.0)}
+    ohlc["high"][4] = 102.5                       # bar 2 sinyali → bar 4'te TP (102)
+    ohlc["low"][11] = 98.5                        # bar 10 sinyali → giriş barında SL (99)
+    ohlc["high"][16], ohlc["low"][16] = 103, 98   # bar 15: aynı barda ikisi → stop
+    ohlc["close"][23] = 100.4                     # bar 20: süre dolunca kapanış
+    ohlc["low"][26] = 97.5                        # short: bar 25 sinyali → TP (98)
+    atr = np.ones(n)
+    signal = np.zeros(n, dtype=bool)
+    signal[[2, 3, 10, 15, 20, 28]] = True         # 3 açık pozisyonla çakışır, 28 geçmişin sonunda
+
+    taker, maker = fees_from_market_info({"taker_fee": 0.05, "maker_fee": 0.02})
+    assert (taker, maker) == (0.0005, 0.0002)
+    trades = simulate(ohlc, signal, 1, atr, taker, maker, hold=3, tp_atr=2, sl_atr=1)
+    assert trades["entry"].tolist() == [3, 11, 16, 21]
+    assert trades["exit"].tolist() == [4, 11, 16, 23]
+    assert trades["reason"].tolist() == [0, 1, 1, 2]
+    assert np.allclose(trades["net"], [0.02 - 0.0007, -0.011, -0.011, 0.004 - 0.001])
+
+    stats = trade_stats({"exit_time": trades["exit"], "net": trades["net"], "reason": trades["reason"],
+                         "bars": trades["exit"] - trades["entry"] + 1})
+    assert stats == {"trades": 4, "hit_rate_pct": 50.0, "expectancy_pct": 0.0075, "avg_win_pct": 1.115,
+                     "avg_loss_pct": -1.1, "profit_factor": 1.014, "total_return_pct": 0.03,
+                     "max_drawdown_pct": 2.2, "avg_bars_held": 1.75,
+                     "exits": {"take_profit": 1, "stop_loss": 2, "time": 1}}
+
+    short_signal = np.zeros(n, dtype=bool)
+    short_signal[25] = True
+    short = simulate(ohlc, short_signal, -1, atr, taker, maker, hold=3, tp_atr=2, sl_atr=1)
+    assert short["reason"].tolist() == [0] and np.allclose(short["gross"], [0.02])
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_benchmark.py
+Benchmark raporunun baseline karşılaştırmasını test eder
+"""
+
+import json
+
+import benchmark
+from benchmark import compare_reports, main
+
+
+def test_compare_reports_flags_regressions():
+    """Tolerans üstü yavaşlama gerileme sayılmalı; gürültü seviyesindeki ölçümler atlanmalı"""
+    baseline = {"results": {
+        "indicators": [{"name": "rsi", "n": 1000, "seconds": 0.010},
+                       {"name": "sma", "n": 1000, "seconds": 0.0001}],
+        "lazy": [{"name": "timeframe_summary_4h", "n": 1000, "seconds": 0.02, "columns": 8,
+                  "reference_seconds": 0.03}],
+    }}
+    report = {"results": {
+        "indicators": [{"name": "rsi", "n": 1000, "seconds": 0.014},
+                       {"name": "sma", "n": 1000, "seconds": 0.0009},
+                       {"name": "rsi", "n": 5000, "seconds": 0.5}],
+        "lazy": [{"name": "timeframe_summary_4h", "n": 1000, "seconds": 0.021, "columns": 8,
+                  "reference_seconds": 0.5}],
+    }}
+    rows = compare_reports(report, baseline, tolerance=0.25)
+    assert [(r["name"], r["n"], r["regression"]) for r in rows] == \
+        [("rsi", 1000, True), ("timeframe_summary_4h", 1000, False)]
+    assert not any(r["regression"] for r in compare_reports(report, baseline, tolerance=0.5))
+
+
+def test_cli_writes_report_and_fails_on_regression(tmp_path, monkeypatch):
+    """--json raporu yazmalı; baseline'dan yavaş ölçüm çıkış kodu 1 vermeli"""
+    seconds = {"value": 0.010}
+    monkeypatch.setitem(benchmark.BENCHMARKS, "fake",
+                        lambda sizes: [{"name": "fake", "n": n, "seconds": seconds["value"]} for n in sizes])
+
+    baseline = tmp_path / "baseline.json"
+    assert main(["fake", "--sizes", "200,1000", "--json", str(baseline)]) == 0
+    report = json.loads(baseline.read_text())
+    assert [r["n"] for r in report["results"]["fake"]] == [200, 1000]
+    assert report["meta"]["numpy"] and report["sizes"] == [200, 1000]
+
+    seconds["value"] = 0.011
+    assert main(["fake", "--sizes", "200", "--baseline", str(baseline)]) == 0
+    seconds["value"] = 0.020
+    assert main(["fake", "--sizes", "200", "--baseline", str(baseline)]) == 1
+    assert main(["fake", "--sizes", "200", "--baseline", str(baseline), "--tolerance", "1.5"]) == 0
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_daemon.py
+Mum kapanışına hizalı daemon modunu (uyanma planı ve sadece kapanan timeframe'lerin hesaplanması) test eder
+"""
+
+import math
+
+import candle_store
+import exchanges
+import qwen3
+from benchmark import synthetic_recording
+from recording import replaying
+from scheduler import next_close_ms, plan_wakeup
+
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+
+def test_plan_wakeup_groups_closing_timeframes():
+    """Aynı anda kapanan timeframe'ler tek uyanmada; kapanıştan sonraki bekleme payı içinde o kapanış seçilmeli"""
+    tfs = ["4h", "1h", "15m"]
+    midnight = 20_000 * DAY_MS
+    assert plan_wakeup(tfs, midnight - 1, delay=5) == (midnight + 5000, midnight, tfs)
+    assert plan_wakeup(tfs, midnight + 2000, delay=5) == (midnight + 5000, midnight, tfs)
+    assert plan_wakeup(tfs, midnight + 5000, delay=5)[1:] == (midnight + 15 * 60_000, ["15m"])
+    assert plan_wakeup(tfs, midnight + HOUR_MS - 1, delay=5)[2] == ["1h", "15m"]
+
+    # Haftalık mum pazartesi 00:00 UTC'de kapanır (1970-01-01 perşembe)
+    monday = next_close_ms("1w", midnight)
+    assert (monday // DAY_MS + 3) % 7 == 0 and monday > midnight
+
+
+def test_daemon_recomputes_only_closed_timeframes(monkeypatch):
+    """İlk tur tüm timeframe'ler; sonra 09:00'da 1h+15m, 09:15'te sadece 15m hesaplanmalı"""
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    recording = synthetic_recording({tf: qwen3.ohlcv_buffer(need) + 20 for tf, need in config.items()})
+    now = {"t": recording["server_time"] / 1000}  # 08:53:20 UTC
+    computed, fetched, results = [], [], []
+
+    original_analyze = qwen3.analyze_timeframe
+    original_fetch = qwen3.fetch_timeframes
+    monkeypatch.setattr(qwen3, "analyze_timeframe",
+                        lambda df, tf, *a, **k: computed.append(tf) or original_analyze(df, tf, *a, **k))
+    monkeypatch.setattr(qwen3, "fetch_timeframes",
+                        lambda symbol, cfg, resample=None: fetched.append(list(cfg)) or original_fetch(symbol, cfg))
+
+    def sleep(seconds):
+        now["t"] += seconds
+        computed.append("|")
+
+    # Son mum zamanlaması exchange saatinden (yerel saat + ölçülen fark) hesaplanır
+    monkeypatch.setattr(exchanges.time, "time", lambda: now["t"])
+    exchanges.reset_clock()
+
+    with replaying(recording):
+        latest = qwen3.run_daemon(["BTC/USDT:USDT"], config, on_result=results.append, close_delay=5,
+                                  max_cycles=3, clock=lambda: now["t"], sleep=sleep)
+        assert candle_store.get_default_store() is None  # bellek deposu bırakıldı
+
+    assert computed == ["4h", "1h", "15m", "|", "1h", "15m", "|", "15m"]
+    assert fetched == [["4h", "1h", "15m"], ["1h", "15m"], ["15m"]]
+    assert len(results) == 3 and set(latest["BTC/USDT:USDT"]["timeframes"]) == set(config)
+    # Yeniden hesaplanmayan 4h özeti önceki turdan korunur, kapanışa kalan süre her uyanmada güncellenir
+    first, last = results[0]["timeframes"]["4h"], results[2]["timeframes"]["4h"]
+    assert last["summary"] is first["summary"]
+    assert last["last_candle"]["timestamp"] == first["last_candle"]["timestamp"]
+    assert first["last_candle"]["seconds_to_close"] == 11200  # 08:53:20 → 12:00
+    assert last["last_candle"]["seconds_to_close"] == 11200 - 405 - 900
+    assert last["last_candle"]["minutes_to_close"] == 164.9 and last["last_candle"]["is_current_candle"]
+    assert now["t"] == recording["server_time"] / 1000 + 405 + 900  # 08:53:20 → 09:00:05 → 09:15:05
+    exchanges.reset_clock()
+
+
+def _assert_close(daemon, one_shot, path="summary"):
+    """İç içe sonuçlar aynı olmalı; float'larda EMA ısınma farkı kadar tolerans"""
+    if isinstance(daemon, dict):
+        assert set(daemon) == set(one_shot), path
+        for key in daemon:
+            _assert_close(daemon[key], one_shot[key], f"{path}.{key}")
+    elif isinstance(daemon, list):
+        assert len(daemon) == len(one_shot), path
+        for i, (a, b) in enumerate(zip(daemon, one_shot)):
+            _assert_close(a, b, f"{path}[{i}]")
+    elif isinstance(daemon, float) and isinstance(one_shot, float):
+        assert math.isclose(daemon, one_shot, rel_tol=1e-7, abs_tol=1e-9), (path, daemon, one_shot)
+    else:
+        assert daemon == one_shot, (path, daemon, one_shot)
+
+
+def test_daemon_wakeups_match_one_shot_analysis(monkeypatch):
+    """Bellekteki motorlarla çok sayıda uyanmadan sonra sonuç aynı buffer'da tek seferlik analizle aynı olmalı"""
+    config = {"1h": 100, "15m": 150}
+    cycles = 40
+    recording = synthetic_recording({tf: qwen3.ohlcv_buffer(need) + 200 for tf, need in config.items()})
+    history = dict(recording["ohlcv"])
+    now = {"t": recording["server_time"] / 1000 - (cycles + 1) * 900}
+    results = []
+
+    def reveal(replay):
+        # Exchange sadece o ana kadar açılmış mumları döndürür
+        recording["server_time"] = int(now["t"] * 1000)
+        for tf, rows in history.items():
+            replay._ohlcv[tf] = rows[rows[:, 0] <= recording["server_time"]]
+
+    with replaying(recording) as replay:
+        reveal(replay)
+
+        def sleep(seconds):
+            now["t"] += seconds
+            reveal(replay)
+
+        qwen3.run_daemon(["BTC/USDT:USDT"], config, on_result=results.append, close_delay=5,
+                         max_cycles=cycles, clock=lambda: now["t"], sleep=sleep)
+        one_shot = qwen3.analyze_coin("BTC/USDT:USDT", config)
+
+    assert len(results) == cycles
+    daemon = results[-1]
+    for tf in config:
+        assert daemon["timeframes"][tf]["last_candle"]["timestamp"] == one_shot["timeframes"][tf]["last_candle"]["timestamp"]
+        _assert_close(daemon["timeframes"][tf]["summary"], one_shot["timeframes"][tf]["summary"])
+
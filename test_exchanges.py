@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_exchanges.py
+Exchange havuzu ve veri çekme katmanını ağ bağlantısı olmadan test eder
+"""
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ccxt
+
+import candle_store
+import exchanges
+
+
+def test_pool_reuses_instance():
+    """Aynı exchange id için her zaman aynı instance dönmeli"""
+    exchanges.reset_pool()
+    first = exchanges.get_exchange("binance", warm=False)
+    second = exchanges.get_exchange("binance", warm=False)
+    other = exchanges.get_exchange("okx", warm=False)
+
+    assert first is second
+    assert first is not other
+    assert first.options.get("defaultType") == "future"
+    assert other.options.get("defaultType") == "swap"
+
+
+def test_pool_loads_markets_once():
+    """warm=True sadece markets boşken load_markets çağırmalı"""
+    exchanges.reset_pool()
+    ex = exchanges.get_exchange("bybit", warm=False)
+    calls = []
+
+    def fake_load_markets(reload=False):
+        calls.append(reload)
+        ex.markets = {"BTC/USDT": {}}
+        return ex.markets
+
+    ex.load_markets = fake_load_markets
+    exchanges.get_exchange("bybit")
+    exchanges.get_exchange("bybit")
+
+    assert calls == [False]
+    exchanges.reset_pool()
+
+
+# =========================
+#   OFFLINE FAKE EXCHANGE
+# =========================
+TF_MS = {"15m": 15 * 60_000, "1h": 60 * 60_000, "4h": 240 * 60_000}
+NOW_MS = 1_760_000_000_000
+
+
+def fake_ohlcv_rows(symbol, timeframe, limit, seed=7):
+    """Sembol/timeframe başına deterministik OHLCV satırları üretir"""
+    rng = np.random.default_rng(seed + sum(map(ord, symbol + timeframe)))
+    step = TF_MS[timeframe]
+    end = NOW_MS - NOW_MS % step
+    ts = end - step * np.arange(limit)[::-1]
+    close = 100 + rng.standard_normal(limit).cumsum()
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(limit)
+    low = np.minimum(open_, close) - rng.random(limit)
+    volume = rng.random(limit) * 1000 + 100
+    return [list(map(float, row)) for row in zip(ts, open_, high, low, close, volume)]
+
+
+class FakeExchange:
+    """ccxt senkron API'sinin analyze_coin tarafından kullanılan alt kümesi"""
+
+    def __init__(self, exchange_id="binance"):
+        self.id = exchange_id
+        self.markets = {"loaded": True}
+        self.has = {"fetchFundingRate": True}
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None, params=None):
+        self.calls.append(("fetch_ohlcv", symbol, timeframe))
+        return fake_ohlcv_rows(symbol, timeframe, limit)
+
+    def fetch_ticker(self, symbol):
+        self.calls.append(("fetch_ticker", symbol))
+        return {"last": 101.5, "bid": 101.4, "ask": 101.6, "quoteVolume": 1_000_000.0}
+
+    def market(self, symbol):
+        return {"type": "swap", "taker": 0.0005, "maker": 0.0002}
+
+    def fetch_order_book(self, symbol, limit=None):
+        self.calls.append(("fetch_order_book", symbol, limit))
+        bids = [[101.4 - i * 0.1, 5.0 + i] for i in range(limit or 20)]
+        asks = [[101.6 + i * 0.1, 4.0 + i] for i in range(limit or 20)]
+        return {"bids": bids, "asks": asks}
+
+    def fetch_funding_rate(self, symbol):
+        self.calls.append(("fetch_funding_rate", symbol))
+        return {"fundingRate": 0.0001, "fundingTimestamp": NOW_MS + 3_600_000}
+
+    def fetch_time(self):
+        self.calls.append(("fetch_time",))
+        return NOW_MS
+
+
+class FakeAsyncExchange(FakeExchange):
+    """Aynı veriyi async arayüzle döndürür"""
+
+    async def fetch_ohlcv(self, *args, **kwargs):
+        return FakeExchange.fetch_ohlcv(self, *args, **kwargs)
+
+    async def fetch_ticker(self, symbol):
+        return FakeExchange.fetch_ticker(self, symbol)
+
+    async def fetch_order_book(self, symbol, limit=None):
+        return FakeExchange.fetch_order_book(self, symbol, limit)
+
+    async def fetch_funding_rate(self, symbol):
+        return FakeExchange.fetch_funding_rate(self, symbol)
+
+    async def fetch_time(self):
+        return FakeExchange.fetch_time(self)
+
+    async def close(self):
+        pass
+
+
+def _strip_volatile(row):
+    """Çalıştırma anına bağlı alanları karşılaştırmadan çıkarır"""
+    row = json.loads(json.dumps(row, default=str))
+    row.pop("as_of_utc")
+    row["market_info"]["advanced_analysis"].pop("timestamp")
+    return row
+
+
+def test_async_mode_matches_sync(monkeypatch):
+    """Async mod senkron mod ile aynı all_analysis_data listesini üretmeli"""
+    import qwen3
+
+    sync_ex = FakeExchange()
+    async_ex = FakeAsyncExchange()
+
+    async def fake_get_async_exchange(exchange_id, warm=True):
+        return async_ex
+
+    async def fake_close():
+        pass
+
+    monkeypatch.setenv("CANDLE_STORE", "0")
+    monkeypatch.setattr(exchanges.time, "time", lambda: NOW_MS / 1000 - 1.5)  # yerel saat 1.5s geride
+    exchanges.reset_clock()
+    monkeypatch.setattr(exchanges, "get_exchange", lambda exchange_id, warm=True: sync_ex)
+    monkeypatch.setattr(exchanges, "get_async_exchange", fake_get_async_exchange)
+    monkeypatch.setattr(qwen3, "close_async_exchanges", fake_close)
+    monkeypatch.setattr(exchanges, "_breaker", exchanges.CircuitBreaker())
+
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    pairs = ["BTC/USDT:USDT", "ETH/USDT:USDT"]
+
+    sync_rows = [qwen3.analyze_coin(symbol, config) for symbol in pairs]
+    async_rows, results = asyncio.run(qwen3.run_analysis_async(pairs, config, concurrency=3))
+
+    assert [r["status"] for r in results] == ["success", "success"]
+    assert [_strip_volatile(r) for r in async_rows] == [_strip_volatile(r) for r in sync_rows]
+    assert {tf["source_exchange"] for r in sync_rows for tf in r["timeframes"].values()} == {"binance"}
+    # Saat farkı exchange başına bir kez ölçülür
+    assert sync_ex.calls.count(("fetch_time",)) == 1
+    exchanges.reset_clock()
+
+
+def test_clock_sync_caches_offset_per_exchange(monkeypatch):
+    """Saat farkı bir kez ölçülmeli, TTL dolunca yenilenmeli, hata yerel saate düşmeli"""
+    local = {"now": NOW_MS / 1000 - 2.0}
+    monotonic = {"now": 0.0}
+    monkeypatch.setattr(exchanges.time, "time", lambda: local["now"])
+    monkeypatch.setattr(exchanges.time, "monotonic", lambda: monotonic["now"])
+
+    clock = exchanges.ClockSync(ttl=60)
+    binance, okx = FakeExchange("binance"), FakeExchange("okx")
+
+    def blocked():
+        raise RuntimeError("geo-blocked")
+
+    okx.fetch_time = blocked
+
+    assert clock.now_ms(binance) == NOW_MS
+    local["now"] += 30
+    assert clock.now_ms(binance) == NOW_MS + 30_000  # önbellekten, istek yok
+    assert binance.calls.count(("fetch_time",)) == 1
+
+    assert clock.offset_ms(okx) == 0.0  # ölçülemedi → yerel saat
+    assert clock.now_ms(okx) == int(local["now"] * 1000)
+
+    monotonic["now"] += 61
+    clock.now_ms(binance)
+    assert binance.calls.count(("fetch_time",)) == 2
+
+
+def test_last_candle_info_uses_serving_exchange_clock(monkeypatch):
+    """get_last_candle_info verilen exchange'in saatini kullanmalı"""
+    import qwen3
+
+    monkeypatch.setattr(exchanges.time, "time", lambda: NOW_MS / 1000)
+    exchanges.reset_clock()
+    ex = FakeExchange("okx")
+    ex.fetch_time = lambda: NOW_MS + 90_000  # exchange saati 90s ileride
+
+    rows = fake_ohlcv_rows("BTC/USDT:USDT", "15m", 10)
+    df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
+    df.index = pd.to_datetime(df.pop("timestamp"), unit="ms", utc=True)
+
+    info = qwen3.get_last_candle_info(df, "15m", exchange=ex)
+    expected_now = NOW_MS + 90_000
+    assert info["time_sync_offset"] == (expected_now - rows[-1][0]) / 1000
+    assert info["seconds_to_close"] == max(0, int((rows[-1][0] + TF_MS["15m"] - expected_now) / 1000))
+    exchanges.reset_clock()
+
+
+# =========================
+#     CIRCUIT BREAKER
+# =========================
+def _failover_env(monkeypatch, failing):
+    """`failing` {exchange_id: hata} olan sahte havuz; çağrılan exchange'leri kaydeder"""
+    attempts = []
+
+    def fake_get_exchange(exchange_id, warm=True):
+        attempts.append(exchange_id)
+        if exchange_id in failing:
+            raise failing[exchange_id]
+        return FakeExchange(exchange_id)
+
+    monkeypatch.setattr(exchanges, "get_exchange", fake_get_exchange)
+    return attempts
+
+
+def test_breaker_skips_unreachable_exchange(monkeypatch, tmp_path):
+    """Coğrafi engelli exchange eşik kadar denenmeli; sonraki çağrılar doğrudan yedeğe gitmeli"""
+    attempts = _failover_env(monkeypatch, {"binance": ccxt.ExchangeNotAvailable("451 restricted location")})
+    state = str(tmp_path / "breaker.json")
+    breaker = exchanges.CircuitBreaker(threshold=2, cooldown=600, state_path=state)
+    candidates = [("binance", "BTC/USDT:USDT"), ("okx", "BTC/USDT:USDT")]
+    fetch = lambda ex, sym: f"{ex.id}:{sym}"
+
+    for _ in range(3):
+        result, ex, sym = exchanges.fetch_with_failover(candidates, fetch, breaker=breaker)
+        assert (result, ex.id) == ("okx:BTC/USDT:USDT", "okx")
+    assert attempts == ["binance", "okx", "binance", "okx", "okx"]
+
+    # Durum dosyası sonraki çalıştırmaya taşınır
+    restored = exchanges.CircuitBreaker(cooldown=600, state_path=state)
+    assert restored.is_open("binance") and not restored.is_open("okx")
+
+    # Süre dolunca tekrar denenir; başarılı olursa devre kapanır
+    later = time.time() + 601
+    monkeypatch.setattr(exchanges.time, "time", lambda: later)
+    attempts.clear()
+    monkeypatch.setattr(exchanges, "get_exchange", lambda exchange_id, warm=True: FakeExchange(exchange_id))
+    _, ex, _ = exchanges.fetch_with_failover(candidates, fetch, breaker=restored)
+    assert ex.id == "binance" and restored.snapshot() == {}
+
+
+def test_breaker_ignores_symbol_and_local_errors_and_tries_all_when_open(monkeypatch):
+    """BadSymbol, tek zaman aşımı ve yerel hatalar exchange'i devre dışı bırakmamalı; tüm devreler açıksa yine de denenmeli"""
+    attempts = _failover_env(monkeypatch, {})
+    breaker = exchanges.CircuitBreaker()
+    candidates = [("binance", "X/USDT:USDT"), ("okx", "X/USDT:USDT")]
+
+    def fetch(ex, sym):
+        if ex.id == "binance":
+            raise ccxt.BadSymbol("binance does not have market symbol X/USDT:USDT")
+        return "ok"
+
+    assert exchanges.fetch_with_failover(candidates, fetch, breaker=breaker)[0] == "ok"
+    assert not breaker.is_open("binance")
+
+    def timeout(ex, sym):
+        if ex.id == "binance":
+            raise ccxt.RequestTimeout("binance GET fetchOHLCV timed out")
+        return "ok"
+
+    assert exchanges.fetch_with_failover(candidates, timeout, breaker=breaker)[0] == "ok"
+    assert breaker.snapshot()["binance"]["failures"] == 1 and not breaker.is_open("binance")
+
+    # ccxt dışı hata yedeğe geçmeden yükselmeli ve kaydedilmemeli
+    def local_bug(ex, sym):
+        raise KeyError("close")
+
+    attempts.clear()
+    with pytest.raises(KeyError):
+        exchanges.fetch_with_failover(candidates, local_bug, breaker=breaker)
+    assert attempts == ["binance"] and breaker.snapshot()["binance"]["failures"] == 1
+
+    breaker = exchanges.CircuitBreaker(threshold=1)
+    breaker.record_failure("binance", RuntimeError("down"))
+    breaker.record_failure("okx", RuntimeError("down"))
+    assert breaker.order(candidates) == candidates
+
+
+def test_rate_limit_backs_off_without_opening_breaker(monkeypatch):
+    """429/DDoS koruması breaker'ı açmamalı (CI'da kalıcı durum yüzünden Binance sonraki çalıştırmalarda da atlanırdı)"""
+    attempts = _failover_env(monkeypatch, {})
+    sleeps = []
+    monkeypatch.setattr(exchanges.time, "sleep", sleeps.append)
+    monkeypatch.setenv("RATE_LIMIT_RETRIES", "2")
+    monkeypatch.setenv("RATE_LIMIT_DELAY", "0.5")
+    breaker = exchanges.CircuitBreaker(threshold=3)
+    candidates = [("binance", "BTC/USDT:USDT"), ("okx", "BTC/USDT:USDT")]
+
+    def limited(ex, sym):
+        if ex.id == "binance":
+            raise ccxt.RateLimitExceeded("binance 429 Too Many Requests")
+        return "ok"
+
+    for _ in range(3):
+        assert exchanges.fetch_with_failover(candidates, limited, breaker=breaker)[1].id == "okx"
+    assert attempts == ["binance"] * 3 + ["okx"] + ["binance"] * 3 + ["okx"] + ["binance"] * 3 + ["okx"]
+    assert sleeps == [0.5, 1.0] * 3
+    assert not breaker.is_open("binance") and "binance" not in breaker.snapshot()
+
+    # Geçici 429 sonrası aynı exchange'den devam edilir
+    calls = []
+
+    def once_limited(ex, sym):
+        calls.append(ex.id)
+        if len(calls) == 1:
+            raise ccxt.DDoSProtection("binance 418 I'm a teapot")
+        return ex.id
+
+    assert exchanges.fetch_with_failover(candidates, once_limited, breaker=breaker)[0] == "binance"
+    assert calls == ["binance", "binance"]
+
+    # Async yol da aynı şekilde davranır
+    async def fake_get_async_exchange(exchange_id, warm=True):
+        return FakeExchange(exchange_id)
+
+    async def no_sleep(seconds):
+        sleeps.append(seconds)
+
+    async def limited_async(ex, sym):
+        return limited(ex, sym)
+
+    monkeypatch.setattr(exchanges, "get_async_exchange", fake_get_async_exchange)
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    sleeps.clear()
+    for _ in range(3):
+        result = asyncio.run(exchanges.fetch_with_failover_async(candidates, limited_async, breaker=breaker))
+        assert result[1].id == "okx"
+    assert sleeps == [0.5, 1.0] * 3 and not breaker.is_open("binance")
+
+
+# =========================
+#       CANDLE STORE
+# =========================
+class SeriesExchange:
+    """Saati ilerletilebilen, `since` destekli sahte exchange"""
+
+    def __init__(self, timeframe="15m", bars=2000):
+        self.id = "fake"
+        self.step = TF_MS[timeframe]
+        self.rows = fake_ohlcv_rows("BTC/USDT:USDT", timeframe, bars)
+        self.visible = bars - 10
+        self.requests = []
+
+    def now_ms(self):
+        return int(self.rows[self.visible - 1][0]) + self.step // 2
+
+    def fetch_ohlcv(self, symbol, timeframe="15m", since=None, limit=None, params=None):
+        self.requests.append({"since": since, "limit": limit})
+        rows = [list(r) for r in self.rows[:self.visible]]
+        rows[-1][4] += 0.5  # forming mum henüz kapanmadı
+        if since is not None:
+            rows = [r for r in rows if r[0] >= since]
+            return rows[:limit]
+        return rows[-limit:]
+
+
+def test_candle_store_fetches_only_delta(tmp_path, monkeypatch):
+    """İkinci çalıştırma sadece yeni mumları `since` ile çekmeli ve forming mumu güncellemeli"""
+    store = candle_store.CandleStore(root=str(tmp_path))
+    ex = SeriesExchange()
+    monkeypatch.setattr(candle_store.time, "time", lambda: ex.now_ms() / 1000)
+
+    first = candle_store.fetch_ohlcv_cached(ex, "BTC/USDT:USDT", "15m", 300, store=store)
+    assert ex.requests[-1] == {"since": None, "limit": 300}
+
+    ex.visible += 3
+    second = candle_store.fetch_ohlcv_cached(ex, "BTC/USDT:USDT", "15m", 300, store=store)
+
+    delta = ex.requests[-1]
+    assert delta["since"] == int(first.index[-1].value // 1_000_000)
+    assert delta["limit"] <= 6
+
+    expected = candle_store.ohlcv_to_frame(ex.fetch_ohlcv("BTC/USDT:USDT", limit=300))
+    pd.testing.assert_frame_equal(second, expected, check_dtype=False)
+
+
+def test_candle_store_refetches_after_long_gap(tmp_path, monkeypatch):
+    """Depodaki veri çok eskiyse tam çekime dönmeli"""
+    store = candle_store.CandleStore(root=str(tmp_path))
+    ex = SeriesExchange()
+    monkeypatch.setattr(candle_store.time, "time", lambda: ex.now_ms() / 1000)
+
+    candle_store.fetch_ohlcv_cached(ex, "BTC/USDT:USDT", "15m", 300, store=store)
+    monkeypatch.setattr(candle_store.time, "time", lambda: (ex.now_ms() + 400 * ex.step) / 1000)
+
+    candle_store.fetch_ohlcv_cached(ex, "BTC/USDT:USDT", "15m", 300, store=store)
+    assert ex.requests[-1] == {"since": None, "limit": 300}
+
+    # Son mum iki periyottan eskiyken delta boş dönerse bayat önbellek yerine tam çekim yapılmalı
+    ex.visible += 3
+    monkeypatch.setattr(candle_store.time, "time", lambda: ex.now_ms() / 1000)
+    full_fetch = ex.fetch_ohlcv
+    ex.fetch_ohlcv = lambda symbol, timeframe="15m", since=None, limit=None, params=None: (
+        [] if since is not None else full_fetch(symbol, timeframe, since, limit))
+    fresh = candle_store.fetch_ohlcv_cached(ex, "BTC/USDT:USDT", "15m", 300, store=store)
+    assert fresh.index[-1].value // 1_000_000 == ex.rows[ex.visible - 1][0]
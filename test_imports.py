@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_imports.py
+İndikatör/özet çekirdeğinin ccxt ve supabase olmadan import edilebildiğini ve
+soğuk başlangıç benchmark'ının importtime çıktısını doğru okuduğunu test eder
+"""
+
+import os
+import subprocess
+import sys
+
+from benchmark import bench_imports, import_breakdown, parse_importtime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ccxt / supabase / httpx / postgrest / aiohttp import edilirse ImportError
+BLOCKED = ("ccxt", "supabase", "httpx", "postgrest", "aiohttp", "websockets")
+
+
+def test_core_imports_without_network_clients():
+    """qwen3 ve indikatör fonksiyonları ağ/kalıcılık paketleri kurulu değilken çalışmalı"""
+    code = (
+        f"import sys; sys.modules.update(dict.fromkeys({BLOCKED!r}))\n"
+        "import numpy as np, qwen3, exchanges, supabase_store\n"
+        "from benchmark import make_data\n"
+        "df = make_data(300)\n"
+        "summary = qwen3.timeframe_summary(qwen3.indicator_set(df), last_n=50, timeframe='15m')\n"
+        "assert summary and not np.isnan(qwen3.rsi(df['close'], 14).iloc[-1])\n"
+        f"loaded = [m for m in {BLOCKED!r} if sys.modules.get(m) is not None]\n"
+        "assert not loaded, loaded\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+
+def test_import_benchmark_reports_cold_import_breakdown():
+    """importtime satırları paket bazında toplanmalı; benchmark hedef başına tek ölçüm üretmeli"""
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     numpy._core",
+        "import time:        50 |        150 |   numpy",
+        "import time:       300 |        300 |     pandas.core",
+        "import time:       200 |        650 |   pandas",
+        "import time:        25 |        825 | qwen3",
+    ])
+    rows = parse_importtime(stderr)
+    assert rows[0] == ("numpy._core", 100, 100, 2) and rows[-1] == ("qwen3", 25, 825, 0)
+    assert import_breakdown(rows) == [{"package": "pandas", "ms": 0.5}, {"package": "numpy", "ms": 0.15},
+                                      {"package": "qwen3", "ms": 0.025}]
+
+    results = bench_imports(targets={"json": "import json"}, repeat=1)
+    assert [(r["name"], r["n"]) for r in results] == [("import_json", 1)]
+    assert 0 < results[0]["seconds"] < results[0]["process_seconds"]
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_incremental.py
+Artımlı indikatör motorunun qwen3 vektörel fonksiyonlarıyla örtüştüğünü test eder
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from incremental import IndicatorEngine, history_path
+from qwen3 import ENGINE_COLUMNS, sma, ema, rsi, macd, atr, enrich_indicators
+from test_scalping_features import create_test_data
+
+
+TOLERANCE = 1e-9
+
+
+def reference_frame(df):
+    """Motorun kolonlarını mevcut fonksiyonlarla hesaplar"""
+    ref = pd.DataFrame(index=df.index)
+    for L in (50, 100, 200):
+        ref[f"sma{L}"] = sma(df["close"], L)
+    for L in (20, 50, 100, 200):
+        ref[f"ema{L}"] = ema(df["close"], L)
+    ref["rsi14"] = rsi(df["close"], 14)
+    ref["macd"], ref["macd_signal"], ref["macd_hist"] = macd(df["close"])
+    ref["atr14"] = atr(df, 14)
+    return ref
+
+
+def assert_matches(result, reference):
+    for col in result.columns:
+        np.testing.assert_allclose(
+            result[col].to_numpy(), reference.loc[result.index, col].to_numpy(),
+            rtol=TOLERANCE, atol=TOLERANCE, err_msg=col
+        )
+
+
+def test_engine_matches_vectorized_across_resume(tmp_path):
+    """Parça parça beslenen ve diske kaydedilip geri yüklenen motor aynı sonucu vermeli"""
+    np.random.seed(42)
+    df = create_test_data(1500)
+    reference = reference_frame(df)
+
+    engine = IndicatorEngine(max_history=2000)
+    parts = [engine.update(df.iloc[:400])]
+
+    path = str(tmp_path / "state.json")
+    engine.save(path)
+    engine = IndicatorEngine.load(path)
+    parts.append(engine.update(df.iloc[:900]))  # eski mumlar atlanmalı
+
+    for start in range(900, 1500, 7):
+        parts.append(engine.update(df.iloc[start:start + 7]))
+
+    result = pd.concat(parts)
+    assert len(result) == len(df)
+    assert_matches(result, reference)
+    # Motor sadece qwen3'ün ondan okuduğu kolonları tutar
+    assert sorted(engine.columns) == sorted(ENGINE_COLUMNS)
+
+
+def test_saved_state_holds_recurrence_and_buffer_rows(tmp_path):
+    """Kayıt tüm geçmişi JSON'a dökmemeli: özyineleme durumu + son max_history satır (.npy)"""
+    np.random.seed(8)
+    df = create_test_data(1001)
+
+    engine = IndicatorEngine(max_history=400)
+    engine.update(df.iloc[:1000])
+    path = str(tmp_path / "state.json")
+    engine.save(path)
+
+    with open(path, encoding="utf-8") as f:
+        assert not {"history_index", "history_rows"} & set(json.load(f))
+    rows = np.load(history_path(path))
+    assert len(rows) == 400 and rows["timestamp"][-1] == df.index[999].value
+
+    # Geri yüklenen motor analiz penceresini (son mum forming) kapsamalı
+    window = df.iloc[601:]
+    result = IndicatorEngine.load(path).frame_for(window)
+    assert_matches(result, reference_frame(df))
+
+    # Geçmiş dosyası durumla uyuşmuyorsa (yarım kalan kayıt) motor yeniden kurulur
+    IndicatorEngine(max_history=400).save(str(tmp_path / "other.json"))
+    np.save(history_path(path), np.load(history_path(str(tmp_path / "other.json"))))
+    assert IndicatorEngine.load(path) is None
+
+
+def test_gap_after_downtime_rebuilds_from_window(tmp_path):
+    """Fetch penceresinden uzun kesintiden sonra motor boşluğun üstünden adım atmamalı"""
+    np.random.seed(5)
+    df = create_test_data(1600)
+
+    engine = IndicatorEngine(max_history=400)
+    engine.frame_for(df.iloc[:400])
+    path = str(tmp_path / "state.json")
+    engine.save(path)
+
+    # 800 mum sonraki pencere: sonuç pencerenin kendi hesabıyla aynı olmalı
+    window = df.iloc[1200:1600]
+    result = IndicatorEngine.load(path).frame_for(window)
+    assert result is not None
+    assert_matches(result, reference_frame(window))
+
+    # Bellekteki motor (daemon) da aynı şekilde yeniden kurulmalı
+    assert_matches(engine.frame_for(window), reference_frame(window))
+    assert engine.last_timestamp == window.index[-2]
+
+
+def test_forming_candle_is_not_committed():
+    """Kapanmamış mum önizlenir; güncellenmiş haliyle tekrar geldiğinde doğru hesaplanmalı"""
+    np.random.seed(3)
+    df = create_test_data(300)
+
+    engine = IndicatorEngine()
+    provisional = df.copy()
+    provisional.iloc[-1, provisional.columns.get_loc("close")] += 250.0
+    engine.update(provisional, forming=True)
+    assert engine.last_timestamp == df.index[-2]
+
+    final = engine.update(df)
+    assert list(final.index) == [df.index[-1]]
+    assert_matches(final, reference_frame(df))
+
+
+def test_enrich_with_engine_matches_plain_enrich():
+    """İlk çalıştırmada motorlu enrich_indicators düz hesapla aynı kolonları üretmeli"""
+    np.random.seed(11)
+    df = create_test_data(400)
+
+    plain = enrich_indicators(df)
+    engine = IndicatorEngine()
+    with_engine = enrich_indicators(df, engine=engine)
+
+    assert list(with_engine.columns) == list(plain.columns)
+    numeric = plain.select_dtypes("number").columns
+    np.testing.assert_allclose(with_engine[numeric].to_numpy(), plain[numeric].to_numpy(),
+                               rtol=TOLERANCE, atol=TOLERANCE)
+    assert (with_engine["pattern"] == plain["pattern"]).all()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_indicator_block.py
+Blok tabanlı, tembel indikatör hattının kopyalayan eski hatla birebir aynı olduğunu test eder
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import enrich_indicators_copying, stochastic_rsi_reindex
+from indicator_block import IndicatorRegistry, IndicatorSet, dropna_tail
+from qwen3 import (INDICATORS, SUMMARY_COLUMNS, enhanced_15m_analysis, enrich_indicators, indicator_set,
+                   stochastic_rsi, timeframe_summary)
+from test_scalping_features import create_test_data
+
+
+def test_block_pipeline_matches_copying_pipeline():
+    """Tüm kolonlar, sıraları ve dtype'ları eski hatla birebir aynı olmalı; girdi değişmemeli"""
+    for n in (30, 250, 1200):
+        np.random.seed(n)
+        df = create_test_data(n)
+        before = df.copy()
+        pd.testing.assert_frame_equal(enrich_indicators(df), enrich_indicators_copying(df), check_exact=True)
+        pd.testing.assert_frame_equal(df, before)
+
+
+def test_columns_are_views_of_one_block():
+    """Float kolonlar tek bloğun ardışık satırları olmalı (kopyasız view)"""
+    np.random.seed(5)
+    out = enrich_indicators(create_test_data(500))
+    addresses = [out[c].to_numpy().__array_interface__["data"][0] for c in ("sma50", "ema50", "sma100")]
+    assert np.diff(addresses).tolist() == [500 * 8, 500 * 8]
+
+
+def test_stochastic_rsi_skips_interior_nans():
+    """Aradaki NaN'lar pencereden atlanmalı (dropna + reindex ile aynı)"""
+    np.random.seed(8)
+    rsi = pd.Series(np.random.rand(120) * 100)
+    rsi.iloc[[0, 1, 30, 31, 32, 77]] = np.nan
+    rsi.iloc[50:65] = 42.0  # sıfır aralık → NaN
+    pd.testing.assert_series_equal(stochastic_rsi(rsi, 14), stochastic_rsi_reindex(rsi, 14), check_exact=True)
+    assert stochastic_rsi(rsi.iloc[:10], 14).isna().all()
+
+
+def test_dropna_tail_and_scalping_do_not_copy_input():
+    """dropna_tail df.dropna().tail ile aynı olmalı; scalping analizi çağıranın frame'ini değiştirmemeli"""
+    np.random.seed(13)
+    df = enrich_indicators(create_test_data(400))
+    gappy = df.copy()
+    gappy.iloc[[300, 350], gappy.columns.get_loc("stoch_rsi")] = np.nan
+    for frame in (df, gappy):
+        for n in (0, 1, 60, 1000):
+            pd.testing.assert_frame_equal(dropna_tail(frame, n), frame.dropna().tail(n))
+
+    trimmed = df.drop(columns=["vwap", "stoch_rsi"])
+    assert enhanced_15m_analysis(trimmed) == enhanced_15m_analysis(df)
+    assert "vwap" not in trimmed.columns
+
+
+def test_lazy_summary_computes_only_consumed_columns():
+    """4h özeti sadece okunan indikatörleri hesaplamalı, sonuç tam hesaplamayla aynı olmalı"""
+    np.random.seed(21)
+    df = create_test_data(500)
+    for tf, skipped in (("4h", {"vwap", "stoch_rsi", "bb_middle", "obv", "ema100"}), ("15m", {"obv", "ema100"})):
+        indicators = indicator_set(df)
+        assert timeframe_summary(indicators, 200, tf) == timeframe_summary(enrich_indicators(df), 200, tf)
+        assert not skipped & set(indicators.computed)
+
+    indicators = indicator_set(df)
+    indicators.frame(["stoch_rsi"])
+    assert indicators.computed == ["rsi14", "stoch_rsi"]
+    indicators.frame(["rsi14", "stoch_rsi", "sma50"])  # önceki sonuçlar saklanır
+    assert indicators.computed == ["rsi14", "stoch_rsi", "sma50"]
+
+
+def test_registry_dependencies_and_warmup():
+    """Bağımlılıklar kayıtlı olmalı; ısınma süresi bağımlılık zinciri boyunca toplanmalı"""
+    assert INDICATORS.warmup(["stoch_rsi"]) == 14
+    assert INDICATORS.warmup(SUMMARY_COLUMNS) == 199
+    assert INDICATORS.warmup([]) == 0
+
+    registry = IndicatorRegistry()
+    with pytest.raises(ValueError):
+        registry.register("x", deps=["missing"])(lambda ind, out: None)
+    registry.register("double", deps=["close"])(lambda ind, out: np.multiply(ind["close"], 2, out=out))
+    with pytest.raises(KeyError):
+        IndicatorSet(create_test_data(5), registry).frame(["triple"])
+
+
+def test_engine_columns_come_from_external_frame():
+    """external verildiğinde motor kolonları hesaplanmadan oradan alınmalı"""
+    np.random.seed(2)
+    df = create_test_data(300)
+    calls = []
+
+    def external():
+        calls.append(1)
+        return pd.DataFrame({"rsi14": np.full(len(df), 55.0)}, index=df.index)
+
+    indicators = IndicatorSet(df, INDICATORS, external=external, external_columns=["rsi14"])
+    assert indicators.frame(["stoch_rsi"])["stoch_rsi"].isna().all()  # sabit RSI → sıfır aralık
+    assert (indicators["rsi14"] == 55.0).all()
+    indicators.frame(["sma50"])
+    assert calls == [1]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_levels.py
+Support/resistance seviye tespitinin referans uygulamayla aynı sonucu verdiğini test eder
+"""
+
+import numpy as np
+
+from benchmark import detect_all_levels_loop, grade_levels_by_volume_loop
+from qwen3 import atr, detect_all_levels, grade_levels_by_volume
+from test_scalping_features import create_test_data
+
+
+def test_detect_all_levels_matches_loop():
+    """Vektörel swing tespiti döngülü referansla birebir aynı listeleri döndürmeli"""
+    np.random.seed(5)
+    df = create_test_data(3000)
+    for window in (3, 10, 25):
+        assert detect_all_levels(df, window=window) == detect_all_levels_loop(df, window=window)
+
+
+def test_detect_all_levels_handles_ties_and_short_input():
+    """Eşit tepeler (plato) ve pencereden kısa veri referansla aynı davranmalı"""
+    np.random.seed(8)
+    df = create_test_data(800)
+    df[["high", "low"]] = df[["high", "low"]].round(-2)  # çok sayıda eşit değer
+
+    assert detect_all_levels(df) == detect_all_levels_loop(df)
+    assert detect_all_levels(df.head(15)) == {"highs": [], "lows": []}
+
+
+def _graded_frame(n, seed):
+    np.random.seed(seed)
+    df = create_test_data(n)
+    df["atr14"] = atr(df, 14)
+    return df
+
+
+def test_grade_levels_matches_per_level_mask():
+    """Toplu derecelendirme seviye başına maske ile aynı strong/moderate/weak kümelerini vermeli"""
+    df = _graded_frame(2000, 13)
+    rng = np.random.default_rng(1)
+    levels = sorted(rng.uniform(df["low"].min() - 100, df["high"].max() + 100, 3000).tolist())
+
+    for radius_mult in (0.1, 0.5, 2.0):
+        assert grade_levels_by_volume(df, levels, "support", radius_mult) == \
+            grade_levels_by_volume_loop(df, levels, "support", radius_mult)
+
+
+def test_grade_levels_with_missing_values():
+    """NaN hacim/fiyat içeren mumlar referansla aynı şekilde yok sayılmalı"""
+    df = _graded_frame(500, 21)
+    df.iloc[10:20, df.columns.get_loc("volume")] = np.nan
+    df.iloc[30:35, df.columns.get_loc("high")] = np.nan
+    levels = sorted(df["close"].iloc[::7].tolist())
+
+    assert grade_levels_by_volume(df, levels, "resistance") == \
+        grade_levels_by_volume_loop(df, levels, "resistance")
+    assert grade_levels_by_volume(df, [], "support") == {"strong": [], "moderate": [], "weak": []}
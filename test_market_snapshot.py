@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_market_snapshot.py
+Ticker ve funding rate'in çalıştırma başına toplu çekildiğini (istek sayısının coin
+sayısından bağımsız olduğunu) ve toplu endpoint yoksa sembol başına isteğe düşüldüğünü test eder
+"""
+
+import asyncio
+from collections import Counter
+
+import qwen3
+from market_snapshot import MarketSnapshots
+
+SYMBOLS = [f"{base}/USDT:USDT" for base in ("BTC", "ETH", "SOL", "BNB", "XRP")]
+
+
+class CountingExchange:
+    """Her sembol için sabit ticker/funding döndüren, istekleri sayan sahte exchange."""
+
+    id = "binance"
+
+    def __init__(self, bulk=True):
+        self.calls = Counter()
+        self.has = {"fetchTickers": bulk, "fetchFundingRates": bulk, "fetchFundingRate": True}
+
+    def ticker(self, symbol):
+        price = 100.0 + SYMBOLS.index(symbol)
+        return {"symbol": symbol, "last": price, "bid": price - 0.1, "ask": price + 0.1, "quoteVolume": 1e6}
+
+    def funding(self, symbol):
+        return {"symbol": symbol, "fundingRate": 0.0001, "markPrice": 100.5, "fundingTimestamp": 1700000000000}
+
+    def fetch_ticker(self, symbol):
+        self.calls["fetch_ticker"] += 1
+        return self.ticker(symbol)
+
+    def fetch_tickers(self, symbols=None):
+        self.calls["fetch_tickers"] += 1
+        return {s: self.ticker(s) for s in symbols}
+
+    def fetch_funding_rate(self, symbol):
+        self.calls["fetch_funding_rate"] += 1
+        return self.funding(symbol)
+
+    def fetch_funding_rates(self, symbols=None):
+        self.calls["fetch_funding_rates"] += 1
+        return {s: self.funding(s) for s in symbols}
+
+    def market(self, symbol):
+        return {"symbol": symbol, "type": "swap", "taker": 0.0005, "maker": 0.0002}
+
+
+class AsyncCountingExchange(CountingExchange):
+    async def fetch_tickers(self, symbols=None):
+        await asyncio.sleep(0)
+        return CountingExchange.fetch_tickers(self, symbols)
+
+    async def fetch_funding_rates(self, symbols=None):
+        await asyncio.sleep(0)
+        return CountingExchange.fetch_funding_rates(self, symbols)
+
+
+def test_market_info_requests_do_not_grow_with_symbol_count():
+    """Beş coin'in market bilgisi iki toplu istekle üretilmeli ve sembol başına çekimle aynı olmalı"""
+    exchange = CountingExchange()
+    snapshots = MarketSnapshots(SYMBOLS)
+    bulk = [qwen3.get_market_info(exchange, s, snapshot=snapshots.get(exchange)) for s in SYMBOLS]
+    assert exchange.calls == Counter(fetch_tickers=1, fetch_funding_rates=1)
+
+    single = [qwen3.get_market_info(exchange, s) for s in SYMBOLS]
+    assert bulk == single
+    assert bulk[2]["current_price"] == 102.0 and bulk[2]["funding_rate"] == 0.01
+    assert bulk[2]["mark_price"] == 100.5
+
+    # Async: eşzamanlı coinler tek snapshot task'ını paylaşır
+    exchange = AsyncCountingExchange()
+    snapshots = MarketSnapshots(SYMBOLS)
+
+    async def gather():
+        limiter = asyncio.Semaphore(4)
+        return await asyncio.gather(*(snapshots.get_async(exchange, limiter) for _ in SYMBOLS))
+
+    results = asyncio.run(gather())
+    assert len({id(r) for r in results}) == 1 and results[0].has("SOL/USDT:USDT")
+    assert exchange.calls == Counter(fetch_tickers=1, fetch_funding_rates=1)
+
+
+def test_falls_back_to_per_symbol_requests_without_bulk_endpoints():
+    """fetchTickers yoksa ya da toplu funding başarısızsa sembol başına isteklere düşülmeli"""
+    exchange = CountingExchange(bulk=False)
+    snapshots = MarketSnapshots(SYMBOLS)
+    infos = [qwen3.get_market_info(exchange, s, snapshot=snapshots.get(exchange)) for s in SYMBOLS]
+    assert snapshots.get(exchange) is None
+    assert exchange.calls == Counter(fetch_ticker=5, fetch_funding_rate=5)
+    assert all(info["funding_rate"] == 0.01 for info in infos)
+
+    exchange = CountingExchange()
+
+    def broken(symbols=None):
+        raise RuntimeError("funding endpoint down")
+
+    exchange.fetch_funding_rates = broken
+    snapshots = MarketSnapshots(SYMBOLS)
+    infos = [qwen3.get_market_info(exchange, s, snapshot=snapshots.get(exchange)) for s in SYMBOLS]
+    assert exchange.calls == Counter(fetch_tickers=1, fetch_funding_rate=5)
+    assert all(info["funding_rate"] == 0.01 for info in infos)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_orderbook.py
+Tek order book snapshot'ının vektörel derinlik metriklerini ve analyze_coin'de
+hem market_info hem derinlik analizini tek istekle beslediğini test eder
+"""
+
+import numpy as np
+
+import qwen3
+from benchmark import synthetic_recording
+from orderbook import DEPTH_BANDS, OrderBookSnapshot, band_metrics, depth_metrics
+from recording import replaying
+
+
+def make_book(levels=400, tick=0.5, mid=1000.0, seed=3):
+    rng = np.random.default_rng(seed)
+    bids = [[mid - tick / 2 - i * tick, float(v)] for i, v in enumerate(rng.exponential(2.0, levels))]
+    asks = [[mid + tick / 2 + i * tick, float(v)] for i, v in enumerate(rng.exponential(2.0, levels))]
+    bids[7][1], asks[3][1] = 80.0, 95.0  # belirgin duvarlar
+    return {"bids": bids, "asks": asks, "timestamp": 1}
+
+
+def test_depth_bands_match_level_by_level_reference():
+    """Bant hacimleri, dengesizlik ve duvarlar seviye seviye hesaplanan referansla aynı olmalı"""
+    raw = make_book()
+    book = OrderBookSnapshot.from_ccxt(raw)
+    mid = (raw["bids"][0][0] + raw["asks"][0][0]) / 2
+    bands = band_metrics(book)
+    assert list(bands) == ["0.1%", "0.5%", "1%"]
+
+    for pct, band in zip(DEPTH_BANDS, bands.values()):
+        bids = [b for b in raw["bids"] if b[0] >= mid * (1 - pct)]
+        asks = [a for a in raw["asks"] if a[0] <= mid * (1 + pct)]
+        bid_vol, ask_vol = sum(b[1] for b in bids), sum(a[1] for a in asks)
+        threshold = (bid_vol + ask_vol) / (len(bids) + len(asks)) * 3
+        assert (band["bid_levels"], band["ask_levels"]) == (len(bids), len(asks))
+        assert band["bid_volume"] == round(bid_vol, 4) and band["ask_volume"] == round(ask_vol, 4)
+        assert band["bid_notional"] == round(sum(p * v for p, v in bids), 2)
+        assert band["imbalance_pct"] == round((bid_vol - ask_vol) / (bid_vol + ask_vol) * 100, 2)
+        assert band["bid_walls"] == sum(v > threshold for _, v in bids)
+        assert band["ask_walls"] == sum(v > threshold for _, v in asks)
+        assert band["largest_bid_wall"] == max(bids, key=lambda b: b[1])[0]
+        assert band["largest_ask_wall"] == max(asks, key=lambda a: a[1])[0]
+        assert band["complete"]
+
+    # Eski order_book_analysis alanları ilk 20 seviyeden aynı formülle hesaplanır
+    metrics = depth_metrics(book, depth=20)
+    top_bid, top_ask = sum(b[1] for b in raw["bids"][:20]), sum(a[1] for a in raw["asks"][:20])
+    assert metrics["total_bid_volume"] == round(top_bid, 2)
+    assert metrics["liquidity_imbalance_pct"] == round((top_bid - top_ask) / (top_bid + top_ask) * 100, 2)
+    assert metrics["large_bid_walls"] == sum(b[1] > (top_bid + top_ask) / 40 * 3 for b in raw["bids"][:20])
+    assert metrics["spread"] == 0.5 and metrics["snapshot_levels"] == {"bids": 400, "asks": 400}
+
+    # Snapshot %1 bandına ulaşmıyorsa bant eksik işaretlenir
+    shallow = band_metrics(OrderBookSnapshot.from_ccxt(make_book(levels=10)))
+    assert shallow["0.1%"]["complete"] and not shallow["1%"]["complete"]
+
+
+def test_analyze_coin_fetches_one_order_book_snapshot(monkeypatch):
+    """Ticker'da bid/ask yokken bile coin başına tek order book isteği olmalı"""
+    monkeypatch.setenv("ORDER_BOOK_LIMIT", "100")
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    recording = synthetic_recording({tf: qwen3.ohlcv_buffer(need) for tf, need in config.items()})
+    recording["ticker"].update(bid=None, ask=None)
+
+    with replaying(recording) as replay:
+        calls = []
+        fetch = replay.fetch_order_book
+        replay.fetch_order_book = lambda symbol, limit=None: calls.append(limit) or fetch(symbol, limit)
+        out = qwen3.analyze_coin("BTC/USDT:USDT", config)
+
+    assert calls == [100]
+    book = recording["order_book"]
+    info = out["market_info"]
+    assert (info["bid"], info["ask"]) == (book["bids"][0][0], book["asks"][0][0])
+    analysis = info["advanced_analysis"]["order_book_analysis"]
+    assert analysis["snapshot_levels"] == {"bids": 20, "asks": 20}
+    assert set(analysis["depth_bands"]) == {"0.1%", "0.5%", "1%"}
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_patterns.py
+Vektörel mum deseni sınıflandırıcısını test eder
+"""
+
+import numpy as np
+import pandas as pd
+
+from benchmark import candle_pattern_row
+from patterns import classify_candles, MULTI_PATTERNS
+from test_scalping_features import create_test_data
+
+
+def candles(rows):
+    """[(open, high, low, close), ...] listesinden OHLC DataFrame"""
+    index = pd.date_range("2024-01-01", periods=len(rows), freq="15min")
+    return pd.DataFrame(rows, columns=["open", "high", "low", "close"], index=index)
+
+
+def test_single_candle_patterns_match_row_classifier():
+    """Çok mumlu desen olmayan mumlarda sonuç eski satır bazlı fonksiyonla aynı olmalı"""
+    np.random.seed(17)
+    df = create_test_data(5000)
+    result = classify_candles(df)
+
+    expected = [candle_pattern_row(o, h, l, c)
+                for o, h, l, c in zip(df["open"], df["high"], df["low"], df["close"])]
+    single = ~result.isin(MULTI_PATTERNS)
+    assert single.sum() > 0
+    assert (result[single].astype(str).to_numpy() == np.array(expected)[single.to_numpy()]).all()
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert result.index.equals(df.index)
+
+
+def test_multi_candle_patterns():
+    """Elle kurulmuş çok mumlu desenler son mumda tanınmalı"""
+    cases = {
+        "bullish_engulfing": [(100, 101, 97, 98), (97.5, 102, 97, 101.5)],
+        "bearish_engulfing": [(98, 101, 97, 100), (100.5, 101, 96, 97)],
+        "morning_star": [(110, 111, 99, 100), (100, 101, 98.5, 100.5), (100.5, 108, 100, 107.5)],
+        "evening_star": [(100, 111, 99, 110), (110, 111.5, 109, 109.5), (109.5, 110, 102, 102.5)],
+        "three_white_soldiers": [(100, 105, 99.5, 104.5), (102, 109, 101.5, 108.5), (106, 113, 105.5, 112.5)],
+        "three_black_crows": [(112, 112.5, 107, 107.5), (109, 109.5, 103, 103.5), (105, 105.5, 99, 99.5)],
+    }
+    for name, rows in cases.items():
+        assert classify_candles(candles(rows)).iloc[-1] == name, name
+
+
+def test_multi_candle_takes_precedence_and_edge_cases():
+    """Çok mumlu desen tek mum desenini ezmeli; sıfır aralıklı ve kısa seriler hata vermemeli"""
+    # Son mum tek başına "normal" sayılırdı; engulfing etiketi kazanmalı
+    rows = [(100, 100.5, 99, 99.2), (99.1, 101, 99, 100.9)]
+    assert classify_candles(candles(rows)).iloc[-1] == "bullish_engulfing"
+
+    flat = classify_candles(candles([(100, 100, 100, 100)]))
+    assert flat.iloc[0] == "doji"
+    assert classify_candles(candles([])).empty
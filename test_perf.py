@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_perf.py
+Aşama süresi (span) kaydını ve analiz satırına eklenmesini test eder
+"""
+
+import asyncio
+import json
+
+import ccxt
+
+import perf
+import qwen3
+from benchmark import synthetic_recording
+from recording import replaying
+
+
+def test_analyze_coin_records_stage_spans(tmp_path, monkeypatch):
+    """PERF_EMBED=1 → satırda perf bölümü; PERF_LOG → aynı trace JSON satırı olarak yazılır"""
+    log = tmp_path / "perf.jsonl"
+    monkeypatch.setenv("PERF_EMBED", "1")
+    monkeypatch.setenv("PERF_LOG", str(log))
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    recording = synthetic_recording({tf: qwen3.ohlcv_buffer(need) for tf, need in config.items()})
+
+    with replaying(recording):
+        out = qwen3.analyze_coin("BTC/USDT:USDT", config)
+
+    trace = out["perf"]
+    assert trace["symbol"] == "BTC/USDT:USDT" and trace["wall_ms"] > 0
+    names = [s["name"] for s in trace["spans"]]
+    assert names.count("fetch_ohlcv") == 3 and names.count("timeframe") == 3
+    for name in ("market_info", "order_book", "advanced_analysis", "enrich", "levels", "summary", "scalping"):
+        assert name in names
+    # İç spanlar timeframe etiketini devralır
+    assert {s["timeframe"] for s in trace["spans"] if s["name"] == "levels"} == set(config)
+    assert all(s["wall_ms"] >= 0 and s["cpu_ms"] >= 0 for s in trace["spans"])
+    assert json.loads(log.read_text().splitlines()[-1]) == json.loads(json.dumps(trace))
+
+    monkeypatch.setenv("PERF_EMBED", "0")
+    with replaying(recording):
+        assert "perf" not in qwen3.analyze_coin("BTC/USDT:USDT", config)
+
+
+def test_requests_counted_in_all_open_spans():
+    """ccxt yanıtları açık tüm spanlara ve trace'e sayılmalı; trace dışında sayılmamalı"""
+    exchange = perf.instrument_exchange(ccxt.binance())
+    body = '{"serverTime": 1}'
+    exchange.on_rest_response(200, "OK", "https://x", "GET", {}, body, {}, None)  # trace yok
+
+    with perf.tracing(symbol="BTC/USDT") as trace:
+        with perf.span("fetch_ohlcv", timeframe="4h"):
+            with perf.span("load_markets"):
+                exchange.on_rest_response(200, "OK", "https://x", "GET", {}, body, {}, None)
+            exchange.on_rest_response(200, "OK", "https://x", "GET", {}, body, {}, None)
+
+    spans = {s["name"]: s for s in trace.spans}
+    assert (spans["load_markets"]["requests"], spans["fetch_ohlcv"]["requests"], trace.requests) == (1, 2, 2)
+    assert trace.bytes_received == 2 * len(body)
+    assert spans["load_markets"]["timeframe"] == "4h"
+
+
+def test_concurrent_traces_do_not_mix():
+    """Eşzamanlı coin'lerin spanları kendi trace'lerinde kalmalı"""
+    async def coin(symbol, delay):
+        with perf.tracing(symbol=symbol) as trace:
+            await asyncio.gather(perf.timed("market_info", asyncio.sleep(delay)),
+                                 perf.timed("order_book", asyncio.sleep(delay / 2)))
+            perf.record_response(10)
+        return trace
+
+    async def run():
+        return await asyncio.gather(coin("BTC", 0.02), coin("ETH", 0.01))
+
+    btc, eth = asyncio.run(run())
+    assert [s["name"] for s in btc.spans] == ["order_book", "market_info"]
+    assert btc.requests == eth.requests == 1
+    assert btc.tags == {"symbol": "BTC"} and len(eth.spans) == 2
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_recording.py
+Kayıt dosyalarını ve ReplayExchange ile ağsız analyze_coin'i test eder
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import ccxt
+
+import candle_store
+import exchanges
+import qwen3
+from benchmark import synthetic_recording
+from recording import ReplayExchange, load_recording, replaying, save_recording
+
+
+def test_recording_roundtrip_and_paging(tmp_path):
+    """Kayıt dosyadan aynen okunmalı; since/limit ile sayfalı çekim kaydı bozmadan dönmeli"""
+    recording = synthetic_recording({"4h": 400, "15m": 2000})
+    path = tmp_path / "btc.npz"
+    save_recording(recording, str(path))
+    loaded = load_recording(str(path))
+
+    assert loaded["ticker"] == recording["ticker"] and loaded["server_time"] == recording["server_time"]
+    for tf, rows in recording["ohlcv"].items():
+        np.testing.assert_array_equal(loaded["ohlcv"][tf], rows)
+
+    replay = ReplayExchange(loaded)
+    rows = candle_store.fetch_rows(replay, "BTC/USDT:USDT", "15m", 1800)  # binance sayfası 1500
+    assert rows == loaded["ohlcv"]["15m"][-1800:].tolist()
+    assert replay.fetch_order_book("BTC/USDT:USDT", limit=5)["bids"] == recording["order_book"]["bids"][:5]
+    with pytest.raises(ccxt.BadSymbol):
+        replay.fetch_ticker("ETH/USDT:USDT")
+
+
+def test_analyze_coin_replays_without_network(monkeypatch):
+    """replaying içinde tüm exchange'ler kayda gitmeli; çıkışta havuz ve ortam geri yüklenmeli"""
+    monkeypatch.delenv("CANDLE_STORE", raising=False)
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    recording = synthetic_recording({tf: qwen3.ohlcv_buffer(need) for tf, need in config.items()})
+
+    with replaying(recording) as replay:
+        assert exchanges.get_exchange("okx") is replay
+        out = qwen3.analyze_coin("BTC/USDT:USDT", config)
+
+    last_15m = recording["ohlcv"]["15m"][-1]
+    candle = out["timeframes"]["15m"]["last_candle"]
+    assert candle["close"] == pytest.approx(last_15m[4])
+    expected = 15 * 60 - (recording["server_time"] % (15 * 60_000)) // 1000
+    assert abs(candle["seconds_to_close"] - expected) <= 2
+    assert out["market_info"]["current_price"] == recording["ticker"]["last"]
+    assert "CANDLE_STORE" not in os.environ
+    assert "okx" not in exchanges._pool
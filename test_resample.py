@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_resample.py
+Üst timeframe mumlarının 15m verisinden yerel üretimini ve sayfalı çekimi test eder
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+import candle_store
+import exchanges
+import qwen3
+from candle_store import ohlcv_to_frame
+from resample import compare_ohlcv, plan_resample, resample_ohlcv
+from test_exchanges import NOW_MS, FakeExchange, fake_ohlcv_rows
+
+
+def native_bars(base: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Exchange'in kendi mumları: pandas resample ile bağımsız toplama"""
+    rule = {"1h": "1h", "4h": "4h", "1d": "1D", "1w": "W-MON"}[timeframe]
+    kwargs = {"label": "left", "closed": "left"} if timeframe == "1w" else {}
+    out = base.resample(rule, **kwargs).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    return out.dropna()
+
+
+class ResampleExchange(FakeExchange):
+    """15m serisinden türetilmiş 1h/4h mumları sunan, `since` ve sayfa sınırı uygulayan exchange"""
+
+    def __init__(self, bars=6000):
+        super().__init__("okx")  # sayfa sınırı 300
+        self.base = ohlcv_to_frame(fake_ohlcv_rows("BTC/USDT:USDT", "15m", bars))
+        self.native = {"15m": self.base}
+        for tf in ("1h", "4h"):
+            self.native[tf] = native_bars(self.base, tf)
+
+    def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None, params=None):
+        self.calls.append(("fetch_ohlcv", symbol, timeframe))
+        frame = self.native[timeframe]
+        assert limit <= candle_store.OHLCV_PAGE_LIMITS["okx"]
+        if since is not None:
+            frame = frame[frame.index >= pd.Timestamp(since, unit="ms", tz="UTC")].head(limit)
+        else:
+            frame = frame.tail(limit)
+        return candle_store.frame_to_rows(frame).tolist()
+
+
+def test_resample_matches_exchange_bars():
+    """1h/4h/1d/1w mumları bağımsız pandas toplamıyla aynı olmalı; baştaki eksik mum atılmalı"""
+    base = ohlcv_to_frame(fake_ohlcv_rows("BTC/USDT:USDT", "15m", 3000))
+    for tf in ("1h", "4h", "1d", "1w"):
+        derived = resample_ohlcv(base, tf, "15m")
+        expected = native_bars(base, tf)
+        # İlk mumun başı verinin dışında kalıyorsa karşılaştırmadan çıkar
+        if expected.index[0] < base.index[0]:
+            expected = expected.iloc[1:]
+        pd.testing.assert_frame_equal(derived, expected, check_freq=False, rtol=1e-12)
+        assert compare_ohlcv(derived, expected)["ok"]
+
+    assert resample_ohlcv(base, "1w", "15m").index[0].dayofweek == 0  # pazartesi
+
+
+def test_plan_and_mismatch_report():
+    """Plan en ince timeframe'i seçmeli; bozuk mum raporlanmalı"""
+    plan = plan_resample({"4h": 300, "1h": 350, "15m": 400, "20m": 300})
+    assert plan == {"base": "15m", "base_limit": 301 * 16, "derived": ["4h", "1h"], "native": ["20m"]}
+    assert plan_resample({"15m": 400}) is None
+
+    base = ohlcv_to_frame(fake_ohlcv_rows("BTC/USDT:USDT", "15m", 400))
+    derived = resample_ohlcv(base, "1h", "15m")
+    native = derived.copy()
+    native.iloc[5, native.columns.get_loc("high")] += 1.0
+    native = native.drop(native.index[10])
+    report = compare_ohlcv(derived, native)
+    assert (report["mismatched"], report["missing"], report["ok"]) == (1, 0, False)
+    assert compare_ohlcv(derived.drop(derived.index[10]), derived)["missing"] == 1
+
+
+def test_fetch_rows_pages_beyond_exchange_limit(monkeypatch):
+    """Sayfa sınırını aşan istek `since` ile ileriye doğru sayfalanmalı"""
+    ex = ResampleExchange()
+    monkeypatch.setattr(candle_store.time, "time", lambda: NOW_MS / 1000 + 60)
+
+    rows = candle_store.fetch_rows(ex, "BTC/USDT:USDT", "15m", 1000)
+    assert len(ex.calls) == 4  # 300 + 300 + 300 + 100
+    expected = candle_store.frame_to_rows(ex.base.tail(1000)).tolist()
+    assert rows == expected
+
+
+def test_analyze_coin_resample_mode(monkeypatch):
+    """Resample modunda coin başına tek OHLCV isteği (sayfalar hariç) ve exchange ile tutarlı sonuç"""
+    ex = ResampleExchange()
+    monkeypatch.setenv("CANDLE_STORE", "0")
+    monkeypatch.setenv("RESAMPLE_VERIFY", "1")
+    monkeypatch.setattr(candle_store.time, "time", lambda: NOW_MS / 1000 + 60)
+    monkeypatch.setattr(exchanges.time, "time", lambda: NOW_MS / 1000 + 60)
+    monkeypatch.setattr(exchanges, "get_exchange", lambda exchange_id, warm=True: ex)
+    monkeypatch.setattr(exchanges, "_breaker", exchanges.CircuitBreaker())
+    exchanges.reset_clock()
+
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    fetched = qwen3.fetch_timeframes("BTC/USDT:USDT", config, resample=True)
+    assert list(fetched) == ["4h", "1h", "15m"]
+    for tf, (df, used_ex, _) in fetched.items():
+        assert used_ex is ex and len(df) == qwen3.ohlcv_buffer(config[tf])
+        pd.testing.assert_frame_equal(df, ex.native[tf].tail(len(df)), check_freq=False, rtol=1e-12)
+
+    ex.calls.clear()
+    monkeypatch.setenv("RESAMPLE_VERIFY", "0")
+    out = qwen3.analyze_coin("BTC/USDT:USDT", config, resample=True)
+    ohlcv_tfs = {c[2] for c in ex.calls if c[0] == "fetch_ohlcv"}
+    assert ohlcv_tfs == {"15m"}
+    assert set(out["timeframes"]) == {"4h", "1h", "15m"}
+    assert out["timeframes"]["4h"]["last_candle"]["timestamp"] == ex.native["4h"].index[-1].isoformat()
+    exchanges.reset_clock()
+
+
+def test_verify_falls_back_to_exchange_bars(monkeypatch):
+    """Uyuşmazlıkta exchange'in kendi mumları kullanılmalı"""
+    ex = ResampleExchange()
+    ex.native["1h"] = ex.native["1h"].copy()
+    ex.native["1h"].iloc[-20, 3] -= 5.0  # exchange'te farklı bir low
+    monkeypatch.setenv("CANDLE_STORE", "0")
+    monkeypatch.setenv("RESAMPLE_VERIFY", "1")
+    monkeypatch.setattr(candle_store.time, "time", lambda: NOW_MS / 1000 + 60)
+    monkeypatch.setattr(exchanges, "get_exchange", lambda exchange_id, warm=True: ex)
+    monkeypatch.setattr(exchanges, "_breaker", exchanges.CircuitBreaker())
+
+    fetched = qwen3.fetch_timeframes("BTC/USDT:USDT", {"1h": 150, "15m": 200}, resample=True)
+    df = fetched["1h"][0]
+    assert np.isclose(df["low"].iloc[-20], ex.native["1h"]["low"].iloc[-20])
+
+
+def test_async_resample_matches_sync(monkeypatch):
+    """Async resample aynı mumları üretmeli, doğrulama aynı exchange'ten yapılmalı"""
+    ex = ResampleExchange()
+
+    class AsyncView:
+        id = ex.id
+
+        async def fetch_ohlcv(self, *args, **kwargs):
+            return ex.fetch_ohlcv(*args, **kwargs)
+
+    async def fake_get_async_exchange(exchange_id, warm=True):
+        return AsyncView()
+
+    monkeypatch.setenv("CANDLE_STORE", "0")
+    monkeypatch.setenv("RESAMPLE_VERIFY", "1")
+    monkeypatch.setattr(candle_store.time, "time", lambda: NOW_MS / 1000 + 60)
+    monkeypatch.setattr(exchanges, "get_exchange", lambda exchange_id, warm=True: ex)
+    monkeypatch.setattr(exchanges, "get_async_exchange", fake_get_async_exchange)
+    monkeypatch.setattr(exchanges, "_breaker", exchanges.CircuitBreaker())
+
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    sync = qwen3.fetch_timeframes("BTC/USDT:USDT", config, resample=True)
+    fetched = asyncio.run(qwen3.fetch_timeframes_async("BTC/USDT:USDT", config, asyncio.Semaphore(4),
+                                                       resample=True))
+    assert list(fetched) == list(config)
+    for tf in config:
+        pd.testing.assert_frame_equal(fetched[tf][0], sync[tf][0])
@@ -164,5 +164,134 @@ def test_scalping_indicators():
     print("="*70)
 
 
+def test_signal_frames_match_last_bar_functions():
+    """Bar başına kolonların her satırı, o bara kadar kesilmiş frame'de tek bar fonksiyonunun sonucu olmalı"""
+    from qwen3 import (
+        SCALPING_COLUMNS, SCALPING_ENTRY_SIGNALS, indicator_set,
+        market_regime_analysis, market_regime_frame, detect_volume_anomalies, volume_anomaly_frame,
+        micro_levels, micro_level_frame, scalping_signals, scalping_signal_frame
+    )
+
+    np.random.seed(7)
+    df = indicator_set(create_test_data(600)).frame(SCALPING_COLUMNS)
+    regime, volume = market_regime_frame(df), volume_anomaly_frame(df)
+    micro, scalping = micro_level_frame(df), scalping_signal_frame(df)
+    assert len(regime) == len(volume) == len(micro) == len(scalping) == len(df)
+
+    for t in range(60, len(df), 9):
+        prefix = df.iloc[:t + 1]
+        expected = market_regime_analysis(prefix)
+        row = regime.iloc[t]
+        assert (row['volatility_regime'], row['trend_regime'], row['range_regime']) == \
+            (expected['volatility_regime'], expected['trend_regime'], expected['range_regime'])
+        assert round(row['price_vs_sma20_pct'], 2) == expected['price_vs_sma20_pct']
+
+        expected = detect_volume_anomalies(prefix)
+        row = volume.iloc[t]
+        assert (row['anomaly_level'], row['volume_momentum'], bool(row['is_volume_spike'])) == \
+            (expected['anomaly_level'], expected['volume_momentum'], expected['is_volume_spike'])
+
+        expected = micro_levels(prefix, window=10)
+        row = micro.iloc[t]
+        assert (row['immediate_resistance'], row['immediate_support']) == \
+            (expected['immediate_resistance'], expected['immediate_support'])
+        assert round(row['range_position_pct'], 2) == expected['range_position_pct']
+
+        expected = scalping_signals(df.iloc[t - 49:t + 1])
+        row = scalping.iloc[t]
+        assert (row['vwap_position'], row['stoch_rsi_signal'], row['confidence'], row['risk_level']) == \
+            (expected['signals']['vwap_position'], expected['signals']['stoch_rsi_signal'],
+             expected['confidence'], expected['risk_level'])
+        assert [name for name in SCALPING_ENTRY_SIGNALS if row[name]] == expected['entry_opportunities']
+
+    # Isınma barlarında giriş yok, risk bilinmiyor
+    assert not scalping['valid'].iloc[:19].any() and (scalping['risk_level'].iloc[:19] == 'unknown').all()
+    assert set(regime['volatility_regime']) <= {'high_volatility', 'low_volatility', 'normal_volatility'}
+
+
+# make_data(400, seed=3) için vektörleştirme öncesi (satır satır) uygulamanın ürettiği değerler.
+# Ham fiyat seviyeleri 2 haneye yuvarlanmış olarak tutulur.
+EXPECTED_LAST_BAR_OUTPUTS = {
+    119: {
+        'market_regime_analysis': {
+            'volatility_regime': 'normal_volatility', 'trend_regime': 'ranging', 'range_regime': 'normal',
+            'current_vs_avg_volatility_ratio': 0.76, 'price_vs_sma20_pct': 0.17, 'sma20_vs_sma50_pct': -0.09},
+        'detect_volume_anomalies': {
+            'volume_zscore': 1.41, 'anomaly_level': 'moderate', 'current_vs_avg_volume_ratio': 1.33,
+            'volume_momentum': 'increasing', 'is_volume_spike': False},
+        'micro_levels': {
+            'immediate_resistance': 97163.60, 'immediate_support': 96898.80, 'current_range': 264.80,
+            'range_position_pct': 94.79, 'is_consolidating': False,
+            'range_breakout_levels': {'upside': 97190.08, 'downside': 96872.32},
+            'recent_high_breaks': False, 'recent_low_breaks': False},
+        'scalping_signals': {
+            'signals': {'vwap_position': 'below', 'vwap_distance_pct': -0.121, 'bollinger_squeeze': 'yes',
+                        'bb_percent_b': 1.052, 'stoch_rsi_signal': 'overbought', 'stoch_rsi_value': 100.0,
+                        'volume_spike': 'yes', 'ema_alignment': 'bearish'},
+            'entry_opportunities': ['VWAP_BOUNCE_SHORT', 'VOLUME_BREAKOUT_LONG', 'SQUEEZE_BREAKOUT_LONG'],
+            'confidence': 'high', 'confidence_score': 4, 'risk_level': 'medium'},
+    },
+    210: {
+        'market_regime_analysis': {
+            'volatility_regime': 'low_volatility', 'trend_regime': 'ranging', 'range_regime': 'contracting',
+            'current_vs_avg_volatility_ratio': 0.68, 'price_vs_sma20_pct': 0.26, 'sma20_vs_sma50_pct': -0.11},
+        'detect_volume_anomalies': {
+            'volume_zscore': 0.1, 'anomaly_level': 'normal', 'current_vs_avg_volume_ratio': 1.02,
+            'volume_momentum': 'decreasing', 'is_volume_spike': False},
+        'micro_levels': {
+            'immediate_resistance': 96995.15, 'immediate_support': 96526.69, 'current_range': 468.46,
+            'range_position_pct': 76.67, 'is_consolidating': False,
+            'range_breakout_levels': {'upside': 97042.0, 'downside': 96479.85},
+            'recent_high_breaks': False, 'recent_low_breaks': False},
+        'scalping_signals': {
+            'signals': {'vwap_position': 'below', 'vwap_distance_pct': -0.204, 'bollinger_squeeze': 'yes',
+                        'bb_percent_b': 0.786, 'stoch_rsi_signal': 'neutral', 'stoch_rsi_value': 61.66,
+                        'volume_spike': 'no', 'ema_alignment': 'bearish'},
+            'entry_opportunities': ['SQUEEZE_BREAKOUT_LONG'],
+            'confidence': 'medium', 'confidence_score': 1, 'risk_level': 'low'},
+    },
+    317: {
+        'market_regime_analysis': {
+            'volatility_regime': 'normal_volatility', 'trend_regime': 'ranging', 'range_regime': 'normal',
+            'current_vs_avg_volatility_ratio': 0.92, 'price_vs_sma20_pct': -0.37, 'sma20_vs_sma50_pct': -0.08},
+        'detect_volume_anomalies': {
+            'volume_zscore': 2.02, 'anomaly_level': 'high', 'current_vs_avg_volume_ratio': 1.69,
+            'volume_momentum': 'increasing', 'is_volume_spike': True},
+        'micro_levels': {
+            'immediate_resistance': 99302.68, 'immediate_support': 98770.70, 'current_range': 531.98,
+            'range_position_pct': 9.31, 'is_consolidating': False,
+            'range_breakout_levels': {'upside': 99355.88, 'downside': 98717.5},
+            'recent_high_breaks': False, 'recent_low_breaks': False},
+        'scalping_signals': {
+            'signals': {'vwap_position': 'above', 'vwap_distance_pct': 1.291, 'bollinger_squeeze': 'yes',
+                        'bb_percent_b': -0.13, 'stoch_rsi_signal': 'oversold', 'stoch_rsi_value': 0.0,
+                        'volume_spike': 'yes', 'ema_alignment': 'bullish'},
+            'entry_opportunities': ['VWAP_BOUNCE_LONG', 'VOLUME_BREAKOUT_SHORT', 'SQUEEZE_BREAKOUT_SHORT'],
+            'confidence': 'high', 'confidence_score': 4, 'risk_level': 'medium'},
+    },
+}
+
+
+def test_last_bar_functions_match_fixed_outputs():
+    """Tek bar fonksiyonları, sabit seed'li veride eski uygulamanın çıktılarını birebir vermeli"""
+    from benchmark import make_data
+    from qwen3 import (
+        SCALPING_COLUMNS, indicator_set,
+        market_regime_analysis, detect_volume_anomalies, micro_levels, scalping_signals
+    )
+
+    df = indicator_set(make_data(400, seed=3)).frame(SCALPING_COLUMNS)
+    for t, expected in EXPECTED_LAST_BAR_OUTPUTS.items():
+        prefix = df.iloc[:t + 1]
+        assert market_regime_analysis(prefix) == expected['market_regime_analysis'], t
+        assert detect_volume_anomalies(prefix) == expected['detect_volume_anomalies'], t
+        assert scalping_signals(prefix.tail(50)) == expected['scalping_signals'], t
+
+        micro = micro_levels(prefix)
+        for key in ('immediate_resistance', 'immediate_support', 'current_range'):
+            micro[key] = round(micro[key], 2)
+        assert micro == expected['micro_levels'], t
+
+
 if __name__ == "__main__":
     test_scalping_indicators()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_serialization.py
+Kolon bazlı mum serileştiricinin iterrows tabanlı eski çıktıyla aynı olduğunu test eder
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+import serialization
+from benchmark import recent_candles_json_loop
+from qwen3 import enrich_indicators, recent_candles_json
+from serialization import columnar_records, dumps, iso_timestamps, shifted_timestamps
+from test_scalping_features import create_test_data
+
+
+def test_recent_candles_json_matches_iterrows():
+    """Naive (mikrosaniyeli) ve UTC index'lerde çıktı birebir aynı olmalı"""
+    np.random.seed(23)
+    df = enrich_indicators(create_test_data(600))
+    assert recent_candles_json(df, 150) == recent_candles_json_loop(df, 150)
+
+    utc = df.copy()
+    utc.index = pd.date_range("2024-03-01", periods=len(df), freq="15min", tz="UTC")
+    result = recent_candles_json(utc, 50)
+    assert result == recent_candles_json_loop(utc, 50)
+    assert result[-1]["timestamp"].endswith("Z")
+
+
+def test_missing_columns_and_values():
+    """Olmayan kolonlar ve NaN/None değerler None olarak yazılmalı"""
+    index = pd.date_range("2024-01-01", periods=3, freq="1h", tz="UTC")
+    df = pd.DataFrame({
+        "close": [1.5, np.nan, 3.0],
+        "flag": pd.array([True, None, False], dtype=object),
+        "pattern": pd.Categorical(["doji", None, "normal"]),
+    }, index=index)
+    fields = [("close", "float"), ("ema20", "float"), ("nested", [("flag", "bool")]), ("pattern", "raw")]
+
+    records = columnar_records(df, fields, timestamps=iso_timestamps(df.index))
+    assert records[0] == {"timestamp": "2024-01-01T00:00:00Z", "close": 1.5, "ema20": None,
+                          "nested": {"flag": True}, "pattern": "doji"}
+    assert records[1] == {"timestamp": "2024-01-01T01:00:00Z", "close": None, "ema20": None,
+                          "nested": {"flag": None}, "pattern": None}
+    assert type(records[2]["close"]) is float
+    assert columnar_records(df.iloc[:0], fields, timestamps=[]) == []
+
+
+def test_shifted_timestamps_match_strftime():
+    """UTC+3 kaydırmalı biçim eski satır bazlı strftime ile aynı olmalı"""
+    index = pd.date_range("2024-12-31 20:00", periods=40, freq="15min", tz="UTC")
+    expected = [(ts + pd.Timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S") for ts in index]
+    assert shifted_timestamps(index, hours=3) == expected
+
+
+def test_encoders_produce_same_document(monkeypatch):
+    """orjson ve standart json aynı JSON belgesini üretmeli"""
+    payload = {"symbol": "BTC/USDT", "value": np.float64(1.25), "count": np.int64(3),
+               "items": [{"a": None, "b": "ğüş"}]}
+    fast = json.loads(dumps(payload, indent=True))
+
+    monkeypatch.setenv("JSON_ENCODER", "json")
+    assert not serialization._use_orjson()
+    assert json.loads(dumps(payload)) == fast == {
+        "symbol": "BTC/USDT", "value": 1.25, "count": 3, "items": [{"a": None, "b": "ğüş"}]
+    }
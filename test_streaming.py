@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_streaming.py
+WebSocket akış modunu yerel stub sunucusuyla (ağ olmadan) test eder
+"""
+
+import time
+
+import ccxt
+import pytest
+
+import exchanges
+import qwen3
+import streaming
+from benchmark import synthetic_recording
+from candle_store import MemoryCandleStore, ohlcv_to_frame, timeframe_to_ms
+from recording import ReplayExchange, replaying
+from streaming import LiveMarket, StreamThread, stream_names
+from test_daemon import _assert_close
+from ws_stub import BinanceStreamStub
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "akış mesajı zamanında işlenmedi"
+        time.sleep(0.01)
+
+
+def test_live_market_tracks_forming_bar_closes_and_gaps():
+    """Forming mum yerinde güncellenmeli, kapanan mum depoya yazılmalı, kopma sonrası boşluk işaretlenmeli"""
+    recording = synthetic_recording({"15m": 300})
+    seed = ohlcv_to_frame(recording["ohlcv"]["15m"])
+    step = timeframe_to_ms("15m")
+    forming = int(seed.index[-1].value // 1_000_000)
+
+    store = MemoryCandleStore(max_rows=1000)
+    market = LiveMarket(store=store)
+    market.seed(SYMBOL, "15m", seed)
+    streams = stream_names([SYMBOL], ["15m"])
+    assert streams == ["btcusdt@kline_15m", "btcusdt@markPrice@1s", "btcusdt@bookTicker"]
+
+    with BinanceStreamStub() as stub:
+        stream = StreamThread(market, streams, url=stub.url, reconnect_delay=0.05).start()
+        try:
+            stub.wait_for_subscribers("btcusdt@bookTicker")
+            stub.kline(SYMBOL, "15m", forming, 100, 105, 99, 104, 7.5, event_ms=forming + 60_000)
+            stub.mark_price(SYMBOL, 104.2, 0.0001, forming + 3_600_000, event_ms=forming + 61_000)
+            stub.book_ticker(SYMBOL, 104.1, 2.0, 104.3, 1.5, event_ms=forming + 61_500)
+            wait_until(lambda: market.messages == 3)
+
+            snapshot = market.snapshot(SYMBOL, "15m")
+            assert len(snapshot.frame) == 300 and snapshot.frame["close"].iloc[-1] == 104
+            assert snapshot.quote == {"mark_price": 104.2, "index_price": 104.2, "funding_rate": 0.0001,
+                                      "next_funding_time": forming + 3_600_000,
+                                      "bid": 104.1, "bid_qty": 2.0, "ask": 104.3, "ask_qty": 1.5}
+            assert snapshot.forming and store.load("binance", SYMBOL, "15m") is None
+
+            # Kapanış → depoya yazılır; yeni mum eklenir
+            stub.kline(SYMBOL, "15m", forming, 100, 106, 99, 105, 9.0, closed=True, event_ms=forming + step)
+            stub.kline(SYMBOL, "15m", forming + step, 105, 105, 105, 105, 0.1, event_ms=forming + step + 1)
+            wait_until(lambda: market.messages == 5)
+            assert store.load("binance", SYMBOL, "15m")["close"].iloc[-1] == 105
+            assert len(market.frame(SYMBOL, "15m")) == 301 and not market.gaps
+
+            # Bağlantı koparsa yeniden abone olur; kaçırılan mum boşluk olarak işaretlenir
+            stub.drop_connections()
+            wait_until(lambda: stub.connections == 2 and stub.subscriptions)
+            stub.wait_for_subscribers("btcusdt@kline_15m")
+            stub.kline(SYMBOL, "15m", forming + 3 * step, 1, 1, 1, 1, 1, event_ms=forming + 3 * step)
+            wait_until(lambda: market.messages == 6)
+            assert market.gaps == {(SYMBOL, "15m")}
+        finally:
+            stream.stop()
+
+
+def test_run_stream_analyzes_live_snapshots(monkeypatch):
+    """
+    Akış modu REST'ten seed etmeli, her turda akıştaki kapanmamış mumdan analiz üretmeli, akış sessizse satır
+    yazmamalı; bir buffer'dan fazla mum kapandıktan sonra sonuç aynı buffer'da tek seferlik analizle aynı olmalı
+    """
+    config = {"1h": 150, "15m": 200}
+    buffer = qwen3.ohlcv_buffer(config["15m"])
+    step = timeframe_to_ms("15m")
+    recording = synthetic_recording({tf: qwen3.ohlcv_buffer(need) + 20 for tf, need in config.items()})
+    last_15m = int(recording["ohlcv"]["15m"][-1, 0])
+    markets, results = [], []
+    live_market = streaming.LiveMarket
+    monkeypatch.setattr(streaming, "LiveMarket", lambda **kw: markets.append(live_market(**kw)) or markets[-1])
+
+    with BinanceStreamStub() as stub, replaying(recording):
+        def advance():
+            # Seed'den bir buffer'dan fazla mum kapanır, ardından yeni forming mum gelir
+            expected = markets[0].messages + buffer + 22
+            for k in range(buffer + 22):
+                open_ms, price = last_15m + k * step, 50_250.0 + (k % 7) * 15 - (k % 5) * 9
+                closed = k < buffer + 21
+                stub.kline(SYMBOL, "15m", open_ms, price, price + 12, price - 12, price + 3, 2.0 + k % 3,
+                           closed=closed, event_ms=open_ms + (step if closed else 60_000))
+            wait_until(lambda: markets[0].messages == expected, timeout=20.0)
+
+        steps = iter([None, 50_000.0, 50_250.0, advance])
+
+        def sleep(seconds):
+            price = next(steps)
+            stub.wait_for_subscribers("btcusdt@bookTicker")
+            if price is None:
+                return  # akış henüz mesaj göndermedi: seed'deki donmuş mumlar yazılmamalı
+            if callable(price):
+                return price()
+            expected = markets[0].messages + 3
+            stub.kline(SYMBOL, "15m", last_15m, price, price + 10, price - 10, price, 3.0,
+                       event_ms=last_15m + 60_000)
+            stub.mark_price(SYMBOL, price + 1, 0.0002, last_15m + 3_600_000, event_ms=last_15m + 60_500)
+            stub.book_ticker(SYMBOL, price - 0.5, 1.0, price + 0.5, 1.0, event_ms=last_15m + 61_000)
+            wait_until(lambda: markets[0].messages == expected)
+
+        latest = qwen3.run_stream([SYMBOL], config, on_result=results.append, url=stub.url,
+                                  max_cycles=4, sleep=sleep)
+
+    assert len(results) == 3 and latest[SYMBOL] is results[-1]
+    for price, result in zip([50_000.0, 50_250.0], results):
+        info = result["market_info"]
+        assert info["current_price"] == price and info["mark_price"] == price + 1
+        assert info["bid"] == price - 0.5 and info["spread"] == 1.0 and info["funding_rate"] == 0.02
+        assert info["taker_fee"] == 0.05  # REST'ten alınan statik alanlar korunur
+        assert set(result["timeframes"]) == set(config) and result["timeframes"]["15m"]["summary"]
+        assert result["timeframes"]["15m"]["last_candle"]["close"] == price
+
+    # Canlı geçmiş buffer'dan uzun; analiz yine de son `buffer` mum üzerinden yapılmalı
+    live = markets[0].frame(SYMBOL, "15m")
+    assert len(live) > 2 * buffer
+    one_shot = qwen3.analyze_timeframe(live.tail(buffer), "15m", config["15m"])
+    _assert_close(results[-1]["timeframes"]["15m"]["summary"], one_shot["summary"])
+
+
+def test_run_stream_seeds_only_from_streamed_exchange():
+    """Binance'e erişilemiyorsa seed başka exchange'e düşmemeli; akış modu başlamamalı"""
+    recording = synthetic_recording({"15m": qwen3.ohlcv_buffer(200)})
+
+    class Unreachable(ReplayExchange):
+        def fetch_ohlcv(self, *args, **kwargs):
+            raise ccxt.ExchangeNotAvailable("451 restricted location")
+
+    with replaying(recording) as okx:
+        exchanges.install_exchange("binance", Unreachable(recording))
+        with pytest.raises(RuntimeError, match="seed"):
+            qwen3.run_stream([SYMBOL], {"15m": 200}, url="ws://127.0.0.1:9", max_cycles=1, sleep=lambda s: None)
+        assert qwen3.fetch_ohlcv_with_exchange(SYMBOL, "15m", 200)[1] is okx  # failover normal modda çalışır
+
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_supabase_store.py
+Supabase yazma yardımcılarını yerel PostgREST taklidine karşı test eder
+"""
+
+import pytest
+from postgrest.exceptions import APIError
+from supabase import create_client
+
+import qwen3
+from postgrest_stub import PostgrestStub
+from supabase_store import SupabaseWriter, bulk_clear, is_transient, upsert_rows
+
+
+@pytest.fixture
+def stub():
+    with PostgrestStub() as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    return create_client(stub.url, "test-key")
+
+
+def test_bulk_clear_uses_single_request(stub, client):
+    """Tüm satırlar tek DELETE isteğiyle silinmeli ve silinen sayı dönmeli"""
+    stub.seed("crypto_analysis", [{"symbol": f"COIN{i}/USDT"} for i in range(250)])
+    stub.reset_counters()
+
+    assert bulk_clear(client, "crypto_analysis") == 250
+    assert stub.tables["crypto_analysis"] == []
+    assert stub.requests == [("DELETE", "/rest/v1/crypto_analysis")]
+    assert bulk_clear(client, "crypto_analysis") == 0
+
+
+def test_clear_table_reports_and_swallows_errors(stub, client, monkeypatch, capsys):
+    """qwen3.clear_table silinen sayıyı yazmalı; sunucu hatası akışı durdurmamalı"""
+    monkeypatch.setattr(qwen3, "get_supabase_client", lambda: client)
+    stub.seed("crypto_analysis", [{"symbol": "BTC/USDT"}, {"symbol": "ETH/USDT"}])
+
+    qwen3.clear_table("crypto_analysis")
+    assert "2 kayıt silindi" in capsys.readouterr().out
+
+    stub.seed("crypto_analysis", [{"symbol": "SOL/USDT"}])
+    stub.fail_next(1)
+    qwen3.clear_table("crypto_analysis")
+    assert "Tablo temizleme hatası" in capsys.readouterr().out
+    assert len(stub.tables["crypto_analysis"]) == 1
+
+
+def test_upsert_replaces_rows_and_retries_transient_errors(stub, client):
+    """Aynı sembol güncellenmeli; 503 sonrası tekrar denenip başarılı olmalı, 4xx denenmemeli"""
+    assert upsert_rows(client, "crypto_analysis", [{"symbol": "BTC/USDT", "v": 1}]) == 1
+
+    stub.fail_next(2)
+    stub.reset_counters()
+    rows = [{"symbol": "BTC/USDT", "v": 2}, {"symbol": "ETH/USDT", "v": 1}]
+    assert upsert_rows(client, "crypto_analysis", rows, retries=3, base_delay=0) == 2
+    assert stub.request_count == 3
+    assert sorted((r["symbol"], r["v"]) for r in stub.tables["crypto_analysis"]) == \
+        [("BTC/USDT", 2), ("ETH/USDT", 1)]
+
+    stub.fail_next(5)
+    with pytest.raises(APIError):
+        upsert_rows(client, "crypto_analysis", rows, retries=1, base_delay=0)
+    assert not is_transient(APIError({"message": "duplicate key", "code": "23505"}))
+
+
+def test_writer_batches_and_reports_failures(stub, client):
+    """Arka plan yazıcı kuyruktaki satırları yazmalı, başarısız anahtarları raporlamalı"""
+    writer = SupabaseWriter(client, "crypto_analysis", chunk_size=2, retries=0, base_delay=0).start()
+    for i in range(5):
+        writer.submit({"symbol": f"COIN{i}/USDT"})
+    written, failed = writer.close()
+    assert sorted(written) == [f"COIN{i}/USDT" for i in range(5)]
+    assert failed == {}
+    assert 3 <= stub.request_count <= 5  # en fazla 2'şerli parçalar
+    assert len(stub.tables["crypto_analysis"]) == 5
+
+    writer = SupabaseWriter(client, "crypto_analysis", retries=0, base_delay=0).start()
+    stub.fail_next(1)
+    writer.submit({"symbol": "COIN9/USDT"})
+    written, failed = writer.close()
+    assert written == [] and list(failed) == ["COIN9/USDT"]
+
+
+def test_main_persists_each_coin_and_prunes_stale_rows(stub, client, monkeypatch):
+    """main: coinler upsert edilmeli, eski semboller silinmeli, hata tabloyu boşaltmamalı"""
+    monkeypatch.setenv("SUPABASE_RETRY_DELAY", "0")
+    monkeypatch.setattr(qwen3, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(qwen3, "get_trading_pairs", lambda: ["BTC/USDT", "ETH/USDT", "SOL/USDT"])
+
+    def fake_analyze(symbol, config, resample=None, snapshots=None):
+        if symbol == "SOL/USDT":
+            raise RuntimeError("exchange down")
+        return {"symbol": symbol, "as_of_utc": "2024-01-01T00:00:00Z",
+                "market_info": {"current_price": 1.0, "volume_24h": 1.0}, "timeframes": {"4h": {}}}
+
+    monkeypatch.setattr(qwen3, "analyze_coin", fake_analyze)
+    stub.seed("crypto_analysis", [{"symbol": "SOL/USDT", "as_of_utc": "old"},
+                                  {"symbol": "DOGE/USDT", "as_of_utc": "old"}])
+    stub.fail_next(1)  # ilk yazma geçici hatayla düşer, tekrar denenir
+
+    qwen3.main([])
+
+    table = {r["symbol"]: r for r in stub.tables["crypto_analysis"]}
+    assert set(table) == {"BTC/USDT", "ETH/USDT", "SOL/USDT"}  # DOGE silindi
+    assert table["BTC/USDT"]["as_of_utc"] == "2024-01-01T00:00:00Z"
+    assert table["SOL/USDT"]["as_of_utc"] == "old"  # başarısız coin'in son kaydı korunur
+    assert ("DELETE", "/rest/v1/crypto_analysis") in stub.requests
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_universe.py
+Evren modunun USDT perpetual'ları 24s hacme göre seçtiğini ve süreç havuzunda
+hesaplanan analizin thread'de hesaplananla aynı olduğunu test eder
+"""
+
+import asyncio
+
+import exchanges
+import qwen3
+from test_exchanges import NOW_MS, FakeAsyncExchange, _strip_volatile
+from universe import compute_pool, select_universe, throughput
+
+
+class MarketsExchange:
+    id = "binance"
+
+    def __init__(self):
+        self.requested = None
+
+    def load_markets(self):
+        def swap(symbol, settle="USDT", linear=True, active=True):
+            return {"symbol": symbol, "swap": True, "linear": linear, "settle": settle, "active": active}
+        return {
+            "BTC/USDT:USDT": swap("BTC/USDT:USDT"),
+            "ETH/USDT:USDT": swap("ETH/USDT:USDT"),
+            "DOGE/USDT:USDT": swap("DOGE/USDT:USDT"),
+            "LUNA/USDT:USDT": swap("LUNA/USDT:USDT", active=False),
+            "BTC/USD:BTC": swap("BTC/USD:BTC", settle="BTC", linear=False),
+            "ETH/USDC:USDC": swap("ETH/USDC:USDC", settle="USDC"),
+            "SOL/USDT": {"symbol": "SOL/USDT", "spot": True, "swap": False, "active": True},
+        }
+
+    def fetch_tickers(self, symbols=None):
+        self.requested = symbols
+        return {
+            "BTC/USDT:USDT": {"quoteVolume": 9e9},
+            "ETH/USDT:USDT": {"quoteVolume": None, "baseVolume": 2e6, "last": 3000.0},
+            "DOGE/USDT:USDT": {"quoteVolume": 4e6},
+        }
+
+
+def test_select_universe_ranks_active_usdt_perpetuals_by_volume():
+    """Sadece aktif USDT-margined perpetual'lar hacme göre sıralanmalı, eşik ve limit uygulanmalı"""
+    exchange = MarketsExchange()
+    assert select_universe(exchange, min_volume=0, top=0) == ["BTC/USDT:USDT", "ETH/USDT:USDT", "DOGE/USDT:USDT"]
+    assert sorted(exchange.requested) == ["BTC/USDT:USDT", "DOGE/USDT:USDT", "ETH/USDT:USDT"]
+    assert select_universe(exchange, min_volume=5e6, top=0) == ["BTC/USDT:USDT", "ETH/USDT:USDT"]
+    assert select_universe(exchange, min_volume=0, top=1) == ["BTC/USDT:USDT"]
+
+    rate = throughput([{"symbol": "A", "status": "success", "seconds": 1.0},
+                       {"symbol": "B", "status": "success", "seconds": 3.0},
+                       {"symbol": "C", "status": "failed", "error": "x"}], wall_seconds=4.0)
+    assert rate == {"symbols": 2, "failed": 1, "wall_seconds": 4.0, "symbols_per_sec": 0.5,
+                    "mean_symbol_seconds": 2.0, "p95_symbol_seconds": 3.0}
+
+
+def test_process_pool_compute_matches_thread_compute(monkeypatch):
+    """İndikatör ve özetler süreç havuzunda hesaplandığında çıktı aynı kalmalı"""
+    async_ex = FakeAsyncExchange()
+
+    async def fake_get_async_exchange(exchange_id, warm=True):
+        return async_ex
+
+    async def fake_close():
+        pass
+
+    monkeypatch.setenv("CANDLE_STORE", "0")
+    monkeypatch.setattr(exchanges.time, "time", lambda: NOW_MS / 1000)
+    exchanges.reset_clock()
+    monkeypatch.setattr(exchanges, "get_async_exchange", fake_get_async_exchange)
+    monkeypatch.setattr(qwen3, "close_async_exchanges", fake_close)
+    monkeypatch.setattr(exchanges, "_breaker", exchanges.CircuitBreaker())
+
+    config = {"4h": 100, "1h": 150, "15m": 200}
+    pairs = ["BTC/USDT:USDT", "ETH/USDT:USDT", "SOL/USDT:USDT"]
+    threaded, _ = asyncio.run(qwen3.run_analysis_async(pairs, config, concurrency=3))
+    with compute_pool(2) as pool:
+        pooled, results = asyncio.run(qwen3.run_analysis_async(pairs, config, concurrency=3, pool=pool))
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert all(r["seconds"] > 0 for r in results)
+    assert [_strip_volatile(r) for r in pooled] == [_strip_volatile(r) for r in threaded]
+    exchanges.reset_clock()
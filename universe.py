@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+universe.py
+Geniş sembol evreni: 24 saatlik quote hacmine göre seçilen USDT-margined perpetual'lar
+ve hesaplama aşaması için süreç havuzu.
+
+Evren modu (UNIVERSE_MODE=1 / --universe) sabit beş coin yerine exchange'in tüm aktif
+USDT perpetual'larını tek fetch_tickers isteğiyle sıralar; UNIVERSE_MIN_VOLUME altındakiler
+elenir, UNIVERSE_SIZE > 0 ise en likit N sembol alınır.
+
+200+ sembolde darboğaz tek çekirdekte çalışan pandas/NumPy hesaplamasıdır. Veri async
+olarak çekilirken indikatör hesaplaması ve timeframe özetleri çekirdek sayısı kadar
+işçili bir ProcessPoolExecutor'a dağıtılır (COMPUTE_WORKERS, 0 → os.cpu_count()).
+İşçiler "spawn" ile başlatılır: ana süreçteki exchange/yazıcı thread'leri kopyalanmaz
+ve Windows'ta da aynı davranır.
+"""
+
+import os
+
+# Evren varsayılanları: "likit" alt sınırı 24s quote hacmi (USDT)
+DEFAULT_MIN_QUOTE_VOLUME = 10_000_000.0
+UNIVERSE_QUOTE = "USDT"
+
+
+def universe_size() -> int:
+    """Seçilecek en fazla sembol sayısı (UNIVERSE_SIZE, 0 → sınırsız)."""
+    return int(os.getenv("UNIVERSE_SIZE", "0"))
+
+
+def min_quote_volume() -> float:
+    """Evrene girmek için gereken 24s quote hacmi (UNIVERSE_MIN_VOLUME)."""
+    return float(os.getenv("UNIVERSE_MIN_VOLUME", str(DEFAULT_MIN_QUOTE_VOLUME)))
+
+
+def compute_workers() -> int:
+    """Hesaplama süreci sayısı (COMPUTE_WORKERS, 0 → çekirdek sayısı)."""
+    return int(os.getenv("COMPUTE_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def is_usdt_perpetual(market: dict, quote: str = UNIVERSE_QUOTE) -> bool:
+    """Aktif, USDT ile teminatlı (linear) perpetual swap mı?"""
+    return bool(market.get("swap") and market.get("linear") and market.get("settle") == quote
+                and market.get("active") is not False)
+
+
+def rank_by_quote_volume(tickers: dict, symbols, min_volume: float = 0.0, top: int = 0) -> list:
+    """
+    Sembolleri 24s quote hacmine göre büyükten küçüğe sıralar.
+
+    Args:
+        tickers: fetch_tickers çıktısı {symbol: ticker}
+        symbols: Aday semboller
+        min_volume: Bu hacmin altındakiler elenir
+        top: > 0 ise ilk `top` sembol döner
+    """
+    volumes = {}
+    for symbol in symbols:
+        ticker = tickers.get(symbol)
+        if ticker is None:
+            continue
+        volume = ticker.get("quoteVolume")
+        if volume is None and ticker.get("baseVolume") and ticker.get("last"):
+            volume = ticker["baseVolume"] * ticker["last"]
+        if volume is not None and volume >= min_volume:
+            volumes[symbol] = volume
+    ranked = sorted(volumes, key=lambda s: (-volumes[s], s))
+    return ranked[:top] if top > 0 else ranked
+
+
+def select_universe(exchange, min_volume: float = None, top: int = None) -> list:
+    """
+    Exchange'in aktif USDT perpetual'larını 24s quote hacmine göre seçer.
+
+    Args:
+        exchange: ccxt exchange instance
+        min_volume: Alt hacim sınırı (None → UNIVERSE_MIN_VOLUME)
+        top: En fazla sembol sayısı (None → UNIVERSE_SIZE, 0 → sınırsız)
+
+    Returns:
+        Hacme göre sıralı sembol listesi (örn. ["BTC/USDT:USDT", ...])
+    """
+    min_volume = min_quote_volume() if min_volume is None else min_volume
+    top = universe_size() if top is None else top
+    markets = exchange.load_markets()
+    candidates = [symbol for symbol, market in markets.items() if is_usdt_perpetual(market)]
+    tickers = exchange.fetch_tickers(candidates)
+    return rank_by_quote_volume(tickers, candidates, min_volume=min_volume, top=top)
+
+
+def compute_pool(workers: int = None):
+    """Hesaplama aşaması için spawn tabanlı süreç havuzu (workers None → compute_workers())."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers or compute_workers(),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+
+def throughput(results: list, wall_seconds: float) -> dict:
+    """
+    Çalıştırmanın sembol başına verimi.
+
+    Args:
+        results: run_analysis_async sonuçları (başarılı satırlarda "seconds" alanı)
+        wall_seconds: Tüm çalıştırmanın duvar süresi
+
+    Returns:
+        {"symbols", "failed", "wall_seconds", "symbols_per_sec", "mean_symbol_seconds", "p95_symbol_seconds"}
+    """
+    durations = sorted(r["seconds"] for r in results if r.get("status") == "success" and "seconds" in r)
+    p95 = durations[min(len(durations) - 1, int(round(0.95 * (len(durations) - 1))))] if durations else None
+    return {
+        "symbols": len(durations),
+        "failed": sum(1 for r in results if r.get("status") != "success"),
+        "wall_seconds": round(wall_seconds, 3),
+        "symbols_per_sec": round(len(durations) / wall_seconds, 3) if wall_seconds > 0 else None,
+        "mean_symbol_seconds": round(sum(durations) / len(durations), 3) if durations else None,
+        "p95_symbol_seconds": round(p95, 3) if p95 is not None else None,
+    }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ws_stub.py
+Test için yerel, Binance Futures combined stream uyumlu basit WebSocket sunucusu.
+
+Desteklenen alt küme:
+  → {"method": "SUBSCRIBE", "params": [...], "id": n}   ← {"result": null, "id": n}
+  → {"method": "UNSUBSCRIBE", "params": [...], "id": n} ← {"result": null, "id": n}
+Yayınlanan mesajlar sadece o akışa abone olan bağlantılara
+{"stream": ..., "data": ...} zarfıyla gönderilir.
+
+kline / mark_price / book_ticker Binance event formatında mesaj üretir;
+drop_connections() tüm istemcileri koparır (yeniden bağlanma testleri için).
+
+Kullanım:
+    with BinanceStreamStub() as stub:
+        ... stream_market(market, streams, url=stub.url) ...
+        stub.wait_for_subscribers("btcusdt@kline_15m")
+        stub.kline("BTC/USDT:USDT", "15m", open_ms, 100, 101, 99, 100.5, 12.0, closed=False)
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from streaming import stream_symbol
+
+
+class BinanceStreamStub:
+    """Arka plan thread'inde çalışan aiohttp WebSocket sunucusu."""
+
+    def __init__(self):
+        self.subscriptions = {}  # ws -> set(stream)
+        self.connections = 0     # toplam kabul edilen bağlantı
+        self.sent = 0
+        self._loop = None
+        self._runner = None
+        self._port = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self._port}/stream"
+
+    def start(self) -> "BinanceStreamStub":
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout=10):
+            raise RuntimeError("WebSocket stub başlatılamadı")
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -------------------------
+    #   Sunucu
+    # -------------------------
+    def _serve(self) -> None:
+        from aiohttp import web
+
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/stream", self._handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self._port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _shutdown(self) -> None:
+        for ws in list(self.subscriptions):
+            await ws.close()
+        await self._runner.cleanup()
+
+    async def _handle(self, request):
+        from aiohttp import web, WSMsgType
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self.subscriptions[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                streams = set(payload.get("params", []))
+                if payload.get("method") == "SUBSCRIBE":
+                    self.subscriptions[ws] |= streams
+                elif payload.get("method") == "UNSUBSCRIBE":
+                    self.subscriptions[ws] -= streams
+                await ws.send_json({"result": None, "id": payload.get("id")})
+        finally:
+            self.subscriptions.pop(ws, None)
+        return ws
+
+    async def _broadcast(self, stream: str, data: dict) -> int:
+        text = json.dumps({"stream": stream, "data": data})
+        targets = [ws for ws, streams in self.subscriptions.items() if stream in streams]
+        for ws in targets:
+            await ws.send_str(text)
+        self.sent += len(targets)
+        return len(targets)
+
+    # -------------------------
+    #   Test yardımcıları
+    # -------------------------
+    def publish(self, stream: str, data: dict) -> int:
+        """Ham event yayınlar; mesajı alan bağlantı sayısını döndürür."""
+        return asyncio.run_coroutine_threadsafe(self._broadcast(stream, data), self._loop).result(timeout=10)
+
+    def wait_for_subscribers(self, stream: str, count: int = 1, timeout: float = 5.0) -> None:
+        """En az count bağlantı stream'e abone olana kadar bekler."""
+        deadline = time.time() + timeout
+        while sum(stream in s for s in list(self.subscriptions.values())) < count:
+            if time.time() > deadline:
+                raise TimeoutError(f"{stream} için abone bekleniyor")
+            time.sleep(0.01)
+
+    def drop_connections(self) -> None:
+        """Tüm istemci bağlantılarını kapatır."""
+        async def close_all():
+            for ws in list(self.subscriptions):
+                await ws.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result(timeout=10)
+
+    def kline(self, symbol: str, timeframe: str, open_ms: int, o, h, l, c, v,
+              closed: bool = False, event_ms: int = None) -> int:
+        base = stream_symbol(symbol)
+        return self.publish(f"{base}@kline_{timeframe}", {
+            "e": "kline", "E": event_ms or open_ms, "s": base.upper(),
+            "k": {"t": open_ms, "i": timeframe, "o": str(o), "h": str(h), "l": str(l),
+                  "c": str(c), "v": str(v), "x": closed},
+        })
+
+    def mark_price(self, symbol: str, price, funding_rate, next_funding_ms: int,
+                   event_ms: int, index_price=None) -> int:
+        base = stream_symbol(symbol)
+        return self.publish(f"{base}@markPrice@1s", {
+            "e": "markPriceUpdate", "E": event_ms, "s": base.upper(), "p": str(price),
+            "i": str(index_price if index_price is not None else price),
+            "r": str(funding_rate), "T": next_funding_ms,
+        })
+
+    def book_ticker(self, symbol: str, bid, bid_qty, ask, ask_qty, event_ms: int) -> int:
+        base = stream_symbol(symbol)
+        return self.publish(f"{base}@bookTicker", {
+            "e": "bookTicker", "E": event_ms, "T": event_ms, "s": base.upper(),
+            "b": str(bid), "B": str(bid_qty), "a": str(ask), "A": str(ask_qty),
+        })